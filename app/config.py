@@ -193,11 +193,79 @@ class Settings(BaseSettings):
     # 浏览器页面数量限制配置
     browser_max_pages_per_context: int = 10  # 每个浏览器上下文的最大页面数
 
+    # Playwright 驱动进程共享配置（所有浏览器会话共用驱动，而不是每个会话启动一个 Node 进程）
+    browser_playwright_driver_shards: int = 1  # 共享驱动进程数量，按引用数分配到负载最低的驱动
+    browser_playwright_driver_keep_alive: bool = True  # 无会话引用时是否保留驱动进程，避免下次冷启动
+
+    # 浏览器预热池配置（根据最近活跃 / 即将执行的定时工作流提前启动浏览器）
+    browser_warm_pool_enabled: bool = False  # 是否启用预热池
+    browser_warm_pool_interval: int = 60  # 预热检查间隔（秒）
+    browser_warm_pool_max_sessions: int = 4  # 同时存在的未认领预热会话上限
+    browser_warm_pool_session_estimate_mb: int = 300  # 单个浏览器会话的预估内存（MB）
+    browser_warm_pool_memory_reserve_mb: int = 2048  # 预热后至少保留的可用内存（MB）
+    browser_warm_pool_max_load_per_cpu: float = 0.7  # 1 分钟负载 / CPU 核数超过该值时不预热
+    browser_warm_pool_recent_window: int = 3600  # 最近活跃窗口（秒），窗口内用过的浏览器视为预热候选
+    browser_warm_pool_schedule_lead_time: int = 120  # 定时工作流提前多少秒预热
+    browser_warm_pool_ttl: int = 600  # 预热会话未被认领的最长保留时间（秒）
+
+    # 浏览器资源治理配置（按 Chromium 进程树采样 RSS/CPU，超出全局预算时按 闲置时长×内存 回收）
+    browser_memory_budget_mb: int = 0  # 所有浏览器会话的总内存预算（MB），0 表示不启用
+    browser_resource_check_interval: int = 30  # 资源采样与预算检查间隔（秒）
+    browser_memory_critical_ratio: float = 1.2  # 总内存超过 预算×该倍数 时直接关闭会话，不再尝试休眠
+    browser_hibernate_reclaim_ratio: float = 0.4  # 休眠页面预计可回收的内存比例
+    browser_page_hibernate_min_idle: int = 120  # 会话至少闲置多少秒才允许被休眠 / 回收
+
+    # 多节点会话分片配置（会话按 (mid, browser_id) 粘滞到固定节点，其它节点收到的请求转发给所属节点）
+    cluster_enabled: bool = False  # 是否启用会话分片，单节点部署保持关闭
+    cluster_node_id: str = ""  # 节点 ID，缺省为 hostname:pid
+    cluster_node_address: str = ""  # 其它节点访问本节点的基础 URL，例如 http://10.0.0.2:28000（每个进程需独立可达）
+    cluster_directory_path: str = ""  # 会话目录 SQLite 文件路径，缺省使用进程内目录（仅单进程有效）
+    cluster_node_ttl: int = 30  # 节点心跳超时（秒），超时节点名下的会话重新分配
+    cluster_heartbeat_interval: int = 10  # 节点心跳间隔（秒）
+    cluster_virtual_nodes: int = 64  # 一致性哈希环上每个节点的虚拟节点数
+    cluster_forward_timeout: float = 120.0  # 转发请求到所属节点的超时时间（秒）
+    cluster_shared_secret: str = ""  # 节点间共享密钥，用于签名转发标记（启用分片时必填，所有节点一致）
+    cluster_forward_signature_ttl: int = 60  # 转发签名的有效期（秒），需覆盖节点间的时钟偏差
+
     # 工作流控制流嵌套深度限制
     workflow_max_nesting_depth: int = 10  # 最大嵌套深度（Loop/IfElse）
+    pipeline_cache_size: int = 256  # 已编译工作流 Pipeline / 自定义操作步骤的 LRU 缓存容量
+    condition_cache_size: int = 1024  # 已编译条件表达式 / 条件规则的 LRU 缓存容量（各自独立计数）
+
+    # 工作流定时触发配置（进程内按 cron / interval 触发已启用的工作流，替代外部 cron 调用 HTTP 接口）
+    # 启用会话分片时每个节点都加载全部任务，但只在 (mid, browser_id) 归属本节点时执行，同一触发只会在一个节点运行
+    workflow_trigger_enabled: bool = False  # 是否启用进程内定时触发，仍由外部 cron 驱动时保持关闭以免重复执行
+    workflow_trigger_tick_interval: int = 1  # 检查到期任务的间隔（秒）
+    workflow_trigger_max_concurrency: int = 16  # 全局同时执行的定时工作流数量上限
+    workflow_trigger_max_per_user: int = 2  # 单个用户同时执行的定时工作流数量上限
+    workflow_trigger_max_jitter: float = 30.0  # 启动抖动上限（秒），打散同一时刻触发的工作流，不超过触发周期的一半
+    workflow_trigger_headless: bool = True  # 定时执行时新建的浏览器是否无头
+
+    # 出站 HTTP 客户端连接池（按 代理/证书校验/HTTP2/超时 复用长连接，如 FetchExternalData 操作）
+    http_client_max_clients: int = 32  # 最多同时保留的客户端数量（不同代理 / 超时配置各占一个）
+    http_client_max_connections: int = 100  # 单个客户端的最大连接数
+    http_client_max_keepalive_connections: int = 20  # 单个客户端保留的空闲长连接数
+    http_client_keepalive_expiry: float = 30.0  # 空闲长连接保留时间（秒）
+    http_client_idle_ttl: float = 300.0  # 客户端闲置超过该时间（秒）后关闭
+
+    # 浏览器归属校验缓存（按用户整体加载 browser_id 列表，本进程创建 / 删除指纹时立即失效）
+    browser_ownership_cache_ttl: float = 30.0  # 归属结果的缓存时间（秒），其它节点的删除最多延迟该时间生效
+    browser_ownership_negative_ttl: float = 5.0  # "不属于" 结果的缓存时间（秒），其它节点新建的指纹最多延迟该时间可见
+    browser_ownership_cache_max_users: int = 10000  # 缓存的用户数上限
+
+    # URL 安全检查的 DNS 解析配置（有界线程池解析 + 正向 / 负向缓存）
+    dns_resolver_max_workers: int = 4  # 执行 getaddrinfo 的线程数上限
+    dns_resolve_timeout: float = 5.0  # 单次解析超时（秒）
+    dns_cache_ttl: float = 300.0  # 解析成功结果的缓存时间（秒）
+    dns_negative_cache_ttl: float = 30.0  # 解析失败 / 超时结果的缓存时间（秒）
+    dns_cache_max_entries: int = 4096  # 缓存的主机名数量上限
 
     # WebRTC 视频流配置
     browser_webrtc_idle_timeout: int = 300  # WebRTC 流最大闲置时间（秒），默认5分钟
+    browser_webrtc_governor_interval: float = 2.0  # 截屏画质 / 帧率自适应调节周期（秒）
+    browser_webrtc_cpu_budget: float = 0.5  # 所有 WebRTC 流解码 + 编码可占用的 CPU 比例（占主机总核数）
+    browser_webrtc_load_high: float = 0.85  # 主机每核 1 分钟负载超过该值时按比例收紧 CPU 预算
+    browser_webrtc_loss_threshold: float = 0.1  # 观众 RTCP 丢包率超过该值时降级该流
 
     # Alembic 数据库迁移配置
     alembic_auto_migrate: bool = True  # 是否在应用启动时自动执行数据库迁移
@@ -207,6 +275,22 @@ class Settings(BaseSettings):
     action_log_default_enabled: bool = False  # 默认是否采集操作日志（用户可按 action 覆盖）
     action_log_max_payload_length: int = 4000  # params/result/variables 序列化后最大字符数
     action_log_default_retention_days: int = 30  # 默认日志保留天数，0 表示永久保留
+    action_log_async_write: bool = True  # 是否由后台协程批量写入操作日志（关闭则每条同步写库）
+    action_log_queue_size: int = 10000  # 待写入日志队列上限，满时丢弃成功记录、失败记录短暂等待
+    action_log_batch_size: int = 200  # 单次批量写入的最大条数
+    action_log_flush_interval: float = 1.0  # 攒批最长等待时间（秒）
+    action_log_put_timeout: float = 0.5  # 队列满时失败记录最多等待的时间（秒）
+
+    # 产物存储配置（截图等二进制结果按内容寻址落盘，执行结果 / 变量 / 日志中只保留引用）
+    artifact_store_dir: str = os.path.join(PROJECT_ROOT, "artifacts")  # 存储目录
+    artifact_retention_days: float = 7  # 保留天数，超期的产物由清理任务删除，0 表示不按时间清理
+    artifact_max_total_mb: int = 2048  # 总容量上限（MB），超出时从最旧的产物开始删除，0 表示不限制
+    artifact_cleanup_interval: int = 3600  # 清理任务执行间隔（秒）
+    artifact_download_chunk_size: int = 256 * 1024  # 下载时每次读取的块大小（字节）
+
+    # 运行指标与采样剖析配置（管理员接口以 Prometheus 文本格式导出 / 按需剖析）
+    metrics_enabled: bool = True  # 是否记录热路径指标（操作耗时、SQL 耗时、丢帧等），关闭后仅导出拉取式指标
+    profiler_max_seconds: float = 60.0  # 单次采样剖析的最长时间（秒）
 
 
 settings = Settings()
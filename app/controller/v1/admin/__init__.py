@@ -1,6 +1,7 @@
 """Admin controller package"""
 
 from app.controller.v1.admin.admin_router import router as admin_sub_router
+from app.controller.v1.admin.metrics_router import router as metrics_sub_router
 from app.controller.v1.admin.permission_router import router as permission_sub_router
 from app.controller.v1.admin.report_router import router as report_sub_router
 from app.models.router.all_routes import admin_router
@@ -10,5 +11,6 @@ router = gen_api_router(admin_router)
 router.include_router(admin_sub_router)
 router.include_router(permission_sub_router)
 router.include_router(report_sub_router)
+router.include_router(metrics_sub_router)
 
 __all__ = ["router"]
@@ -10,8 +10,10 @@ from app.models.system.admin import (
     AdminAllSessionsResponse,
     BrowserSessionConfigResponse,
     UpdateBrowserSessionConfigRequest,
+    WarmPoolStatsResponse,
 )
 from app.services.RPA_browser.session.live_service import LiveService
+from app.services.RPA_browser.browser_session_pool.playwright_pool import get_default_session_pool
 
 router = APIRouter(tags=[RouterTag.admin_management])
 
@@ -115,3 +117,28 @@ async def update_browser_session_config(request: UpdateBrowserSessionConfigReque
             msg=f"Failed to update browser session config: {str(e)}",
             code=ResponseCode.INTERNAL_ERROR,
         )
+
+
+@router.get("/sessions/warm-pool", response_model=StandardResponse[WarmPoolStatsResponse])
+async def get_warm_pool_stats():
+    """获取会话池命中率与预热池统计（管理员）"""
+    try:
+        pool = get_default_session_pool()
+        stats = pool.stats
+        response = WarmPoolStatsResponse(
+            enabled=settings.browser_warm_pool_enabled,
+            hits=stats.hits,
+            misses=stats.misses,
+            warm_hits=stats.warm_hits,
+            hit_ratio=stats.hit_ratio,
+            warm_sessions=len(pool.warm_sessions),
+            time_to_first_page_p50=stats.percentile(0.5),
+            time_to_first_page_p99=stats.percentile(0.99),
+        )
+        return success_response(data=response)
+    except Exception as e:
+        logger.error(f"❌ Admin: failed to fetch warm pool stats: {e}")
+        return error_response(
+            msg=f"Failed to fetch warm pool stats: {str(e)}",
+            code=ResponseCode.INTERNAL_ERROR,
+        )
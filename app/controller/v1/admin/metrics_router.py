@@ -0,0 +1,44 @@
+"""管理员 API - 运行指标导出与按需采样剖析"""
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from loguru import logger
+
+from app.models.response import StandardResponse, success_response
+from app.models.router.router_tag import RouterTag
+from app.models.system.admin import ProfileResponse, ProfileStack
+from app.utils.metrics.profiler import sampling_profiler
+from app.utils.metrics.registry import CONTENT_TYPE_LATEST, metrics_registry
+
+router = APIRouter(tags=[RouterTag.admin_management])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """导出进程内运行指标（Prometheus 文本格式，供 Prometheus 抓取）"""
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/profile", response_model=StandardResponse[ProfileResponse])
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="采样时长（秒），超过配置上限时按上限采样"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="采样间隔（毫秒）"),
+    top: int = Query(200, ge=1, description="返回命中次数最多的前 N 条调用栈（仅 json 格式）"),
+    fmt: Literal["json", "collapsed"] = Query(
+        "json", alias="format", description="collapsed 返回 flamegraph.pl / speedscope 可直接读取的折叠栈文本",
+    ),
+):
+    """对整个进程做一次采样剖析（管理员），同一时间只允许一个剖析任务"""
+    logger.info(f"👨‍💼 Admin: profiling for {seconds}s (interval={interval_ms}ms)")
+    result = await sampling_profiler.profile(seconds, interval_ms / 1000)
+    if fmt == "collapsed":
+        return PlainTextResponse(result.collapsed())
+
+    response = ProfileResponse(
+        duration=result.duration,
+        interval=result.interval,
+        samples=result.samples,
+        stacks=[ProfileStack(stack=stack, count=count) for stack, count in result.stacks.most_common(top)],
+    )
+    return success_response(data=response)
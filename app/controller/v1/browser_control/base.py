@@ -10,6 +10,7 @@ from app.models.router.all_routes import (
     browser_control_community_router,
     browser_control_execution_router,
     browser_control_action_log_router,
+    browser_control_artifact_router,
 )
 from app.utils.controller.router_path import gen_api_router
 
@@ -56,3 +57,8 @@ def new_execution_router(dependencies=None) -> APIRouter:
 def new_action_log_router(dependencies=None) -> APIRouter:
     """操作日志管理路由"""
     return gen_api_router(browser_control_action_log_router, dependencies)
+
+
+def new_artifact_router(dependencies=None) -> APIRouter:
+    """产物下载路由"""
+    return gen_api_router(browser_control_artifact_router, dependencies)
@@ -19,6 +19,9 @@ from app.controller.v1.browser_control.execution.community_router import (
 from app.controller.v1.browser_control.execution.action_log_router import (
     router as action_log_sub_router,
 )
+from app.controller.v1.browser_control.execution.artifact_router import (
+    router as artifact_sub_router,
+)
 
 router = APIRouter()
 router.include_router(action_sub_router)
@@ -27,4 +30,5 @@ router.include_router(workflow_sub_router)
 router.include_router(plugin_sub_router)
 router.include_router(community_sub_router)
 router.include_router(action_log_sub_router)
+router.include_router(artifact_sub_router)
 __all__ = ["router"]
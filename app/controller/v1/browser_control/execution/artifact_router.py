@@ -0,0 +1,80 @@
+"""
+产物下载路由
+
+截图等二进制结果只在执行结果中返回 artifact_id，原始字节通过本接口流式下载：
+    - 支持单段 Range（bytes=start-end / bytes=start- / bytes=-suffix），返回 206 + Content-Range
+    - ETag 为内容 SHA-256，内容不可变，客户端可长期缓存
+"""
+import re
+
+from fastapi import Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
+
+from app.models.router.router_prefix import BrowserControlRouterPath
+from app.services.execution.artifact_store import artifact_store
+from app.utils.depends.mid_depends import get_auth_info_from_header, AuthInfo
+from ..base import new_artifact_router
+
+router = new_artifact_router()
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """解析单段 Range 头，返回闭区间 (start, end)
+
+    Returns:
+        None 表示忽略 Range 返回完整内容（格式不支持 / 多段）
+
+    Raises:
+        ValueError: 范围不可满足（应返回 416）
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N：最后 N 个字节
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+@router.get(BrowserControlRouterPath.artifacts_download, summary="下载产物（支持 Range）")
+async def download_artifact(
+    artifact_id: str = Query(..., description="产物 ID"),
+    range_header: str | None = Header(default=None, alias="Range"),
+    auth: AuthInfo = Depends(get_auth_info_from_header),
+) -> Response:
+    """按块流式返回产物内容，只能下载自己的产物"""
+    artifact = await artifact_store.get(artifact_id, auth.mid)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{artifact.sha256}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+
+    try:
+        byte_range = _parse_range(range_header, artifact.size) if range_header else None
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{artifact.size}"
+        return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(artifact.size)
+        return StreamingResponse(
+            artifact_store.iter_bytes(artifact), media_type=artifact.content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        artifact_store.iter_bytes(artifact, start, end),
+        status_code=206, media_type=artifact.content_type, headers=headers,
+    )
@@ -9,8 +9,10 @@ from app.models.response import StandardResponse, success_response, error_respon
 from bili_common.models.response_code import ResponseCode
 from app.models.router.router_prefix import BrowserControlRouterPath
 from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.cluster_depends import route_to_session_owner
 from bili_common.models.depends import BrowserReqAuthInfo
 from app.services.RPA_browser.session.live_service import live_service
+from app.models.runtime.live_service import BrowserSessionEntry
 from app.services.execution.engine import ExecutionEngine
 from app.services.execution.action_registry import action_registry
 from app.services.execution.actions.control_flow import CompositeAction as CompositeActionClass
@@ -42,18 +44,17 @@ router = new_execution_router()
 execution_engine = ExecutionEngine()
 
 
-async def _resolve_page(mid: int, browser_id: int | str, page_index: int | None = None):
-    """从 LiveService 解析浏览器页面，供路由层传入引擎"""
-    entry = live_service.get_browser_session_entry(mid=mid, browser_id=browser_id)
-    if not entry:
-        raise ValueError("浏览器不存在或未运行")
+async def _resolve_page(entry: BrowserSessionEntry, page_index: int | None = None):
+    """解析会话条目上的浏览器页面，供路由层传入引擎
 
+    条目需通过 live_service.use_browser_session 获取：执行期间会话标记为忙碌且休眠的页面已恢复。
+    """
     if page_index is None:
         return await entry.browser_session.get_current_page()
 
     all_pages = entry.browser_session.all_pages
     if not all_pages:
-        raise ValueError(f"浏览器 {browser_id} 没有打开任何页面")
+        raise ValueError(f"浏览器 {entry.browser_id} 没有打开任何页面")
     if not (0 <= page_index < len(all_pages)):
         raise ValueError(f"页面索引 {page_index} 超出范围 (0-{len(all_pages)-1})")
     return all_pages[page_index]
@@ -93,7 +94,11 @@ def _build_auth_headers(auth_info) -> dict[str, str]:
 # ============ 操作执行 API ============
 
 
-@router.post(BrowserControlRouterPath.actions_execute, summary="执行单个操作")
+@router.post(
+    BrowserControlRouterPath.actions_execute,
+    summary="执行单个操作",
+    dependencies=[Depends(route_to_session_owner)],
+)
 async def execute_action(
     request: ActionExecuteRequest,
     browser_info: BrowserReqAuthInfo = Depends(verify_browser_ownership),
@@ -111,13 +116,14 @@ async def execute_action(
         page_index=request.page_index,
         auth_headers=_build_auth_headers(browser_info.auth_info),
     )
-    page = await _resolve_page(browser_info.auth_info.mid, browser_info.browser_id, request.page_index)
-    result = await execution_engine.execute_action(
-        req,
-        session_id=str(browser_info.browser_id),
-        browser_id=str(browser_info.browser_id),
-        page=page,
-    )
+    async with live_service.use_browser_session(browser_info.auth_info.mid, browser_info.browser_id) as entry:
+        page = await _resolve_page(entry, request.page_index)
+        result = await execution_engine.execute_action(
+            req,
+            session_id=str(browser_info.browser_id),
+            browser_id=str(browser_info.browser_id),
+            page=page,
+        )
     return success_response(
         ActionResultResponse(
             success=result.success,
@@ -135,7 +141,11 @@ async def execute_action(
 # ============ 工作流执行 API ============
 
 
-@router.post(BrowserControlRouterPath.workflows_execute, summary="执行工作流")
+@router.post(
+    BrowserControlRouterPath.workflows_execute,
+    summary="执行工作流",
+    dependencies=[Depends(route_to_session_owner)],
+)
 async def execute_workflow(
     request: WorkflowExecuteRequest,
     browser_info: BrowserReqAuthInfo = Depends(verify_browser_ownership),
@@ -160,45 +170,40 @@ async def execute_workflow(
         auth_headers=_build_auth_headers(browser_info.auth_info),
     )
 
-    page = await _resolve_page(mid, bid, request.page_index)
+    async with live_service.use_browser_session(mid, bid) as entry:
+        page = await _resolve_page(entry, request.page_index)
 
-    if request.steps:
-        # PipelineBuilder 通过 getattr 统一访问步骤字段，无需 create_workflow_step 二次规范化
-        plugins = await workflow_crud_svr.get_enabled_plugins(request.workflow_id) if request.workflow_id else []
-        steps = _build_steps(request.steps)
-        results = await execution_engine.execute_steps(
-            req,
-            steps=steps,
-            session_id=str(bid),
-            browser_id=str(bid),
-            page=page,
-            plugins=plugins,
-        )
-    elif request.action_id:
-        from app.services.execution.crud_service import action_crud_svr, workflow_crud_svr
-        from app.models.execution.action_params import _ensure_action_type, workflow_step_adapter
-        action_model = await action_crud_svr.get_by_action_id(request.action_id)
-        if not action_model:
-            return error_response(ResponseCode.BUSINESS_ERROR, f"未找到操作: {request.action_id}")
-
-        plugins = await workflow_crud_svr.get_enabled_plugins(request.workflow_id) if request.workflow_id else []
-
-        normalized_steps = []
-        for s in action_model.steps:
-            if isinstance(s, dict):
-                s = workflow_step_adapter.validate_python(_ensure_action_type(s))
-            normalized_steps.append(s)
-
-        results = await execution_engine.execute_steps(
-            req,
-            steps=normalized_steps,
-            session_id=str(bid),
-            browser_id=str(bid),
-            page=page,
-            plugins=plugins,
-        )
-    else:
-        return error_response(ResponseCode.BUSINESS_ERROR, "需要提供 action_id 或 steps")
+        if request.steps:
+            # PipelineBuilder 通过 getattr 统一访问步骤字段，无需 create_workflow_step 二次规范化
+            plugins = await workflow_crud_svr.get_enabled_plugins(request.workflow_id) if request.workflow_id else []
+            steps = _build_steps(request.steps)
+            results = await execution_engine.execute_steps(
+                req,
+                steps=steps,
+                session_id=str(bid),
+                browser_id=str(bid),
+                page=page,
+                plugins=plugins,
+            )
+        elif request.action_id:
+            from app.services.execution.crud_service import action_crud_svr, workflow_crud_svr
+            action_model = await action_crud_svr.get_by_action_id(request.action_id)
+            if not action_model:
+                return error_response(ResponseCode.BUSINESS_ERROR, f"未找到操作: {request.action_id}")
+
+            plugins = await workflow_crud_svr.get_enabled_plugins(request.workflow_id) if request.workflow_id else []
+
+            # 按 (action_id, updated_at) 缓存编译结果，定时工作流重复执行时不再重新规范化 / 编译
+            results = await execution_engine.execute_steps(
+                req,
+                steps=execution_engine.compile_action_pipeline(action_model),
+                session_id=str(bid),
+                browser_id=str(bid),
+                page=page,
+                plugins=plugins,
+            )
+        else:
+            return error_response(ResponseCode.BUSINESS_ERROR, "需要提供 action_id 或 steps")
 
     results_data = [
         {
@@ -294,7 +299,11 @@ async def validate_action_params(
 # ============ 单步执行 API ============
 
 
-@router.post(BrowserControlRouterPath.actions_execute_step, summary="单步执行操作")
+@router.post(
+    BrowserControlRouterPath.actions_execute_step,
+    summary="单步执行操作",
+    dependencies=[Depends(route_to_session_owner)],
+)
 async def execute_action_step(
     request: ExecuteStepRequest,
     browser_info: BrowserReqAuthInfo = Depends(verify_browser_ownership),
@@ -308,60 +317,61 @@ async def execute_action_step(
     try:
         mid = browser_info.auth_info.mid
         bid = browser_info.browser_id
-        page = await _resolve_page(mid, bid, request.page_index)
-        auth_headers = _build_auth_headers(browser_info.auth_info)
-
-        action_class = await action_registry.get_action_class_for_user(request.action_id)
-        if not action_class:
-            raise ValueError(f"未找到操作: {request.action_id}")
-        metadata = action_registry.get_action_metadata(request.action_id)
-        if not metadata:
-            raise ValueError(f"未找到操作: {request.action_id}")
-
-        req = ActionExecutionRequest(
-            mid=mid,
-            browser_id=bid,
-            variables=request.variables,
-            page_index=request.page_index,
-            action_id=request.action_id,
-            params=request.params,
-            auth_headers=auth_headers,
-        )
-
-        if issubclass(action_class, CompositeActionClass):
-            params_dict = params_to_dict(request.params)
-            steps = params_dict.get("steps", [])
-            if request.step_index < 0 or request.step_index >= len(steps):
-                raise ValueError(f"步骤索引 {request.step_index} 超出范围 (0-{len(steps)-1})")
-
-            step = steps[request.step_index]
-            step_params = execution_engine._replace_params(
-                step.get("params", {}), request.variables)
-
-            step_req = ActionExecutionRequest(
+        async with live_service.use_browser_session(mid, bid) as entry:
+            page = await _resolve_page(entry, request.page_index)
+            auth_headers = _build_auth_headers(browser_info.auth_info)
+
+            action_class = await action_registry.get_action_class_for_user(request.action_id)
+            if not action_class:
+                raise ValueError(f"未找到操作: {request.action_id}")
+            metadata = action_registry.get_action_metadata(request.action_id)
+            if not metadata:
+                raise ValueError(f"未找到操作: {request.action_id}")
+
+            req = ActionExecutionRequest(
                 mid=mid,
                 browser_id=bid,
                 variables=request.variables,
                 page_index=request.page_index,
-                action_id=step["action_id"],
-                params=step_params,
+                action_id=request.action_id,
+                params=request.params,
                 auth_headers=auth_headers,
             )
-            result = await execution_engine.execute_action(
-                step_req,
-                session_id=str(bid),
-                browser_id=str(bid),
-                page=page,
-            )
-            step_index, action_id, action_name = request.step_index, step["action_id"], metadata.name
-        else:
-            result = await execution_engine.execute_action(
-                req,
-                session_id=str(bid),
-                browser_id=str(bid),
-                page=page,
-            )
-            step_index, action_id, action_name = 0, request.action_id, metadata.name
+
+            if issubclass(action_class, CompositeActionClass):
+                params_dict = params_to_dict(request.params)
+                steps = params_dict.get("steps", [])
+                if request.step_index < 0 or request.step_index >= len(steps):
+                    raise ValueError(f"步骤索引 {request.step_index} 超出范围 (0-{len(steps)-1})")
+
+                step = steps[request.step_index]
+                step_params = execution_engine._replace_params(
+                    step.get("params", {}), request.variables)
+
+                step_req = ActionExecutionRequest(
+                    mid=mid,
+                    browser_id=bid,
+                    variables=request.variables,
+                    page_index=request.page_index,
+                    action_id=step["action_id"],
+                    params=step_params,
+                    auth_headers=auth_headers,
+                )
+                result = await execution_engine.execute_action(
+                    step_req,
+                    session_id=str(bid),
+                    browser_id=str(bid),
+                    page=page,
+                )
+                step_index, action_id, action_name = request.step_index, step["action_id"], metadata.name
+            else:
+                result = await execution_engine.execute_action(
+                    req,
+                    session_id=str(bid),
+                    browser_id=str(bid),
+                    page=page,
+                )
+                step_index, action_id, action_name = 0, request.action_id, metadata.name
 
         return success_response(
             ExecuteStepResponse(
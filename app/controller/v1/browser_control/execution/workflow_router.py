@@ -11,6 +11,7 @@ from app.models.router.router_prefix import BrowserControlRouterPath
 from app.utils.depends.mid_depends import get_auth_info_from_header, AuthInfo
 from fastapi import Depends
 from app.services.RPA_browser.session.live_service import live_service
+from app.models.runtime.live_service import BrowserSessionEntry
 from app.services.execution.crud_service import workflow_crud_svr
 from app.models.workflow.models import (
     WorkflowCreateRequest,
@@ -34,15 +35,12 @@ from ..base import new_workflow_router
 execution_engine = ExecutionEngine()
 
 
-async def _resolve_page(mid: int, browser_id: int, page_index: int | None = None):
-    """从 LiveService 解析浏览器页面"""
-    entry = live_service.get_browser_session_entry(mid=mid, browser_id=browser_id)
-    if not entry:
-        raise ValueError("浏览器不存在或未运行")
+async def _resolve_page(entry: BrowserSessionEntry, page_index: int | None = None):
+    """解析会话条目上的浏览器页面（条目需通过 live_service.use_browser_session 获取）"""
     if page_index is not None:
         all_pages = entry.browser_session.all_pages
         if not all_pages:
-            raise ValueError(f"浏览器 {browser_id} 没有打开任何页面")
+            raise ValueError(f"浏览器 {entry.browser_id} 没有打开任何页面")
         if not (0 <= page_index < len(all_pages)):
             raise ValueError(f"页面索引 {page_index} 超出范围 (0-{len(all_pages)-1})")
         return all_pages[page_index]
@@ -430,8 +428,6 @@ async def execute_workflow_step(
 
         mid = auth.mid
         bid = int(request.browser_id) if request.browser_id.isdigit() else 0
-        page = await _resolve_page(mid, bid, request.page_index)
-
         step_req = ActionExecutionRequest(
             mid=mid,
             browser_id=bid,
@@ -440,12 +436,14 @@ async def execute_workflow_step(
             action_id=step.action_id,
             params=step.params or {},
         )
-        result = await execution_engine.execute_action(
-            step_req,
-            session_id=str(bid),
-            browser_id=str(bid),
-            page=page,
-        )
+        async with live_service.use_browser_session(mid, bid) as entry:
+            page = await _resolve_page(entry, request.page_index)
+            result = await execution_engine.execute_action(
+                step_req,
+                session_id=str(bid),
+                browser_id=str(bid),
+                page=page,
+            )
 
         logger.info(
             f"[Workflow Step Execute] 步骤执行完成: success={result.success}")
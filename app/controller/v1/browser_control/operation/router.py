@@ -10,12 +10,13 @@ from app.models.router.router_prefix import BrowserControlRouterPath
 from app.services.RPA_browser.session.live_service import LiveService
 from app.utils.depends.mid_depends import get_auth_info_from_header, AuthInfo
 from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.cluster_depends import route_to_session_owner
 from bili_common.models.depends import BrowserReqInfo, BrowserReqAuthInfo
 from ..base import new_operation_router
 from pydantic import BaseModel, Field
 from fastapi import Depends
 
-router = new_operation_router()
+router = new_operation_router(dependencies=[Depends(route_to_session_owner)])
 
 
 # ============ 浏览器操作请求模型 ============
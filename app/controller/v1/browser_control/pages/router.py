@@ -9,11 +9,12 @@ from app.models.response import StandardResponse, success_response, error_respon
 from bili_common.models.response_code import ResponseCode
 from app.services.RPA_browser.session.live_service import LiveService
 from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.cluster_depends import route_to_session_owner
 from ..base import new_webrtc_router
 import loguru
 from app.models.runtime.control import PagesListResponse
 
-router = new_webrtc_router()
+router = new_webrtc_router(dependencies=[Depends(route_to_session_owner)])
 
 
 @router.post(
@@ -38,7 +39,7 @@ async def get_pages_list(
 
     try:
         # 获取浏览器会话
-        entry = live_service.get_browser_session_entry(
+        entry = await live_service.acquire_browser_session_entry(
             mid, int(browser_id)
         )
         if not entry:
@@ -14,10 +14,11 @@ from app.models.router.router_prefix import BrowserSessionRouterPath
 from app.services.RPA_browser.session.live_service import LiveService
 from app.utils.depends.mid_depends import AuthInfo, get_auth_info_from_header
 from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.cluster_depends import route_to_session_owner
 from bili_common.models.depends import BrowserReqInfo, BrowserReqAuthInfo
 from ..base import new_session_router
 
-router = new_session_router()
+router = new_session_router(dependencies=[Depends(route_to_session_owner)])
 
 
 @router.post(
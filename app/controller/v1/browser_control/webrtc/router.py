@@ -13,11 +13,12 @@ from bili_common.models.response_code import ResponseCode
 from app.models.router.router_prefix import BrowserControlRouterPath
 from app.services.RPA_browser.session.live_service import LiveService
 from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.cluster_depends import route_to_session_owner
 from bili_common.models.depends import BrowserReqAuthInfo
 from ..base import new_webrtc_router
 from pydantic import BaseModel
 
-router = new_webrtc_router()
+router = new_webrtc_router(dependencies=[Depends(route_to_session_owner)])
 
 
 class WebRTCOfferRequest(BaseModel):
@@ -67,6 +68,7 @@ async def create_webrtc_offer(
     """
     创建 WebRTC Offer 以开始视频流传输。
     会话不存在时自动创建，WebRTC 管理器已内建无需手动启用。
+    同一页面的多个观众共享一路捕获与编码，返回的 stream_key 为该观众的 key。
     """
     mid = browser_req.auth_info.mid
     browser_id = browser_req.browser_id
@@ -129,7 +131,7 @@ async def handle_webrtc_answer(
             )
 
         logger.info(f"找到流: {stream.stream_key}, 状态: {stream.state.value}")
-        await stream.handle_answer(req.sdp, req.type)
+        await stream.handle_answer(req.sdp, req.type, viewer_key=req.stream_key)
         logger.info(f"WebRTC Answer 处理成功: {stream.stream_key}")
         return success_response(msg="WebRTC Answer 已处理")
 
@@ -163,7 +165,7 @@ async def add_ice_candidate(
             )
 
         await stream.add_ice_candidate(
-            req.candidate, req.sdpMid, req.sdpMLineIndex
+            req.candidate, req.sdpMid, req.sdpMLineIndex, viewer_key=req.stream_key
         )
         return success_response(msg="ICE Candidate 已添加")
 
@@ -219,6 +221,7 @@ async def get_webrtc_status(
                     "stream_key": stream.stream_key,
                     "page_index": page_index,
                     "state": stream.state.value,
+                    "viewers": stream.viewer_count,
                     "idle_duration": round(stream.idle_duration, 1),
                 }
             )
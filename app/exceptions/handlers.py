@@ -10,6 +10,7 @@ import traceback
 from app.config import settings
 from sqlalchemy.exc import DisconnectionError, OperationalError
 from app.models.common.exceptions.base_exception import BaseException as CustomBaseException
+from app.services.RPA_browser.cluster import SessionForwardedException
 
 from loguru import logger
 
@@ -67,6 +68,13 @@ async def custom_exception_handler(
     return JSONResponse(content=response.model_dump(), status_code=200)
 
 
+async def session_forwarded_handler(
+    _: Request, exc: SessionForwardedException
+) -> Response:
+    """请求已由会话所属节点处理，原样返回其响应"""
+    return exc.response
+
+
 async def global_exception_handler(_: Request, exc: Exception) -> Response:
     """处理所有未捕获的异常，特别优化数据库连接丢失处理"""
 
@@ -139,3 +139,27 @@ class ActionNotFoundException(BaseException):
 
     def __init__(self, action_id: str):
         self.msg = self.msg.format(action_id=action_id)
+
+
+class SessionOwnerUnavailableException(BaseException):
+    """会话所属节点不可达异常（多节点部署）"""
+    code = ResponseCode.SERVICE_UNAVAILABLE
+    msg = "浏览器会话所在节点 {node_id} 暂不可用，请稍后重试"
+
+    def __init__(self, node_id: str):
+        self.msg = self.msg.format(node_id=node_id)
+
+
+class ArtifactNotFoundException(BaseException):
+    """产物不存在、已过期或不属于当前用户"""
+    code = ResponseCode.NOT_FOUND
+    msg = "产物不存在或已过期: {artifact_id}"
+
+    def __init__(self, artifact_id: str):
+        self.msg = self.msg.format(artifact_id=artifact_id)
+
+
+class ProfilerBusyException(BaseException):
+    """已有采样剖析任务正在运行"""
+    code = ResponseCode.BUSINESS_ERROR
+    msg = "已有剖析任务正在运行，请稍后重试"
@@ -53,6 +53,7 @@ class BuiltinActionDesc(StrEnum):
 
     IF_ELSE = "根据条件执行 true/false 分支"
     LOOP = "循环执行"
+    PARALLEL = "并发执行多个分支"
     COMPOSITE = "执行复合操作"
 
 
@@ -68,6 +69,7 @@ class BuiltinActionName(StrEnum):
     COMPOSITE = "复合操作"
     LLM = "LLM"
     IF_ELSE = "条件判断"
+    PARALLEL = "并行"
     HOVER = "悬停"
     NEW_PAGE = "新页面"
     GET_TEXT = "获取文本"
@@ -95,6 +97,7 @@ class BuiltinActionType(StrEnum):
     LOOP = "loop"
     COMPOSITE = "composite"  # 复合操作 需要拆分开开单独执行
     IF_ELSE = "if_else"
+    PARALLEL = "parallel"
 
     @property
     def nameDisplay(self) -> str:
@@ -342,6 +345,8 @@ class ScreenshotParams(SelectorActionParams):
         default=False, description="是否截取整个可滚动页面（仅 page.screenshot 支持）")
     omit_background: bool = Field(
         default=False, description="是否隐藏默认白色背景并截取透明背景（仅 png 格式支持）")
+    return_base64: bool = Field(
+        default=False, description="是否同时在结果中内联 Base64 图片数据（兼容旧调用方，体积约为原图 1.3 倍）")
 
 
 class LLMParams(BaseActionParams):
@@ -524,13 +529,32 @@ class IfElseParams(BaseActionParams):
         default=None, description="假分支步骤")
 
 
+class ParallelParams(BaseActionParams):
+    """并行控制流操作参数
+
+    每个分支在独立的子作用域中并发执行，全部结束后按分支声明顺序把成功分支写入的变量合并回父作用域
+    （同名变量以靠后的分支为准，与完成先后无关）。
+    """
+    branches: list[list['WorkflowStep']] = Field(
+        default_factory=list, description="并发执行的分支，每个分支是一个步骤列表")
+    on_branch_error: Literal["fail_fast", "collect_all"] = Field(
+        default="fail_fast",
+        description="分支失败策略: fail_fast=任一分支失败立即取消其余分支, collect_all=等待所有分支结束后汇总",
+    )
+    page_indexes: list[int | None] | None = Field(
+        default=None,
+        description="各分支绑定的页面索引（与 branches 按位置对应），None 表示使用当前页面",
+    )
+    max_concurrency: int = Field(default=0, ge=0, le=100, description="同时执行的分支数上限，0 表示不限制")
+
+
 class CompositeParams(BaseActionParams):
     """复合操作参数"""
     steps: list['WorkflowStep'] = Field(
         default_factory=list, description="复合操作步骤")
 
 
-AllActionParams = ClickParams | InputParams | NavigateParams | NewPageParams | ScrollParams | WaitParams | HoverParams | GetTextParams | GetWindowParams | ScreenshotParams | LLMParams | FetchExternalDataParams | PrintParams | LoopParams | IfElseParams | CompositeParams
+AllActionParams = ClickParams | InputParams | NavigateParams | NewPageParams | ScrollParams | WaitParams | HoverParams | GetTextParams | GetWindowParams | ScreenshotParams | LLMParams | FetchExternalDataParams | PrintParams | LoopParams | IfElseParams | ParallelParams | CompositeParams
 
 # endregion
 
@@ -590,7 +614,11 @@ class ScreenshotResult(SQLModel):
     """截图操作结果"""
     format: str = Field(default="png", description="截图格式")
     size: int = Field(default=0, description="图片大小(字节)")
-    base64: str = Field(default="", description="Base64 编码的图片数据")
+    base64: str = Field(default="", description="Base64 编码的图片数据（仅 return_base64=True 或产物存储不可用时返回）")
+    artifact_id: str = Field(default="", description="产物 ID，通过产物下载接口获取图片")
+    sha256: str = Field(default="", description="图片内容的 SHA-256")
+    width: int | None = Field(default=None, description="图片宽度(像素)")
+    height: int | None = Field(default=None, description="图片高度(像素)")
 
 
 class LLMResult(SQLModel):
@@ -647,6 +675,13 @@ class IfElseResult(SQLModel):
     message: str | None = Field(default=None, description="提示消息")
 
 
+class ParallelResult(SQLModel):
+    """并行操作结果"""
+    branches: list[Dict] = Field(default_factory=list, description="各分支结果（按声明顺序）")
+    failed_branches: list[int] = Field(default_factory=list, description="失败的分支索引")
+    cancelled_branches: list[int] = Field(default_factory=list, description="被 fail_fast 取消的分支索引")
+
+
 class CompositeResult(SQLModel):
     """复合操作结果"""
     total_steps: int = Field(default=0, description="总步骤数")
@@ -654,7 +689,7 @@ class CompositeResult(SQLModel):
     results: list[Dict] = Field(default_factory=list, description="各步骤结果")
 
 
-AllActionResult = ClickResult | InputResult | ScrollResult | WaitResult | HoverResult | GetTextResult | GetWindowResult | NavigateResult | NewPageResult | ScreenshotResult | LLMResult | FetchExternalDataResult | PrintResult | LoopResult | IfElseResult | CompositeResult
+AllActionResult = ClickResult | InputResult | ScrollResult | WaitResult | HoverResult | GetTextResult | GetWindowResult | NavigateResult | NewPageResult | ScreenshotResult | LLMResult | FetchExternalDataResult | PrintResult | LoopResult | IfElseResult | ParallelResult | CompositeResult
 
 BUILTIN_ACTION_RESULT_MAP: Dict[str, Type[AllActionResult]] = {
     BuiltinActionType.CLICK: ClickResult,
@@ -672,6 +707,7 @@ BUILTIN_ACTION_RESULT_MAP: Dict[str, Type[AllActionResult]] = {
     BuiltinActionType.PRINT: PrintResult,
     BuiltinActionType.LOOP: LoopResult,
     BuiltinActionType.IF_ELSE: IfElseResult,
+    BuiltinActionType.PARALLEL: ParallelResult,
     BuiltinActionType.COMPOSITE: CompositeResult,
 }
 
@@ -704,6 +740,7 @@ BUILTIN_ACTION_PARAMS_MAP: Dict[str, Type[AllActionParams]] = {
     BuiltinActionType.PRINT: PrintParams,
     BuiltinActionType.LOOP: LoopParams,
     BuiltinActionType.IF_ELSE: IfElseParams,
+    BuiltinActionType.PARALLEL: ParallelParams,
     BuiltinActionType.COMPOSITE: CompositeParams,
 }
 
@@ -825,6 +862,11 @@ class IfElseWorkflowStep(BaseWorkflowStep[IfElseParams]):
     action_type: Literal[BuiltinActionType.IF_ELSE] = BuiltinActionType.IF_ELSE  # type: ignore[assignment]
 
 
+class ParallelWorkflowStep(BaseWorkflowStep[ParallelParams]):
+    """并行步骤"""
+    action_type: Literal[BuiltinActionType.PARALLEL] = BuiltinActionType.PARALLEL  # type: ignore[assignment]
+
+
 class CompositeWorkflowStep(BaseWorkflowStep[CompositeParams]):
     """复合操作步骤"""
     action_type: Literal[BuiltinActionType.COMPOSITE] = BuiltinActionType.COMPOSITE  # type: ignore[assignment]
@@ -863,6 +905,7 @@ WorkflowStep = ClickWorkflowStep\
     | PrintWorkflowStep\
     | LoopWorkflowStep\
     | IfElseWorkflowStep\
+    | ParallelWorkflowStep\
     | CompositeWorkflowStep
 
 # TypeAdapter 用于从 dict 反序列化
@@ -885,6 +928,7 @@ _WORKFLOW_STEP_CLASS_MAP: dict[BuiltinActionType, type[BaseWorkflowStep[Any]]] =
     BuiltinActionType.PRINT: PrintWorkflowStep,
     BuiltinActionType.LOOP: LoopWorkflowStep,
     BuiltinActionType.IF_ELSE: IfElseWorkflowStep,
+    BuiltinActionType.PARALLEL: ParallelWorkflowStep,
     BuiltinActionType.COMPOSITE: CompositeWorkflowStep,
 }
 
@@ -132,6 +132,13 @@ browser_control_action_log_router = RouterInfo(
     description="操作日志管理 - 日志查询与清理",
 )
 
+browser_control_artifact_router = RouterInfo(
+    version_tag=DEFAULT_VERSION,
+    router_tag=RouterTag.artifact_management,
+    router_prefix=RouterPrefix.BROWSER_CONTROL,
+    description="产物管理 - 截图等二进制产物的流式下载（支持 Range）",
+)
+
 # ====== 系统管理模块 ======
 
 admin_router = RouterInfo(
@@ -163,6 +170,7 @@ BROWSER_RUNTIME_ROUTERS: List[RouterInfo] = [
     browser_control_session_router,
     browser_control_community_router,   # 社区互动
     browser_control_action_log_router,  # 操作日志管理
+    browser_control_artifact_router,    # 产物管理
 ]
 
 # 系统管理相关路由
@@ -81,6 +81,9 @@ class BrowserControlRouterPath(StrEnum):
     action_logs_clear = "/action-logs/clear"
     action_logs_stats = "/action-logs/stats"
 
+    # === 产物下载 ===
+    artifacts_download = "/artifacts/download"
+
     # === 系统微服务 ===
     system_services_list = "/system-services/list"
 
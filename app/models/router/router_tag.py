@@ -18,6 +18,7 @@ class RouterTag(StrEnum):
     session_control = "浏览器会话控制"
     execution_engine = "执行引擎"  # 提供浏览器操作的执行
     action_log_management = "操作日志管理"  # 浏览器操作日志采集配置与查询
+    artifact_management = "产物管理"  # 截图等二进制产物的下载
     # === 系统管理 ===
     community_management = "社区互动管理"  # 公开资源浏览、点赞、举报、Fork
     # === 系统管理 ===
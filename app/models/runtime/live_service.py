@@ -18,6 +18,15 @@ from app.services.RPA_browser.browser_session_pool.session_pool_model import (
 )
 
 
+@dataclass
+class CleanupDecision:
+    should_cleanup: bool = False
+    reason: str = ""
+    next_state: SessionLifecycleState = SessionLifecycleState.ACTIVE
+    priority: int = 0  # 优先级，数字越小优先级越高
+    hibernate_pages: bool = False  # 不关闭会话，只休眠闲置页面以释放内存
+
+
 @dataclass
 class BrowserSessionEntry:
     """浏览器会话条目"""
@@ -36,6 +45,11 @@ class BrowserSessionEntry:
     created_at: int = field(default_factory=lambda: int(time.time()))
     lifecycle_state: SessionLifecycleState = SessionLifecycleState.ACTIVE
     expires_at: int | None = None
+    # 资源采样结果（由 ResourceGovernor 周期性更新）
+    rss_mb: float = 0.0
+    cpu_percent: float = 0.0
+    # 正在使用该会话执行的操作 / 工作流数量（HTTP 执行不占用 active_connections）
+    busy_count: int = 0
 
     @property
     def is_expired(self) -> bool:
@@ -57,6 +71,11 @@ class BrowserSessionEntry:
         """检查是否没有活跃连接"""
         return len(self.active_connections) == 0
 
+    @property
+    def is_busy(self) -> bool:
+        """是否有操作 / 工作流正在使用该会话执行"""
+        return self.busy_count > 0
+
     @property
     def calculated_expires_at(self) -> int | None:
         """动态计算过期时间：基于清理策略和当前状态"""
@@ -81,6 +100,16 @@ class BrowserSessionEntry:
         """检查浏览器是否正在运行（委托给 browser_session）"""
         return not self.browser_session.is_closed
 
+    @property
+    def user_data_dir(self) -> str:
+        """浏览器持久化上下文的用户目录（用于定位 Chromium 进程树）"""
+        return self.browser_session.playwright_instance.user_data_dir
+
+    @property
+    def eviction_cost(self) -> float:
+        """内存压力下的驱逐代价：闲置时长 × 内存占用，越大越应该先被回收"""
+        return max(0, self.idle_duration) * self.rss_mb
+
     @property
     def page_count(self) -> int:
         """获取页面数量（委托给 browser_session）"""
@@ -92,4 +121,5 @@ class BrowserSessionEntry:
 
 __all__ = [
     "BrowserSessionEntry",
+    "CleanupDecision",
 ]
@@ -26,6 +26,7 @@ class WebRTCStreamInfo:
     state: WebRTCStreamState = WebRTCStreamState.INITIALIZING  # 当前状态
     created_at: float = field(default_factory=time.time)  # 创建时间戳
     last_activity: float = field(default_factory=time.time)  # 最后活动时间戳
+    viewer_count: int = 0  # 当前观众数（共享同一路编码）
     
     @property
     def age_seconds(self) -> float:
@@ -45,6 +46,8 @@ class WebRTCSessionConfig:
     max_fps: int = 30  # 最大帧率
     idle_timeout: int = 300  # 闲置超时时间（秒），默认5分钟
     frame_queue_size: int = 10  # 帧队列大小（丢旧保新策略）
+    bitrate: int = 1_000_000  # 共享 VP8 编码码率（bps），所有观众共用，不随单个观众的 REMB 调整
+    viewer_queue_size: int = 8  # 每个观众的编码帧队列大小，满时该观众丢帧并等待下一个关键帧
     
     def __post_init__(self):
         """验证配置参数的有效性"""
@@ -56,10 +59,32 @@ class WebRTCSessionConfig:
             raise ValueError(f"Idle timeout must be positive, got {self.idle_timeout}")
         if self.frame_queue_size <= 0:
             raise ValueError(f"Frame queue size must be positive, got {self.frame_queue_size}")
+        if self.bitrate <= 0:
+            raise ValueError(f"Bitrate must be positive, got {self.bitrate}")
+        if self.viewer_queue_size <= 0:
+            raise ValueError(f"Viewer queue size must be positive, got {self.viewer_queue_size}")
+
+
+@dataclass(frozen=True, slots=True)
+class ScreencastSettings:
+    """CDP Page.startScreencast 参数（可在运行中调整）"""
+    quality: int = 80  # JPEG 图像质量 (0-100)
+    every_nth_frame: int = 1  # 每 N 帧推送一帧
+    max_width: Optional[int] = None  # 最大宽度，None 表示原始分辨率
+    max_height: Optional[int] = None  # 最大高度，None 表示原始分辨率
+
+    def to_cdp_params(self) -> dict:
+        params = {"format": "jpeg", "quality": self.quality, "everyNthFrame": self.every_nth_frame}
+        if self.max_width is not None:
+            params["maxWidth"] = self.max_width
+        if self.max_height is not None:
+            params["maxHeight"] = self.max_height
+        return params
 
 
 __all__ = [
     "WebRTCStreamState",
     "WebRTCStreamInfo",
     "WebRTCSessionConfig",
+    "ScreencastSettings",
 ]
@@ -62,6 +62,32 @@ class UpdateBrowserSessionConfigRequest(SQLModel):
     expiration_time: int | None = Field(None, description="会话过期时间（秒），None表示不过期", ge=300)
 
 
+class WarmPoolStatsResponse(SQLModel):
+    """浏览器预热池 / 会话池命中统计响应"""
+    enabled: bool = Field(description="是否启用预热池")
+    hits: int = Field(description="会话池命中次数")
+    misses: int = Field(description="会话池未命中（需要现场启动浏览器）次数")
+    warm_hits: int = Field(description="命中预热会话的次数")
+    hit_ratio: float = Field(description="命中率")
+    warm_sessions: int = Field(description="当前未被认领的预热会话数")
+    time_to_first_page_p50: float = Field(description="首个页面可用耗时 p50（秒）")
+    time_to_first_page_p99: float = Field(description="首个页面可用耗时 p99（秒）")
+
+
+class ProfileStack(SQLModel):
+    """采样剖析中的一条折叠调用栈"""
+    stack: str = Field(description="线程名;根帧;...;栈顶帧")
+    count: int = Field(description="采样命中次数")
+
+
+class ProfileResponse(SQLModel):
+    """采样剖析结果响应"""
+    duration: float = Field(description="实际采样时长（秒）")
+    interval: float = Field(description="采样间隔（秒）")
+    samples: int = Field(description="采样轮数（每轮覆盖所有线程）")
+    stacks: list[ProfileStack] = Field(description="按命中次数降序的折叠调用栈")
+
+
 __all__ = [
     "AdminSessionInfo",
     "AdminAllSessionsResponse",
@@ -69,4 +95,7 @@ __all__ = [
     "AdminWebRTCConnectionInfo",
     "BrowserSessionConfigResponse",
     "UpdateBrowserSessionConfigRequest",
+    "WarmPoolStatsResponse",
+    "ProfileStack",
+    "ProfileResponse",
 ]
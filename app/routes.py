@@ -1,4 +1,5 @@
 from app.models.common.exceptions.base_exception import BaseException as CustomBaseException
+from app.services.RPA_browser.cluster import SessionForwardedException
 from fastapi import FastAPI
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
@@ -10,6 +11,7 @@ from app.exceptions.handlers import (
     http_exception_handler,
     validation_exception_handler,
     custom_exception_handler,
+    session_forwarded_handler,
     global_exception_handler,
     database_connection_handler,
 )
@@ -32,6 +34,7 @@ def setup_routes(app: FastAPI):
     app.add_exception_handler(RequestValidationError,
                               validation_exception_handler)
     app.add_exception_handler(CustomBaseException, custom_exception_handler)
+    app.add_exception_handler(SessionForwardedException, session_forwarded_handler)
     app.add_exception_handler(OperationalError, database_connection_handler)
     app.add_exception_handler(DisconnectionError, database_connection_handler)
     app.add_exception_handler(Exception, global_exception_handler)
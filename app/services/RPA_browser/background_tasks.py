@@ -1,6 +1,10 @@
 """后台任务服务 - 处理浏览器操作的异步后台任务"""
 
 from app.services.RPA_browser.session.live_service import live_service
+from app.services.RPA_browser.browser_session_pool.warm_pool import get_default_warm_pool
+from app.services.RPA_browser.cluster import get_default_session_router
+from app.services.execution.artifact_store import artifact_store
+from app.utils.http.httpx_client import sweep_idle_http_clients
 from loguru import logger
 from app.config import settings, ConfigRunningModeEnum
 
@@ -37,5 +41,68 @@ class BackgroundTasks:
             logger.info("✅ 会话清理任务完成")
         else:
             logger.info("开发者模式下不清理浏览器会话")
-        
-    
+
+    @staticmethod
+    async def warm_browser_pool():
+        """
+        预热池调度任务
+
+        释放超时未被认领的预热会话，并在内存 / 负载预算内提前启动预测会用到的浏览器。
+        """
+        try:
+            await get_default_warm_pool().tick()
+        except Exception as e:
+            logger.error(f"预热池调度失败: {e}")
+
+    @staticmethod
+    async def enforce_resource_budget():
+        """
+        浏览器资源预算检查任务
+
+        采样各浏览器进程树的内存 / CPU，总内存超出 browser_memory_budget_mb 时
+        按 闲置时长×内存 的代价优先休眠页面，仍不足时关闭会话。
+        """
+        try:
+            await live_service.enforce_resource_budget()
+        except Exception as e:
+            logger.error(f"浏览器资源预算检查失败: {e}")
+
+    @staticmethod
+    async def cluster_heartbeat():
+        """
+        多节点会话分片心跳任务
+
+        定期刷新本节点心跳，超过 cluster_node_ttl 未刷新的节点名下的会话会被其它节点接管。
+        """
+        router = get_default_session_router()
+        if router is None:
+            return
+        try:
+            await router.heartbeat()
+        except Exception as e:
+            logger.error(f"节点心跳更新失败: {e}")
+
+    @staticmethod
+    async def cleanup_artifacts():
+        """
+        产物清理任务
+
+        删除超过保留天数的截图等产物，总量超出 artifact_max_total_mb 时从最旧的开始删除。
+        """
+        try:
+            await artifact_store.cleanup()
+        except Exception as e:
+            logger.error(f"产物清理失败: {e}")
+
+    @staticmethod
+    async def sweep_http_clients():
+        """
+        HTTP 客户端回收任务
+
+        关闭闲置超过 http_client_idle_ttl 的连接池客户端；没有新请求时 get_client 不会触发回收，
+        由该任务兜底。
+        """
+        try:
+            await sweep_idle_http_clients()
+        except Exception as e:
+            logger.error(f"HTTP 客户端回收失败: {e}")
@@ -1,5 +1,6 @@
 import os
 import uuid
+from contextlib import suppress
 from pathlib import Path
 from typing import Any, AsyncGenerator
 from playwright.async_api import BrowserContext
@@ -8,8 +9,15 @@ from app.models.core.browser.fingerprint import BaseFingerprintBrowserInitParams
 from app.utils.consts.browser_exe_info.browser_exec_info_utils import (
     browser_exec_info_helper,
 )
-from app.config import CONF
+from app.config import CONF, settings
 from botright.botright import Botright
+from botright.modules.playwright_driver import PlaywrightDriverManager
+
+# 进程级共享的 Playwright 驱动管理器：所有浏览器会话从这里借用驱动，而不是各自启动一个 Node 进程
+playwright_driver_manager = PlaywrightDriverManager(
+    shards=settings.browser_playwright_driver_shards,
+    keep_alive=settings.browser_playwright_driver_keep_alive,
+)
 
 
 class BaseUndetectedPlaywright:
@@ -67,15 +75,21 @@ class BaseUndetectedPlaywright:
             user_action_layer=True,  # 操作的时候显示操作的内容
             fingerprint=fingerprint_params.browserforge_fingerprint_object,
             execute_path=browser_exec_info.exec_path,
+            driver_manager=playwright_driver_manager,
         )
-        botright_instance.flags.extend(self.default_args)
-        browser = await botright_instance.new_browser(
-            proxy=fingerprint_params.proxy_server,
-            user_data_dir=self._user_data_dir,
-            viewport=fingerprint_params.viewport,
-            screen=fingerprint_params.screen,
-            accept_downloads=False
-        )
-        await browser.new_page()  # 使用新的mock好的页面,直接调用new_page就行了,botright会自动处理关闭初始页面
-        yield browser
-        await browser.close()
+        try:
+            botright_instance.flags.extend(self.default_args)
+            browser = await botright_instance.new_browser(
+                proxy=fingerprint_params.proxy_server,
+                user_data_dir=self._user_data_dir,
+                viewport=fingerprint_params.viewport,
+                screen=fingerprint_params.screen,
+                accept_downloads=False
+            )
+            await browser.new_page()  # 使用新的mock好的页面,直接调用new_page就行了,botright会自动处理关闭初始页面
+            yield browser
+            await browser.close()
+        finally:
+            # 生成器被 aclose() 时也要归还共享驱动的引用，否则驱动引用计数只增不减
+            with suppress(Exception):
+                await botright_instance.close()
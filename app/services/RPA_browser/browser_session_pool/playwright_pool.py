@@ -1,4 +1,5 @@
-import asyncio
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Dict
 from app.models.runtime.session import (
     SessionCreateParams,
@@ -7,71 +8,124 @@ from app.models.runtime.session import (
     SessionCloseResponse,
 )
 from app.services.RPA_browser.browser_session_pool.session_pool_model import (
-    BrowserSession,
     WebRTCEnabledSession,
 )
+from app.services.RPA_browser.browser_session_pool.session_registry import ShardedSessionRegistry
 import time
 from loguru import logger
 from app.models.common.exceptions.base_exception import BrowserNotStartedException
 
 
+@dataclass
+class SessionPoolStats:
+    """会话池命中统计：命中/未命中次数与首个页面可用耗时（time-to-first-page）采样"""
+    hits: int = 0
+    misses: int = 0
+    warm_hits: int = 0  # 命中的会话是由预热池提前启动的
+    first_page_samples: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def record_first_page(self, seconds: float) -> None:
+        self.first_page_samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """返回 time-to-first-page 的分位数（秒），无采样时为 0"""
+        if not self.first_page_samples:
+            return 0.0
+        ordered = sorted(self.first_page_samples)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
 class PlaywrightSessionPool:
     """
     管理 BaseUndetectedPlaywright 会话的池化系统
 
     支持以下功能：
-    1. 根据 mid 快速查找现有浏览器会话
-    2. 自动创建新的浏览器实例
+    1. 根据 (mid, browser_id) 快速查找现有浏览器会话
+    2. 自动创建新的浏览器实例（同一浏览器的并发创建合并为一次启动）
     3. 会话生命周期管理
-    4. 并发安全访问
+    4. 并发安全访问（分片注册表，不同浏览器之间互不阻塞）
+    5. 预热会话（prewarm_session）与命中率 / 首页耗时统计
     """
 
     def __init__(self):
-        # 存储活跃会话的字典，键为mid，值为BrowserSession
-        self._active_sessions: Dict[int, BrowserSession] = {}
+        # 活跃会话注册表，键为 (mid, browser_id)；与 LiveService._browser_sessions 的一致性约定见 session_registry 模块说明
+        self._sessions: ShardedSessionRegistry[tuple[int, int], WebRTCEnabledSession] = ShardedSessionRegistry()
+
+        # 预热但尚未被请求认领的会话，键为 (mid, browser_id)，值为预热完成时间
+        self._warm_sessions: Dict[tuple[int, int], float] = {}
+        self.stats = SessionPoolStats()
+
+    @property
+    def warm_sessions(self) -> Dict[tuple[int, int], float]:
+        """尚未被认领的预热会话（只读视图请勿修改）"""
+        return self._warm_sessions
 
-        # 全局锁，用于保护会话池操作
-        self._pool_lock = asyncio.Lock()
+    def has_session(self, mid: int, browser_id: int) -> bool:
+        """池中是否已存在该浏览器会话（不更新使用时间）"""
+        return (mid, browser_id) in self._sessions
 
     async def get_session(self, params: SessionCreateParams) -> WebRTCEnabledSession:
         """
         优先获取
-        获取指定mid的浏览器会话，如果不存在则创建新的
+        获取指定 (mid, browser_id) 的浏览器会话，如果不存在则创建新的
         """
+        start = time.perf_counter()
+        key = (params.mid, params.browser_id)
         # 先尝试获取现有的会话
-        async with self._pool_lock:
-            if browser_session := self._active_sessions.get(params.mid):
-                if session_info := browser_session.get_session(params):
-                    return session_info
+        if session_info := self._sessions.get(key):
+            session_info.last_used_at = int(time.time())
+            self.stats.hits += 1
+            if self._warm_sessions.pop(key, None) is not None:
+                self.stats.warm_hits += 1
+            self.stats.record_first_page(time.perf_counter() - start)
+            return session_info
+
+        # 创建新的会话（并发请求合并到同一次创建）
+        session_info = await self._sessions.get_or_create(key, lambda: self._create_session(params))
+        self.stats.misses += 1
+        self.stats.record_first_page(time.perf_counter() - start)
+        return session_info
+
+    async def prewarm_session(self, params: SessionCreateParams, warmed_at: float | None = None) -> bool:
+        """
+        提前启动浏览器会话，等待后续请求认领（不计入命中统计）
+
+        Args:
+            warmed_at: 预热完成时间（Unix 时间戳），默认取当前时间
 
-        # 创建新的会话
-        return await self._create_session(params)
+        Returns:
+            bool: 是否真正启动了新会话（已存在或正在创建则返回 False）
+        """
+        key = (params.mid, params.browser_id)
+        if key in self._sessions or self._sessions.is_in_flight(key):
+            return False
+        await self._sessions.get_or_create(key, lambda: self._create_session(params))
+        self._warm_sessions[key] = warmed_at or time.time()
+        return True
 
     async def _create_session(self, params: SessionCreateParams) -> WebRTCEnabledSession:
         """
-        创建新的浏览器会话（带并发保护）
+        启动新的浏览器会话（由注册表的 single-flight 调用，同一浏览器同时只会执行一次）
 
-        此方法只负责创建浏览器会话，不操作 LiveService 的状态。
+        此方法只负责启动浏览器，注册由 ShardedSessionRegistry 完成，不操作 LiveService 的状态。
 
         Returns:
             WebRTCEnabledSession: 新创建的会话实例
         """
         start_time = time.time()
+        session_info: WebRTCEnabledSession = await WebRTCEnabledSession.new(
+            mid=params.mid,
+            browser_id=params.browser_id,
+            headless=params.headless,
+        )
 
-        # 🔑 第一阶段：获取或创建 BrowserSession
-        if not (browser_session := self._active_sessions.get(params.mid)):
-            browser_session = BrowserSession(mid=params.mid, sessions={})
-            self._active_sessions[params.mid] = browser_session
-
-        # 🔑 第二阶段：创建浏览器会话
-        create_start = time.time()
-        browser_session = await browser_session.create_session(params)
-        create_elapsed = time.time() - create_start
-        logger.info(
-            f"浏览器创建完成: mid={params.mid}, browser_id={params.browser_id}, 耗时: {create_elapsed:.3f}s")
-
-        # 🔑 第三阶段：验证刚创建的浏览器是否仍然有效
-        if browser_session.is_closed:
+        # 验证刚创建的浏览器是否仍然有效
+        if session_info.is_closed:
             logger.warning(
                 f"刚创建的浏览器已关闭: mid={params.mid}, browser_id={params.browser_id}")
             raise BrowserNotStartedException("浏览器在创建过程中被关闭，请重试")
@@ -80,30 +134,67 @@ class PlaywrightSessionPool:
         logger.info(
             f"会话创建完成: mid={params.mid}, browser_id={params.browser_id}, 总耗时: {elapsed:.3f}s")
 
-        return browser_session
+        return session_info
 
     async def release_all_session(self, mid: int) -> SessionAllCloseResponse:
         """
         释放指定mid的会话资源
         """
-        async with self._pool_lock:
-            if browser_session := self._active_sessions.get(mid):
-                return await browser_session.remove_all_session()
-        return SessionAllCloseResponse()
-
-    async def release_session(self, params: BrowserSessionRemoveParams):
-        if browser_session := self._active_sessions.get(params.mid):
-            res = await browser_session.remove_session(params)
-            if len(browser_session.sessions) == 0:
-                del self._active_sessions[params.mid]
-            return res
-
-        return SessionCloseResponse(
-            browser_id=params.browser_id,
-            mid=params.mid,
-            is_closed=False,
-            feedback="会话不存在",
-        )
+        res = SessionAllCloseResponse()
+        for key_mid, browser_id in [key for key in self._sessions if key[0] == mid]:
+            res.items.append(
+                await self.release_session(BrowserSessionRemoveParams(mid=key_mid, browser_id=browser_id))
+            )
+        return res
+
+    async def release_session(self, params: BrowserSessionRemoveParams) -> SessionCloseResponse:
+        """关闭会话；force_close 时同时从池中移除"""
+        key = (params.mid, params.browser_id)
+        self._warm_sessions.pop(key, None)
+
+        async def close() -> SessionCloseResponse:
+            session_info = self._sessions.get(key)
+            if session_info is None:
+                return SessionCloseResponse(
+                    browser_id=params.browser_id,
+                    mid=params.mid,
+                    is_closed=False,
+                    feedback="会话不存在",
+                )
+            if not params.force_close:
+                return await session_info.close()
+            try:
+                return await session_info.force_close()
+            finally:
+                self._sessions.discard(key)
+
+        return await self._sessions.run_exclusive(key, close)
+
+    async def release_warm_session(self, mid: int, browser_id: int) -> bool:
+        """
+        释放尚未被认领的预热会话（预热池淘汰 / 停止时调用）
+
+        在该浏览器的独占任务内重新确认仍未被认领：排队期间会话若已被 LiveService 取走，
+        则保留不动，避免关闭 LiveService 条目正在使用的浏览器。
+
+        Returns:
+            bool: 是否真正释放了会话
+        """
+        key = (mid, browser_id)
+
+        async def release() -> bool:
+            if self._warm_sessions.pop(key, None) is None:
+                return False
+            session_info = self._sessions.get(key)
+            if session_info is None:
+                return False
+            try:
+                await session_info.force_close()
+            finally:
+                self._sessions.discard(key)
+            return True
+
+        return await self._sessions.run_exclusive(key, release)
 
 
 # 全局单例实例
@@ -123,4 +214,4 @@ def get_default_session_pool() -> PlaywrightSessionPool:
     return _default_session_pool
 
 
-__all__ = ["get_default_session_pool"]
+__all__ = ["get_default_session_pool", "PlaywrightSessionPool", "SessionPoolStats"]
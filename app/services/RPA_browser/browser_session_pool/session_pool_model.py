@@ -1,18 +1,14 @@
 from app.models.runtime.control import PageInfo
 import asyncio
-import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
-from typing import AsyncGenerator, Any, Dict
+from typing import AsyncGenerator, Any
 import uuid
+import weakref
 import loguru
 from botright.playwright_mock import BrowserContext, Page
 from app.models.runtime.session import (
     SessionCloseResponse,
-    BrowserSessionCreateParams,
-    BrowserSessionGetParams,
-    BrowserSessionRemoveParams,
-    SessionAllCloseResponse,
 )
 from app.models.runtime.api import (
     BrowserFingerprintQueryParams,
@@ -26,9 +22,6 @@ from pydantic import computed_field
 from app.config import settings
 from app.services.RPA_browser.webrtc.stream_manager import WebRTCStreamManager
 from loguru import logger
-# 🔑 全局锁字典，用于保护浏览器创建过程（key: f"{mid}_{browser_id}"）
-_browser_creation_locks: Dict[str, asyncio.Lock] = {}
-_global_browser_lock = asyncio.Lock()  # 用于保护 _browser_creation_locks 字典本身
 
 
 @dataclass
@@ -39,37 +32,6 @@ class InitSessionRes:
     fingerprint_params: BaseFingerprintBrowserInitParams
 
 
-async def _get_browser_creation_lock(mid, browser_id) -> asyncio.Lock:
-    """
-    获取浏览器创建锁（懒创建）
-
-    Args:
-        mid: 用户ID
-        browser_id: 浏览器ID
-
-    Returns:
-        asyncio.Lock: 针对该uid+browser_id的锁
-    """
-    lock_key = f"{mid}_{browser_id}"
-    async with _global_browser_lock:
-        if lock_key not in _browser_creation_locks:
-            _browser_creation_locks[lock_key] = asyncio.Lock()
-        return _browser_creation_locks[lock_key]
-
-
-async def _cleanup_browser_creation_lock(mid, browser_id):
-    """
-    清理浏览器创建锁（在浏览器创建完成后调用）
-
-    Args:
-        mid: 用户ID
-        browser_id: 浏览器ID
-    """
-    lock_key = f"{mid}_{browser_id}"
-    async with _global_browser_lock:
-        _browser_creation_locks.pop(lock_key, None)
-
-
 @dataclass
 class SessionInfo:
     """
@@ -150,6 +112,9 @@ class WebRTCEnabledSession(SessionInfo):
 
     # WebRTC 管理器缓存（惰性属性，首次访问时自动初始化，无需 enable_webrtc）
     __webrtc_mgr_cache = None
+    # 休眠页面记录（惰性初始化）：底层 playwright 页面 -> 休眠前的 URL
+    # 以底层 _impl_obj 为键，不依赖 Page 包装器的对象身份
+    __hibernated_cache: "weakref.WeakKeyDictionary | None" = None
 
     @property
     def _webrtc_manager(self) -> WebRTCStreamManager:
@@ -445,6 +410,71 @@ class WebRTCEnabledSession(SessionInfo):
         # 所有页面都关闭了，创建新页面
         return await self.__new_page()
 
+    @property
+    def _hibernated_pages(self) -> "weakref.WeakKeyDictionary[Any, str]":
+        if self.__hibernated_cache is None:
+            self.__hibernated_cache = weakref.WeakKeyDictionary()
+        return self.__hibernated_cache
+
+    @property
+    def hibernated_page_count(self) -> int:
+        """当前处于休眠状态的页面数量"""
+        return len(self._hibernated_pages)
+
+    def hibernatable_page_count(self) -> int:
+        """可被休眠的页面数量（未关闭、未休眠且不是空白页）"""
+        return sum(1 for page in self.all_pages if self._is_hibernatable(page))
+
+    def _is_hibernatable(self, page: Page) -> bool:
+        return (
+            not page.is_closed()
+            and page._impl_obj not in self._hibernated_pages
+            and page.url not in ("", "about:blank")
+        )
+
+    async def hibernate_idle_pages(self) -> int:
+        """
+        休眠会话中的所有页面：记录 URL 后导航到 about:blank，释放渲染进程占用的内存，
+        浏览器进程与登录态（cookie / storage）保持不变。
+
+        Returns:
+            int: 本次休眠的页面数量
+        """
+        hibernated = 0
+        for page in self.all_pages:
+            if not self._is_hibernatable(page):
+                continue
+            url = page.url
+            try:
+                await page.goto("about:blank")
+            except Exception as e:
+                self.logger.warning(f"休眠页面失败: {url}, error: {e}")
+                continue
+            self._hibernated_pages[page._impl_obj] = url
+            hibernated += 1
+        return hibernated
+
+    async def restore_hibernated_pages(self) -> int:
+        """
+        恢复被休眠的页面（重新导航到休眠前的 URL）
+
+        Returns:
+            int: 本次恢复的页面数量
+        """
+        restored = 0
+        for page in self.all_pages:
+            # 先取出记录，避免并发恢复时重复导航
+            url = self._hibernated_pages.pop(page._impl_obj, None)
+            if url is None or page.is_closed():
+                continue
+            try:
+                await page.goto(url)
+                restored += 1
+            except Exception as e:
+                self.logger.warning(f"恢复休眠页面失败: {url}, error: {e}")
+        self._hibernated_pages.clear()
+        return restored
+
     async def _get_page(self):
         if self.is_closed:
             return await self._create_session()
@@ -454,55 +484,52 @@ class WebRTCEnabledSession(SessionInfo):
     async def _initialize_session(
         cls, mid, browser_id, headless=False
     ) -> InitSessionRes:
-        """初始化会话的公共方法（带锁保护，防止并发创建）"""
-        # 🔑 获取针对 uid+browser_id 的锁
-        lock = await _get_browser_creation_lock(mid, browser_id)
-        async with lock:
-            try:
-                # 获取浏览器指纹信息
-                async with DatabaseSessionManager.async_session() as session:
-                    fingerprint_info = await BrowserFingerprintService.read_fingerprint(
-                        browser_id=browser_id,
-                        mid=mid,
-                        session=session,
-                    )
+        """
+        初始化会话的公共方法
 
-                if not fingerprint_info:
-                    raise ValueError("浏览器指纹信息不存在")
+        同一浏览器的并发创建由 PlaywrightSessionPool 的会话注册表合并为一次调用，这里不再加锁
+        """
+        # 获取浏览器指纹信息
+        async with DatabaseSessionManager.async_session() as session:
+            fingerprint_info = await BrowserFingerprintService.read_fingerprint(
+                browser_id=browser_id,
+                mid=mid,
+                session=session,
+            )
 
-                # 🔑 调试日志：记录指纹信息类型和字段
-                logger.debug(f"指纹信息类型: {type(fingerprint_info).__name__}")
-                fingerprint_dict = fingerprint_info.model_dump(
-                    exclude_none=True)
-                logger.debug(f"指纹信息字段: {list(fingerprint_dict.keys())}")
+        if not fingerprint_info:
+            raise ValueError("浏览器指纹信息不存在")
 
-                # 🔑 确保 fingerprint 字段存在（如果为 None 会被 exclude_none 排除）
-                if 'fingerprint' not in fingerprint_dict:
-                    logger.warning(f"⚠️ fingerprint 字段不存在或为 None，设置为默认值 0")
-                    fingerprint_dict['fingerprint'] = 0
+        # 🔑 调试日志：记录指纹信息类型和字段
+        logger.debug(f"指纹信息类型: {type(fingerprint_info).__name__}")
+        fingerprint_dict = fingerprint_info.model_dump(
+            exclude_none=True)
+        logger.debug(f"指纹信息字段: {list(fingerprint_dict.keys())}")
 
-                fingerprint_params = BaseFingerprintBrowserInitParams(
-                    **fingerprint_dict
-                )
+        # 🔑 确保 fingerprint 字段存在（如果为 None 会被 exclude_none 排除）
+        if 'fingerprint' not in fingerprint_dict:
+            logger.warning(f"⚠️ fingerprint 字段不存在或为 None，设置为默认值 0")
+            fingerprint_dict['fingerprint'] = 0
 
-                playwright_instance = BaseUndetectedPlaywright(
-                    mid=mid, browser_id=browser_id, headless=headless
-                )
-                browser_generator = playwright_instance.launch_browser_span(
-                    fingerprint_params)
-                browser_context = await anext(browser_generator)
-
-                return InitSessionRes(
-                    **{
-                        "playwright_instance": playwright_instance,
-                        "browser_context": browser_context,
-                        "browser_generator": browser_generator,
-                        "fingerprint_params": fingerprint_params,
-                    }
-                )
-            finally:
-                # 🔑 清理锁（可选，避免内存泄漏）
-                await _cleanup_browser_creation_lock(mid, browser_id)
+        fingerprint_params = BaseFingerprintBrowserInitParams(
+            **fingerprint_dict
+        )
+
+        playwright_instance = BaseUndetectedPlaywright(
+            mid=mid, browser_id=browser_id, headless=headless
+        )
+        browser_generator = playwright_instance.launch_browser_span(
+            fingerprint_params)
+        browser_context = await anext(browser_generator)
+
+        return InitSessionRes(
+            **{
+                "playwright_instance": playwright_instance,
+                "browser_context": browser_context,
+                "browser_generator": browser_generator,
+                "fingerprint_params": fingerprint_params,
+            }
+        )
 
     async def _create_session(self):
         """创建会话实例"""
@@ -533,74 +560,7 @@ class WebRTCEnabledSession(SessionInfo):
         )
 
 
-@dataclass
-class BrowserSession:
-    """浏览器会话数据类，包含特定mid下的所有browser_id会话"""
-
-    mid: int
-    sessions: Dict[int, WebRTCEnabledSession]
-    created_at: datetime = datetime.now()
-
-    async def create_session(
-        self, params: BrowserSessionCreateParams
-    ) -> WebRTCEnabledSession:
-        """添加新的会话"""
-        if sess := self.get_session(params):
-            return sess
-        session_info: WebRTCEnabledSession = await WebRTCEnabledSession.new(
-            mid=self.mid,
-            browser_id=params.browser_id,
-            headless=params.headless,
-        )
-        # 注册插件
-        self.sessions[params.browser_id] = session_info
-        return session_info
-
-    def get_session(
-        self, params: BrowserSessionGetParams
-    ) -> WebRTCEnabledSession | None:
-        """根据browser_id获取会话"""
-        if session_info := self.sessions.get(params.browser_id):
-            session_info.last_used_at = int(time.time())
-            return session_info
-        return None
-
-    async def remove_session(
-        self, params: BrowserSessionRemoveParams
-    ) -> SessionCloseResponse:
-        """移除指定browser_id的会话"""
-        if params.browser_id in self.sessions:
-            if params.force_close:
-                res = await self.sessions[params.browser_id].force_close()
-                del self.sessions[params.browser_id]
-                return res
-            else:
-                res = await self.sessions[params.browser_id].close()
-                return res
-        return SessionCloseResponse(
-            browser_id=params.browser_id,
-            mid=self.mid,
-            is_closed=False,
-            feedback="会话不存在",
-        )
-
-    async def remove_all_session(
-        self, force_close: bool = False
-    ) -> SessionAllCloseResponse:
-        """移除所有会话"""
-        res = SessionAllCloseResponse()
-        for browser_id in list(self.sessions.keys()):
-            if force_close:
-                resp = await self.sessions[browser_id].force_close()
-                del self.sessions[browser_id]
-            else:
-                resp = await self.sessions[browser_id].close()
-            res.items.append(resp)
-        return res
-
-
 __all__ = [
     "SessionInfo",
     "WebRTCEnabledSession",
-    "BrowserSession",
 ]
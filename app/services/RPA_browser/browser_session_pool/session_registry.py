@@ -0,0 +1,200 @@
+"""
+ShardedSessionRegistry - 分片会话注册表
+
+LiveService 与 PlaywrightSessionPool 各自使用的会话存储，替代 "全局字典 + 全局锁 + 每个 key 一把锁" 的组合：
+
+1. 读取不加锁：按 key 的哈希落到固定分片，单线程事件循环下字典读写本身是原子的
+2. 创建走 single-flight：同一个 key 同时只有一个创建任务，其余调用者等待同一个任务，
+   得到同一个结果或同一个异常；创建任务独立于发起者运行，发起请求被取消不会中断其它等待者
+3. 关闭 / 休眠等需要独占的操作同样登记为该 key 的在途任务，创建与关闭互相排队，
+   不同 key 之间互不阻塞
+4. 在途任务结束即从分片中移除，不存在需要手动清理的锁字典
+
+两个注册表的分工与一致性约定：
+    PlaywrightSessionPool._sessions   (mid, browser_id) → WebRTCEnabledSession，拥有浏览器进程
+    LiveService._browser_sessions     "mid_browser_id"  → BrowserSessionEntry，包装池中同一个会话对象
+
+    1. LiveService 中每个浏览器仍在运行的条目，其 browser_session 与池中同 key 的会话是同一个对象；
+       池中多出的会话只能是尚未被认领的预热会话（warm_sessions）
+    2. 会话的创建 / 释放只从 LiveService 发起：LiveService 的在途任务在外层，池的在途任务在内层，
+       池从不回调 LiveService，因此两层独占任务不会互相等待形成死锁
+    3. 预热池只操作未被认领的会话（release_warm_session 在池的独占任务内重新确认），
+       不会关闭 LiveService 条目正在使用的浏览器
+    4. 浏览器意外退出时 LiveService 条目失效（browser_running 为假），下次获取时先从池中移除旧会话再重建
+"""
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterator, Mapping
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class FlightKind(StrEnum):
+    CREATE = "create"
+    EXCLUSIVE = "exclusive"
+
+
+@dataclass
+class _Flight:
+    """某个 key 上正在执行的任务"""
+    kind: FlightKind
+    task: asyncio.Task | None = None
+
+
+@dataclass
+class _Shard(Generic[K, V]):
+    entries: dict[K, V] = field(default_factory=dict)
+    flights: dict[K, _Flight] = field(default_factory=dict)
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    """发起者被取消后可能无人读取任务异常，这里读取一次避免 'exception was never retrieved' 告警"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ShardedSessionRegistry(Mapping[K, V]):
+    """
+    分片会话注册表（只读部分实现 Mapping 接口，写入只能通过 get_or_create / run_exclusive / discard）
+    """
+
+    def __init__(self, shards: int = 16):
+        self._shards: list[_Shard[K, V]] = [_Shard() for _ in range(max(1, shards))]
+
+    def _shard(self, key: K) -> _Shard[K, V]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    # ─── Mapping 只读接口 ───────────────────────────────
+
+    def __getitem__(self, key: K) -> V:
+        return self._shard(key).entries[key]
+
+    def __iter__(self) -> Iterator[K]:
+        for shard in self._shards:
+            # 拷贝 key 列表，迭代期间允许其它协程修改
+            yield from list(shard.entries)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    @property
+    def in_flight(self) -> int:
+        """正在执行的创建 / 独占任务数量"""
+        return sum(len(shard.flights) for shard in self._shards)
+
+    def is_in_flight(self, key: K) -> bool:
+        return key in self._shard(key).flights
+
+    # ─── 写入 ───────────────────────────────────────────
+
+    def discard(self, key: K) -> V | None:
+        """直接移除条目（不等待在途任务），一般只在 run_exclusive 的操作内部调用"""
+        return self._shard(key).entries.pop(key, None)
+
+    def _start(self, key: K, kind: FlightKind, operation: Callable[[], Awaitable[T]]) -> _Flight:
+        shard = self._shard(key)
+        flight = _Flight(kind=kind)
+
+        async def run() -> T:
+            try:
+                return await operation()
+            finally:
+                if shard.flights.get(key) is flight:
+                    del shard.flights[key]
+
+        flight.task = asyncio.ensure_future(run())
+        flight.task.add_done_callback(_consume_exception)
+        shard.flights[key] = flight
+        return flight
+
+    @staticmethod
+    async def _join(flight: _Flight) -> T:
+        """等待在途任务的结果；等待者被取消不会取消任务本身"""
+        return await asyncio.shield(flight.task)
+
+    @staticmethod
+    async def _wait_quietly(flight: _Flight) -> None:
+        """等待在途任务结束，忽略其结果与异常（调用方被取消时仍然向上抛出）"""
+        try:
+            await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.cancelled() or asyncio.current_task().cancelling():
+                raise
+        except Exception:
+            pass
+
+    async def get_or_create(
+        self,
+        key: K,
+        factory: Callable[[], Awaitable[V]],
+        is_valid: Callable[[V], bool] | None = None,
+    ) -> V:
+        """
+        获取会话，不存在（或 is_valid 判定无效）时调用 factory 创建
+
+        同一 key 的并发调用只会执行一次 factory：所有调用者得到同一个会话或同一个异常。
+        factory 返回值会被注册到表中；factory 内可通过 self.get(key) 读取待替换的失效会话。
+        """
+        shard = self._shard(key)
+        while True:
+            value = shard.entries.get(key)
+            if value is not None and (is_valid is None or is_valid(value)):
+                return value
+            flight = shard.flights.get(key)
+            if flight is None:
+                break
+            if flight.kind == FlightKind.CREATE:
+                try:
+                    return await self._join(flight)
+                except asyncio.CancelledError:
+                    # 创建任务被取消（例如关闭服务），自己没有被取消时重新检查
+                    if not flight.task.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    continue
+            # 关闭 / 休眠等独占操作结束后重新检查
+            await self._wait_quietly(flight)
+
+        async def create() -> V:
+            created = await factory()
+            shard.entries[key] = created
+            return created
+
+        return await self._join(self._start(key, FlightKind.CREATE, create))
+
+    async def run_exclusive(self, key: K, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        在 key 上独占执行操作（例如关闭会话）：先等待该 key 的在途任务结束，
+        执行期间同一 key 的 get_or_create / run_exclusive 都会排队，其它 key 不受影响
+        """
+        shard = self._shard(key)
+        while (flight := shard.flights.get(key)) is not None:
+            await self._wait_quietly(flight)
+        return await self._join(self._start(key, FlightKind.EXCLUSIVE, operation))
+
+    async def remove(self, key: K, finalizer: Callable[[V], Awaitable[object]] | None = None) -> V | None:
+        """
+        独占地移除会话，finalizer 用于关闭资源（无论 finalizer 是否失败，条目都会被移除）
+
+        Returns:
+            被移除的会话，不存在时返回 None
+        """
+
+        async def operation() -> V | None:
+            value = self._shard(key).entries.get(key)
+            if value is None:
+                return None
+            try:
+                if finalizer is not None:
+                    await finalizer(value)
+            finally:
+                self.discard(key)
+            return value
+
+        return await self.run_exclusive(key, operation)
+
+
+__all__ = ["ShardedSessionRegistry", "FlightKind"]
@@ -0,0 +1,215 @@
+"""
+WarmPoolService - 浏览器预热池
+
+根据预测提前启动浏览器会话，让首个请求直接命中 PlaywrightSessionPool 中已就绪的会话，
+而不是在请求路径上等待指纹读取 + launch_persistent_context + new_page。
+
+预测来源：
+1. 最近活跃：窗口期内被使用过的 (mid, browser_id)，越近越优先
+2. 定时计划：即将执行的定时工作流（由调度方通过 add_scheduled_hint 登记）
+
+预算控制：未认领预热会话数上限、可用内存保留量、每核负载阈值。
+持久化上下文的 user_data_dir 与指纹参数都是 Chromium 启动参数，无法把配置文件挂到已启动的进程上，
+因此"备用进程"层保持一个共享 Playwright 驱动常驻（见 playwright_driver_manager），省去驱动冷启动。
+"""
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import settings
+from app.models.runtime.session import SessionCreateParams
+from app.services.RPA_browser.base.base_engines import playwright_driver_manager
+from app.services.RPA_browser.browser_session_pool.playwright_pool import (
+    PlaywrightSessionPool,
+    get_default_session_pool,
+)
+from botright.modules.playwright_driver import DriverLease
+
+
+def _available_memory_mb() -> float | None:
+    """读取 /proc/meminfo 的 MemAvailable，非 Linux 平台返回 None（不做内存限制）"""
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _load_per_cpu() -> float:
+    """1 分钟平均负载 / CPU 核数，不支持 getloadavg 的平台返回 0"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+@dataclass
+class WarmCandidate:
+    mid: int
+    browser_id: int
+    reason: str
+
+
+class WarmPoolService:
+    """浏览器预热池服务"""
+
+    def __init__(
+        self,
+        pool: PlaywrightSessionPool,
+        *,
+        clock: Callable[[], float] = time.time,
+        memory_provider: Callable[[], float | None] = _available_memory_mb,
+        load_provider: Callable[[], float] = _load_per_cpu,
+    ):
+        self._pool = pool
+        self._clock = clock
+        self._memory_provider = memory_provider
+        self._load_provider = load_provider
+        # 最近活跃的浏览器，按最后活跃时间排序（最新的在末尾）
+        self._recent: OrderedDict[tuple[int, int], float] = OrderedDict()
+        # 即将执行的定时计划：(mid, browser_id) -> 最近一次计划执行时间
+        self._scheduled: dict[tuple[int, int], float] = {}
+        self._driver_lease: DriverLease | None = None
+
+    # ─── 预测输入 ───────────────────────────────────────
+
+    def record_activity(self, mid: int, browser_id: int) -> None:
+        """记录浏览器被使用（LiveService 每次获取 / 创建会话时调用）"""
+        key = (int(mid), int(browser_id))
+        self._recent[key] = self._clock()
+        self._recent.move_to_end(key)
+
+    def add_scheduled_hint(self, mid: int, browser_id: int, run_at: float) -> None:
+        """登记一次即将执行的定时任务，run_at 为 Unix 时间戳"""
+        key = (int(mid), int(browser_id))
+        current = self._scheduled.get(key)
+        if current is None or run_at < current:
+            self._scheduled[key] = run_at
+
+    def forget(self, mid: int, browser_id: int) -> None:
+        """移除某个浏览器的所有预测记录（例如浏览器被删除）"""
+        key = (int(mid), int(browser_id))
+        self._recent.pop(key, None)
+        self._scheduled.pop(key, None)
+
+    # ─── 预测与预算 ─────────────────────────────────────
+
+    def predict(self) -> list[WarmCandidate]:
+        """返回按优先级排序的预热候选：先定时计划（越早越优先），再最近活跃（越近越优先）"""
+        now = self._clock()
+        candidates: list[WarmCandidate] = []
+        seen: set[tuple[int, int]] = set()
+
+        lead_time = settings.browser_warm_pool_schedule_lead_time
+        for key, run_at in sorted(self._scheduled.items(), key=lambda kv: kv[1]):
+            if run_at < now:
+                self._scheduled.pop(key, None)
+                continue
+            if run_at - now <= lead_time:
+                candidates.append(WarmCandidate(mid=key[0], browser_id=key[1], reason="scheduled"))
+                seen.add(key)
+
+        window = settings.browser_warm_pool_recent_window
+        for key, last_active in reversed(list(self._recent.items())):
+            if now - last_active > window:
+                self._recent.pop(key, None)
+                continue
+            if key not in seen:
+                candidates.append(WarmCandidate(mid=key[0], browser_id=key[1], reason="recent"))
+                seen.add(key)
+
+        return [c for c in candidates if not self._pool.has_session(c.mid, c.browser_id)]
+
+    def capacity(self) -> int:
+        """按预算计算本轮还能预热的会话数"""
+        if self._load_provider() > settings.browser_warm_pool_max_load_per_cpu:
+            return 0
+        slots = settings.browser_warm_pool_max_sessions - len(self._pool.warm_sessions)
+        available_mb = self._memory_provider()
+        if available_mb is not None:
+            spare_mb = available_mb - settings.browser_warm_pool_memory_reserve_mb
+            slots = min(slots, int(spare_mb // max(1, settings.browser_warm_pool_session_estimate_mb)))
+        return max(0, slots)
+
+    # ─── 执行 ───────────────────────────────────────────
+
+    async def evict_unclaimed(self) -> int:
+        """释放超过 TTL 仍未被认领的预热会话，返回释放数量"""
+        now = self._clock()
+        expired = [
+            key for key, warmed_at in list(self._pool.warm_sessions.items())
+            if now - warmed_at > settings.browser_warm_pool_ttl
+        ]
+        released = 0
+        for mid, browser_id in expired:
+            # 快照之后可能已被认领，由会话池在独占任务内重新确认
+            if await self._pool.release_warm_session(mid, browser_id):
+                released += 1
+                logger.info(f"预热会话未被认领，已释放: mid={mid}, browser_id={browser_id}")
+        return released
+
+    async def warm_up(self) -> int:
+        """按预测结果在预算内启动会话，返回本轮启动数量"""
+        slots = self.capacity()
+        launched = 0
+        for candidate in self.predict():
+            if launched >= slots:
+                break
+            params = SessionCreateParams(mid=candidate.mid, browser_id=candidate.browser_id)
+            try:
+                if await self._pool.prewarm_session(params, warmed_at=self._clock()):
+                    launched += 1
+                    logger.info(
+                        f"预热会话已启动: mid={candidate.mid}, browser_id={candidate.browser_id}, "
+                        f"原因: {candidate.reason}"
+                    )
+            except Exception as e:
+                # 指纹已删除等情况：不再预测该浏览器
+                logger.warning(f"预热会话失败: mid={candidate.mid}, browser_id={candidate.browser_id}, error: {e}")
+                self.forget(candidate.mid, candidate.browser_id)
+        return launched
+
+    async def tick(self) -> None:
+        """预热池一次调度：先释放过期预热，再按预算补充"""
+        await self.evict_unclaimed()
+        await self.warm_up()
+
+    async def start(self) -> None:
+        """启动预热池：借用一个共享驱动常驻，保证预热 / 首次启动都跳过驱动冷启动"""
+        if self._driver_lease is None:
+            self._driver_lease = await playwright_driver_manager.acquire()
+
+    async def stop(self) -> None:
+        """停止预热池：释放所有未认领的预热会话并归还驱动"""
+        for mid, browser_id in list(self._pool.warm_sessions):
+            await self._pool.release_warm_session(mid, browser_id)
+        if self._driver_lease is not None:
+            await playwright_driver_manager.release(self._driver_lease)
+            self._driver_lease = None
+
+
+# 全局单例实例
+_default_warm_pool: WarmPoolService | None = None
+
+
+def get_default_warm_pool() -> WarmPoolService:
+    """
+    获取默认的预热池实例（单例），与默认会话池绑定
+
+    Returns:
+        WarmPoolService实例
+    """
+    global _default_warm_pool
+    if _default_warm_pool is None:
+        _default_warm_pool = WarmPoolService(get_default_session_pool())
+    return _default_warm_pool
+
+
+__all__ = ["WarmPoolService", "WarmCandidate", "get_default_warm_pool"]
@@ -0,0 +1,33 @@
+"""
+多节点会话分片模块
+
+按 (mid, browser_id) 把浏览器会话粘滞到固定节点，其它节点收到的请求转发给所属节点。
+"""
+
+from .session_directory import (
+    ClusterNode,
+    SessionDirectory,
+    InMemorySessionDirectory,
+    SQLiteSessionDirectory,
+)
+from .hash_ring import ConsistentHashRing
+from .session_router import (
+    FORWARDED_BY_HEADER,
+    FORWARD_SIGNATURE_HEADER,
+    SessionForwardedException,
+    SessionRouter,
+    get_default_session_router,
+)
+
+__all__ = [
+    "ClusterNode",
+    "SessionDirectory",
+    "InMemorySessionDirectory",
+    "SQLiteSessionDirectory",
+    "ConsistentHashRing",
+    "FORWARDED_BY_HEADER",
+    "FORWARD_SIGNATURE_HEADER",
+    "SessionForwardedException",
+    "SessionRouter",
+    "get_default_session_router",
+]
@@ -0,0 +1,56 @@
+"""
+一致性哈希环 - 新会话的节点放置
+
+每个节点在环上放置若干虚拟节点，节点增减时只有相邻区间的 key 会迁移。
+"""
+import bisect
+import hashlib
+from collections.abc import Iterable
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """一致性哈希环"""
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 64):
+        self._virtual_nodes = max(1, virtual_nodes)
+        self._points: list[int] = []
+        self._owners: dict[int, str] = {}
+        self._nodes: set[str] = set()
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> frozenset[str]:
+        return frozenset(self._nodes)
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self._virtual_nodes):
+            point = _hash(f"{node}#{i}")
+            # 极少数哈希冲突时保留先加入的节点
+            if point not in self._owners:
+                self._owners[point] = node
+                bisect.insort(self._points, point)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._points = [p for p in self._points if self._owners[p] != node]
+        self._owners = {p: self._owners[p] for p in self._points}
+
+    def get(self, key: str) -> str | None:
+        """返回 key 顺时针方向遇到的第一个节点，环为空时返回 None"""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+__all__ = ["ConsistentHashRing"]
@@ -0,0 +1,210 @@
+"""
+SessionDirectory - 会话目录
+
+记录集群中的节点（心跳）以及每个 (mid, browser_id) 归属的节点。
+浏览器的 user_data_dir 保存在所属节点的本地磁盘上，因此归属一旦确定就保持粘滞，
+只有所属节点心跳超时后才会被重新分配。
+
+后端可插拔：
+- InMemorySessionDirectory：进程内实现，单节点部署与测试使用
+- SQLiteSessionDirectory：基于 SQLite 文件，同一台机器上的多个进程共享
+"""
+import asyncio
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class ClusterNode:
+    """集群节点"""
+    node_id: str
+    address: str  # 其它节点访问本节点的基础 URL，例如 http://10.0.0.2:28000
+    last_heartbeat: float = 0.0
+
+
+class SessionDirectory(ABC):
+    """会话目录接口"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+
+    @abstractmethod
+    async def register_node(self, node: ClusterNode) -> None:
+        """注册（或更新）节点并记录一次心跳"""
+
+    @abstractmethod
+    async def heartbeat(self, node_id: str) -> None:
+        """更新节点心跳时间"""
+
+    @abstractmethod
+    async def remove_node(self, node_id: str) -> None:
+        """移除节点（节点正常退出时调用），其名下的会话归属随之失效"""
+
+    @abstractmethod
+    async def alive_nodes(self, ttl: float) -> list[ClusterNode]:
+        """返回最近 ttl 秒内有心跳的节点"""
+
+    @abstractmethod
+    async def get_owner(self, mid: int, browser_id: int) -> str | None:
+        """返回会话归属的节点 ID，未分配时返回 None"""
+
+    @abstractmethod
+    async def claim(self, mid: int, browser_id: int, node_id: str, replace: str | None = None) -> str:
+        """
+        原子地分配会话归属（compare-and-set）
+
+        仅当会话未分配、或当前归属等于 replace（调用方确认已失效的旧节点）时写入 node_id；
+        并发分配时只有一个成功，其余调用拿到胜出者。
+
+        Returns:
+            str: 分配完成后的归属节点 ID
+        """
+
+    async def close(self) -> None:
+        """释放后端资源"""
+
+
+class InMemorySessionDirectory(SessionDirectory):
+    """进程内会话目录"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self._nodes: dict[str, ClusterNode] = {}
+        self._owners: dict[tuple[int, int], str] = {}
+
+    async def register_node(self, node: ClusterNode) -> None:
+        self._nodes[node.node_id] = ClusterNode(node.node_id, node.address, self._clock())
+
+    async def heartbeat(self, node_id: str) -> None:
+        if node := self._nodes.get(node_id):
+            node.last_heartbeat = self._clock()
+
+    async def remove_node(self, node_id: str) -> None:
+        self._nodes.pop(node_id, None)
+
+    async def alive_nodes(self, ttl: float) -> list[ClusterNode]:
+        deadline = self._clock() - ttl
+        return [node for node in self._nodes.values() if node.last_heartbeat >= deadline]
+
+    async def get_owner(self, mid: int, browser_id: int) -> str | None:
+        return self._owners.get((mid, browser_id))
+
+    async def claim(self, mid: int, browser_id: int, node_id: str, replace: str | None = None) -> str:
+        key = (mid, browser_id)
+        current = self._owners.get(key)
+        if current is None or current == replace:
+            self._owners[key] = node_id
+            current = node_id
+        return current
+
+
+class SQLiteSessionDirectory(SessionDirectory):
+    """
+    基于 SQLite 文件的会话目录
+
+    每次操作使用独立连接并在线程中执行，写操作使用 BEGIN IMMEDIATE 保证跨进程的 compare-and-set。
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self._path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, timeout=10, isolation_level=None)
+        if not self._initialized:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cluster_nodes (
+                    node_id TEXT PRIMARY KEY,
+                    address TEXT NOT NULL,
+                    last_heartbeat REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS session_owners (
+                    mid INTEGER NOT NULL,
+                    browser_id INTEGER NOT NULL,
+                    node_id TEXT NOT NULL,
+                    claimed_at REAL NOT NULL,
+                    PRIMARY KEY (mid, browser_id)
+                );
+                """
+            )
+            self._initialized = True
+        return conn
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], object]):
+        def task():
+            conn = self._connect()
+            try:
+                return fn(conn)
+            finally:
+                conn.close()
+
+        return await asyncio.to_thread(task)
+
+    async def register_node(self, node: ClusterNode) -> None:
+        now = self._clock()
+        await self._run(lambda conn: conn.execute(
+            "INSERT INTO cluster_nodes (node_id, address, last_heartbeat) VALUES (?, ?, ?) "
+            "ON CONFLICT(node_id) DO UPDATE SET address = excluded.address, last_heartbeat = excluded.last_heartbeat",
+            (node.node_id, node.address, now),
+        ))
+
+    async def heartbeat(self, node_id: str) -> None:
+        now = self._clock()
+        await self._run(lambda conn: conn.execute(
+            "UPDATE cluster_nodes SET last_heartbeat = ? WHERE node_id = ?", (now, node_id)
+        ))
+
+    async def remove_node(self, node_id: str) -> None:
+        await self._run(lambda conn: conn.execute("DELETE FROM cluster_nodes WHERE node_id = ?", (node_id,)))
+
+    async def alive_nodes(self, ttl: float) -> list[ClusterNode]:
+        deadline = self._clock() - ttl
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT node_id, address, last_heartbeat FROM cluster_nodes WHERE last_heartbeat >= ?", (deadline,)
+        ).fetchall())
+        return [ClusterNode(*row) for row in rows]
+
+    async def get_owner(self, mid: int, browser_id: int) -> str | None:
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT node_id FROM session_owners WHERE mid = ? AND browser_id = ?", (mid, browser_id)
+        ).fetchone())
+        return row[0] if row else None
+
+    async def claim(self, mid: int, browser_id: int, node_id: str, replace: str | None = None) -> str:
+        now = self._clock()
+
+        def cas(conn: sqlite3.Connection) -> str:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT node_id FROM session_owners WHERE mid = ? AND browser_id = ?", (mid, browser_id)
+                ).fetchone()
+                current = row[0] if row else None
+                if current is None or current == replace:
+                    conn.execute(
+                        "INSERT INTO session_owners (mid, browser_id, node_id, claimed_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(mid, browser_id) DO UPDATE SET node_id = excluded.node_id, "
+                        "claimed_at = excluded.claimed_at",
+                        (mid, browser_id, node_id, now),
+                    )
+                    current = node_id
+                conn.execute("COMMIT")
+                return current
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return await self._run(cas)
+
+
+__all__ = [
+    "ClusterNode",
+    "SessionDirectory",
+    "InMemorySessionDirectory",
+    "SQLiteSessionDirectory",
+]
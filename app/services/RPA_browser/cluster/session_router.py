@@ -0,0 +1,206 @@
+"""
+SessionRouter - 会话粘滞路由
+
+确定 (mid, browser_id) 归属的节点，并把落到非所属节点的请求转发过去：
+
+1. 会话目录里已有归属且节点存活：直接使用（粘滞，浏览器配置目录在该节点磁盘上）
+2. 没有归属或归属节点心跳超时：按一致性哈希在存活节点中放置，并通过 compare-and-set 写入目录
+3. 已被转发过的请求一律在本节点处理，避免目录短暂不一致时来回转发
+
+转发标记由 X-RPA-Forwarded-By（来源节点）和 X-RPA-Forward-Signature（时间戳:HMAC）组成，
+HMAC 以集群共享密钥对 来源节点 + 时间戳 + 方法 + 路径 签名。只有签名有效且未过期的请求才跳过路由，
+客户端自行伪造的转发头仍会被路由到所属节点，保证同一会话只在一个节点上启动浏览器。
+"""
+import hashlib
+import hmac
+import os
+import socket
+import time
+from collections.abc import Callable
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.config import settings
+from app.services.RPA_browser.cluster.hash_ring import ConsistentHashRing
+from app.services.RPA_browser.cluster.session_directory import (
+    ClusterNode,
+    InMemorySessionDirectory,
+    SessionDirectory,
+    SQLiteSessionDirectory,
+)
+from app.utils.http.httpx_client import AsyncHttpClient
+
+FORWARDED_BY_HEADER = "X-RPA-Forwarded-By"
+FORWARD_SIGNATURE_HEADER = "X-RPA-Forward-Signature"
+
+# 转发时不透传的逐跳头
+_HOP_BY_HOP_HEADERS = {
+    "host", "content-length", "connection", "keep-alive", "transfer-encoding",
+    "te", "trailer", "upgrade", "proxy-authorization", "proxy-authenticate",
+}
+
+
+class SessionForwardedException(Exception):
+    """请求已由所属节点处理，携带需要原样返回给客户端的响应"""
+
+    def __init__(self, response: Response, node_id: str):
+        super().__init__(f"request forwarded to {node_id}")
+        self.response = response
+        self.node_id = node_id
+
+
+class SessionRouter:
+    """会话粘滞路由器"""
+
+    def __init__(
+        self,
+        directory: SessionDirectory,
+        node: ClusterNode,
+        *,
+        node_ttl: float = 30,
+        virtual_nodes: int = 64,
+        http_client: AsyncHttpClient | None = None,
+        secret: str,
+        signature_ttl: float = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not secret:
+            raise ValueError("启用会话分片时必须配置 cluster_shared_secret")
+        self.directory = directory
+        self.node = node
+        self._node_ttl = node_ttl
+        self._virtual_nodes = virtual_nodes
+        self._ring = ConsistentHashRing(virtual_nodes=virtual_nodes)
+        self._http_client = http_client or AsyncHttpClient(timeout=settings.cluster_forward_timeout)
+        self._secret = secret.encode()
+        self._signature_ttl = signature_ttl
+        self._clock = clock
+
+    # ─── 节点生命周期 ───────────────────────────────────
+
+    async def start(self) -> None:
+        await self.directory.register_node(self.node)
+
+    async def heartbeat(self) -> None:
+        await self.directory.heartbeat(self.node.node_id)
+
+    async def stop(self) -> None:
+        await self.directory.remove_node(self.node.node_id)
+        await self.directory.close()
+        await self._http_client.close()
+
+    # ─── 路由 ───────────────────────────────────────────
+
+    def _ring_for(self, node_ids: frozenset[str]) -> ConsistentHashRing:
+        """存活节点集合变化时才重建哈希环"""
+        if self._ring.nodes != node_ids:
+            self._ring = ConsistentHashRing(node_ids, virtual_nodes=self._virtual_nodes)
+        return self._ring
+
+    async def locate(self, mid: int, browser_id: int) -> ClusterNode:
+        """返回会话归属的节点，必要时分配"""
+        nodes = {node.node_id: node for node in await self.directory.alive_nodes(self._node_ttl)}
+        # 本节点正在处理请求，视为存活
+        nodes.setdefault(self.node.node_id, self.node)
+
+        owner = await self.directory.get_owner(mid, browser_id)
+        if owner in nodes:
+            return nodes[owner]
+
+        target = self._ring_for(frozenset(nodes)).get(f"{mid}_{browser_id}")
+        claimed = await self.directory.claim(mid, browser_id, target, replace=owner)
+        # 并发分配时以目录中的胜出者为准；胜出者刚好失效的极端情况由本节点兜底
+        return nodes.get(claimed, self.node)
+
+    def is_local(self, node: ClusterNode) -> bool:
+        return node.node_id == self.node.node_id
+
+    def _signature(self, node_id: str, timestamp: int, method: str, path: str) -> str:
+        message = f"{node_id}\n{timestamp}\n{method.upper()}\n{path}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def sign_forward(self, method: str, path: str) -> dict[str, str]:
+        """生成本节点转发请求时携带的转发标记头"""
+        timestamp = int(self._clock())
+        signature = self._signature(self.node.node_id, timestamp, method, path)
+        return {
+            FORWARDED_BY_HEADER: self.node.node_id,
+            FORWARD_SIGNATURE_HEADER: f"{timestamp}:{signature}",
+        }
+
+    def is_forwarded(self, request: Request) -> bool:
+        """请求是否由集群内其它节点转发而来（转发标记签名有效且未过期）"""
+        node_id = request.headers.get(FORWARDED_BY_HEADER)
+        timestamp, _, signature = request.headers.get(FORWARD_SIGNATURE_HEADER, "").partition(":")
+        if not node_id or not timestamp.isdigit() or not signature:
+            return False
+        if abs(self._clock() - int(timestamp)) > self._signature_ttl:
+            return False
+        expected = self._signature(node_id, int(timestamp), request.method, request.url.path)
+        return hmac.compare_digest(expected, signature)
+
+    async def forward(self, request: Request, node: ClusterNode) -> Response:
+        """把请求原样转发给所属节点并返回其响应"""
+        headers = {
+            k: v for k, v in request.headers.items() if k.lower() not in _HOP_BY_HOP_HEADERS
+        }
+        headers.update(self.sign_forward(request.method, request.url.path))
+        url = f"{node.address.rstrip('/')}{request.url.path}"
+        upstream = await self._http_client.request(
+            request.method,
+            url,
+            content=await request.body(),
+            params=dict(request.query_params),
+            headers=headers,
+        )
+        response_headers = {
+            k: v for k, v in upstream.headers.items()
+            if k.lower() not in _HOP_BY_HOP_HEADERS and k.lower() != "content-encoding"
+        }
+        return Response(content=upstream.content, status_code=upstream.status_code, headers=response_headers)
+
+
+def _default_node() -> ClusterNode:
+    node_id = settings.cluster_node_id or f"{socket.gethostname()}:{os.getpid()}"
+    return ClusterNode(node_id=node_id, address=settings.cluster_node_address)
+
+
+# 全局单例实例（未启用分片时为 None）
+_default_session_router: SessionRouter | None = None
+
+
+def get_default_session_router() -> SessionRouter | None:
+    """
+    获取默认的会话路由器（单例），未启用 cluster_enabled 时返回 None
+
+    Returns:
+        SessionRouter实例或None
+    """
+    global _default_session_router
+    if not settings.cluster_enabled:
+        return None
+    if _default_session_router is None:
+        directory: SessionDirectory = (
+            SQLiteSessionDirectory(settings.cluster_directory_path)
+            if settings.cluster_directory_path
+            else InMemorySessionDirectory()
+        )
+        _default_session_router = SessionRouter(
+            directory,
+            _default_node(),
+            node_ttl=settings.cluster_node_ttl,
+            virtual_nodes=settings.cluster_virtual_nodes,
+            secret=settings.cluster_shared_secret,
+            signature_ttl=settings.cluster_forward_signature_ttl,
+        )
+    return _default_session_router
+
+
+__all__ = [
+    "FORWARDED_BY_HEADER",
+    "FORWARD_SIGNATURE_HEADER",
+    "SessionForwardedException",
+    "SessionRouter",
+    "get_default_session_router",
+]
@@ -1,5 +1,9 @@
 from app.services.RPA_browser.fingerprint.browser_fingerprint_service import (
     BrowserFingerprintService,
 )
+from app.services.RPA_browser.fingerprint.ownership_cache import (
+    BrowserOwnershipCache,
+    browser_ownership_cache,
+)
 
-__all__ = ["BrowserFingerprintService"]
+__all__ = ["BrowserFingerprintService", "BrowserOwnershipCache", "browser_ownership_cache"]
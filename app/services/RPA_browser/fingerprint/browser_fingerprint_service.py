@@ -24,6 +24,7 @@ from app.models.base.base_sqlmodel import BasePaginationResp
 from app.services.broswer_fingerprint.fingerprint_gen import (
     gen_from_browserforge_fingerprint,
 )
+from app.services.RPA_browser.fingerprint.ownership_cache import browser_ownership_cache
 from bili_common.models.response_code import ResponseCode
 from app.config import CONF
 from app.models.common.exceptions.base_exception import (
@@ -118,6 +119,8 @@ class BrowserFingerprintService:
         session.add(browser_info)
         await session.commit()
         await session.refresh(browser_info)
+        if params.browser_id is None:
+            browser_ownership_cache.mark_owned(mid, browser_info.browser_id)
 
         return BrowserFingerprintCreateResp(mid=mid, browser_id=browser_info.browser_id)
 
@@ -146,6 +149,7 @@ class BrowserFingerprintService:
         session.add(browser_info)
         await session.commit()
         await session.refresh(browser_info)
+        browser_ownership_cache.mark_owned(mid, browser_info.browser_id)
 
         # 返回响应 - 需要将mid和id转换为字符串
         browser_info_dict = browser_info.model_dump()
@@ -232,6 +236,7 @@ class BrowserFingerprintService:
 
         await session.delete(browser_info)
         await session.commit()
+        browser_ownership_cache.revoke(mid, params.browser_id)
         return ResponseCode.SUCCESS, True, "success"
 
     @staticmethod
@@ -315,6 +320,12 @@ class BrowserFingerprintService:
         )
         result = await session.exec(stmt)
         browser_infos = result.all()
+
+        # 登录后客户端首先拉取浏览器列表：顺带预加载归属缓存，后续控制接口的归属校验不再查询数据库
+        if params.page == 1 and cnt <= len(browser_infos):
+            browser_ownership_cache.seed(mid, (info.browser_id for info in browser_infos))
+        else:
+            await browser_ownership_cache.preload(mid)
         return BasePaginationResp(
             total=cnt,
             items=browser_infos,
@@ -0,0 +1,191 @@
+"""
+BrowserOwnershipCache — 浏览器归属校验缓存
+
+verify_browser_ownership 挂在几乎所有浏览器控制接口上（操作轮询、页面列表、WebRTC 信令……），
+旧实现每个请求都从数据库读取整行指纹，接口吞吐被数据库往返次数卡住。
+
+数据结构:
+    mid → (加载时间, 该用户拥有的全部 browser_id)      OrderedDict，按用户 LRU
+
+    每个用户的指纹数量受等级上限约束，一次只查 browser_id 一列即可拿到完整列表，
+    之后该用户任意 (mid, browser_id) 的判定都在内存中完成:
+        - 在列表中     → 属于该用户，ttl 秒内有效
+        - 不在列表中   → 不属于该用户（负向缓存），negative_ttl 秒内有效；
+                         负向有效期更短，其它节点新建的指纹很快可见
+
+失效策略:
+    1. BrowserFingerprintService 创建 / 删除指纹后调用 mark_owned() / revoke()，本进程立即生效
+    2. 每个用户有一个版本号，失效时递增；加载期间发生失效的结果不写入缓存，避免旧列表覆盖新状态
+    3. 其它进程 / 节点的修改依赖 TTL 过期
+
+预加载:
+    preload() 一次性加载用户的完整列表（登录后首次拉取浏览器列表时调用），
+    seed() 直接写入调用方已查到的完整列表，不额外查询数据库。
+    同一用户的并发加载只查询一次。
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlmodel import select
+
+from app.config import settings
+from app.models.database.browser.info import UserBrowserInfo
+from app.utils.depends.session_manager import DatabaseSessionManager
+
+# 加载用户拥有的全部 browser_id
+OwnershipLoader = Callable[[int], Awaitable[Iterable[int]]]
+
+
+async def load_owned_browser_ids(mid: int) -> list[int]:
+    """只查询 browser_id 一列（使用独立会话：加载结果由并发请求共享，不绑定某个请求的会话）"""
+    async with DatabaseSessionManager.async_session() as session:
+        result = await session.exec(select(UserBrowserInfo.browser_id).where(UserBrowserInfo.mid == mid))
+        return list(result.all())
+
+
+@dataclass(slots=True)
+class _UserOwnership:
+    loaded_at: float
+    browser_ids: frozenset[int]
+
+
+class BrowserOwnershipCache:
+    """(mid, browser_id) → 是否拥有，按用户整体加载的归属缓存"""
+
+    def __init__(
+        self,
+        loader: OwnershipLoader = load_owned_browser_ids,
+        *,
+        ttl: float = 30.0,
+        negative_ttl: float = 5.0,
+        max_users: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            loader: 加载用户完整 browser_id 列表的函数
+            ttl: 归属结果的缓存时间（秒）
+            negative_ttl: "不属于" 结果的缓存时间（秒），应小于 ttl
+            max_users: 缓存的用户数上限
+            clock: 时钟（测试中可注入模拟时钟）
+        """
+        self._loader = loader
+        self.ttl = ttl
+        self.negative_ttl = min(negative_ttl, ttl)
+        self.max_users = max(1, max_users)
+        self._clock = clock
+        self._users: OrderedDict[int, _UserOwnership] = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self._inflight: dict[int, asyncio.Task[frozenset[int]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    async def is_owner(self, mid: int, browser_id: int) -> bool:
+        """判断浏览器是否属于该用户，缓存未命中时加载该用户的完整列表"""
+        entry = self._users.get(mid)
+        if entry is not None:
+            age = self._clock() - entry.loaded_at
+            owned = browser_id in entry.browser_ids
+            if age < (self.ttl if owned else self.negative_ttl):
+                self.hits += 1
+                self._users.move_to_end(mid)
+                return owned
+
+        self.misses += 1
+        return browser_id in await self._load(mid)
+
+    async def preload(self, mid: int) -> None:
+        """预加载用户的完整列表（已缓存且未过期时不查询）"""
+        entry = self._users.get(mid)
+        if entry is None or self._clock() - entry.loaded_at >= self.ttl:
+            await self._load(mid)
+
+    def seed(self, mid: int, browser_ids: Iterable[int]) -> None:
+        """写入调用方已查询到的用户完整列表"""
+        self._bump(mid)
+        self._store(mid, frozenset(browser_ids))
+
+    async def _load(self, mid: int) -> frozenset[int]:
+        task = self._inflight.get(mid)
+        if task is None:
+            task = asyncio.create_task(self._fetch(mid, self._versions.get(mid, 0)))
+            # 所有等待者都被取消时也取走异常，避免 "exception was never retrieved" 告警
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[mid] = task
+        # shield：某个请求被取消不会中断其他请求共享的加载
+        return await asyncio.shield(task)
+
+    async def _fetch(self, mid: int, version: int) -> frozenset[int]:
+        self.loads += 1
+        try:
+            browser_ids = frozenset(int(browser_id) for browser_id in await self._loader(mid))
+        finally:
+            self._inflight.pop(mid, None)
+        if self._versions.get(mid, 0) == version:
+            self._store(mid, browser_ids)
+        return browser_ids
+
+    def _store(self, mid: int, browser_ids: frozenset[int]) -> None:
+        self._users[mid] = _UserOwnership(self._clock(), browser_ids)
+        self._users.move_to_end(mid)
+        while len(self._users) > self.max_users:
+            evicted, _ = self._users.popitem(last=False)
+            self._versions.pop(evicted, None)
+
+    # ── 失效 ──
+
+    def _bump(self, mid: int) -> None:
+        # 只有已缓存 / 正在加载的用户需要版本号
+        if mid in self._users or mid in self._inflight:
+            self._versions[mid] = self._versions.get(mid, 0) + 1
+
+    def mark_owned(self, mid: int, browser_id: int) -> None:
+        """新建指纹后调用"""
+        self._bump(mid)
+        entry = self._users.get(mid)
+        if entry is not None:
+            entry.browser_ids = entry.browser_ids | {int(browser_id)}
+
+    def revoke(self, mid: int, browser_id: int) -> None:
+        """删除指纹后调用"""
+        self._bump(mid)
+        entry = self._users.get(mid)
+        if entry is not None:
+            entry.browser_ids = entry.browser_ids - {int(browser_id)}
+
+    def invalidate_user(self, mid: int) -> None:
+        self._bump(mid)
+        self._users.pop(mid, None)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._versions.clear()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "users": len(self._users),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+browser_ownership_cache = BrowserOwnershipCache(
+    ttl=settings.browser_ownership_cache_ttl,
+    negative_ttl=settings.browser_ownership_negative_ttl,
+    max_users=settings.browser_ownership_cache_max_users,
+)
+
+
+__all__ = ["OwnershipLoader", "BrowserOwnershipCache", "browser_ownership_cache", "load_owned_browser_ids"]
@@ -8,7 +8,6 @@ from app.services.RPA_browser.browser_session_pool.playwright_pool import Playwr
 import time
 import asyncio
 import contextlib
-from dataclasses import dataclass
 from typing import Dict
 from app.config import settings
 from app.models.consts.enums import ConfigRunningModeEnum
@@ -28,6 +27,7 @@ from app.models.runtime.session import BrowserSessionRemoveParams
 
 from app.models.runtime.live_service import (
     BrowserSessionEntry,
+    CleanupDecision,
 )
 from app.models.runtime.session import SessionCreateParams
 from app.services.RPA_browser.browser_session_pool.playwright_pool import (
@@ -36,46 +36,41 @@ from app.services.RPA_browser.browser_session_pool.playwright_pool import (
 from app.services.RPA_browser.browser_session_pool.session_pool_model import (
     WebRTCEnabledSession,
 )
-
-
-@dataclass
-class CleanupDecision:
-    should_cleanup: bool = False
-    reason: str = ""
-    next_state: SessionLifecycleState = SessionLifecycleState.ACTIVE
-    priority: int = 0  # 优先级，数字越小优先级越高
+from app.services.RPA_browser.browser_session_pool.warm_pool import get_default_warm_pool
+from app.services.RPA_browser.browser_session_pool.session_registry import ShardedSessionRegistry
+from app.services.RPA_browser.session.resource_governor import ResourceGovernor
+from app.utils.metrics.registry import metrics_registry
+
+# 浏览器启动耗时分布（启动通常在秒级，使用更粗的分桶）
+_SESSION_LAUNCH_SECONDS = metrics_registry.histogram(
+    "rpa_session_launch_duration_seconds", "浏览器会话从池中获取 / 启动的耗时", ("outcome",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+_SESSION_ACQUIRE_TOTAL = metrics_registry.counter(
+    "rpa_session_acquire_total", "获取浏览器会话的次数（复用现有会话 / 新建 / 等待同一会话进行中的创建）",
+    ("result",),
+)
 
 
 class LiveService:
     """浏览器控制服务类 - 支持人工干预、心跳检测和自动清理"""
     # 维护浏览器会话状态
     # key: f"{mid}_{browser_id}"
-    # private属性，不允许直接操作
-    _browser_sessions: Dict[str, BrowserSessionEntry] = {}
+    # private属性，不允许直接操作；创建 / 关闭通过注册表的 single-flight 与独占操作完成，
+    # 同一会话的并发请求合并，不同会话之间互不阻塞；
+    # 条目包装 PlaywrightSessionPool 中的同一个会话对象，两个注册表的一致性约定见 session_registry 模块说明
+    _browser_sessions: ShardedSessionRegistry[str, BrowserSessionEntry] = ShardedSessionRegistry()
     # 默认配置
     DEFAULT_SESSION_TIMEOUT = 3600  # 1小时
     DEFAULT_CLEANUP_INTERVAL = 300  # 清理间隔5分钟
-    # 🔑 添加会话级别的锁，防止并发操作导致的状态不一致
-    _session_locks: Dict[str, asyncio.Lock] = {}
-    _global_lock = asyncio.Lock()  # 用于保护 _session_locks 字典本身
+    # 资源治理器：按进程树采样内存 / CPU，超出预算时给出休眠或关闭决策
+    _resource_governor = ResourceGovernor()
 
     @staticmethod
     def _get_session_key(mid: int|str, browser_id: int|str) -> str:
         """获取会话键"""
         return f"{mid}_{browser_id}"
 
-    async def _get_session_lock(self, session_key: str) -> asyncio.Lock:
-        """获取会话级别的锁（懒创建）"""
-        async with self._global_lock:
-            if session_key not in LiveService._session_locks:
-                self._session_locks[session_key] = asyncio.Lock()
-            return self._session_locks[session_key]
-
-    async def _cleanup_session_lock(self, session_key: str):
-        """清理会话锁（在会话删除后调用）"""
-        async with self._global_lock:
-            self._session_locks.pop(session_key, None)
-
     def _parse_session_key(self, session_key: str) -> tuple[int, int]:
         """解析会话键，返回 (mid, browser_id)"""
         try:
@@ -116,15 +111,76 @@ class LiveService:
                 )
 
         # 🔑 第二阶段：执行清理（每个会话单独加锁）
-        for session_key, decision in sessions_to_cleanup:
+        await self._apply_cleanup_decisions(sessions_to_cleanup)
+
+        # 🔑 第三阶段：内存预算检查（跳过已决定清理的会话）
+        await self.enforce_resource_budget(
+            exclude=[session_key for session_key, _ in sessions_to_cleanup]
+        )
+
+    async def enforce_resource_budget(self, exclude: list[str] | None = None):
+        """采样浏览器进程树资源占用，超出内存预算时按 闲置时长×内存 休眠页面或关闭会话"""
+        governor = self._resource_governor
+        if not governor.enabled or not self._browser_sessions:
+            return
+        entries = {
+            session_key: entry for session_key, entry in list(self._browser_sessions.items())
+            if session_key not in (exclude or ())
+        }
+        # 扫描 /proc 是阻塞 IO，放到线程中执行
+        total_mb = await asyncio.to_thread(governor.sample, entries)
+        decisions = governor.plan(entries)
+        if not decisions:
+            return
+        logger.warning(
+            f"浏览器内存 {total_mb:.0f}MB 超出预算 {settings.browser_memory_budget_mb}MB，"
+            f"回收 {len(decisions)} 个会话"
+        )
+        await self._apply_cleanup_decisions(list(decisions.items()))
+
+    async def _apply_cleanup_decisions(self, decisions: list[tuple[str, CleanupDecision]]):
+        """执行清理决策：关闭会话，或仅休眠页面并进入 SUSPENDING"""
+        for session_key, decision in decisions:
             try:
                 mid, browser_id = self._parse_session_key(session_key)
+                if decision.hibernate_pages:
+                    await self._hibernate_session(session_key, decision)
+                    continue
                 # 释放浏览器会话（内部会获取锁）
                 await self.release_browser_session(mid, browser_id)
                 logger.info(f"已清理会话: {session_key}, 原因: {decision.reason}")
             except Exception as e:
                 logger.error(f"清理会话失败: {session_key}, error: {e}")
 
+    async def _hibernate_session(self, session_key: str, decision: CleanupDecision):
+        """休眠会话的页面（与该会话的创建 / 关闭互斥），会话在下次被获取时自动恢复"""
+
+        async def hibernate():
+            entry = self._browser_sessions.get(session_key)
+            # 排队期间会话可能已被释放或重新使用
+            if entry is None or not entry.no_active_connections or entry.is_busy:
+                return
+            count = await entry.browser_session.hibernate_idle_pages()
+            entry.lifecycle_state = decision.next_state
+            logger.info(f"已休眠会话 {session_key} 的 {count} 个页面, 原因: {decision.reason}")
+
+        await self._browser_sessions.run_exclusive(session_key, hibernate)
+
+    async def _resume_session(self, entry: BrowserSessionEntry):
+        """恢复处于 SUSPENDING 状态的会话（重新打开被休眠的页面，与该会话的休眠 / 关闭互斥）"""
+        if entry.lifecycle_state != SessionLifecycleState.SUSPENDING:
+            return
+
+        async def resume():
+            # 排队期间可能已被其它请求恢复
+            if entry.lifecycle_state != SessionLifecycleState.SUSPENDING:
+                return
+            restored = await entry.browser_session.restore_hibernated_pages()
+            entry.lifecycle_state = SessionLifecycleState.ACTIVE
+            logger.info(f"已恢复休眠会话: mid={entry.mid}, browser_id={entry.browser_id}, 页面数: {restored}")
+
+        await self._browser_sessions.run_exclusive(self._get_session_key(entry.mid, entry.browser_id), resume)
+
     def _evaluate_session_cleanup(self,
                                   entry: BrowserSessionEntry, current_time: int
                                   ) -> CleanupDecision:
@@ -157,7 +213,7 @@ class LiveService:
         is_idle = entry.is_idle
         no_active_connections = entry.no_active_connections
 
-        if is_idle and no_active_connections and time_since_last_activity > policy.max_idle_time:
+        if is_idle and no_active_connections and not entry.is_busy and time_since_last_activity > policy.max_idle_time:
             return CleanupDecision(
                 should_cleanup=True,
                 reason=f"闲置超时 ({time_since_last_activity}s > {policy.max_idle_time}s)",
@@ -203,8 +259,37 @@ class LiveService:
             return entry
         raise BrowserNotStartedException()
 
-    async def get_browser_session_page(self, mid: int, browser_id: int, page_index: int | None = None) -> Page:
+    async def acquire_browser_session_entry(
+        self,
+        mid: int | str,
+        browser_id: int | str,
+    ) -> BrowserSessionEntry:
+        """
+        获取已存在的会话条目用于操作：刷新活动时间，并恢复被休眠的页面
+
+        get_browser_session_entry 只做查找，拿来执行操作会落在休眠后的空白页上；
+        需要操作页面的调用方都应使用此方法（或 use_browser_session）。
+        """
         entry = self.get_browser_session_entry(mid, browser_id)
+        entry.last_activity = int(time.time())
+        await self._resume_session(entry)
+        return entry
+
+    @contextlib.asynccontextmanager
+    async def use_browser_session(self, mid: int | str, browser_id: int | str):
+        """
+        在执行期间占用会话：条目标记为忙碌，资源治理器与闲置清理都会跳过它，结束时刷新活动时间
+        """
+        entry = await self.acquire_browser_session_entry(mid, browser_id)
+        entry.busy_count += 1
+        try:
+            yield entry
+        finally:
+            entry.busy_count -= 1
+            entry.last_activity = int(time.time())
+
+    async def get_browser_session_page(self, mid: int, browser_id: int, page_index: int | None = None) -> Page:
+        entry = await self.acquire_browser_session_entry(mid, browser_id)
         all_pages = entry.browser_session.all_pages
         if page_index is None:
             return await entry.browser_session.get_current_page()
@@ -220,26 +305,15 @@ class LiveService:
         is_create_browser: bool = True,
         max_retries: int = 2,  # ✅ 最大重试次数
     ) -> BrowserSessionEntry:
-        """获取插件化浏览器会话（优化锁策略，支持并发创建）"""
-        start_time = time.time()
-        session_key = LiveService._get_session_key(mid, browser_id)
-        current_time = int(time.time())
+        """
+        获取插件化浏览器会话（支持并发创建）
 
-        # ✅ 重试循环：处理浏览器在创建过程中被关闭的情况
-        for attempt in range(max_retries + 1):
-            try:
-                return await self._do_get_or_create_session_entry(
-                    mid, browser_id, headless, is_create_browser, current_time, start_time
-                )
-            except BrowserNotStartedException as e:
-                if attempt < max_retries:
-                    logger.warning(
-                        f"浏览器创建失败，第 {attempt + 1} 次重试: {session_key}, error: {e}")
-                    await asyncio.sleep(0.5)  # 短暂等待后重试
-                    continue
-                logger.error(f"浏览器创建失败，已达最大重试次数: {session_key}")
-                raise e
-        raise BrowserNotStartedException()
+        同一会话的并发调用合并为一次创建：所有等待者拿到同一个会话条目或同一个异常。
+        浏览器在创建过程中被关闭时，在同一次创建任务内立即重试（最多 max_retries 次），不做 sleep 退避。
+        """
+        return await self._do_get_or_create_session_entry(
+            mid, browser_id, headless, is_create_browser, int(time.time()), time.time(), max_retries
+        )
 
     async def _do_get_or_create_session_entry(
         self,
@@ -249,113 +323,134 @@ class LiveService:
         is_create_browser: bool,
         current_time: int,
         start_time: float,
+        max_retries: int = 2,
     ) -> BrowserSessionEntry:
         """
         执行实际的会话获取或创建逻辑
 
         此方法负责：
-        1. 检查现有会话的有效性
-        2. 委托给 PlaywrightSessionPool._create_session 进行创建
+        1. 检查现有会话的有效性（不加锁）
+        2. 通过注册表的 single-flight 委托给 PlaywrightSessionPool 创建，同一会话的并发请求只启动一次浏览器
         3. 在 LiveService.browser_sessions 中注册新创建的会话
         """
         session_key = self._get_session_key(mid, browser_id)
-        pool: PlaywrightSessionPool = get_default_session_pool()
-        # 🔑 第一阶段：检查现有会话
-        if session_key in self._browser_sessions:
-            entry = self._browser_sessions[session_key]
+        # 记录活跃，供预热池预测下次需要的浏览器
+        get_default_warm_pool().record_activity(mid, browser_id)
 
-            # 验证浏览器是否真正运行
-            if entry.browser_running:
-                # 浏览器仍然可用，更新活动时间
-                entry.last_activity = current_time
-                elapsed = time.time() - start_time
-                logger.debug(f"复用现有会话: {session_key}, 耗时: {elapsed:.3f}s")
-                return entry
+        # 🔑 第一阶段：检查现有会话
+        entry = self._browser_sessions.get(session_key)
+        if entry is not None and entry.browser_running:
+            # 浏览器仍然可用，更新活动时间
+            entry.last_activity = current_time
+            await self._resume_session(entry)
+            _SESSION_ACQUIRE_TOTAL.labels("reused").inc()
+            elapsed = time.time() - start_time
+            logger.debug(f"复用现有会话: {session_key}, 耗时: {elapsed:.3f}s")
+            return entry
 
         # 🔑 第二阶段：如果不需要创建，抛出异常
         if not is_create_browser:
             raise BrowserNotStartedException()
 
-        # 🔑 第三阶段：使用会话级别的锁保护创建过程
-        lock = await self._get_session_lock(session_key)
-        async with lock:
-            # 双重检查：验证会话是否已被其他请求创建
-            if session_key in self._browser_sessions:
-                entry = self.get_browser_session_entry(mid, browser_id)
-                if entry.browser_running:
-                    entry.last_activity = current_time
-                    elapsed = time.time() - start_time
-                    logger.debug(
-                        f"并发检查后发现会话已存在: {session_key}, 耗时: {elapsed:.3f}s")
-                    return entry
-
-            # 🔑 第四阶段：委托给 PlaywrightSessionPool 创建会话
-            session_params = SessionCreateParams(
+        # 🔑 第三阶段：合并到同一个创建任务
+        pool: PlaywrightSessionPool = get_default_session_pool()
+        remove_params = BrowserSessionRemoveParams(mid=mid, browser_id=browser_id, force_close=True)
+        session_params = SessionCreateParams(
+            mid=mid,
+            browser_id=browser_id,
+            headless=headless,
+        )
+
+        async def launch() -> BrowserSessionEntry:
+            launch_start = time.perf_counter()
+            outcome = "failure"
+            try:
+                browser_session = await pool.get_session(session_params)
+                outcome = "closed" if browser_session.is_closed else "success"
+            finally:
+                _SESSION_LAUNCH_SECONDS.labels(outcome).observe(time.perf_counter() - launch_start)
+            logger.info(
+                f"浏览器创建完成: {session_key}, 耗时: {time.time() - start_time:.3f}s")
+
+            # 验证刚创建的浏览器是否仍然有效，无效则从池中移除，避免重试时拿到同一个已关闭的浏览器
+            if browser_session.is_closed:
+                logger.warning(f"刚创建的浏览器已关闭，清理并重新创建: {session_key}")
+                await pool.release_session(remove_params)
+                raise BrowserNotStartedException("浏览器在创建过程中被关闭，请重试")
+
+            return BrowserSessionEntry(
                 mid=mid,
                 browser_id=browser_id,
-                headless=headless,
+                browser_session=browser_session,
+                last_activity=current_time,
             )
-            try:
-                # 这里用get_session就行了，不存在自动创建
-                browser_session = await pool.get_session(session_params)
-                create_elapsed = time.time() - start_time
-                logger.info(
-                    f"浏览器创建完成: {session_key}, 耗时: {create_elapsed:.3f}s")
-
-                # 🔑 第五阶段：验证刚创建的浏览器是否仍然有效
-                if browser_session.is_closed:
-                    logger.warning(f"刚创建的浏览器已关闭，清理并重新创建: {session_key}")
-                    raise BrowserNotStartedException("浏览器在创建过程中被关闭，请重试")
-
-                # 🔑 第六阶段：在 LiveService 中注册会话条目
-                entry = BrowserSessionEntry(
-                    mid=mid,
-                    browser_id=browser_id,
-                    browser_session=browser_session,
-                    last_activity=current_time,
-                )
 
-                self._browser_sessions[session_key] = entry
-                elapsed = time.time() - start_time
-                logger.info(f"会话创建并注册完成: {session_key}, 总耗时: {elapsed:.3f}s")
-                return entry
-            except Exception as e:
-                logger.exception(f"创建浏览器会话失败: {session_key}, error: {e}")
-                raise e
+        launched = False
+
+        async def create() -> BrowserSessionEntry:
+            nonlocal launched
+            # 浏览器已失效的旧会话：先从池中移除，避免池返回已关闭的浏览器
+            if self._browser_sessions.get(session_key) is not None:
+                logger.warning(f"会话浏览器已关闭，重新创建: {session_key}")
+                await pool.release_session(remove_params)
+            for attempt in range(max_retries + 1):
+                try:
+                    created = await launch()
+                    launched = True
+                    _SESSION_ACQUIRE_TOTAL.labels("created").inc()
+                    return created
+                except BrowserNotStartedException as e:
+                    if attempt >= max_retries:
+                        logger.error(f"浏览器创建失败，已达最大重试次数: {session_key}")
+                        raise
+                    logger.warning(
+                        f"浏览器创建失败，第 {attempt + 1} 次重试: {session_key}, error: {e}")
+            raise BrowserNotStartedException()
+
+        try:
+            entry = await self._browser_sessions.get_or_create(
+                session_key, create, is_valid=lambda e: e.browser_running
+            )
+        except Exception as e:
+            logger.exception(f"创建浏览器会话失败: {session_key}, error: {e}")
+            raise e
+        entry.last_activity = current_time
+        await self._resume_session(entry)
+        if not launched:
+            # 合并到其它调用进行中的创建（created 只在实际启动浏览器的 create() 中计数）
+            _SESSION_ACQUIRE_TOTAL.labels("coalesced").inc()
+        elapsed = time.time() - start_time
+        logger.info(f"会话获取完成: {session_key}, 总耗时: {elapsed:.3f}s")
+        return entry
 
     async def release_browser_session(self, mid: int, browser_id: int) -> bool:
-        """释放浏览器会话（带锁保护）"""
+        """释放浏览器会话（与该会话的创建互斥）"""
         session_key = LiveService._get_session_key(mid, browser_id)
 
-        try:
-            # 🔑 获取会话级别的锁，防止并发操作
-            lock = await self._get_session_lock(session_key)
-            async with lock:
-                pool = get_default_session_pool()
-
-                # 关闭浏览器会话
-                if session_key in self._browser_sessions:
-                    entry = self.get_browser_session_entry(mid, browser_id)
-                    # 🔑 关键：先关闭浏览器会话，再删除引用
-                    with contextlib.suppress(Exception):
-                        await entry.browser_session.close()
-                    # 删除会话引用
-                    del self._browser_sessions[session_key]
-                    logger.info(f"已删除会话: {session_key}")
-
-                # 从池中释放会话
-                remove_params = BrowserSessionRemoveParams(
-                    mid=mid,
-                    browser_id=browser_id,
-                    force_close=True,  # 🔑 关键修复：强制关闭并删除浏览器实例，避免复用已关闭的浏览器
-                )
+        async def release():
+            pool = get_default_session_pool()
 
-                await pool.release_session(remove_params)
-                logger.info(f"已从池中释放会话: mid={mid}, browser_id={browser_id}")
+            # 关闭浏览器会话
+            if entry := self._browser_sessions.get(session_key):
+                # 🔑 关键：先关闭浏览器会话，再删除引用
+                with contextlib.suppress(Exception):
+                    await entry.browser_session.close()
+                # 删除会话引用
+                self._browser_sessions.discard(session_key)
+                logger.info(f"已删除会话: {session_key}")
+
+            # 从池中释放会话
+            remove_params = BrowserSessionRemoveParams(
+                mid=mid,
+                browser_id=browser_id,
+                force_close=True,  # 🔑 关键修复：强制关闭并删除浏览器实例，避免复用已关闭的浏览器
+            )
 
-            # 🔑 在锁外清理会话锁（避免死锁）
-            await self._cleanup_session_lock(session_key)
+            await pool.release_session(remove_params)
+            logger.info(f"已从池中释放会话: mid={mid}, browser_id={browser_id}")
 
+        try:
+            await self._browser_sessions.run_exclusive(session_key, release)
             return True
 
         except Exception as e:
@@ -519,7 +614,7 @@ class LiveService:
 
         # 检查是否已存在会话
         if session_key in LiveService._browser_sessions:
-            return self.get_browser_session_entry(mid, browser_id)
+            return await self.acquire_browser_session_entry(mid, browser_id)
 
         # 使用标准的 get_or_create 创建会话（WebRTC 管理器自动初始化）
         entry = await self.get_or_create_browser_session_entry(
@@ -532,6 +627,14 @@ class LiveService:
 
 live_service = LiveService()
 
+metrics_registry.gauge(
+    "rpa_browser_sessions", "当前注册的浏览器会话数", collect=lambda: len(LiveService._browser_sessions),
+)
+metrics_registry.gauge(
+    "rpa_browser_session_operations_in_flight", "正在执行的会话创建 / 关闭任务数",
+    collect=lambda: LiveService._browser_sessions.in_flight,
+)
+
 __all__ = [
     "live_service",
 ]
@@ -0,0 +1,269 @@
+"""
+ResourceGovernor - 浏览器资源治理
+
+按持久化上下文的 user_data_dir 定位每个浏览器的 Chromium 进程树，采样 RSS / CPU，
+当所有会话的总内存超出全局预算时，按 "闲置时长 × 内存占用" 的代价排序给出回收决策：
+
+1. 优先休眠页面（导航到 about:blank 释放渲染进程内存，保留浏览器与登录态）
+2. 仍超出预算、会话已休眠过或内存达到临界值时，直接关闭会话
+
+决策复用 LiveService 的 CleanupDecision 状态机：休眠 -> SUSPENDING，关闭 -> TERMINATING。
+进程采样通过 ProcessStatsProvider 注入，测试时可替换为假的实现。
+"""
+import os
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+from loguru import logger
+
+from app.config import settings
+from app.models.runtime.control import SessionLifecycleState
+from app.models.runtime.live_service import BrowserSessionEntry, CleanupDecision
+
+
+@dataclass
+class ProcessStats:
+    """单个浏览器进程树的资源占用"""
+    rss_mb: float = 0.0
+    cpu_percent: float = 0.0
+    pids: list[int] = field(default_factory=list)
+
+
+class ProcessStatsProvider(Protocol):
+    def sample_all(self, user_data_dirs: Iterable[str]) -> dict[str, ProcessStats]:
+        """按 user_data_dir 返回对应浏览器进程树的资源占用，找不到进程的目录不出现在结果中"""
+        ...
+
+
+@dataclass
+class _ProcInfo:
+    pid: int
+    ppid: int
+    rss_pages: int
+    cpu_ticks: int
+    user_data_dir: str | None
+
+
+class ProcProcessStatsProvider:
+    """
+    基于 /proc 的进程采样（仅 Linux）
+
+    一次扫描 /proc 得到所有进程，命令行中带 --user-data-dir=<dir> 的进程视为该浏览器的进程，
+    取其中父进程不属于同一浏览器的作为根，累加根进程及全部子进程（渲染 / GPU / 网络服务进程）。
+    CPU 使用率为两次采样间 utime + stime 的增量。
+    """
+
+    USER_DATA_DIR_ARG = "--user-data-dir="
+
+    def __init__(self, proc_root: str = "/proc"):
+        self._proc_root = Path(proc_root)
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        # user_data_dir -> (采样时间, 累计 CPU ticks)
+        self._last_cpu: dict[str, tuple[float, int]] = {}
+
+    def _read_process(self, pid_dir: Path) -> _ProcInfo | None:
+        try:
+            stat = (pid_dir / "stat").read_text()
+            statm = (pid_dir / "statm").read_text()
+            cmdline = (pid_dir / "cmdline").read_bytes()
+        except OSError:
+            # 进程已退出或无权限
+            return None
+        # comm 字段可能包含空格和括号，从最后一个 ')' 之后开始解析
+        fields = stat[stat.rfind(")") + 2:].split()
+        user_data_dir = None
+        for arg in cmdline.split(b"\0"):
+            if arg.startswith(self.USER_DATA_DIR_ARG.encode()):
+                user_data_dir = os.path.abspath(arg[len(self.USER_DATA_DIR_ARG):].decode(errors="replace"))
+                break
+        return _ProcInfo(
+            pid=int(pid_dir.name),
+            ppid=int(fields[1]),
+            rss_pages=int(statm.split()[1]),
+            cpu_ticks=int(fields[11]) + int(fields[12]),
+            user_data_dir=user_data_dir,
+        )
+
+    @staticmethod
+    def _is_same_browser(info: _ProcInfo | None, user_data_dir: str) -> bool:
+        return info is not None and info.user_data_dir == user_data_dir
+
+    def sample_all(self, user_data_dirs: Iterable[str]) -> dict[str, ProcessStats]:
+        wanted = {os.path.abspath(d): d for d in user_data_dirs}
+        if not wanted:
+            return {}
+
+        processes: dict[int, _ProcInfo] = {}
+        for pid_dir in self._proc_root.iterdir():
+            if pid_dir.name.isdigit() and (info := self._read_process(pid_dir)):
+                processes[info.pid] = info
+
+        children: dict[int, list[int]] = {}
+        for info in processes.values():
+            children.setdefault(info.ppid, []).append(info.pid)
+
+        now = time.monotonic()
+        result: dict[str, ProcessStats] = {}
+        for normalized, original in wanted.items():
+            roots = [
+                info.pid for info in processes.values()
+                if info.user_data_dir == normalized and not self._is_same_browser(processes.get(info.ppid), normalized)
+            ]
+            if not roots:
+                self._last_cpu.pop(original, None)
+                continue
+
+            pids: list[int] = []
+            stack = list(roots)
+            while stack:
+                pid = stack.pop()
+                pids.append(pid)
+                stack.extend(children.get(pid, []))
+
+            rss_mb = sum(processes[pid].rss_pages for pid in pids) * self._page_size / 1024 / 1024
+            ticks = sum(processes[pid].cpu_ticks for pid in pids)
+            cpu_percent = 0.0
+            if last := self._last_cpu.get(original):
+                elapsed = now - last[0]
+                if elapsed > 0:
+                    # 子进程退出会让累计值变小，此时记为 0
+                    cpu_percent = max(0.0, (ticks - last[1]) / self._clock_ticks / elapsed * 100)
+            self._last_cpu[original] = (now, ticks)
+            result[original] = ProcessStats(rss_mb=rss_mb, cpu_percent=cpu_percent, pids=pids)
+
+        # 清理已不存在的浏览器的 CPU 基线
+        for stale in set(self._last_cpu) - set(wanted.values()):
+            self._last_cpu.pop(stale, None)
+        return result
+
+
+class ResourceGovernor:
+    """浏览器资源治理器：采样资源占用，并在超出内存预算时给出回收决策"""
+
+    def __init__(self, provider: ProcessStatsProvider | None = None):
+        self._provider = provider or ProcProcessStatsProvider()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.browser_memory_budget_mb > 0
+
+    def sample(self, entries: Mapping[str, BrowserSessionEntry]) -> float:
+        """
+        采样所有会话的资源占用并写回 entry.rss_mb / entry.cpu_percent
+
+        Returns:
+            float: 所有会话的总内存（MB）
+        """
+        dirs: dict[str, str] = {}
+        for session_key, entry in entries.items():
+            try:
+                dirs[session_key] = entry.user_data_dir
+            except AttributeError:
+                continue
+        stats = self._provider.sample_all(dirs.values())
+        total = 0.0
+        for session_key, entry in entries.items():
+            entry_stats = stats.get(dirs.get(session_key, ""), ProcessStats())
+            entry.rss_mb = entry_stats.rss_mb
+            entry.cpu_percent = entry_stats.cpu_percent
+            total += entry.rss_mb
+        return total
+
+    @staticmethod
+    def _is_evictable(entry: BrowserSessionEntry) -> bool:
+        """有人在看（WebRTC 连接）、正在执行或处于人工操作中的会话不回收，刚用过的会话也不回收"""
+        return (
+            entry.no_active_connections
+            and not entry.is_busy
+            and not entry.is_manual_mode
+            and entry.idle_duration >= settings.browser_page_hibernate_min_idle
+        )
+
+    @staticmethod
+    def _can_hibernate(entry: BrowserSessionEntry) -> bool:
+        if entry.lifecycle_state == SessionLifecycleState.SUSPENDING:
+            return False
+        try:
+            return entry.browser_session.hibernatable_page_count() > 0
+        except Exception:
+            return False
+
+    def plan(
+        self,
+        entries: Mapping[str, BrowserSessionEntry],
+        exclude: Iterable[str] = (),
+    ) -> dict[str, CleanupDecision]:
+        """
+        根据最近一次采样结果生成回收决策（只决策，不执行）
+
+        Args:
+            entries: session_key -> BrowserSessionEntry
+            exclude: 已由其它规则决定清理的会话，不重复决策
+
+        Returns:
+            dict[str, CleanupDecision]: 需要休眠或关闭的会话
+        """
+        budget = settings.browser_memory_budget_mb
+        if budget <= 0:
+            return {}
+        total = sum(entry.rss_mb for entry in entries.values())
+        if total <= budget:
+            return {}
+
+        excluded = set(exclude)
+        candidates = sorted(
+            (
+                (key, entry) for key, entry in entries.items()
+                if key not in excluded and self._is_evictable(entry)
+            ),
+            key=lambda item: item[1].eviction_cost,
+            reverse=True,
+        )
+        critical = total > budget * settings.browser_memory_critical_ratio
+        reclaim_ratio = settings.browser_hibernate_reclaim_ratio
+        decisions: dict[str, CleanupDecision] = {}
+
+        # 第一轮：休眠页面（内存达到临界值时跳过，直接关闭）
+        if not critical:
+            for key, entry in candidates:
+                if total <= budget:
+                    break
+                if not self._can_hibernate(entry):
+                    continue
+                decisions[key] = CleanupDecision(
+                    should_cleanup=False,
+                    reason=f"内存超出预算，休眠页面 (rss={entry.rss_mb:.0f}MB, 闲置 {entry.idle_duration}s)",
+                    next_state=SessionLifecycleState.SUSPENDING,
+                    priority=2,
+                    hibernate_pages=True,
+                )
+                total -= entry.rss_mb * reclaim_ratio
+
+        # 第二轮：仍超出预算则按代价关闭会话（包括刚决定休眠的会话）
+        for key, entry in candidates:
+            if total <= budget:
+                break
+            previous = decisions.get(key)
+            total -= entry.rss_mb * (1 - reclaim_ratio) if previous else entry.rss_mb
+            decisions[key] = CleanupDecision(
+                should_cleanup=True,
+                reason=f"内存超出预算 (rss={entry.rss_mb:.0f}MB, 闲置 {entry.idle_duration}s)",
+                next_state=SessionLifecycleState.TERMINATING,
+                priority=2,
+            )
+
+        if total > budget:
+            logger.warning(f"回收全部可回收会话后内存仍超出预算: 预计 {total:.0f}MB > {budget}MB")
+        return decisions
+
+
+__all__ = [
+    "ProcessStats",
+    "ProcessStatsProvider",
+    "ProcProcessStatsProvider",
+    "ResourceGovernor",
+]
@@ -4,14 +4,21 @@ WebRTC 视频流服务模块
 提供浏览器页面到客户端的 WebRTC 单向视频流传输功能。
 """
 
+from .jpeg_decoder import JpegFrameDecoder
 from .video_frame_producer import VideoFrameProducer
-from .media_track import WebRTCMediaTrack
-from .stream_session import WebRTCStreamSession
+from .broadcast import BroadcastTrack, VideoBroadcast
+from .governor import ScreencastGovernor, screencast_governor
+from .stream_session import WebRTCStreamSession, WebRTCViewer
 from .stream_manager import WebRTCStreamManager
 
 __all__ = [
+    "JpegFrameDecoder",
     "VideoFrameProducer",
-    "WebRTCMediaTrack",
+    "BroadcastTrack",
+    "VideoBroadcast",
+    "ScreencastGovernor",
+    "screencast_governor",
     "WebRTCStreamSession",
+    "WebRTCViewer",
     "WebRTCStreamManager",
 ]
@@ -0,0 +1,301 @@
+"""
+VideoBroadcast - 单次编码、多观众共享的视频广播
+
+同一页面被多个客户端同时观看时，旧实现为每个观众各启动一路 screencast，
+每个 RTCPeerConnection 的 RTCRtpSender 再各自做一次 VP8 编码，CPU 开销随观众数线性增长。
+
+这里每个页面只解码、编码一次：
+
+    VideoFrameProducer ──▶ VideoBroadcast（VP8 编码一次）──┬──▶ BroadcastTrack ──▶ 观众 1 RTCPeerConnection
+                                                          ├──▶ BroadcastTrack ──▶ 观众 2 RTCPeerConnection
+                                                          └──▶ ...
+
+BroadcastTrack.recv() 返回已编码的 av.Packet，aiortc 的 RTCRtpSender 对 Packet 只做 RTP 分包
+（Encoder.pack），不会再次编码。
+
+- 每个观众一个有界队列：慢观众队列满时只丢弃自己的积压帧，然后跳过差分帧直到下一个关键帧
+  （VP8 帧间依赖，丢帧后继续发送差分帧会花屏），并向编码器请求关键帧，其他观众不受影响
+- 新观众加入、观众发送 PLI / FIR 时，下一帧强制编码为关键帧
+- 没有观众时跳过编码
+- 码率固定：共享编码器不随单个观众的 REMB 反馈调整
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fractions
+import multiprocessing
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import av
+from aiortc import MediaStreamTrack
+from aiortc.codecs.vpx import number_of_threads
+from aiortc.mediastreams import MediaStreamError
+from loguru import logger
+
+from .video_frame_producer import VideoFrameProducer
+
+VIDEO_CLOCK_RATE = 90000
+VIDEO_TIME_BASE = fractions.Fraction(1, VIDEO_CLOCK_RATE)
+
+
+@dataclass(slots=True)
+class EncodedFrame:
+    """一帧完整的 VP8 编码数据（所有观众共享，只读）"""
+    packet: av.Packet
+    keyframe: bool
+
+
+class Vp8FrameEncoder:
+    """
+    VP8 编码器（libvpx）
+
+    编码参数与 aiortc 的 Vp8Encoder 相同（实时模式、CBR、无前瞻），
+    区别在于输出完整的编码帧而不做 RTP 分包，分包由每个观众的 RTCRtpSender 完成。
+    """
+
+    def __init__(self, bitrate: int):
+        self.bitrate = bitrate
+        self._codec: av.video.codeccontext.VideoCodecContext | None = None
+        self.busy_seconds = 0.0  # 累计编码耗时
+
+    def encode(self, frame: av.VideoFrame, force_keyframe: bool = False) -> EncodedFrame | None:
+        """编码一帧（CPU 密集，应在线程池中调用）；编码器没有输出时返回 None"""
+        started = time.perf_counter()
+        try:
+            return self._encode(frame, force_keyframe)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    def _encode(self, frame: av.VideoFrame, force_keyframe: bool) -> EncodedFrame | None:
+        if self._codec is not None and (frame.width, frame.height) != (self._codec.width, self._codec.height):
+            self._codec = None  # 分辨率变化（页面缩放），重建编码器，首帧必为关键帧
+        if self._codec is None:
+            self._codec = self._create_codec(frame.width, frame.height)
+
+        frame.pict_type = av.video.frame.PictureType.I if force_keyframe else av.video.frame.PictureType.NONE
+        packets = self._codec.encode(frame)
+        if not packets:
+            return None
+
+        packet = av.Packet(b"".join(bytes(p) for p in packets))
+        packet.pts = frame.pts
+        packet.time_base = frame.time_base
+        return EncodedFrame(packet, keyframe=any(p.is_keyframe for p in packets))
+
+    def _create_codec(self, width: int, height: int) -> av.video.codeccontext.VideoCodecContext:
+        codec = av.CodecContext.create("libvpx", "w")
+        codec.width = width
+        codec.height = height
+        codec.bit_rate = self.bitrate
+        codec.pix_fmt = "yuv420p"
+        codec.gop_size = 3000  # 只在请求时输出关键帧
+        codec.qmin = 2
+        codec.qmax = 56
+        codec.options = {
+            "bufsize": str(self.bitrate),
+            "cpu-used": "-6",
+            "deadline": "realtime",
+            "lag-in-frames": "0",
+            "minrate": str(self.bitrate),
+            "maxrate": str(self.bitrate),
+            "noise-sensitivity": "4",
+            "overshoot-pct": "15",
+            "partitions": "0",
+            "static-thresh": "1",
+            "undershoot-pct": "100",
+        }
+        codec.thread_count = number_of_threads(width * height, multiprocessing.cpu_count())
+        return codec
+
+
+class BroadcastTrack(MediaStreamTrack):
+    """
+    单个观众的视频轨道
+
+    从 VideoBroadcast 接收共享的编码帧，放入本观众的有界队列，recv() 按序取出交给 RTCRtpSender。
+    """
+
+    kind = "video"
+
+    def __init__(self, broadcast: VideoBroadcast, queue_size: int):
+        super().__init__()
+        self._broadcast = broadcast
+        self._queue: deque[EncodedFrame] = deque()
+        self._queue_size = queue_size
+        self._ready = asyncio.Event()
+        # 新观众从关键帧开始解码
+        self._waiting_keyframe = True
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def push(self, encoded: EncodedFrame) -> None:
+        """接收一帧共享编码帧（由 VideoBroadcast 在事件循环中调用，不阻塞）"""
+        if self._waiting_keyframe:
+            if not encoded.keyframe:
+                self.frames_dropped += 1
+                return
+            self._waiting_keyframe = False
+
+        if len(self._queue) >= self._queue_size:
+            # 慢观众：丢弃积压帧，等待下一个关键帧后重新开始
+            self.frames_dropped += len(self._queue) + 1
+            self._queue.clear()
+            self._waiting_keyframe = True
+            self._broadcast.request_keyframe()
+            return
+
+        self._queue.append(encoded)
+        self._ready.set()
+
+    async def recv(self) -> av.Packet:
+        """
+        取出下一帧编码数据（由 aiortc RTCRtpSender 调用）
+
+        Raises:
+            MediaStreamError: 轨道已停止
+        """
+        while not self._queue:
+            if self.readyState != "live":
+                raise MediaStreamError
+            self._ready.clear()
+            await self._ready.wait()
+
+        self.frames_sent += 1
+        return self._queue.popleft().packet
+
+    def stop(self) -> None:
+        """停止轨道并取消订阅（幂等）"""
+        super().stop()
+        self._ready.set()  # 唤醒等待中的 recv()
+        self._broadcast.unsubscribe(self)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+
+class VideoBroadcast:
+    """
+    页面视频广播
+
+    一个后台任务从 VideoFrameProducer 取帧、编码一次，再分发给所有订阅的 BroadcastTrack。
+    """
+
+    def __init__(self, producer: VideoFrameProducer, bitrate: int, viewer_queue_size: int):
+        self.producer = producer
+        self.viewer_queue_size = viewer_queue_size
+        self._encoder = Vp8FrameEncoder(bitrate)
+        self._tracks: dict[BroadcastTrack, None] = {}  # 有序集合，按订阅顺序分发
+        self._keyframe_requested = True
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self._clock_start: float | None = None
+        self._last_pts = -1
+
+        self.frames_encoded = 0
+        self.keyframes_encoded = 0
+        self.frames_skipped = 0  # 没有观众时跳过编码的帧
+
+    # ── 生命周期 ──
+
+    def start(self) -> None:
+        """启动编码分发任务（幂等）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止编码分发任务并结束所有观众轨道（幂等）"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for track in list(self._tracks):
+            track.stop()
+
+    # ── 订阅 ──
+
+    def subscribe(self) -> BroadcastTrack:
+        """新增一个观众轨道，下一帧编码为关键帧"""
+        track = BroadcastTrack(self, self.viewer_queue_size)
+        self._tracks[track] = None
+        self.request_keyframe()
+        return track
+
+    def unsubscribe(self, track: BroadcastTrack) -> None:
+        self._tracks.pop(track, None)
+
+    def request_keyframe(self) -> None:
+        """请求下一帧编码为关键帧（新观众加入 / 慢观众丢帧 / 观众 PLI）"""
+        self._keyframe_requested = True
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._tracks)
+
+    @property
+    def encode_seconds(self) -> float:
+        """累计编码耗时"""
+        return self._encoder.busy_seconds
+
+    # ── 编码分发 ──
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._closed:
+            # get_next_frame 会吞掉 CancelledError 并返回 None，以 _closed 判断是否退出
+            frame = await self.producer.get_next_frame()
+            if frame is None:
+                if self._closed or not self.producer.is_running:
+                    break
+                continue
+            if not self._tracks:
+                self.frames_skipped += 1
+                continue
+
+            frame.pts = self._next_pts()
+            frame.time_base = VIDEO_TIME_BASE
+            force_keyframe, self._keyframe_requested = self._keyframe_requested, False
+            try:
+                encoded = await loop.run_in_executor(None, self._encoder.encode, frame, force_keyframe)
+            except Exception as e:
+                logger.error(f"VP8 编码失败: {e}")
+                self._keyframe_requested = True
+                continue
+            if encoded is None:
+                continue
+
+            self.frames_encoded += 1
+            self.keyframes_encoded += encoded.keyframe
+            for track in list(self._tracks):
+                track.push(encoded)
+
+        for track in list(self._tracks):
+            track.stop()
+
+    def _next_pts(self) -> int:
+        """按真实时间生成 90kHz 时间戳（单调递增）"""
+        now = time.monotonic()
+        if self._clock_start is None:
+            self._clock_start = now
+        self._last_pts = max(int((now - self._clock_start) * VIDEO_CLOCK_RATE), self._last_pts + 1)
+        return self._last_pts
+
+    def stats(self) -> dict:
+        """编码与各观众的分发统计"""
+        return {
+            "viewers": self.viewer_count,
+            "encoded": self.frames_encoded,
+            "keyframes": self.keyframes_encoded,
+            "skipped": self.frames_skipped,
+            "encode_seconds": round(self._encoder.busy_seconds, 3),
+            "viewer_sent": [track.frames_sent for track in self._tracks],
+            "viewer_dropped": [track.frames_dropped for track in self._tracks],
+        }
+
+
+__all__ = ["EncodedFrame", "Vp8FrameEncoder", "BroadcastTrack", "VideoBroadcast"]
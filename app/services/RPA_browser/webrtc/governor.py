@@ -0,0 +1,322 @@
+"""
+ScreencastGovernor - 截屏画质 / 帧率自适应调节器
+
+旧实现中每路流固定 quality=80、原始分辨率、浏览器每帧都推送，主机 CPU 紧张时只能靠生产者队列丢旧帧，
+所有流同时、同样地劣化。
+
+这里周期性采集每路流的信号，闭环调整 CDP Page.startScreencast 的 quality / everyNthFrame / maxWidth / maxHeight：
+
+- 解码 + 编码耗时 → 每路流实际占用的 CPU 核数
+- 生产者队列深度与丢帧 → 本路流处理不过来
+- 观众 RTCP 丢包率 → 网络拥塞
+- 主机 1 分钟负载 → 收紧全局 CPU 预算
+
+调节策略（每个周期先算出所有流的目标档位，每路流最多下发一次 CDP 命令）：
+
+1. 本路流过载（队列积压 / 丢帧 / 丢包）→ 降一档
+2. 没有观众的流直接降到最低档；观众重新出现时回到最高档，再由预算约束
+3. 总 CPU 估算超出预算 → 按优先级逐档降级：无观众 → 观众少 → 成本高的先降
+4. 连续若干周期无过载、且升档后仍在预算余量内 → 升一档，观众多的流优先
+
+时钟与主机负载可注入，配合假的 CDP 会话即可离线测试。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from loguru import logger
+
+from app.config import settings
+from app.models.runtime.webrtc_models import ScreencastSettings
+
+# 档位：从高画质到低画质
+SCREENCAST_LEVELS: tuple[ScreencastSettings, ...] = (
+    ScreencastSettings(quality=80),
+    ScreencastSettings(quality=70, max_width=1600, max_height=900),
+    ScreencastSettings(quality=60, max_width=1280, max_height=720),
+    ScreencastSettings(quality=50, every_nth_frame=2, max_width=1280, max_height=720),
+    ScreencastSettings(quality=45, every_nth_frame=2, max_width=960, max_height=540),
+    ScreencastSettings(quality=35, every_nth_frame=3, max_width=854, max_height=480),
+    ScreencastSettings(quality=30, every_nth_frame=4, max_width=640, max_height=360),
+)
+
+# 估算相对成本时，原始分辨率按 1080p 计
+_FULL_PIXELS = 1920 * 1080
+
+
+def relative_cost(level: ScreencastSettings) -> float:
+    """档位的相对 CPU 成本（像素数 × 帧率），原始分辨率逐帧推送为 1"""
+    pixels = level.max_width * level.max_height if level.max_width and level.max_height else _FULL_PIXELS
+    return pixels / _FULL_PIXELS / level.every_nth_frame
+
+
+def host_load() -> float:
+    """主机每核 1 分钟平均负载；平台不支持时返回 0"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+@dataclass(slots=True)
+class StreamSignals:
+    """单路流在采样时刻的信号（计数类字段为累计值）"""
+    viewers: int
+    queue_depth: int
+    queue_capacity: int
+    frames_dropped: int  # 生产者队列累计丢帧
+    busy_seconds: float  # 累计解码 + 编码耗时
+    fraction_lost: float = 0.0  # 观众中最差的 RTCP 丢包率（0-1）
+
+
+class GovernedStream(Protocol):
+    """被调节的流（WebRTCStreamSession 实现该接口）"""
+    stream_key: str
+
+    @property
+    def screencast_adjustable(self) -> bool: ...
+
+    async def collect_signals(self) -> StreamSignals: ...
+
+    async def apply_screencast_settings(self, settings: ScreencastSettings) -> bool: ...
+
+
+@dataclass(slots=True)
+class _StreamState:
+    stream_ref: weakref.ReferenceType
+    level: int = 0
+    signals: StreamSignals | None = None
+    sampled_at: float = 0.0
+    cost: float = 0.0  # 最近一个周期实际占用的 CPU 核数
+    calm_ticks: int = 0  # 连续无过载的周期数
+    congested: bool = False
+    parked: bool = False  # 因没有观众被降到最低档
+
+
+@dataclass(slots=True)
+class GovernorDecision:
+    """单路流一个周期的调节结果"""
+    stream_key: str
+    level: int
+    settings: ScreencastSettings
+    reason: str
+
+
+class ScreencastGovernor:
+    """全局截屏调节器（所有浏览器会话的 WebRTC 流共用一个 CPU 预算）"""
+
+    def __init__(
+        self,
+        *,
+        cpu_budget: float,
+        interval: float,
+        load_high: float,
+        loss_threshold: float,
+        upgrade_after: int = 3,
+        upgrade_headroom: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+        load_average: Callable[[], float] = host_load,
+        autostart: bool = True,
+    ):
+        """
+        Args:
+            cpu_budget: 所有流可占用的 CPU 核数
+            interval: 调节周期（秒）
+            load_high: 主机每核负载超过该值时按比例收紧预算
+            loss_threshold: 观众丢包率超过该值视为拥塞
+            upgrade_after: 连续无过载多少个周期后允许升档
+            upgrade_headroom: 升档后总成本不得超过预算的比例（留出余量，避免来回振荡）
+            clock: 时钟（测试中可注入模拟时钟）
+            load_average: 主机负载采样函数
+            autostart: 登记流时是否自动启动后台调节任务（测试中关闭，手动调用 tick）
+        """
+        self.cpu_budget = cpu_budget
+        self.interval = interval
+        self.load_high = load_high
+        self.loss_threshold = loss_threshold
+        self.upgrade_after = upgrade_after
+        self.upgrade_headroom = upgrade_headroom
+        self._clock = clock
+        self._load_average = load_average
+        self._autostart = autostart
+        self._streams: dict[str, _StreamState] = {}
+        self._task: asyncio.Task | None = None
+
+        self.ticks = 0
+        self.adjustments = 0
+        self.last_budget = cpu_budget
+        self.last_cost = 0.0
+
+    # ── 注册 ──
+
+    def register(self, stream: GovernedStream) -> None:
+        """登记一路流，并在有事件循环时启动调节任务"""
+        self._streams[stream.stream_key] = _StreamState(weakref.ref(stream))
+        if self._autostart and self._task is None:
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass
+
+    def unregister(self, stream: GovernedStream) -> None:
+        state = self._streams.get(stream.stream_key)
+        if state is not None and state.stream_ref() in (stream, None):
+            del self._streams[stream.stream_key]
+
+    def level_of(self, stream_key: str) -> int | None:
+        state = self._streams.get(stream_key)
+        return None if state is None else state.level
+
+    async def _run(self) -> None:
+        try:
+            while self._streams:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.tick()
+                except Exception as e:
+                    logger.error(f"截屏自适应调节失败: {e}")
+        finally:
+            self._task = None
+
+    # ── 调节 ──
+
+    async def tick(self) -> list[GovernorDecision]:
+        """执行一个调节周期，返回本周期变更了档位的流"""
+        self.ticks += 1
+        now = self._clock()
+        streams = await self._sample(now)
+        if not streams:
+            return []
+
+        budget = self.cpu_budget
+        load = self._load_average()
+        if load > self.load_high:
+            budget *= self.load_high / load
+        self.last_budget = budget
+
+        targets: dict[str, int] = {}
+        reasons: dict[str, str] = {}
+        last = len(SCREENCAST_LEVELS) - 1
+
+        for key, (stream, state, viewers) in streams.items():
+            targets[key] = state.level
+            if not stream.screencast_adjustable:
+                continue
+            if viewers == 0:
+                if state.level != last:
+                    targets[key], reasons[key] = last, "no viewers"
+            elif state.parked:
+                targets[key], reasons[key] = 0, "viewers returned"
+            elif state.congested and state.level < last:
+                targets[key], reasons[key] = state.level + 1, "congested"
+
+        def estimate(key: str, level: int) -> float:
+            state = streams[key][1]
+            return state.cost * relative_cost(SCREENCAST_LEVELS[level]) / relative_cost(SCREENCAST_LEVELS[state.level])
+
+        total = sum(estimate(key, level) for key, level in targets.items())
+
+        # 超出预算：无观众 → 观众少 → 档位高（画质好）→ 成本高的先降
+        degradable = [key for key, (stream, _, _) in streams.items() if stream.screencast_adjustable]
+        while total > budget:
+            candidates = [key for key in degradable if targets[key] < last]
+            if not candidates:
+                break
+            key = min(candidates, key=lambda k: (streams[k][2] > 0, streams[k][2], targets[k], -streams[k][1].cost))
+            total += estimate(key, targets[key] + 1) - estimate(key, targets[key])
+            targets[key] += 1
+            reasons[key] = "over budget"
+
+        # 余量充足：观众多的流优先升档
+        for key in sorted(degradable, key=lambda k: -streams[k][2]):
+            stream, state, viewers = streams[key]
+            if not viewers or targets[key] != state.level or state.level == 0:
+                continue
+            if state.calm_ticks < self.upgrade_after:
+                continue
+            upgraded = total + estimate(key, state.level - 1) - estimate(key, state.level)
+            if upgraded <= budget * self.upgrade_headroom:
+                total = upgraded
+                targets[key], reasons[key] = state.level - 1, "headroom"
+
+        self.last_cost = total
+        decisions = []
+        for key, level in targets.items():
+            stream, state, _ = streams[key]
+            if level == state.level:
+                continue
+            try:
+                applied = await stream.apply_screencast_settings(SCREENCAST_LEVELS[level])
+            except Exception as e:
+                logger.warning(f"下发截屏参数失败 {key}: {e}")
+                continue
+            if not applied:
+                continue
+            logger.info(f"截屏档位调整: {key} {state.level} → {level} ({reasons[key]})")
+            state.level, state.calm_ticks = level, 0
+            state.parked = reasons[key] == "no viewers"
+            self.adjustments += 1
+            decisions.append(GovernorDecision(key, level, SCREENCAST_LEVELS[level], reasons[key]))
+        return decisions
+
+    async def _sample(self, now: float) -> dict[str, tuple[GovernedStream, _StreamState, int]]:
+        """采集各流信号，计算本周期成本与过载标记；首次采样的流只记录基线"""
+        sampled = {}
+        for key, state in list(self._streams.items()):
+            stream = state.stream_ref()
+            if stream is None:
+                del self._streams[key]
+                continue
+            signals = await stream.collect_signals()
+            previous, elapsed = state.signals, now - state.sampled_at
+            if previous is not None and elapsed <= 0:
+                continue
+            state.signals, state.sampled_at = signals, now
+            if previous is None:
+                continue
+
+            state.cost = max(signals.busy_seconds - previous.busy_seconds, 0.0) / elapsed
+            state.congested = (
+                signals.frames_dropped > previous.frames_dropped
+                or signals.queue_depth * 2 >= signals.queue_capacity
+                or signals.fraction_lost > self.loss_threshold
+            )
+            state.calm_ticks = 0 if state.congested else state.calm_ticks + 1
+            sampled[key] = (stream, state, signals.viewers)
+        return sampled
+
+    def stats(self) -> dict:
+        """调节器状态：预算、估算成本与各流档位"""
+        return {
+            "streams": len(self._streams),
+            "ticks": self.ticks,
+            "adjustments": self.adjustments,
+            "budget": round(self.last_budget, 3),
+            "cost": round(self.last_cost, 3),
+            "levels": {key: state.level for key, state in self._streams.items()},
+        }
+
+
+screencast_governor = ScreencastGovernor(
+    cpu_budget=settings.browser_webrtc_cpu_budget * (os.cpu_count() or 1),
+    interval=settings.browser_webrtc_governor_interval,
+    load_high=settings.browser_webrtc_load_high,
+    loss_threshold=settings.browser_webrtc_loss_threshold,
+)
+
+
+__all__ = [
+    "SCREENCAST_LEVELS",
+    "StreamSignals",
+    "GovernedStream",
+    "GovernorDecision",
+    "ScreencastGovernor",
+    "screencast_governor",
+    "relative_cost",
+]
@@ -0,0 +1,56 @@
+"""
+JpegFrameDecoder - screencast JPEG 解码器
+
+CDP screencast 推送的是 JPEG。旧流程先用 PIL 解码为 RGB 图像，再由 PyAV 转换为 yuv420p，
+每帧两次整帧拷贝外加一次 RGB→YUV 色彩空间转换。
+
+这里直接使用 FFmpeg 的 MJPEG 解码器把 JPEG 解码为 YUV 平面（yuvj420p，与 yuv420p 平面布局相同，
+只是色彩范围为 full range），再由常驻的 VideoReformatter 做一次 full → limited range 映射，
+输出与旧流程一致的 yuv420p 帧。
+
+- 解码器上下文常驻：libavcodec 的帧缓冲池在帧之间复用，不再每帧分配解码缓冲
+- VideoReformatter 常驻：复用 SwsContext，分辨率不变时不重新初始化
+- 非 4:2:0 的 JPEG（4:2:2 / 4:4:4 / 灰度）由同一个 reformatter 转换为 yuv420p
+"""
+
+import threading
+
+import av
+from av.video.reformatter import VideoReformatter
+
+
+class JpegFrameDecoder:
+    """把 JPEG 字节解码为 yuv420p 的 av.VideoFrame（每个视频流一个实例）"""
+
+    def __init__(self):
+        self._codec = av.CodecContext.create("mjpeg", "r")
+        self._reformatter = VideoReformatter()
+        # 解码在线程池中执行，同一解码器上下文不能被并发调用
+        self._lock = threading.Lock()
+        self.decoded = 0
+
+    def decode(self, jpeg_data: bytes) -> av.VideoFrame:
+        """
+        解码一帧 JPEG（CPU 密集，应在线程池中调用）
+
+        Raises:
+            av.error.FFmpegError: JPEG 数据损坏
+            ValueError: 解码器没有输出帧
+        """
+        with self._lock:
+            frames = self._codec.decode(av.Packet(jpeg_data))
+            if not frames:
+                raise ValueError("MJPEG 解码器未输出帧")
+            frame = frames[-1]
+            self.decoded += 1
+
+            if frame.format.name == "yuv420p":
+                return frame
+            if frame.format.name.startswith("yuvj"):
+                return self._reformatter.reformat(
+                    frame, format="yuv420p", src_color_range="JPEG", dst_color_range="MPEG"
+                )
+            return self._reformatter.reformat(frame, format="yuv420p")
+
+
+__all__ = ["JpegFrameDecoder"]
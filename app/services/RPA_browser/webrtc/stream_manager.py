@@ -6,6 +6,8 @@ WebRTCStreamManager - WebRTC 流管理器（无循环引用 + 高效数据结构
 2. OrderedDict 维护 LRU 淘汰顺序，最近使用的流在末尾
 3. 双向索引：_streams_by_index + _streams_by_key，实现 O(1) 双向查找
 4. 定期清理基于 LRU 顺序，低开销闲置检测
+5. 每个页面一个流，多个观众共享该流的捕获与编码；观众 key "{stream_key}#{viewer_id}"
+   通过去掉后缀映射回页面流，仍是 O(1) 查找
 """
 
 import asyncio
@@ -17,8 +19,19 @@ from loguru import logger
 
 from app.config import settings
 from app.models.runtime.webrtc_models import WebRTCSessionConfig
-from .stream_session import WebRTCStreamSession
+from .stream_session import VIEWER_KEY_SEPARATOR, WebRTCStreamSession
 from app.scheduler_manager import scheduler_manager_ist
+from app.utils.metrics.registry import metrics_registry
+
+_STREAM_START_SECONDS = metrics_registry.histogram(
+    "rpa_webrtc_stream_start_duration_seconds", "创建并启动一路 WebRTC 页面流（screencast 启动）的耗时",
+)
+_STREAM_REQUESTS = metrics_registry.counter(
+    "rpa_webrtc_stream_requests_total", "请求页面流的次数（复用已有流 / 新建）", ("result",),
+)
+
+# 存活的流管理器（弱引用，仅用于导出流数量）
+_live_managers: "weakref.WeakSet[WebRTCStreamManager]" = weakref.WeakSet()
 
 
 class WebRTCStreamManager:
@@ -36,7 +49,7 @@ class WebRTCStreamManager:
 
     查找算法：
     - 按 page_index 查找: O(1) 直接哈希
-    - 按 stream_key 查找: O(1) 直接哈希
+    - 按 stream_key 查找: O(1) 直接哈希（观众 key 先去掉 "#{viewer_id}" 后缀）
     - 闲置淘汰: O(k) 遍历 OrderedDict 前部，k 为超时流数量
 
     淘汰策略：
@@ -58,6 +71,7 @@ class WebRTCStreamManager:
         self._streams_by_index: OrderedDict[int, WebRTCStreamSession] = OrderedDict()
         # 辅助索引：stream_key → stream 的 O(1) 映射
         self._streams_by_key: Dict[str, WebRTCStreamSession] = {}
+        _live_managers.add(self)
 
         # 注册定期清理任务（基于配置的 cleanup_interval）
         mid = getattr(session.playwright_instance, 'mid', 'unknown')
@@ -83,7 +97,8 @@ class WebRTCStreamManager:
         """
         启动指定页面的 WebRTC 视频流
 
-        创建全新的流实例，使用双向索引注册，自动淘汰同页面的旧流。
+        该页面已有活跃流时直接复用（新观众订阅同一路编码），否则创建新的流实例并使用双向索引注册，
+        同时淘汰同页面已失效的旧流。
 
         Args:
             page_index: 页面索引（从 0 开始）
@@ -107,9 +122,14 @@ class WebRTCStreamManager:
 
         page = pages[page_index]
 
-        # 如果该 page_index 已有旧流，先淘汰
-        if page_index in self._streams_by_index:
-            old_stream = self._streams_by_index[page_index]
+        old_stream = self._streams_by_index.get(page_index)
+        if old_stream is not None:
+            # 同一页面的活跃流：复用，不重复捕获与编码
+            if old_stream.is_active and old_stream.page is page:
+                self._touch_lru(old_stream)
+                _STREAM_REQUESTS.labels("reused").inc()
+                return old_stream
+            # 旧流已失效或该索引已对应其他页面，先淘汰
             logger.info(f"淘汰 page_index={page_index} 的旧流，创建新流")
             await self._evict_stream(page_index, old_stream)
 
@@ -125,7 +145,10 @@ class WebRTCStreamManager:
 
         # 创建并启动流
         stream = WebRTCStreamSession(stream_key, page, config, page_index)
+        start = time.perf_counter()
         await stream.start()
+        _STREAM_START_SECONDS.observe(time.perf_counter() - start)
+        _STREAM_REQUESTS.labels("created").inc()
 
         # 双向索引注册（新流插入 OrderedDict 末尾 = 最新）
         self._streams_by_index[page_index] = stream
@@ -145,13 +168,13 @@ class WebRTCStreamManager:
 
         Args:
             page_index: 页面索引
-            stream_key: 流唯一键
+            stream_key: 流唯一键或观众 key（返回观众所属的页面流）
 
         Returns:
             WebRTCStreamSession 或 None
         """
         if stream_key is not None:
-            stream = self._streams_by_key.get(stream_key)
+            stream = self._streams_by_key.get(stream_key.partition(VIEWER_KEY_SEPARATOR)[0])
             if stream is not None:
                 self._touch_lru(stream)
             return stream
@@ -168,13 +191,19 @@ class WebRTCStreamManager:
         """
         关闭指定流（O(1) 查找 + 自动清理双索引）
 
+        传入观众 key 时只关闭该观众，页面流继续服务其他观众。
+
         Args:
             page_index: 页面索引
-            stream_key: 流唯一键
+            stream_key: 流唯一键或观众 key
         """
         stream = None
         if stream_key:
-            stream = self._streams_by_key.get(stream_key)
+            page_key, _, viewer_id = stream_key.partition(VIEWER_KEY_SEPARATOR)
+            stream = self._streams_by_key.get(page_key)
+            if stream is not None and viewer_id:
+                await stream.close_viewer(stream_key)
+                return
         elif page_index is not None:
             stream = self._streams_by_index.get(page_index)
 
@@ -291,3 +320,9 @@ class WebRTCStreamManager:
 
     def __contains__(self, key) -> bool:
         return key in self._streams_by_index or key in self._streams_by_key
+
+
+metrics_registry.gauge(
+    "rpa_webrtc_active_streams", "当前活跃的 WebRTC 页面流数",
+    collect=lambda: sum(m.active_stream_count for m in list(_live_managers)),
+)
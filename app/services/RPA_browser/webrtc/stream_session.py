@@ -6,27 +6,45 @@ WebRTCStreamSession - WebRTC 流会话（无循环引用设计）
 - PageWebRTCState 使用 weakref 持有 stream_session，避免 page ↔ session 循环引用
 - 内置 _last_activity 时间戳，支持 O(1) 闲置时长查询
 - 状态机确保正确的生命周期转换
+- 每个页面只捕获、编码一次（VideoBroadcast），多个观众（WebRTCViewer）各自持有
+  RTCPeerConnection 并订阅同一路编码帧
+- 活跃期间登记到 ScreencastGovernor，由其按 CPU 预算与观众反馈调整截屏参数
 """
 
 from __future__ import annotations
 
+import asyncio
+import itertools
 import time
 import weakref
 from typing import TYPE_CHECKING
 
-from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate
+from aiortc import RTCPeerConnection, RTCRtpSender, RTCSessionDescription, RTCIceCandidate
 from loguru import logger
 
 if TYPE_CHECKING:
     from playwright.async_api import Page
 
 from app.models.runtime.webrtc_models import (
+    ScreencastSettings,
     WebRTCStreamState,
     WebRTCStreamInfo,
     WebRTCSessionConfig,
 )
+from .broadcast import BroadcastTrack, VideoBroadcast
+from .governor import StreamSignals, screencast_governor
 from .video_frame_producer import VideoFrameProducer
-from .media_track import WebRTCMediaTrack
+
+# 观众 key 格式: "{stream_key}#{viewer_id}"
+VIEWER_KEY_SEPARATOR = "#"
+
+# WebRTCViewer 覆盖 RTCRtpSender 的私有方法 _send_keyframe 把 PLI / FIR 转交给共享编码器（aiortc 1.15）。
+# 钩子不存在时覆盖不会报错，观众的关键帧请求却会被静默丢弃（丢包后画面长时间花屏），因此在启动时直接失败
+if not hasattr(RTCRtpSender, "_send_keyframe"):
+    raise RuntimeError(
+        "当前 aiortc 版本的 RTCRtpSender 没有 _send_keyframe 方法，无法转交观众的关键帧请求，"
+        "请安装 pyproject.toml 中锁定的 aiortc 版本（>=1.15,<1.16）"
+    )
 
 
 class PageWebRTCState:
@@ -64,11 +82,139 @@ class PageWebRTCState:
         self._stream_session_ref = None if value is None else weakref.ref(value)
 
 
+def parse_ice_candidate(candidate: str, sdpMid: str, sdpMLineIndex: int) -> RTCIceCandidate:
+    """解析 "candidate:..." 格式字符串为 RTCIceCandidate 对象"""
+    candidate = candidate.removeprefix("candidate:")
+
+    parts = candidate.split()
+    if len(parts) < 8:
+        raise ValueError(f"无效的 candidate 格式: {candidate}")
+
+    return RTCIceCandidate(
+        foundation=parts[0],
+        component=int(parts[1]),
+        protocol=parts[2],
+        priority=int(parts[3]),
+        ip=parts[4],
+        port=int(parts[5]),
+        type=parts[7] if len(parts) > 7 else "host",
+        sdpMid=sdpMid,
+        sdpMLineIndex=sdpMLineIndex,
+    )
+
+
+class WebRTCViewer:
+    """
+    单个观众的 WebRTC 连接
+
+    每个观众持有独立的 RTCPeerConnection（信令、ICE、RTP 分包与重传互不影响），
+    视频数据来自页面共享的 VideoBroadcast，不单独编码。
+    以弱引用持有所属的 WebRTCStreamSession，避免 session ↔ viewer 循环引用。
+    """
+
+    def __init__(self, viewer_key: str, session: 'WebRTCStreamSession'):
+        self.viewer_key = viewer_key
+        self._session_ref = weakref.ref(session)
+        self._closed = False
+
+        broadcast = session.broadcast
+        self.track: BroadcastTrack = broadcast.subscribe()
+        self.pc = RTCPeerConnection()
+        transceiver = self.pc.addTransceiver(self.track, direction="sendonly")
+        self.sender: RTCRtpSender = transceiver.sender
+        # 共享编码帧为 VP8，只协商 VP8（及其 RTX 重传）
+        transceiver.setCodecPreferences([
+            codec for codec in RTCRtpSender.getCapabilities("video").codecs
+            if codec.mimeType.lower() in ("video/vp8", "video/rtx")
+        ])
+        # 观众的 PLI / FIR 请求转交给共享编码器（aiortc 默认只作用于该 sender 自己的编码器）。
+        # _send_keyframe 是 RTCRtpSender 的私有方法，按 aiortc 1.15（pyproject.toml 锁定的版本范围）的实现覆盖：
+        # RTCP PLI / FIR 处理中调用 self._send_keyframe()。模块导入时已校验该钩子存在。
+        transceiver.sender._send_keyframe = broadcast.request_keyframe
+
+        self.pc.on("iceconnectionstatechange")(self._on_ice_state_change)
+        self.pc.on("connectionstatechange")(self._on_connection_state_change)
+
+    @property
+    def session(self) -> 'WebRTCStreamSession | None':
+        return self._session_ref()
+
+    def _touch(self):
+        session = self.session
+        if session is not None:
+            session._touch()
+
+    # ── 信令处理 ──
+
+    async def create_offer(self) -> RTCSessionDescription:
+        offer = await self.pc.createOffer()
+        await self.pc.setLocalDescription(offer)
+        return self.pc.localDescription
+
+    async def handle_answer(self, sdp: str, type: str):
+        await self.pc.setRemoteDescription(RTCSessionDescription(sdp=sdp, type=type))
+        logger.info(f"已设置 Remote Description: {self.viewer_key}")
+
+    async def add_ice_candidate(self, candidate: str, sdpMid: str, sdpMLineIndex: int):
+        ice_candidate = parse_ice_candidate(candidate, sdpMid, sdpMLineIndex)
+        await self.pc.addIceCandidate(ice_candidate)
+        logger.debug(
+            f"ICE Candidate 已添加: {ice_candidate.foundation} "
+            f"{ice_candidate.ip}:{ice_candidate.port} ({ice_candidate.type})"
+        )
+
+    async def fraction_lost(self) -> float:
+        """最近一次 RTCP 接收报告中的丢包率（0-1），尚未收到报告时为 0"""
+        report = await self.sender.getStats()
+        return max(
+            (stat.fractionLost / 256 for stat in report.values() if stat.type == "remote-inbound-rtp"),
+            default=0.0,
+        )
+
+    async def close(self):
+        """关闭观众连接并取消订阅（幂等）"""
+        if self._closed:
+            return
+        self._closed = True
+        self.track.stop()
+        await self.pc.close()
+
+    # ── 连接状态回调 ──
+
+    def _on_ice_state_change(self):
+        logger.info(f"ICE 状态变更: {self.pc.iceConnectionState} for {self.viewer_key}")
+        self._touch()
+
+    async def _on_connection_state_change(self):
+        state = self.pc.connectionState
+        logger.info(f"Connection 状态变更: {state} for {self.viewer_key}")
+        self._touch()
+        if state in ("failed", "closed"):
+            # 观众断开：只移除该观众，页面的捕获与编码继续服务其他观众
+            session = self.session
+            if session is not None:
+                await session.close_viewer(self.viewer_key)
+            else:
+                await self.close()
+
+    def stats(self) -> dict:
+        return {
+            "viewer_key": self.viewer_key,
+            "connection_state": self.pc.connectionState,
+            "sent": self.track.frames_sent,
+            "dropped": self.track.frames_dropped,
+            "queued": self.track.queued,
+        }
+
+
 class WebRTCStreamSession:
     """
     WebRTC 流会话
 
     封装单个浏览器页面的 WebRTC 视频流，管理从初始化到关闭的完整生命周期。
+    页面只启动一路 screencast 并编码一次，每次 create_offer() 新增一个观众（WebRTCViewer），
+    所有观众共享同一路编码帧。
+
     使用状态机确保正确的生命周期转换：
 
         INITIALIZING ──start()──▶ ACTIVE ──close()──▶ CLOSED
@@ -105,12 +251,15 @@ class WebRTCStreamSession:
         self.page_index = page_index
         self.config = config
 
-        self.pc = RTCPeerConnection()
         self.producer = VideoFrameProducer(page, config)
-        self.track: WebRTCMediaTrack | None = None
+        self.broadcast = VideoBroadcast(self.producer, config.bitrate, config.viewer_queue_size)
+        # 观众索引：viewer_key → viewer（插入顺序即加入顺序）
+        self.viewers: dict[str, WebRTCViewer] = {}
+        self._viewer_ids = itertools.count(1)
 
         self._state: WebRTCStreamState = WebRTCStreamState.INITIALIZING
-        self._last_activity: float = time.time()
+        self._created_at: float = time.time()
+        self._last_activity: float = self._created_at
 
         # 初始化或获取 Page 的 WebRTC 状态管理器
         if not hasattr(page, '_webrtc_state'):
@@ -120,10 +269,6 @@ class WebRTCStreamSession:
         # 将 session 引用以弱引用方式附加到 state（无循环引用）
         self.webrtc_state.stream_session = self
 
-        # 注册 ICE / Connection 状态变更回调
-        self.pc.on("iceconnectionstatechange")(self._on_ice_state_change)
-        self.pc.on("connectionstatechange")(self._on_connection_state_change)
-
         logger.info(
             f"WebRTCStreamSession 已创建: {stream_key} (page_index={page_index})"
         )
@@ -157,19 +302,19 @@ class WebRTCStreamSession:
     def _touch(self):
         """更新活动时间"""
         self._last_activity = time.time()
+        self.webrtc_state.update_activity()
 
     # ── 生命周期 ──
 
     async def start(self):
-        """启动 WebRTC 流：初始化帧捕获并创建视频轨道"""
+        """启动 WebRTC 流：初始化帧捕获并启动共享编码"""
         try:
             logger.info(f"启动 WebRTC 流: {self.stream_key}")
             await self.producer.start()
-            self.track = WebRTCMediaTrack(self.producer)
-            self.pc.addTrack(self.track)
+            self.broadcast.start()
+            screencast_governor.register(self)
             self.state = WebRTCStreamState.ACTIVE
             self._touch()
-            self.webrtc_state.update_activity()
             logger.info(f"WebRTC 流已启动: {self.stream_key}")
         except Exception as e:
             logger.error(f"启动 WebRTC 流失败 {self.stream_key}: {e}")
@@ -177,17 +322,19 @@ class WebRTCStreamSession:
             raise
 
     async def close(self):
-        """关闭 WebRTC 流并清理所有资源（幂等）"""
+        """关闭 WebRTC 流（含所有观众）并清理所有资源（幂等）"""
         if self._state == WebRTCStreamState.CLOSED:
             logger.debug(f"WebRTC 流已关闭，跳过: {self.stream_key}")
             return
 
-        logger.info(f"关闭 WebRTC 流: {self.stream_key}")
+        logger.info(f"关闭 WebRTC 流: {self.stream_key} (观众数={len(self.viewers)})")
         try:
-            if self.producer:
-                await self.producer.stop()
-            if self.pc:
-                await self.pc.close()
+            screencast_governor.unregister(self)
+            viewers = list(self.viewers.values())
+            self.viewers.clear()
+            await asyncio.gather(*(v.close() for v in viewers), return_exceptions=True)
+            await self.broadcast.stop()
+            await self.producer.stop()
             # 清除 webrtc_state 上的弱引用
             if self.webrtc_state:
                 self.webrtc_state.stream_session = None
@@ -197,14 +344,66 @@ class WebRTCStreamSession:
             logger.error(f"关闭 WebRTC 流时出错 {self.stream_key}: {e}")
             self.state = WebRTCStreamState.ERROR
 
+    # ── 观众管理 ──
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self.viewers)
+
+    def _get_viewer(self, viewer_key: str | None) -> WebRTCViewer:
+        """
+        按 viewer_key 查找观众；viewer_key 为 None 或页面 stream_key 时取最近加入的观众（兼容单观众调用）
+
+        Raises:
+            RuntimeError: 观众不存在
+        """
+        if viewer_key is None or viewer_key == self.stream_key:
+            if self.viewers:
+                return next(reversed(self.viewers.values()))
+        elif viewer_key in self.viewers:
+            return self.viewers[viewer_key]
+        raise RuntimeError(f"观众 {viewer_key} 不存在，请先调用 /webrtc/offer")
+
+    async def close_viewer(self, viewer_key: str):
+        """关闭单个观众，页面的捕获与编码继续服务其他观众"""
+        viewer = self.viewers.pop(viewer_key, None)
+        if viewer is None:
+            return
+        await viewer.close()
+        self._touch()
+        logger.info(f"观众已离开: {viewer_key} (剩余观众数={len(self.viewers)})")
+
+    # ── 截屏自适应调节（GovernedStream 接口） ──
+
+    @property
+    def screencast_adjustable(self) -> bool:
+        return self.producer.adjustable
+
+    async def collect_signals(self) -> StreamSignals:
+        losses = await asyncio.gather(
+            *(viewer.fraction_lost() for viewer in self.viewers.values()), return_exceptions=True
+        )
+        return StreamSignals(
+            viewers=len(self.viewers),
+            queue_depth=self.producer.queue_size,
+            queue_capacity=self.config.frame_queue_size,
+            frames_dropped=self.producer.frames_dropped,
+            busy_seconds=self.producer.decode_seconds + self.broadcast.encode_seconds,
+            fraction_lost=max((loss for loss in losses if isinstance(loss, float)), default=0.0),
+        )
+
+    async def apply_screencast_settings(self, settings: ScreencastSettings) -> bool:
+        return await self.producer.apply_settings(settings)
+
     # ── 信令处理 ──
 
     async def create_offer(self) -> dict:
         """
-        创建 SDP Offer
+        新增一个观众并创建 SDP Offer
 
         Returns:
-            {"sdp": str, "type": str, "stream_key": str}
+            {"sdp": str, "type": str, "stream_key": str}，stream_key 为观众 key
+            "{stream_key}#{viewer_id}"，后续 answer / ice / close 使用该 key
 
         Raises:
             RuntimeError: 流不在 ACTIVE 状态
@@ -212,30 +411,33 @@ class WebRTCStreamSession:
         if self._state != WebRTCStreamState.ACTIVE:
             raise RuntimeError(f"无法在 {self._state.value} 状态创建 Offer")
 
-        offer = await self.pc.createOffer()
-        await self.pc.setLocalDescription(offer)
+        viewer_key = f"{self.stream_key}{VIEWER_KEY_SEPARATOR}{next(self._viewer_ids)}"
+        viewer = WebRTCViewer(viewer_key, self)
+        self.viewers[viewer_key] = viewer
+        try:
+            description = await viewer.create_offer()
+        except Exception:
+            await self.close_viewer(viewer_key)
+            raise
         self._touch()
-        self.webrtc_state.update_activity()
+        logger.info(f"新观众加入: {viewer_key} (观众数={len(self.viewers)})")
 
         return {
-            "sdp": self.pc.localDescription.sdp,
-            "type": self.pc.localDescription.type,
-            "stream_key": self.stream_key,
+            "sdp": description.sdp,
+            "type": description.type,
+            "stream_key": viewer_key,
         }
 
-    async def handle_answer(self, sdp: str, type: str):
+    async def handle_answer(self, sdp: str, type: str, viewer_key: str | None = None):
         """处理客户端 SDP Answer"""
         if self._state != WebRTCStreamState.ACTIVE:
             raise RuntimeError(f"无法在 {self._state.value} 状态处理 Answer")
 
-        answer = RTCSessionDescription(sdp=sdp, type=type)
-        await self.pc.setRemoteDescription(answer)
+        await self._get_viewer(viewer_key).handle_answer(sdp, type)
         self._touch()
-        self.webrtc_state.update_activity()
-        logger.info(f"已设置 Remote Description: {self.stream_key}")
 
     async def add_ice_candidate(
-        self, candidate: str, sdpMid: str, sdpMLineIndex: int
+        self, candidate: str, sdpMid: str, sdpMLineIndex: int, viewer_key: str | None = None
     ):
         """
         添加 ICE Candidate
@@ -245,46 +447,8 @@ class WebRTCStreamSession:
         if self._state != WebRTCStreamState.ACTIVE:
             raise RuntimeError(f"无法在 {self._state.value} 状态添加 ICE Candidate")
 
-        # 解析 candidate 字符串
-        candidate = candidate.removeprefix("candidate:")
-
-        parts = candidate.split()
-        if len(parts) < 8:
-            raise ValueError(f"无效的 candidate 格式: {candidate}")
-
-        ice_candidate = RTCIceCandidate(
-            foundation=parts[0],
-            component=int(parts[1]),
-            protocol=parts[2],
-            priority=int(parts[3]),
-            ip=parts[4],
-            port=int(parts[5]),
-            type=parts[7] if len(parts) > 7 else "host",
-            sdpMid=sdpMid,
-            sdpMLineIndex=sdpMLineIndex,
-        )
-        await self.pc.addIceCandidate(ice_candidate)
+        await self._get_viewer(viewer_key).add_ice_candidate(candidate, sdpMid, sdpMLineIndex)
         self._touch()
-        self.webrtc_state.update_activity()
-        logger.debug(
-            f"ICE Candidate 已添加: {parts[0]} {parts[4]}:{parts[5]} ({parts[7] if len(parts) > 7 else 'host'})"
-        )
-
-    # ── 连接状态回调 ──
-
-    def _on_ice_state_change(self):
-        """ICE 连接状态变更回调"""
-        state = self.pc.iceConnectionState
-        logger.info(f"ICE 状态变更: {state} for {self.stream_key}")
-        self._touch()
-        self.webrtc_state.update_activity()
-
-    def _on_connection_state_change(self):
-        """PeerConnection 状态变更回调"""
-        state = self.pc.connectionState
-        logger.info(f"Connection 状态变更: {state} for {self.stream_key}")
-        self._touch()
-        self.webrtc_state.update_activity()
 
     # ── 信息查询 ──
 
@@ -295,6 +459,16 @@ class WebRTCStreamSession:
             stream_key=self.stream_key,
             page_index=self.page_index,
             state=self._state,
-            created_at=self._last_activity,
+            created_at=self._created_at,
             last_activity=self._last_activity,
+            viewer_count=len(self.viewers),
         )
+
+    def stats(self) -> dict:
+        """采集、编码与各观众的分发统计"""
+        return {
+            "producer": self.producer.stats(),
+            "broadcast": self.broadcast.stats(),
+            "screencast": self.producer.settings.to_cdp_params(),
+            "viewers": [viewer.stats() for viewer in self.viewers.values()],
+        }
@@ -3,16 +3,43 @@ VideoFrameProducer - 视频帧生产者
 
 负责从 Playwright screencast API 捕获页面帧，并将其转换为 av.VideoFrame 格式。
 所有 CPU 密集型操作（JPEG 解码、格式转换）均在线程池中执行，避免阻塞事件循环。
+
+帧率控制：到达间隔小于 1 / max_fps 的帧不入队；被跳过的最新一帧在下一个时间槽补发，
+保证页面静止后画面停留在最终状态。
+
+页面带有 CDP 会话（botright Page.cdp）时直接使用 CDP Page.startScreencast 捕获，
+画质、everyNthFrame 与最大分辨率可在运行中由 ScreencastGovernor 调整；
+否则退回 Playwright screencast API（参数固定）。
 """
 
 import asyncio
-import io
+import base64
+import time
+import weakref
+
 import av
 from PIL import Image
 from loguru import logger
 from playwright.async_api import Page
 
-from app.models.runtime.webrtc_models import WebRTCSessionConfig
+from app.models.runtime.webrtc_models import ScreencastSettings, WebRTCSessionConfig
+
+from app.utils.metrics.registry import metrics_registry
+
+from .jpeg_decoder import JpegFrameDecoder
+
+_FRAMES_RECEIVED = metrics_registry.counter(
+    "rpa_webrtc_frames_received_total", "screencast 捕获到的帧数",
+).labels()
+_FRAMES_DROPPED = metrics_registry.counter(
+    "rpa_webrtc_frames_dropped_total", "未送达编码的帧数（throttled: 超过 max_fps 被覆盖；queue_full: 队列满丢弃旧帧）",
+    ("reason",),
+)
+_DROPPED_THROTTLED = _FRAMES_DROPPED.labels("throttled")
+_DROPPED_QUEUE_FULL = _FRAMES_DROPPED.labels("queue_full")
+
+# 存活的生产者（弱引用，仅用于导出队列深度）
+_live_producers: "weakref.WeakSet[VideoFrameProducer]" = weakref.WeakSet()
 
 
 class VideoFrameProducer:
@@ -20,7 +47,7 @@ class VideoFrameProducer:
     视频帧生产者
     
     使用 Playwright 的 page.screencast.start() API 捕获页面帧，
-    并通过异步队列提供给消费者（WebRTCMediaTrack）。
+    并通过异步队列提供给消费者（VideoBroadcast）。
     
     每次启动都会创建全新的 screencast 会话，不依赖任何缓存机制。
     """
@@ -37,8 +64,24 @@ class VideoFrameProducer:
         self.config = config
         self.frame_queue: asyncio.Queue = asyncio.Queue(maxsize=config.frame_queue_size)
         self.screencast_session = None
+        self.settings = ScreencastSettings(quality=config.quality)
+        self._cdp = None  # 使用 CDP 捕获时的会话
         self._is_running = False
         self._last_frame: av.VideoFrame | None = None  # 最后一帧（用于超时返回）
+        self._decoder = JpegFrameDecoder()
+
+        # max_fps 限流：下一帧最早入队时间，以及被限流暂存的最新一帧
+        self._min_interval = 1.0 / config.max_fps
+        self._next_frame_at = 0.0
+        self._pending_jpeg: bytes | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+        # 统计
+        self.frames_received = 0
+        self.frames_throttled = 0  # 因 max_fps 被跳过
+        self.frames_dropped = 0  # 队列满时被丢弃的旧帧
+        self.decode_seconds = 0.0  # 累计解码耗时
+        _live_producers.add(self)
         
     async def start(self):
         """启动帧捕获"""
@@ -48,36 +91,13 @@ class VideoFrameProducer:
             
         try:
             logger.info(f"启动 VideoFrameProducer，质量: {self.config.quality}")
-            
-            # 尝试启动 screencast，如果失败则先停止再重新启动
-            try:
-                self.screencast_session = await self.page.screencast.start(
-                    on_frame=self._on_frame_callback,
-                    quality=self.config.quality
-                )
-                logger.info("Screencast 会话启动成功")
-            except Exception as e:
-                error_msg = str(e)
-                if "already started" in error_msg.lower():
-                    logger.warning(f"检测到 Screencast 已启动，执行恢复流程: {e}")
-                    # 先停止现有的异常会话
-                    try:
-                        await self.page.screencast.stop()
-                        logger.info("已停止异常的 Screencast 会话")
-                    except Exception as stop_error:
-                        logger.warning(f"停止异常会话时出错（继续重试）: {stop_error}")
-                    
-                    # 重新尝试启动
-                    logger.info("重新尝试启动 Screencast 会话...")
-                    self.screencast_session = await self.page.screencast.start(
-                        on_frame=self._on_frame_callback,
-                        quality=self.config.quality
-                    )
-                    logger.info("Screencast 会话重新启动成功")
-                else:
-                    # 其他错误直接抛出
-                    raise
-            
+
+            cdp = getattr(self.page, "cdp", None)
+            if cdp is not None:
+                await self._start_cdp_screencast(cdp)
+            else:
+                await self._start_playwright_screencast()
+
             self._is_running = True
             
             # 初始化最后一帧为绿屏（避免一开始返回 None）
@@ -89,13 +109,62 @@ class VideoFrameProducer:
         except Exception as e:
             logger.error(f"启动 VideoFrameProducer 失败: {e}")
             raise
-            
+
+    async def _start_cdp_screencast(self, cdp):
+        """通过页面的 CDP 会话启动 Page.startScreencast"""
+        # 先记录会话：启动响应返回前到达的帧也要确认，否则浏览器停止推帧
+        self._cdp = cdp
+        cdp.on("Page.screencastFrame", self._on_cdp_frame)
+        try:
+            await cdp.send("Page.startScreencast", self.settings.to_cdp_params())
+        except Exception:
+            cdp.remove_listener("Page.screencastFrame", self._on_cdp_frame)
+            self._cdp = None
+            raise
+        logger.info("CDP Screencast 启动成功")
+
+    async def _start_playwright_screencast(self):
+        """通过 Playwright screencast API 启动"""
+        # 尝试启动 screencast，如果失败则先停止再重新启动
+        try:
+            self.screencast_session = await self.page.screencast.start(
+                on_frame=self._on_frame_callback,
+                quality=self.config.quality
+            )
+            logger.info("Screencast 会话启动成功")
+        except Exception as e:
+            error_msg = str(e)
+            if "already started" in error_msg.lower():
+                logger.warning(f"检测到 Screencast 已启动，执行恢复流程: {e}")
+                # 先停止现有的异常会话
+                try:
+                    await self.page.screencast.stop()
+                    logger.info("已停止异常的 Screencast 会话")
+                except Exception as stop_error:
+                    logger.warning(f"停止异常会话时出错（继续重试）: {stop_error}")
+                
+                # 重新尝试启动
+                logger.info("重新尝试启动 Screencast 会话...")
+                self.screencast_session = await self.page.screencast.start(
+                    on_frame=self._on_frame_callback,
+                    quality=self.config.quality
+                )
+                logger.info("Screencast 会话重新启动成功")
+            else:
+                # 其他错误直接抛出
+                raise
+
     async def stop(self):
         """停止帧捕获并清理资源"""
         if not self._is_running:
             return
             
         try:
+            if self._cdp is not None:
+                cdp, self._cdp = self._cdp, None
+                cdp.remove_listener("Page.screencastFrame", self._on_cdp_frame)
+                await cdp.send("Page.stopScreencast")
+                logger.info("CDP Screencast 已停止")
             # 停止 screencast session
             if self.screencast_session:
                 await self.screencast_session.stop()
@@ -105,7 +174,33 @@ class VideoFrameProducer:
         finally:
             self._is_running = False
             self.screencast_session = None
+            self._cancel_pending()
             
+    async def apply_settings(self, settings: ScreencastSettings) -> bool:
+        """
+        运行中调整 screencast 参数（重新下发 Page.startScreencast）
+
+        Returns:
+            是否已生效；Playwright screencast 不支持调整，返回 False
+        """
+        if self._cdp is None or not self._is_running:
+            return False
+        await self._cdp.send("Page.startScreencast", settings.to_cdp_params())
+        self.settings = settings
+        return True
+
+    async def _on_cdp_frame(self, params: dict):
+        """CDP Page.screencastFrame 事件：入队后立即确认，浏览器收到确认才推送下一帧"""
+        cdp = self._cdp
+        try:
+            await self._on_frame_callback(base64.b64decode(params["data"]))
+        finally:
+            if cdp is not None:
+                try:
+                    await cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+                except Exception as e:
+                    logger.debug(f"Screencast 帧确认失败: {e}")
+
     async def _on_frame_callback(self, frame_data: dict):
         """
         Playwright screencast 回调函数
@@ -128,15 +223,54 @@ class VideoFrameProducer:
         else:
             # 兼容直接传入 bytes 的情况
             jpeg_data = frame_data
-            
+
+        self.frames_received += 1
+        _FRAMES_RECEIVED.inc()
+        loop = asyncio.get_running_loop()
+        wait = self._next_frame_at - loop.time()
+        if wait > 0:
+            # 超过 max_fps：暂存为待发帧（覆盖更早的待发帧），到时间槽再入队
+            if self._pending_jpeg is not None:
+                self.frames_throttled += 1
+                _DROPPED_THROTTLED.inc()
+            self._pending_jpeg = jpeg_data
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(wait, self._flush_pending)
+            return
+
+        if self._pending_jpeg is not None:
+            self.frames_throttled += 1
+            _DROPPED_THROTTLED.inc()
+            self._cancel_pending()
+        self._enqueue(jpeg_data)
+
+    def _enqueue(self, jpeg_data: bytes):
+        """入队一帧（丢旧保新）并推进下一时间槽"""
+        self._next_frame_at = asyncio.get_running_loop().time() + self._min_interval
+
         # 丢旧保新策略
         if self.frame_queue.full():
             try:
                 self.frame_queue.get_nowait()
+                self.frames_dropped += 1
+                _DROPPED_QUEUE_FULL.inc()
             except asyncio.QueueEmpty:
                 pass
-                
-        await self.frame_queue.put(jpeg_data)
+
+        self.frame_queue.put_nowait(jpeg_data)
+
+    def _flush_pending(self):
+        """时间槽到达：补发被限流暂存的最新一帧"""
+        self._flush_handle = None
+        jpeg_data, self._pending_jpeg = self._pending_jpeg, None
+        if jpeg_data is not None and self._is_running:
+            self._enqueue(jpeg_data)
+
+    def _cancel_pending(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_jpeg = None
         
     async def get_next_frame(self) -> av.VideoFrame | None:
         """
@@ -144,7 +278,7 @@ class VideoFrameProducer:
         
         从队列中获取 JPEG 数据并在线程池中解码为 av.VideoFrame。
         如果队列为空，会一直阻塞等待新帧（不会超时）。
-        这是唯一的外部访问接口，供 WebRTCMediaTrack 调用。
+        这是唯一的外部访问接口，供 VideoBroadcast 调用。
         
         Returns:
             av.VideoFrame: 解码后的视频帧（YUV420P 格式）
@@ -177,6 +311,7 @@ class VideoFrameProducer:
         将 JPEG 字节解码为 av.VideoFrame
         
         此方法应该在线程池中执行，因为它是 CPU 密集型的。
+        JPEG 由 MJPEG 解码器直接解码为 YUV 平面，不经过 RGB 图像。
         
         Args:
             jpeg_data: JPEG 编码的图像数据
@@ -184,22 +319,16 @@ class VideoFrameProducer:
         Returns:
             av.VideoFrame: YUV420P 格式的视频帧
         """
+        started = time.perf_counter()
         try:
-            # JPEG → PIL Image
-            image = Image.open(io.BytesIO(jpeg_data))
-            
-            # PIL Image → av.VideoFrame
-            frame = av.VideoFrame.from_image(image)
-            
-            # 转换为 WebRTC 标准格式 YUV420P
-            frame = frame.reformat(format="yuv420p")
-            
-            return frame
+            return self._decoder.decode(jpeg_data)
             
         except Exception as e:
             logger.error(f"JPEG 解码失败: {e}")
             # 返回绿屏帧作为错误恢复
             return self._create_green_frame()
+        finally:
+            self.decode_seconds += time.perf_counter() - started
     
     def _create_green_frame(self) -> av.VideoFrame | None:
         """
@@ -222,7 +351,29 @@ class VideoFrameProducer:
         """检查生产者是否正在运行"""
         return self._is_running
         
+    @property
+    def adjustable(self) -> bool:
+        """screencast 参数是否可在运行中调整（CDP 捕获）"""
+        return self._cdp is not None
+
     @property
     def queue_size(self) -> int:
         """获取当前队列中的帧数"""
         return self.frame_queue.qsize()
+
+    def stats(self) -> dict:
+        """帧统计：接收 / 限流跳过 / 队列丢弃 / 已解码"""
+        return {
+            "received": self.frames_received,
+            "throttled": self.frames_throttled,
+            "dropped": self.frames_dropped,
+            "decoded": self._decoder.decoded,
+            "queued": self.frame_queue.qsize(),
+            "decode_seconds": round(self.decode_seconds, 3),
+        }
+
+
+metrics_registry.gauge(
+    "rpa_webrtc_frame_queue_depth", "所有 WebRTC 生产者队列中待解码的帧数",
+    collect=lambda: sum(p.frame_queue.qsize() for p in list(_live_producers) if p.is_running),
+)
@@ -0,0 +1,240 @@
+"""
+ActionLogWriter — 操作日志异步批量写入
+
+save_action_log 原先在每个 action 结束时同步 await 一次
+"新建会话 → INSERT → commit → refresh"，500 步的工作流就是 500 次串行的数据库往返。
+
+现在执行路径只负责构造 ActionLogRecord 并入队，后台写入协程按批落库：
+    攒够 batch_size 条或距本批第一条超过 flush_interval 秒 → 一条 INSERT ... VALUES 多行写入
+
+队列满时（数据库跟不上）:
+    - 成功记录直接丢弃（采样），计入 dropped 与 rpa_action_log_dropped_total 指标
+    - 失败记录最多等待 put_timeout 秒（背压），仍然满则丢弃
+    失败日志是排查问题的依据，优先保留。
+
+生命周期由 FastAPI lifespan 管理（app/setup.py）：启动时 start()，关闭时 stop() 排空队列。
+未启动时（脚本 / 单元测试）submit 退化为直接写库，行为与原先一致。
+
+写入协程意外退出时由 done 回调记录错误并重启；连续重启超过 max_restarts 次后
+放弃后台写入，把队列中的记录直接落库，之后的 submit 退化为直接写库，不会悄悄堆满队列。
+
+写入顺序：单个写入协程 + FIFO 队列，同一执行批次的日志按执行顺序获得自增 id，
+list_by_execution 还原调用链路不受影响。
+"""
+import asyncio
+import time
+import traceback
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from loguru import logger
+
+from app.config import settings
+from app.models.database.log.models import ActionLogRecord
+from app.services.execution.crud_service import action_log_crud_svr
+from app.utils.metrics.registry import metrics_registry
+
+Sink = Callable[[Sequence[ActionLogRecord]], Awaitable[Any]]
+
+
+class ActionLogWriter:
+    """有界队列 + 单写入协程的操作日志批量写入器"""
+
+    def __init__(
+        self,
+        sink: Sink | None = None,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        put_timeout: float = 0.5,
+        max_restarts: int = 3,
+    ):
+        self._sink = sink or action_log_crud_svr.create_many
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_restarts = max_restarts
+        self._queue: asyncio.Queue[ActionLogRecord] | None = None
+        self._task: asyncio.Task | None = None
+        self._drain_task: asyncio.Task | None = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.crashes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._stopping = False
+        self.crashes = 0
+        self._spawn()
+
+    def _spawn(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="action-log-writer")
+        self._task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        """写入协程意外退出：重启，或多次失败后退化为直接写库"""
+        if task is not self._task or task.cancelled() or task.exception() is None:
+            return
+        self.crashes += 1
+        logger.opt(exception=task.exception()).error(
+            f"[ActionLog] 日志写入协程异常退出（第 {self.crashes} 次）"
+        )
+        if self.crashes <= self.max_restarts:
+            self._spawn()
+            return
+        logger.error("[ActionLog] 日志写入协程多次异常退出，改为直接写库")
+        queue, self._queue, self._task = self._queue, None, None
+        if queue is not None and not queue.empty():
+            self._drain_task = asyncio.create_task(self._drain(queue), name="action-log-drain")
+
+    async def stop(self) -> None:
+        """停止接收新记录，等待队列中的记录全部落库"""
+        self._stopping = True
+        try:
+            # 等待期间写入协程可能崩溃并被 done 回调重启，直到没有新的协程为止
+            while self._task is not None:
+                task = self._task
+                try:
+                    await task
+                except Exception:
+                    pass  # 已由 _on_task_done 记录
+                if self._task is task:
+                    break
+            if self._drain_task is not None:
+                await self._drain_task
+        finally:
+            self._task = None
+            self._drain_task = None
+            self._queue = None
+
+    async def submit(self, record: ActionLogRecord) -> bool:
+        """提交一条日志记录，返回是否被接收（False 表示因队列满被丢弃）"""
+        if not self.running:
+            await self._write([record])
+            return True
+
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if record.success:
+                return self._drop("success")
+            try:
+                await asyncio.wait_for(self._queue.put(record), self.put_timeout)
+            except TimeoutError:
+                return self._drop("timeout")
+        self.enqueued += 1
+        return True
+
+    def _drop(self, reason: str) -> bool:
+        self.dropped += 1
+        _DROPPED_TOTAL.labels(reason).inc()
+        # 按 2 的幂次打印，避免持续溢出时刷屏
+        if self.dropped & (self.dropped - 1) == 0:
+            logger.warning(f"[ActionLog] 日志队列已满，累计丢弃 {self.dropped} 条")
+        return False
+
+    async def flush(self) -> None:
+        """立即写入队列中已有的记录（不等待攒批）"""
+        if self._queue is not None:
+            await self._drain(self._queue)
+
+    async def _drain(self, queue: asyncio.Queue[ActionLogRecord]) -> None:
+        while not queue.empty():
+            batch = [queue.get_nowait() for _ in range(min(self.batch_size, queue.qsize()))]
+            await self._write(batch)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._collect(self._queue)
+            if batch:
+                await self._write(batch)
+
+    async def _collect(self, queue: asyncio.Queue[ActionLogRecord]) -> list[ActionLogRecord]:
+        """攒一批：最多等待 flush_interval 秒拿到第一条，之后在同一时间窗口内继续收集"""
+        try:
+            first = await asyncio.wait_for(queue.get(), self.flush_interval)
+        except TimeoutError:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: list[ActionLogRecord]) -> None:
+        """写入一批；整批失败时逐条重试，避免一条坏数据拖垮整批"""
+        try:
+            await self._sink(batch)
+            self.written += len(batch)
+            self.batches += 1
+            return
+        except Exception:
+            if len(batch) == 1:
+                self.failed += 1
+                logger.warning(f"[ActionLog] 写入操作日志失败: {traceback.format_exc()}")
+                return
+            logger.warning(f"[ActionLog] 批量写入 {len(batch)} 条失败，改为逐条写入: {traceback.format_exc()}")
+
+        for record in batch:
+            await self._write([record])
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "crashes": self.crashes,
+        }
+
+
+action_log_writer = ActionLogWriter(
+    max_queue=settings.action_log_queue_size,
+    batch_size=settings.action_log_batch_size,
+    flush_interval=settings.action_log_flush_interval,
+    put_timeout=settings.action_log_put_timeout,
+)
+
+metrics_registry.gauge(
+    "rpa_action_log_queue_depth", "待批量写入的操作日志条数", collect=lambda: action_log_writer.queue_depth,
+)
+_DROPPED_TOTAL = metrics_registry.counter(
+    "rpa_action_log_dropped_total", "队列满时丢弃的操作日志条数（success: 成功记录直接丢弃；timeout: 失败记录等待空位超时）",
+    ("reason",),
+)
+
+
+__all__ = ["ActionLogWriter", "action_log_writer"]
@@ -7,7 +7,8 @@
        - 父操作透传下来的采集配置（复合/循环/分支控制流的子步骤继承）
        - 自定义操作（ca_xxx）在 CompositeActionModel 上的 log_* 字段
        - 内置操作回落到服务端 settings.action_log_* 兜底
-    2. save_action_log：将一次 action 执行的上下文 + 结果落库到 ActionLogRecord
+    2. save_action_log：将一次 action 执行的上下文 + 结果构造为 ActionLogRecord，
+       交给 action_log_writer 后台批量落库（见 action_log_writer.py）
 
 设计原则：
     采集失败绝不影响业务执行 —— save_action_log 内部吞掉所有异常，仅打印告警日志。
@@ -18,6 +19,7 @@ import contextlib
 import time
 import traceback
 import uuid
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, Optional
@@ -31,7 +33,8 @@ from app.models.database.log.models import (
     ActionLogStatusEnum,
 )
 from app.models.execution.action_params import ActionLogOption
-from app.services.execution.crud_service import action_crud_svr, action_log_crud_svr
+from app.services.execution.action_log_writer import action_log_writer
+from app.services.execution.crud_service import action_crud_svr
 
 
 def new_execution_id() -> str:
@@ -135,7 +138,7 @@ class ActionLogContext:
     session_id: str = ""
     page: Any = None
     params: Dict | None = None
-    variables: Dict | None = None
+    variables: Mapping[str, Any] | None = None
     started_at: datetime = field(default_factory=datetime.now)
     # 复合操作内部子步骤继承的采集配置；为空时按 action_id 自行解析
     log_config: Optional[ActionLogOption] = None
@@ -210,7 +213,7 @@ async def _do_save(
         started_at=ctx.started_at,
         finished_at=datetime.now(),
     )
-    await action_log_crud_svr.create(record)
+    await action_log_writer.submit(record)
 
 
 async def _save_fallback(ctx: ActionLogContext, error_trace: str) -> None:
@@ -236,7 +239,7 @@ async def _save_fallback(ctx: ActionLogContext, error_trace: str) -> None:
         started_at=ctx.started_at,
         finished_at=datetime.now(),
     )
-    await action_log_crud_svr.create(record)
+    await action_log_writer.submit(record)
 
 
 # ═══════════════ 序列化工具 ═══════════════════════
@@ -275,7 +278,7 @@ def _to_jsonable(value: Any, depth: int = 0) -> Any:
             return _to_jsonable(value.model_dump(), depth + 1)
         except Exception:
             return str(value)
-    if isinstance(value, dict):
+    if isinstance(value, Mapping):
         return {str(k): _to_jsonable(v, depth + 1) for k, v in value.items()}
     if isinstance(value, (list, tuple, set)):
         return [_to_jsonable(v, depth + 1) for v in value]
@@ -18,6 +18,7 @@ from app.services.execution.actions.all_actions import (
     get_all_actions_metadata,
 )
 from app.services.execution.actions.base import BaseAction
+from app.services.execution.pipeline_cache import action_steps_cache, validated_steps_cache
 from app.utils.depends.session_manager import DatabaseSessionManager
 
 
@@ -62,15 +63,58 @@ class ActionRegistry:
         """
         获取自定义操作的步骤列表（已确保 action_type 字段存在）
 
+        按 (action_id, updated_at) 缓存：先只查询 updated_at，版本未变时直接返回缓存的步骤，
+        避免每次调用都反序列化整份 steps JSON 并重新规范化。
+
         Args:
             action_id: 操作标识
 
         Returns:
             步骤列表，不是自定义操作返回 None
         """
+        loaded = await self._load_custom_action_steps(action_id)
+        return list(loaded[1]) if loaded else None
+
+    async def get_validated_action_steps(self, action_id: str) -> tuple[list[Dict], list[Any]] | None:
+        """
+        获取自定义操作的步骤：(规范化的 dict 步骤, 已校验的 WorkflowStep 列表)
+
+        校验结果同样按 (action_id, updated_at) 缓存，复合操作（含嵌套的 ca_ 子步骤）每次执行
+        不再把整棵步骤树重新交给 workflow_step_adapter 校验；dict 步骤供引用权限校验使用。
+
+        Args:
+            action_id: 操作标识
+
+        Returns:
+            (dict 步骤, WorkflowStep 列表)，不是自定义操作返回 None
+        """
+        from app.models.execution.action_params import workflow_step_adapter
+
+        loaded = await self._load_custom_action_steps(action_id)
+        if loaded is None:
+            return None
+        version, steps = loaded
+        validated = validated_steps_cache.get_or_build(action_id, version, lambda: [
+            workflow_step_adapter.validate_python(s) if isinstance(s, dict) else s for s in steps
+        ])
+        return list(steps), list(validated)
+
+    @staticmethod
+    async def _load_custom_action_steps(action_id: str) -> tuple[Any, list] | None:
+        """查询自定义操作的版本与规范化步骤，返回 (updated_at, steps)，不存在返回 None"""
         from app.models.execution.action_params import _ensure_action_type
 
         async with DatabaseSessionManager.async_session() as session:
+            version = (await session.exec(
+                select(CompositeActionModel.updated_at).where(
+                    CompositeActionModel.action_id == action_id
+                )
+            )).first()
+            if version is None:
+                return None
+            if (cached := action_steps_cache.get(action_id, version)) is not None:
+                return version, cached
+
             result = await session.exec(
                 select(CompositeActionModel).where(
                     CompositeActionModel.action_id == action_id
@@ -80,7 +124,9 @@ class ActionRegistry:
             if custom:
                 steps = custom.steps  # List[WorkflowStep] from JSON, may be raw dicts
                 # 确保每个 step dict 都有 action_type 字段
-                return [_ensure_action_type(s) if isinstance(s, dict) else s for s in steps]
+                normalized = [_ensure_action_type(s) if isinstance(s, dict) else s for s in steps]
+                action_steps_cache.put(action_id, custom.updated_at, normalized)
+                return custom.updated_at, normalized
         return None
 
     def get_action_metadata(self, action_id: str) -> ActionMetadata | None:
@@ -1,5 +1,5 @@
 """
-控制流类 Action - Loop, IfElse, CompositeAction
+控制流类 Action - Loop, IfElse, Parallel, CompositeAction
 
 使用的常用算法模式：
 1. 策略模式：不同类型的步骤使用不同的执行策略
@@ -11,15 +11,18 @@
 from app.models.execution.action_params import CompositeParams, CompositeResult
 from app.models.execution.action_params import IfElseParams, IfElseResult
 from app.models.execution.action_params import LoopParams, LoopResult
+from app.models.execution.action_params import ParallelParams
 from app.models.execution.action_params import BaseWorkflowStep, WorkflowStep, workflow_step_adapter, _ensure_action_type
 from app.models.execution.condition_models import (
     ConditionRule,
-    evaluate_rule,
-    evaluate_condition,
     ConditionEvaluateError,
 )
-import ast
-import operator
+from app.services.execution.condition_compiler import (
+    compile_expression,
+    compile_rule,
+    safe_evaluate_condition,
+)
+import copy
 import time
 import re
 import uuid
@@ -33,6 +36,8 @@ from app.config import settings
 from app.models.database.workflow.models import BuiltinActionType
 from app.models.database.log.models import ActionLogSourceEnum
 from app.services.execution.action_logger import ActionLogContext, save_action_log, resolve_log_option
+from app.services.execution.pipeline import BranchRunner, run_parallel_branches
+from app.services.execution.scope import BranchVariables, isolate_variables
 from app.utils.depends.session_manager import DatabaseSessionManager
 
 
@@ -56,7 +61,7 @@ class ExecutionContext:
     def save_state(self) -> Dict:
         """保存当前状态"""
         return {
-            'variables': dict(self.variables),
+            'variables': self.variables.copy(),
             'execution_stack': list(self.execution_stack),
             'current_depth': self.current_depth
         }
@@ -80,6 +85,13 @@ class ExecutionContext:
         """检测循环引用"""
         return action_id in self.execution_stack
 
+    def fork(self) -> 'ExecutionContext':
+        """派生子上下文（并行分支）：变量深拷贝并记录赋值，执行栈独立，执行元信息沿用父上下文"""
+        child = copy.copy(self)
+        child.variables = BranchVariables(isolate_variables(self.variables))
+        child.execution_stack = list(self.execution_stack)
+        return child
+
 
 class StepExecutor:
     """步骤执行器 - 策略模式的上下文"""
@@ -113,6 +125,8 @@ class StepExecutor:
             return LoopStrategy(self)
         elif action_id == BuiltinActionType.IF_ELSE:
             return IfElseStrategy(self)
+        elif action_id == BuiltinActionType.PARALLEL:
+            return ParallelStrategy(self)
         else:
             return AtomicStrategy(self)
 
@@ -133,118 +147,19 @@ class ExecutionStrategy:
     def _evaluate_condition(self, condition: ConditionRule | str | None) -> bool:
         """安全评估条件表达式
 
-        - ConditionRule: 使用 evaluate_rule() 结构化评估（零 eval）
-        - str: 使用 AST 递归 safe_evaluate_condition()（无 eval，用于循环条件）
+        - ConditionRule: 使用 compile_rule() 预编译后结构化评估（零 eval）
+        - str: 使用预编译的 safe_evaluate_condition()（AST 白名单，无 eval，用于循环条件）
         """
         if condition is None:
             return False
         if isinstance(condition, ConditionRule):
             try:
-                return evaluate_rule(condition, self.context.variables)
+                return compile_rule(condition)(self.context.variables)
             except ConditionEvaluateError as e:
                 logger.warning(f"ConditionRule 评估失败: {e}")
                 return False
         return safe_evaluate_condition(condition, self.context.variables)
 
-    def _eval_node(self, node: ast.AST, variables: Dict | None = None) -> Any:
-        """委托给模块级 _eval_ast_node"""
-        if variables is None:
-            variables = self.context.variables
-        return _eval_ast_node(node, variables)
-
-
-# 模块级安全条件评估函数，供 ConditionIterator、LoopAction 等使用
-def safe_evaluate_condition(condition: str | None, variables: dict) -> bool:
-    """安全评估条件表达式（AST 白名单方式，不使用 eval）
-
-    variables 中的键可直接作为变量名引用，例如：
-      element_found == True
-      loop_index >= 5
-    """
-    if not condition:
-        return False
-    try:
-        tree = ast.parse(condition.strip(), mode='eval')
-        return _eval_ast_node(tree.body, variables)
-    except Exception as e:
-        logger.warning(f"条件评估失败: {e}")
-        return False
-
-
-def _eval_ast_node(node: ast.AST, variables: dict) -> Any:
-    """递归安全求值 AST 节点，仅允许白名单中的节点类型"""
-    match node:
-        case ast.Constant(value):
-            return value
-        case ast.Name(id):
-            if id in variables:
-                return variables[id]
-            raise NameError(f"变量 '{id}' 未定义")
-        case ast.Subscript():
-            obj = _eval_ast_node(node.value, variables)
-            key = _eval_ast_node(node.slice, variables)
-            if isinstance(obj, dict):
-                return obj.get(key)
-            raise TypeError("仅支持 dict 下标访问")
-        case ast.Tuple(elts):
-            return tuple(_eval_ast_node(e, variables) for e in elts)
-        case ast.List(elts):
-            return [_eval_ast_node(e, variables) for e in elts]
-        case ast.Compare(left, ops, comparators):
-            val = _eval_ast_node(left, variables)
-            for op, comp in zip(ops, comparators):
-                other = _eval_ast_node(comp, variables)
-                val = _apply_compare_op(val, op, other)
-            return val
-        case ast.BoolOp(op, values):
-            vals = [_eval_ast_node(v, variables) for v in values]
-            return all(vals) if isinstance(op, ast.And) else any(vals)
-        case ast.UnaryOp(op, operand):
-            val = _eval_ast_node(operand, variables)
-            if isinstance(op, ast.Not):
-                return not val
-            if isinstance(op, ast.USub):
-                return -val
-            if isinstance(op, ast.UAdd):
-                return +val
-            raise ValueError(f"不支持的一元运算符: {type(op).__name__}")
-        case ast.BinOp(left, op, right):
-            lv = _eval_ast_node(left, variables)
-            rv = _eval_ast_node(right, variables)
-            return _apply_binop(lv, op, rv)
-        case _:
-            raise ValueError(f"不支持的操作: {type(node).__name__}")
-
-
-# 模块级工具函数，不含 eval，安全求值
-_COMPARE_OPS = {
-    ast.Eq: operator.eq, ast.NotEq: operator.ne,
-    ast.Lt: operator.lt, ast.LtE: operator.le,
-    ast.Gt: operator.gt, ast.GtE: operator.ge,
-    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
-    ast.Is: operator.is_, ast.IsNot: operator.is_not,
-}
-
-_BIN_OPS = {
-    ast.Add: operator.add, ast.Sub: operator.sub,
-    ast.Mult: operator.mul, ast.Div: operator.truediv,
-    ast.Mod: operator.mod, ast.Pow: operator.pow,
-}
-
-
-def _apply_compare_op(val: Any, op: ast.cmpop, other: Any) -> Any:
-    op_type = type(op)
-    if op_type in _COMPARE_OPS:
-        return _COMPARE_OPS[op_type](val, other)
-    raise ValueError(f"不支持的比较运算符: {op_type.__name__}")
-
-
-def _apply_binop(left: Any, op: ast.operator, right: Any) -> Any:
-    op_type = type(op)
-    if op_type in _BIN_OPS:
-        return _BIN_OPS[op_type](left, right)
-    raise ValueError(f"不支持的二元运算符: {op_type.__name__}")
-
 
 class AtomicStrategy(ExecutionStrategy):
     """原子操作执行策略"""
@@ -281,21 +196,23 @@ class AtomicStrategy(ExecutionStrategy):
                     # 对于自定义复合操作，从 DB 加载 steps 到 params
                     from app.services.execution.actions.control_flow import CompositeAction as CompositeActionCls
                     if issubclass(action_class, CompositeActionCls):
-                        db_steps = await action_registry.get_custom_action_steps(action_id)
-                        if db_steps:
+                        # 按 (action_id, updated_at) 取已校验的步骤，嵌套执行时不再重复校验整棵步骤树
+                        loaded = await action_registry.get_validated_action_steps(action_id)
+                        if loaded:
+                            db_steps, validated_steps = loaded
                             if not isinstance(params, dict):
                                 if hasattr(params, 'model_dump'):
                                     params = params.model_dump()
                                 else:
                                     params = {}
-                            if not params.get("steps"):
-                                params["steps"] = db_steps
                             # 校验 steps 中引用的所有 ca_ 操作是否可访问，防止越权执行
                             from app.services.execution.crud_service import action_crud_svr
                             await action_crud_svr.validate_steps_referenced_actions(
-                                params["steps"] if isinstance(params, dict) else params.steps,
+                                params.get("steps") or db_steps,
                                 self.mid,
                             )
+                            if not params.get("steps"):
+                                params["steps"] = validated_steps
 
             if not action_class:
                 raise ValueError(f"未找到操作: {action_id}")
@@ -469,8 +386,7 @@ class LoopStrategy(ExecutionStrategy):
 
         # 合并映射参数（映射参数优先级高于原始参数）
         merged = {**raw_params, **mapped}
-        step.params = merged
-        return step
+        return step.model_copy(update={"params": merged})
 
     async def execute(self, step: WorkflowStep, step_index: int = 0) -> ActionResult:
         """执行循环操作"""
@@ -609,9 +525,7 @@ class LoopStrategy(ExecutionStrategy):
         if loop_source == "expression" and loop_items_expr:
             # 安全评估表达式获取 items
             try:
-                import ast as _ast
-                tree = _ast.parse(loop_items_expr.strip(), mode='eval')
-                items = _eval_ast_node(tree.body, self.context.variables)
+                items = compile_expression(loop_items_expr)(self.context.variables)
                 if isinstance(items, list):
                     return ListIterator(items)
                 logger.warning(f"loop_items_expr 解析结果不是列表: {type(items)}")
@@ -738,6 +652,79 @@ class IfElseStrategy(ExecutionStrategy):
         return results
 
 
+class ParallelStrategy(ExecutionStrategy):
+    """并行步骤执行策略（fork-join），语义与 Pipeline 的 ParallelStep 一致
+
+    fork-join 逻辑与合并规则由 run_parallel_branches 实现：每个分支在父上下文变量的深拷贝上独立执行，
+    全部结束后按分支声明顺序把成功分支赋值过的变量合并回父上下文。
+    """
+
+    async def execute(self, step: WorkflowStep, step_index: int = 0) -> ActionResult:
+        """并发执行各分支"""
+        params = step.params or {}
+        if not isinstance(params, ParallelParams):
+            try:
+                params = ParallelParams.model_validate(params)
+            except Exception as e:
+                return ActionResult(
+                    success=False,
+                    error=f"并行步骤参数验证失败: {str(e)}",
+                    action_id=BuiltinActionType.PARALLEL,
+                    action_name="parallel",
+                )
+
+        # 递归深度检查
+        if self.context.current_depth >= settings.workflow_max_nesting_depth:
+            return ActionResult(
+                success=False,
+                error=f"嵌套深度超过限制 ({self.context.current_depth}/{settings.workflow_max_nesting_depth})",
+                action_id=BuiltinActionType.PARALLEL,
+            )
+
+        children = [self.context.fork() for _ in params.branches]
+        for child in children:
+            child.current_depth += 1
+        page_indexes = params.page_indexes or []
+
+        def branch(index: int) -> BranchRunner:
+            page_index = page_indexes[index] if index < len(page_indexes) else None
+            return lambda: self._execute_branch(children[index], params.branches[index], page_index)
+
+        return await run_parallel_branches(
+            [branch(index) for index in range(len(params.branches))],
+            written=lambda index: children[index].variables.assigned(),
+            merge=self.context.variables.update,
+            fail_fast=params.on_branch_error == "fail_fast",
+            max_concurrency=params.max_concurrency,
+            action_id=BuiltinActionType.PARALLEL,
+        )
+
+    async def _execute_branch(
+        self, context: ExecutionContext, branch: List[WorkflowStep], page_index: int | None,
+    ) -> List[ActionResult]:
+        """在独立上下文中顺序执行一个分支，page_index 不为空时绑定到同一浏览器上下文中的其它页面"""
+        page = self.page
+        if page_index is not None:
+            pages = page.context.pages
+            if not 0 <= page_index < len(pages):
+                return [ActionResult(
+                    success=False,
+                    error=f"页面索引 {page_index} 超出范围 (0-{len(pages) - 1})",
+                    action_id=BuiltinActionType.PARALLEL,
+                    action_name="parallel",
+                )]
+            page = pages[page_index]
+
+        executor = StepExecutor(context, page, self.mid)
+        results = []
+        for i, step in enumerate(branch):
+            result = await executor.execute(step, i)
+            results.append(result)
+            if not result.success and step.retry == 0:
+                break
+        return results
+
+
 # ============ 迭代器实现 ============
 
 class LoopIterator(Iterator):
@@ -913,11 +900,9 @@ class LoopAction(BaseAction[LoopParams]):
         # 获取 break/continue 条件（支持 dict 或 ConditionRule）
         break_cond_raw = getattr(self.params, 'break_condition', None)
         continue_cond_raw = getattr(self.params, 'continue_condition', None)
-        # dict 反序列化为 ConditionRule（JSON 从前端传来时是 dict）
-        if isinstance(break_cond_raw, dict):
-            break_cond_raw = ConditionRule.model_validate(break_cond_raw)
-        if isinstance(continue_cond_raw, dict):
-            continue_cond_raw = ConditionRule.model_validate(continue_cond_raw)
+        # 循环开始前编译一次（JSON 从前端传来时是 dict，仅在未命中缓存时做 pydantic 校验）
+        break_check = compile_rule(break_cond_raw) if break_cond_raw else None
+        continue_check = compile_rule(continue_cond_raw) if continue_cond_raw else None
 
         # 向后兼容旧参数
         loop_count = getattr(self.params, 'loop_count', None)
@@ -933,10 +918,10 @@ class LoopAction(BaseAction[LoopParams]):
                 context.variables[loop_index_var] = i
                 context.variables[loop_item_var] = item_value
                 # 每次迭代开始前评估 break 条件
-                if break_cond_raw and evaluate_rule(break_cond_raw, context.variables):
+                if break_check and break_check(context.variables):
                     break
                 # 每次迭代开始前评估 continue 条件
-                if continue_cond_raw and evaluate_rule(continue_cond_raw, context.variables):
+                if continue_check and continue_check(context.variables):
                     continue
                 mapped = self._resolve_param_mapping_static(param_mapping, item_value, context.variables, loop_item_var, loop_index_var)
                 mapped_children = self._inject_params_to_children(children, mapped)
@@ -952,10 +937,10 @@ class LoopAction(BaseAction[LoopParams]):
                 context.variables[loop_index_var] = i
                 context.variables[loop_item_var] = item_value
                 # 每次迭代开始前评估 break 条件
-                if break_cond_raw and evaluate_rule(break_cond_raw, context.variables):
+                if break_check and break_check(context.variables):
                     break
                 # 每次迭代开始前评估 continue 条件
-                if continue_cond_raw and evaluate_rule(continue_cond_raw, context.variables):
+                if continue_check and continue_check(context.variables):
                     continue
                 mapped = self._resolve_param_mapping_static(param_mapping, item_value, context.variables, loop_item_var, loop_index_var)
                 mapped_children = self._inject_params_to_children(children, mapped)
@@ -971,10 +956,10 @@ class LoopAction(BaseAction[LoopParams]):
                 context.variables[loop_index_var] = i
                 context.variables[loop_item_var] = item_value
                 # 每次迭代开始前评估 break 条件
-                if break_cond_raw and evaluate_rule(break_cond_raw, context.variables):
+                if break_check and break_check(context.variables):
                     break
                 # 每次迭代开始前评估 continue 条件
-                if continue_cond_raw and evaluate_rule(continue_cond_raw, context.variables):
+                if continue_check and continue_check(context.variables):
                     continue
                 mapped = self._resolve_param_mapping_static(param_mapping, item_value, context.variables, loop_item_var, loop_index_var)
                 mapped_children = self._inject_params_to_children(children, mapped)
@@ -989,10 +974,10 @@ class LoopAction(BaseAction[LoopParams]):
                 context.variables[loop_index_var] = i
                 context.variables[loop_item_var] = None
                 # 每次迭代开始前评估 break 条件
-                if break_cond_raw and evaluate_rule(break_cond_raw, context.variables):
+                if break_check and break_check(context.variables):
                     break
                 # 每次迭代开始前评估 continue 条件
-                if continue_cond_raw and evaluate_rule(continue_cond_raw, context.variables):
+                if continue_check and continue_check(context.variables):
                     continue
                 mapped = self._resolve_param_mapping_static(param_mapping, None, context.variables, loop_item_var, loop_index_var)
                 mapped_children = self._inject_params_to_children(children, mapped)
@@ -1010,10 +995,10 @@ class LoopAction(BaseAction[LoopParams]):
                 context.variables[loop_index_var] = i
                 context.variables[loop_item_var] = None
                 # 每次迭代开始前评估 break 条件
-                if break_cond_raw and evaluate_rule(break_cond_raw, context.variables):
+                if break_check and break_check(context.variables):
                     break
                 # 每次迭代开始前评估 continue 条件
-                if continue_cond_raw and evaluate_rule(continue_cond_raw, context.variables):
+                if continue_check and continue_check(context.variables):
                     continue
                 mapped = self._resolve_param_mapping_static(param_mapping, None, context.variables, loop_item_var, loop_index_var)
                 mapped_children = self._inject_params_to_children(children, mapped)
@@ -1128,7 +1113,7 @@ class LoopAction(BaseAction[LoopParams]):
     def _inject_params_to_children(
         children: list[WorkflowStep], mapped: dict[str, Any],
     ) -> list[WorkflowStep]:
-        """将映射参数注入到子步骤中"""
+        """将映射参数注入到子步骤中（浅拷贝子步骤，缓存中的步骤在多次执行间共享，不能原地修改）"""
         if not mapped or not children:
             return children
         new_children = []
@@ -1139,8 +1124,7 @@ class LoopAction(BaseAction[LoopParams]):
             elif not isinstance(raw, dict):
                 raw = {}
             merged = {**raw, **mapped}
-            child.params = merged
-            new_children.append(child)
+            new_children.append(child.model_copy(update={"params": merged}))
         return new_children
 
     def _resolve_items_from_variable(self, context: ExecutionContext, var_ref: str) -> list:
@@ -1154,9 +1138,7 @@ class LoopAction(BaseAction[LoopParams]):
     def _resolve_items_from_expr(self, context: ExecutionContext, expr: str) -> list:
         """从表达式安全解析 items 列表"""
         try:
-            import ast as _ast
-            tree = _ast.parse(expr.strip(), mode='eval')
-            items = _eval_ast_node(tree.body, context.variables)
+            items = compile_expression(expr)(context.variables)
             if isinstance(items, list):
                 return items
             logger.warning(f"loop_items_expr 解析结果不是列表: {type(items)}")
@@ -1321,7 +1303,7 @@ class IfElseAction(BaseAction[IfElseParams]):
     def _evaluate_condition(self, condition: ConditionRule) -> bool:
         """评估条件规则（纯 Python 逻辑，不使用 eval）"""
         try:
-            return evaluate_rule(condition, self.variables)
+            return compile_rule(condition)(self.variables)
         except ConditionEvaluateError as e:
             logger.warning(f"IfElseAction 条件评估失败: {e}")
             return False
@@ -1416,7 +1398,7 @@ class CompositeAction(BaseAction[CompositeParams]):
                 action_name=self.action_name,
             )
 
-        # 统一转换为 WorkflowStep 对象
+        # 统一转换为 WorkflowStep 对象（引擎注入的是按版本缓存的已校验步骤，只有调用方直接传入的 dict 步骤需要在此校验）
         steps: List[WorkflowStep] = []
         for s in raw_steps:
             if isinstance(s, BaseWorkflowStep):
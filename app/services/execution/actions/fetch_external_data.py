@@ -38,6 +38,7 @@ from app.models.execution.rpc_method_params import (
 )
 from app.models.database.workflow.models import BuiltinActionType
 from app.services.mq.rpc_client import rpc_client
+from app.utils.http.httpx_client import get_http_client
 
 
 class FetchExternalDataAction(BaseAction[FetchExternalDataParams]):
@@ -234,17 +235,15 @@ class FetchExternalDataAction(BaseAction[FetchExternalDataParams]):
     ) -> ActionResult[FetchExternalDataResult]:
         """发送普通 HTTP/HTTPS 请求获取外部数据
 
-        使用 httpx.AsyncClient 发送请求，根据 body_type 自动构造请求体。
+        使用按 (代理, 超时) 复用的连接池客户端发送请求（见 HttpClientManager），
+        循环中反复请求同一接口时不再每次重新握手；根据 body_type 自动构造请求体。
         """
         # 构造请求参数
         request_kwargs: dict[str, Any] = {
             "params": params or None,
             "headers": headers or None,
-            "timeout": timeout_sec,
             "follow_redirects": follow_redirects,
         }
-        if proxy:
-            request_kwargs["proxy"] = proxy
 
         # 根据 body_type 构造请求体
         if body_type == HttpBodyTypeEnum.JSON:
@@ -264,8 +263,8 @@ class FetchExternalDataAction(BaseAction[FetchExternalDataParams]):
             f"proxy={proxy or '-'}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(method, url, **request_kwargs)
+            client = await get_http_client(proxy=proxy, timeout=timeout_sec)
+            response = await client.request(method, url, **request_kwargs)
         except httpx.RequestError as e:
             logger.warning(f"[FetchExternalDataAction] HTTP 请求失败: {method} {url} - {e}")
             return ActionResult(
@@ -14,12 +14,16 @@ from app.services.execution.actions.base import BaseAction, ActionResult
 from app.models.execution.action_params import NavigateParams, NewPageParams, NavigateResult, NewPageResult
 from app.models.core.browser.security import SecurityCheckResult
 from app.config import settings
+from app.utils.http.dns_resolver import CachingResolver, dns_resolver
 from app.models.database.workflow.models import BuiltinActionType
 
 
 class URLSecurityChecker:
     """URL 安全检查工具类"""
 
+    # DNS 解析器（测试可替换为假解析器）
+    resolver: CachingResolver = dns_resolver
+
     @staticmethod
     def _check_protocol(scheme: str) -> SecurityCheckResult:
         """检查协议是否允许"""
@@ -75,51 +79,31 @@ class URLSecurityChecker:
 
         return SecurityCheckResult(allowed=True)
 
-    @staticmethod
-    async def _check_dns_resolution(hostname: str, max_retries: int = 2) -> SecurityCheckResult:
-        """DNS 解析并检查地址安全性"""
-        for attempt in range(max_retries):
-            try:
-                addr_info_v4 = socket.getaddrinfo(
-                    hostname, None, socket.AF_INET, socket.SOCK_STREAM)
-                addr_info_v6 = socket.getaddrinfo(
-                    hostname, None, socket.AF_INET6, socket.SOCK_STREAM)
-                all_addr_info = addr_info_v4 + addr_info_v6
-
-                if not all_addr_info:
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(0.5)
-                        continue
-                    return SecurityCheckResult(
-                        allowed=True,
-                        reason=f"DNS 解析未返回地址，但允许浏览器尝试验证: {hostname}",
-                    )
-
-                for info in all_addr_info:
-                    ip_str = info[4][0]
-                    result = URLSecurityChecker._check_ip_address(
-                        ip_str, hostname)
-                    if not result.allowed:
-                        return result
-
-                return SecurityCheckResult(allowed=True)
+    @classmethod
+    async def _check_dns_resolution(cls, hostname: str) -> SecurityCheckResult:
+        """DNS 解析并检查地址安全性（异步解析，结果缓存，不阻塞事件循环）"""
+        try:
+            addresses = await cls.resolver.resolve(hostname)
+        except socket.gaierror:
+            return SecurityCheckResult(
+                allowed=True,
+                reason=f"DNS 解析失败: {hostname}。允许浏览器尝试验证",
+            )
+        except TimeoutError:
+            return SecurityCheckResult(
+                allowed=True,
+                reason=f"DNS 解析超时: {hostname}。允许浏览器尝试验证",
+            )
+        except Exception as e:
+            return SecurityCheckResult(
+                allowed=True,
+                reason=f"DNS 检查异常: {str(e)}。允许浏览器尝试验证",
+            )
 
-            except socket.gaierror:
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(0.5)
-                    continue
-                return SecurityCheckResult(
-                    allowed=True,
-                    reason=f"DNS 解析失败（已重试{max_retries}次）: {hostname}。允许浏览器尝试验证",
-                )
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(0.5)
-                    continue
-                return SecurityCheckResult(
-                    allowed=True,
-                    reason=f"DNS 检查异常（已重试{max_retries}次）: {str(e)}。允许浏览器尝试验证",
-                )
+        for ip_str in addresses:
+            result = cls._check_ip_address(ip_str, hostname)
+            if not result.allowed:
+                return result
 
         return SecurityCheckResult(allowed=True)
 
@@ -8,6 +8,7 @@ import time
 from loguru import logger
 
 from app.services.execution.actions.base import BaseAction, ActionResult
+from app.services.execution.artifact_store import artifact_store, image_size
 from app.models.execution.action_params import ScreenshotParams, ScreenshotResult
 from app.models.database.workflow.models import BuiltinActionType
 
@@ -82,12 +83,25 @@ class ScreenshotAction(BaseAction[ScreenshotParams]):
                 logger.info(f"[ScreenshotAction] 页面截图参数: {screenshot_params}")
                 image_bytes = await self.page.screenshot(**screenshot_params)
 
-            image_base64 = base64.b64encode(image_bytes).decode()
+            # 图片写入产物存储，结果 / 变量 / 日志中只保留引用
+            width, height = image_size(image_bytes)
+            data = {"format": img_type, "size": len(image_bytes), "base64": "",
+                    "artifact_id": "", "sha256": "", "width": width, "height": height}
+            try:
+                artifact = await artifact_store.put(
+                    self.mid, image_bytes, content_type=f"image/{img_type}", width=width, height=height)
+                data["artifact_id"] = artifact.artifact_id
+                data["sha256"] = artifact.sha256
+            except OSError as e:
+                # 存储不可用时退回内联返回，保证截图结果不丢失
+                logger.warning(f"[ScreenshotAction] 产物存储写入失败，改为内联返回: {e}")
+                data["base64"] = base64.b64encode(image_bytes).decode()
+            if validated_params.return_base64 and not data["base64"]:
+                data["base64"] = base64.b64encode(image_bytes).decode()
 
             return ActionResult(
                 success=True,
-                data={"format": img_type, "size": len(
-                    image_bytes), "base64": image_base64},
+                data=data,
                 execution_time=time.time() - start_time,
                 action_id=self.metadata.id, action_name=self.metadata.name,
             )
@@ -0,0 +1,372 @@
+"""
+ArtifactStore — 截图等二进制产物的内容寻址存储
+
+截图原先以 base64 内联在 ActionResult.data 中，随后依次流经 _merge_output_vars、Scope、
+操作日志和 HTTP 响应：每一处都多出约 1.3 倍原图的体积，且每步被复制多次。
+现在字节直接写入磁盘，结果中只携带引用（artifact_id / sha256 / size / 宽高），
+需要原图时再通过下载接口（支持 Range）流式读取。
+
+目录结构:
+    <root>/blobs/<sha256[:2]>/<sha256>   内容文件，相同内容只存一份
+    <root>/meta/<artifact_id>.json      引用记录：所属用户、sha256、大小、类型、宽高、创建时间
+    <root>/tmp/                         写入中的临时文件，写完后原子 rename 到 blobs
+
+保留策略（cleanup，由后台任务定期执行）:
+    1. 删除创建时间超过 retention_days 的引用记录
+    2. 剩余引用指向的内容总量超过 max_total_bytes 时，从最旧的引用开始删除
+    3. 删除不再被任何引用指向、且超过宽限期未被写入的内容文件
+       （写入 / 去重命中时会刷新内容文件的 mtime，避免与并发写入竞争）
+
+所有文件系统操作都在线程池中执行，不阻塞事件循环。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from loguru import logger
+
+from app.config import settings
+from app.models.common.exceptions.base_exception import ArtifactNotFoundException
+
+_ARTIFACT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# 孤立内容文件 / 临时文件的删除宽限期（秒）
+_ORPHAN_GRACE = 300.0
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """产物引用记录（执行结果、变量、日志中只保存它）"""
+    artifact_id: str
+    mid: int | str
+    sha256: str
+    size: int
+    content_type: str
+    width: int | None = None
+    height: int | None = None
+    created_at: float = 0.0
+
+
+def image_size(data: bytes) -> tuple[int | None, int | None]:
+    """从 PNG / JPEG 文件头解析图片宽高，无法识别时返回 (None, None)"""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker == 0xFF:
+                # 填充字节
+                i += 1
+                continue
+            if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+                # 无长度字段的独立标记
+                i += 2
+                continue
+            # SOF0 ~ SOF15（排除 DHT / JPG / DAC）携带图片尺寸
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height = int.from_bytes(data[i + 5:i + 7], "big")
+                width = int.from_bytes(data[i + 7:i + 9], "big")
+                return width, height
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+
+    return None, None
+
+
+class ArtifactStore:
+    """内容寻址的产物文件存储"""
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        retention_days: float = 7,
+        max_total_bytes: int = 0,
+        chunk_size: int = 256 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.root = root
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self.chunk_size = max(1, chunk_size)
+        self._clock = clock
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+        self.expired = 0
+        self.evicted = 0
+        self.blobs_removed = 0
+        self.last_cleanup: float | None = None
+
+    # ── 路径 ──
+
+    @property
+    def _blob_dir(self) -> str:
+        return os.path.join(self.root, "blobs")
+
+    @property
+    def _meta_dir(self) -> str:
+        return os.path.join(self.root, "meta")
+
+    @property
+    def _tmp_dir(self) -> str:
+        return os.path.join(self.root, "tmp")
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self._blob_dir, sha256[:2], sha256)
+
+    def _meta_path(self, artifact_id: str) -> str:
+        return os.path.join(self._meta_dir, f"{artifact_id}.json")
+
+    # ── 写入 ──
+
+    def _open_tmp(self):
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self._tmp_dir)
+        return os.fdopen(fd, "wb"), path
+
+    def _commit_blob(self, tmp_path: str, sha256: str) -> bool:
+        """把临时文件移入内容目录，内容已存在时丢弃临时文件并刷新 mtime。返回是否为新内容"""
+        dest = self._blob_path(sha256)
+        if os.path.exists(dest):
+            os.unlink(tmp_path)
+            os.utime(dest)
+            return False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(tmp_path, dest)
+        return True
+
+    def _write_meta(self, artifact: Artifact) -> None:
+        os.makedirs(self._meta_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._meta_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(artifact), f)
+        os.replace(tmp_path, self._meta_path(artifact.artifact_id))
+
+    def _put_bytes(self, data: bytes) -> tuple[str, bool]:
+        f, tmp_path = self._open_tmp()
+        try:
+            with f:
+                f.write(data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            return sha256, self._commit_blob(tmp_path, sha256)
+        except BaseException:
+            _unlink_quietly(tmp_path)
+            raise
+
+    async def _put_stream(self, chunks: AsyncIterable[bytes]) -> tuple[str, int, bool]:
+        f, tmp_path = await asyncio.to_thread(self._open_tmp)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with f:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            sha256 = digest.hexdigest()
+            return sha256, size, await asyncio.to_thread(self._commit_blob, tmp_path, sha256)
+        except BaseException:
+            await asyncio.to_thread(_unlink_quietly, tmp_path)
+            raise
+
+    async def put(
+        self,
+        mid: int | str,
+        data: bytes | AsyncIterable[bytes],
+        *,
+        content_type: str = "application/octet-stream",
+        width: int | None = None,
+        height: int | None = None,
+    ) -> Artifact:
+        """写入一个产物并返回其引用
+
+        Args:
+            mid: 所属用户，下载时校验
+            data: 完整字节或异步字节流（边读边写入临时文件并计算哈希）
+            content_type: 下载时返回的 Content-Type
+            width / height: 图片尺寸（可选）
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+            size = len(data)
+            sha256, fresh = await asyncio.to_thread(self._put_bytes, data)
+        else:
+            sha256, size, fresh = await self._put_stream(data)
+
+        artifact = Artifact(
+            artifact_id=uuid.uuid4().hex,
+            mid=mid,
+            sha256=sha256,
+            size=size,
+            content_type=content_type,
+            width=width,
+            height=height,
+            created_at=self._clock(),
+        )
+        await asyncio.to_thread(self._write_meta, artifact)
+        self.stored += 1
+        if fresh:
+            self.bytes_written += size
+        else:
+            self.deduplicated += 1
+        return artifact
+
+    # ── 读取 ──
+
+    def _load(self, artifact_id: str) -> Artifact | None:
+        try:
+            with open(self._meta_path(artifact_id)) as f:
+                artifact = Artifact(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not os.path.exists(self._blob_path(artifact.sha256)):
+            return None
+        return artifact
+
+    async def get(self, artifact_id: str, mid: int | str) -> Artifact:
+        """读取引用记录；不存在、已过期或不属于该用户时抛出 ArtifactNotFoundException"""
+        if not _ARTIFACT_ID_RE.match(artifact_id or ""):
+            raise ArtifactNotFoundException(artifact_id)
+        artifact = await asyncio.to_thread(self._load, artifact_id)
+        if artifact is None or str(artifact.mid) != str(mid):
+            raise ArtifactNotFoundException(artifact_id)
+        return artifact
+
+    async def iter_bytes(self, artifact: Artifact, start: int = 0, end: int | None = None) -> AsyncIterator[bytes]:
+        """按块流式读取 [start, end] 闭区间（与 HTTP Range 语义一致），end 缺省为末尾"""
+        end = artifact.size - 1 if end is None else min(end, artifact.size - 1)
+        f = await asyncio.to_thread(open, self._blob_path(artifact.sha256), "rb")
+        try:
+            if start:
+                await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def read_bytes(self, artifact: Artifact) -> bytes:
+        """读取完整内容（小文件 / 兼容旧的内联返回）"""
+        return b"".join([chunk async for chunk in self.iter_bytes(artifact)])
+
+    # ── 保留策略 ──
+
+    def _cleanup_sync(self) -> dict[str, int]:
+        now = self._clock()
+        records: list[tuple[float, str, str, int]] = []
+        if os.path.isdir(self._meta_dir):
+            for name in os.listdir(self._meta_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self._meta_dir, name)
+                try:
+                    with open(path) as f:
+                        meta = json.load(f)
+                    records.append((meta["created_at"], path, meta["sha256"], meta["size"]))
+                except (OSError, ValueError, KeyError):
+                    logger.warning(f"无法解析产物记录，已删除: {path}")
+                    _unlink_quietly(path)
+
+        expired = evicted = 0
+        if self.retention_days > 0:
+            cutoff = now - self.retention_days * 86400
+            for record in [r for r in records if r[0] < cutoff]:
+                _unlink_quietly(record[1])
+                expired += 1
+            records = [r for r in records if r[0] >= cutoff]
+
+        # 从最新的引用开始保留，内容去重后总量超出上限的更旧引用全部删除
+        records.sort(key=lambda r: r[0], reverse=True)
+        referenced: set[str] = set()
+        total = 0
+        for created_at, path, sha256, size in records:
+            if sha256 not in referenced:
+                if self.max_total_bytes > 0 and total + size > self.max_total_bytes:
+                    _unlink_quietly(path)
+                    evicted += 1
+                    continue
+                referenced.add(sha256)
+                total += size
+
+        blobs_removed = 0
+        grace_cutoff = now - _ORPHAN_GRACE
+        for directory in (self._blob_dir, self._tmp_dir):
+            if not os.path.isdir(directory):
+                continue
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    if directory == self._blob_dir and name in referenced:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        if os.path.getmtime(path) < grace_cutoff:
+                            os.unlink(path)
+                            blobs_removed += 1
+                    except OSError:
+                        pass
+
+        return {"expired": expired, "evicted": evicted, "blobs_removed": blobs_removed, "total_bytes": total}
+
+    async def cleanup(self) -> dict[str, int]:
+        """按保留天数与容量上限清理产物，返回本次清理统计"""
+        result = await asyncio.to_thread(self._cleanup_sync)
+        self.expired += result["expired"]
+        self.evicted += result["evicted"]
+        self.blobs_removed += result["blobs_removed"]
+        self.last_cleanup = self._clock()
+        if result["expired"] or result["evicted"] or result["blobs_removed"]:
+            logger.info(f"产物清理完成: {result}")
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "bytes_written": self.bytes_written,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "blobs_removed": self.blobs_removed,
+            "last_cleanup": self.last_cleanup,
+        }
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+artifact_store = ArtifactStore(
+    settings.artifact_store_dir,
+    retention_days=settings.artifact_retention_days,
+    max_total_bytes=settings.artifact_max_total_mb * 1024 * 1024,
+    chunk_size=settings.artifact_download_chunk_size,
+)
+
+
+__all__ = [
+    "Artifact",
+    "ArtifactStore",
+    "artifact_store",
+    "image_size",
+]
@@ -0,0 +1,322 @@
+"""
+ConditionCompiler — 条件表达式 / 条件规则预编译
+
+safe_evaluate_condition 每次调用都要 ast.parse 一遍表达式，再逐层 match 整棵 AST；
+evaluate_rule 每次都递归遍历 ConditionRule，dict 形式的规则还要先过一遍 pydantic 校验。
+循环的 while / until / break / continue 条件每轮迭代都在重复这套工作。
+
+编译（一次）:
+    compile_expression(source) → Evaluator        以表达式原文为键缓存
+    compile_rule(rule)         → RulePredicate    以规则的规范化 JSON 为键缓存
+        - 每个 AST 节点 / 规则节点编译为一个闭包，子节点闭包在编译期绑定
+        - 运算符在编译期查表，求值时不再 match 节点类型
+
+求值（每次执行）:
+    evaluator(variables) → 与逐节点解释执行 ast.parse(source.strip()).body 的结果相同
+    predicate(variables) → 与 evaluate_rule(rule, variables, strict=strict) 相同
+
+白名单语义保持不变：不支持的节点 / 运算符编译为"求值到该位置时抛出同样异常"的闭包，
+语法错误同样缓存为抛出原异常的闭包，因此子表达式的求值顺序与报错行为都与解释执行一致。
+"""
+from __future__ import annotations
+
+import ast
+import json
+import operator
+from collections.abc import Callable
+from typing import Any
+
+from loguru import logger
+
+from app.config import settings
+from app.models.execution.condition_models import (
+    ConditionEvaluateError,
+    ConditionRule,
+    ConditionValueType,
+    LogicOperator,
+    ParamsCondition,
+)
+from app.services.execution.pipeline_cache import VersionedLRUCache
+
+# 求值函数：variables → 表达式的值
+Evaluator = Callable[[dict], Any]
+# 规则谓词：variables → 是否满足
+RulePredicate = Callable[[dict], bool]
+
+# 白名单运算符（不含 eval，安全求值）
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_, ast.IsNot: operator.is_not,
+}
+
+_BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+
+_UNARY_OPS = {
+    ast.Not: operator.not_, ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+
+# 编译结果与版本无关，缓存统一使用同一个版本号
+_VERSION = 0
+
+# 已编译表达式（表达式原文 → Evaluator）
+expression_cache: VersionedLRUCache[Evaluator] = VersionedLRUCache(settings.condition_cache_size)
+# 已编译条件规则（(来源, strict, 规范化 JSON) → RulePredicate）
+rule_cache: VersionedLRUCache[RulePredicate] = VersionedLRUCache(settings.condition_cache_size)
+# ConditionRule 对象的快速路径（(id, strict) → (rule, RulePredicate)），免去每次序列化计算键；
+# 条目持有 rule 引用，存活期间 id 不会被复用，命中时仍以 is 校验
+_rule_identity_cache: VersionedLRUCache[tuple[ConditionRule, RulePredicate]] = VersionedLRUCache(
+    settings.condition_cache_size
+)
+
+
+def _raiser(exc: Exception) -> Callable[..., Any]:
+    """编译期已确定会失败的节点：求值到此处时抛出异常（每次清空 traceback，避免反复抛出时累积）"""
+    def fail(variables: dict) -> Any:
+        raise exc.with_traceback(None)
+
+    return fail
+
+
+def _compile_operator(table: dict, op: ast.AST, kind: str) -> Callable[..., Any]:
+    """查白名单运算符，不支持时返回"操作数求值完毕后抛错"的函数，与解释执行的报错时机一致"""
+    func = table.get(type(op))
+    if func is not None:
+        return func
+    exc = ValueError(f"不支持的{kind}: {type(op).__name__}")
+
+    def unsupported(*_operands: Any) -> Any:
+        raise exc.with_traceback(None)
+
+    return unsupported
+
+
+def _compile_node(node: ast.AST) -> Evaluator:
+    """递归编译 AST 节点，仅允许白名单中的节点类型"""
+    match node:
+        case ast.Constant(value):
+            return lambda variables: value
+        case ast.Name(id):
+            def name(variables: dict) -> Any:
+                if id in variables:
+                    return variables[id]
+                raise NameError(f"变量 '{id}' 未定义")
+
+            return name
+        case ast.Subscript():
+            get_obj = _compile_node(node.value)
+            get_key = _compile_node(node.slice)
+
+            def subscript(variables: dict) -> Any:
+                obj = get_obj(variables)
+                key = get_key(variables)
+                if isinstance(obj, dict):
+                    return obj.get(key)
+                raise TypeError("仅支持 dict 下标访问")
+
+            return subscript
+        case ast.Tuple(elts):
+            items = tuple(_compile_node(e) for e in elts)
+            return lambda variables: tuple(f(variables) for f in items)
+        case ast.List(elts):
+            items = tuple(_compile_node(e) for e in elts)
+            return lambda variables: [f(variables) for f in items]
+        case ast.Compare(left, ops, comparators):
+            first = _compile_node(left)
+            chain = tuple(
+                (_compile_operator(_COMPARE_OPS, op, "比较运算符"), _compile_node(comp))
+                for op, comp in zip(ops, comparators)
+            )
+            if len(chain) == 1:
+                (op, right), = chain
+                return lambda variables: op(first(variables), right(variables))
+
+            # 与解释执行一致：逐个把上一步结果与下一个操作数比较（而非 Python 的链式比较）
+            def compare(variables: dict) -> Any:
+                val = first(variables)
+                for op, right in chain:
+                    val = op(val, right(variables))
+                return val
+
+            return compare
+        case ast.BoolOp(op, values):
+            operands = tuple(_compile_node(v) for v in values)
+            # 与解释执行一致：所有操作数都会求值（不短路），结果为 bool
+            if isinstance(op, ast.And):
+                return lambda variables: all([f(variables) for f in operands])
+            return lambda variables: any([f(variables) for f in operands])
+        case ast.UnaryOp(op, operand):
+            func = _compile_operator(_UNARY_OPS, op, "一元运算符")
+            get_operand = _compile_node(operand)
+            return lambda variables: func(get_operand(variables))
+        case ast.BinOp(left, op, right):
+            func = _compile_operator(_BIN_OPS, op, "二元运算符")
+            get_left = _compile_node(left)
+            get_right = _compile_node(right)
+            return lambda variables: func(get_left(variables), get_right(variables))
+        case _:
+            return _raiser(ValueError(f"不支持的操作: {type(node).__name__}"))
+
+
+def compile_expression(source: str) -> Evaluator:
+    """编译条件表达式（命中缓存直接返回）。
+
+    语法错误等编译失败同样会被缓存为抛出原异常的 Evaluator，调用方按求值失败处理即可。
+    """
+    evaluator = expression_cache.get(source, _VERSION)
+    if evaluator is None:
+        try:
+            evaluator = _compile_node(ast.parse(source.strip(), mode='eval').body)
+        except Exception as e:
+            evaluator = _raiser(e)
+        expression_cache.put(source, _VERSION, evaluator)
+    return evaluator
+
+
+def safe_evaluate_condition(condition: str | None, variables: dict) -> bool:
+    """安全评估条件表达式（AST 白名单方式，不使用 eval）
+
+    variables 中的键可直接作为变量名引用，例如：
+      element_found == True
+      loop_index >= 5
+    """
+    if not condition:
+        return False
+    try:
+        return compile_expression(condition)(variables)
+    except Exception as e:
+        logger.warning(f"条件评估失败: {e}")
+        return False
+
+
+def _compile_condition(condition: ParamsCondition) -> RulePredicate:
+    """编译原子条件，校验失败时抛出 ConditionEvaluateError（与 evaluate_condition 一致）"""
+    field = condition.field
+    cvt = condition.condition_value_type
+    expected = condition.condition_value
+
+    def missing(variables: dict) -> ConditionEvaluateError:
+        return ConditionEvaluateError(
+            f"变量 '{field}' 不在当前上下文中（可用变量: {list(variables.keys())}"
+        )
+
+    if cvt == ConditionValueType.BOOLEAN:
+        def check_bool(variables: dict) -> bool:
+            if field not in variables:
+                raise missing(variables)
+            actual = variables[field]
+            if not isinstance(actual, bool):
+                raise ConditionEvaluateError(
+                    f"BOOLEAN 条件要求变量 '{field}' 类型为 bool，实际: {type(actual).__name__}"
+                )
+            return actual is expected
+
+        return check_bool
+
+    if cvt == ConditionValueType.NULL:
+        def check_null(variables: dict) -> bool:
+            if field not in variables:
+                raise missing(variables)
+            return variables[field] is None
+
+        return check_null
+
+    if cvt == ConditionValueType.STRING:
+        def check_str(variables: dict) -> bool:
+            if field not in variables:
+                raise missing(variables)
+            actual = variables[field]
+            if not isinstance(actual, str):
+                raise ConditionEvaluateError(
+                    f"STRING 条件要求变量 '{field}' 类型为 str，实际: {type(actual).__name__}"
+                )
+            return actual == expected
+
+        return check_str
+
+    return _raiser(ConditionEvaluateError(f"不支持的条件值类型: {cvt}"))
+
+
+def _compile_rule_node(rule: ConditionRule, strict: bool) -> RulePredicate:
+    """递归编译 ConditionRule"""
+    if rule.condition is not None:
+        check = _compile_condition(rule.condition)
+        if strict:
+            return check
+
+        def lenient(variables: dict) -> bool:
+            try:
+                return check(variables)
+            except ConditionEvaluateError:
+                return False
+
+        return lenient
+
+    if rule.rules is not None:
+        children = tuple(_compile_rule_node(r, strict) for r in rule.rules)
+        if rule.logic == LogicOperator.NOT:
+            child = children[0]
+            return lambda variables: not child(variables)
+        # 非严格模式下子规则不会抛错，可以短路；严格模式需求值全部子规则以保留报错行为
+        if rule.logic == LogicOperator.AND:
+            if strict:
+                return lambda variables: all([c(variables) for c in children])
+            return lambda variables: all(c(variables) for c in children)
+        if rule.logic == LogicOperator.OR:
+            if strict:
+                return lambda variables: any([c(variables) for c in children])
+            return lambda variables: any(c(variables) for c in children)
+
+    return _raiser(ConditionEvaluateError("条件规则为空，无法评估"))
+
+
+def compile_rule(rule: ConditionRule | dict, *, strict: bool = False) -> RulePredicate:
+    """编译条件规则（命中缓存直接返回）。
+
+    rule 为 dict 时（前端 JSON 直接传入）只在未命中时做一次 pydantic 校验，
+    校验失败抛出 ValidationError 且不写入缓存。
+
+    Args:
+        rule: 条件规则或其 dict 形式
+        strict: 与 evaluate_rule 的 strict 相同
+
+    Returns:
+        variables → bool 的谓词；strict=True 时变量不存在或类型不匹配抛出 ConditionEvaluateError
+    """
+    if isinstance(rule, dict):
+        key = ("dict", strict, json.dumps(rule, sort_keys=True, ensure_ascii=False, default=str))
+    else:
+        entry = _rule_identity_cache.get((id(rule), strict), _VERSION)
+        if entry is not None and entry[0] is rule:
+            return entry[1]
+        key = ("rule", strict, rule.model_dump_json())
+    predicate = rule_cache.get(key, _VERSION)
+    if predicate is None:
+        model = ConditionRule.model_validate(rule) if isinstance(rule, dict) else rule
+        predicate = rule_cache.put(key, _VERSION, _compile_rule_node(model, strict))
+    if not isinstance(rule, dict):
+        _rule_identity_cache.put((id(rule), strict), _VERSION, (rule, predicate))
+    return predicate
+
+
+def stats() -> dict[str, Any]:
+    """表达式 / 规则编译缓存的命中统计"""
+    return {"expressions": expression_cache.stats(), "rules": rule_cache.stats()}
+
+
+__all__ = [
+    "Evaluator",
+    "RulePredicate",
+    "compile_expression",
+    "compile_rule",
+    "safe_evaluate_condition",
+    "expression_cache",
+    "rule_cache",
+    "stats",
+]
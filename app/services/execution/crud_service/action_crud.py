@@ -10,6 +10,7 @@ from sqlmodel import select, update, delete
 from app.models.database.workflow.models import CompositeActionModel, BuiltinActionType, TagModel, CompositeActionTagLink
 from app.models.execution.action_params import BaseWorkflowStep
 from app.models.common.exceptions.base_exception import NameAlreadyExistsException
+from app.services.execution.pipeline_cache import invalidate_action
 from app.utils.depends.session_manager import DatabaseSessionManager
 
 
@@ -32,6 +33,9 @@ class ActionCrudService:
                     branch = params.get(key)
                     if isinstance(branch, list):
                         ids.extend(ActionCrudService._collect_ca_action_ids(branch))
+                for branch in params.get("branches") or []:
+                    if isinstance(branch, list):
+                        ids.extend(ActionCrudService._collect_ca_action_ids(branch))
         return ids
 
     @staticmethod
@@ -490,6 +494,7 @@ class ActionCrudService:
             model.updated_at = datetime.now()
             await session.commit()
             await session.refresh(model)
+            invalidate_action(model.action_id)
             return model
 
     @staticmethod
@@ -512,8 +517,10 @@ class ActionCrudService:
                 .where(CompositeActionTagLink.composite_action_id == model.id)
             )
 
+            action_id = model.action_id
             await session.delete(model)
             await session.commit()
+            invalidate_action(action_id)
             return True
 
     @staticmethod
@@ -9,9 +9,10 @@
  不再有独立的采集配置表。）
 """
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert as sa_insert
 from sqlmodel import func, select
 
 from app.config import settings
@@ -34,6 +35,17 @@ class ActionLogCrudService:
             await session.refresh(record)
             return record
 
+    @staticmethod
+    async def create_many(records: Sequence[ActionLogRecord]) -> int:
+        """批量写入（单条 INSERT ... VALUES 多行，一次提交），保持传入顺序"""
+        if not records:
+            return 0
+        rows = [record.model_dump(exclude={"id"}) for record in records]
+        async with DatabaseSessionManager.async_session() as session:
+            await session.exec(sa_insert(ActionLogRecord), params=rows)
+            await session.commit()
+        return len(rows)
+
     @staticmethod
     def _build_filters(
         mid: int | str,
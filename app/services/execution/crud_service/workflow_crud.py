@@ -11,6 +11,23 @@ from app.models.database.workflow.models import UserWorkflow, WorkflowPluginRela
 from app.models.execution.action_params import PluginConfig
 from app.models.common.exceptions.base_exception import NameAlreadyExistsException
 from app.utils.depends.session_manager import DatabaseSessionManager
+from app.services.execution.workflow_scheduler import TRIGGER_TYPES, workflow_trigger_scheduler
+
+
+def _copied_trigger(original: UserWorkflow, keep_browser: bool) -> Dict[str, Any]:
+    """复制 / Fork 时的触发配置与启用状态
+
+    定时工作流的副本默认不启用，避免与原工作流重复执行；Fork 给其他用户时去掉 browser_id，
+    由新用户选择自己的浏览器后再启用。
+    """
+    config = dict(original.trigger_config or {})
+    if not keep_browser:
+        config.pop("browser_id", None)
+    return {
+        "trigger_type": original.trigger_type,
+        "trigger_config": config,
+        "is_enabled": original.trigger_type not in TRIGGER_TYPES,
+    }
 
 
 class WorkflowCrudService:
@@ -61,6 +78,7 @@ class WorkflowCrudService:
 
             await session.commit()
             await session.refresh(model)
+            await workflow_trigger_scheduler.sync(model)
             return model
 
     @staticmethod
@@ -218,6 +236,7 @@ class WorkflowCrudService:
             model.updated_at = datetime.now()
             await session.commit()
             await session.refresh(model)
+            await workflow_trigger_scheduler.sync(model)
             return model
 
     @staticmethod
@@ -241,8 +260,10 @@ class WorkflowCrudService:
             for link in links.all():
                 await session.delete(link)
 
+            workflow_id = model.workflow_id
             await session.delete(model)
             await session.commit()
+            workflow_trigger_scheduler.unregister(workflow_id)
             return True
 
     @staticmethod
@@ -252,6 +273,8 @@ class WorkflowCrudService:
                 update(UserWorkflow).where(UserWorkflow.id == id).values(is_enabled=True, updated_at=datetime.now())
             )
             await session.commit()
+            if model := await session.get(UserWorkflow, id):
+                await workflow_trigger_scheduler.sync(model)
             return True
 
     @staticmethod
@@ -261,6 +284,8 @@ class WorkflowCrudService:
                 update(UserWorkflow).where(UserWorkflow.id == id).values(is_enabled=False, updated_at=datetime.now())
             )
             await session.commit()
+            if model := await session.get(UserWorkflow, id):
+                await workflow_trigger_scheduler.sync(model)
             return True
 
     @staticmethod
@@ -279,14 +304,14 @@ class WorkflowCrudService:
                 mid=original.mid,
                 original_mid=original.original_mid,
                 custom_action_id=original.custom_action_id,
-                trigger_type=original.trigger_type,
-                trigger_config=original.trigger_config,
                 is_public=False,
+                **_copied_trigger(original, keep_browser=True),
             )
 
             session.add(new_model)
             await session.commit()
             await session.refresh(new_model)
+            await workflow_trigger_scheduler.sync(new_model)
             return new_model
 
     @staticmethod
@@ -319,10 +344,9 @@ class WorkflowCrudService:
                 mid=target_mid,
                 original_mid=original.original_mid,
                 custom_action_id=original.custom_action_id,
-                trigger_type=original.trigger_type,
-                trigger_config=original.trigger_config,
                 is_public=False,
                 forked_from_id=original.id,
+                **_copied_trigger(original, keep_browser=False),
             )
 
             session.add(new_model)
@@ -334,6 +358,7 @@ class WorkflowCrudService:
 
             await session.commit()
             await session.refresh(new_model)
+            await workflow_trigger_scheduler.sync(new_model)
             return new_model
 
     @staticmethod
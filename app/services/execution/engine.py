@@ -6,11 +6,11 @@ Execution Engine — 操作执行引擎
     数据结构:
         Scope       — 变量作用域栈（链式查找，push/pop 隔离）
         Pipeline    — 步骤序列 IR（编译自 WorkflowStep 列表）
-        StepNode    — sealed union: AtomicStep | LoopStep | IfElseStep
+        StepNode    — sealed union: AtomicStep | LoopStep | IfElseStep | ParallelStep
 
     算法:
         Pipeline.execute(scope):    left-fold → 依次执行 StepNode
-        Scope.resolve_params():     DFS 遍历参数树 → 替换 {{var}}
+        CompiledTemplate.render():  构建时预编译参数模板 → 执行时只替换含 {{var}} 的路径
         Scope.query(key):           栈顶 → 栈底链式查找
 
     数据流:
@@ -24,6 +24,7 @@ Execution Engine — 操作执行引擎
 """
 
 from app.services.execution.pipeline import PipelineBuilder, Pipeline, ActionExecutor
+from app.services.execution.pipeline_cache import pipeline_cache
 from app.services.execution.actions.base import BaseAction, ActionResult
 from app.services.execution.scope import Scope
 from botright.playwright_mock.page import Page
@@ -41,7 +42,7 @@ from app.services.execution.action_logger import (
     resolve_log_option,
     save_action_log,
 )
-from app.models.database.workflow.models import WorkflowStep
+from app.models.database.workflow.models import CompositeActionModel, WorkflowStep
 from app.services.execution.crud_service import action_crud_svr, plugin_crud_svr, workflow_crud_svr
 from app.models.execution.action_params import (
     ActionMetadata,
@@ -49,6 +50,8 @@ from app.models.execution.action_params import (
     BaseWorkflowStep,
     BuiltinActionType,
     ActionLogOption,
+    _ensure_action_type,
+    workflow_step_adapter,
 )
 from app.models.execution.condition_models import ConditionRule
 from app.services.execution.actions.control_flow import CompositeAction as CompositeActionClass
@@ -58,6 +61,16 @@ from app.models.execution.request_params import (
     ActionExecutionRequest,
     params_to_dict,
 )
+from app.utils.metrics.registry import metrics_registry
+
+# 操作耗时按操作类型统计：内置操作取其 action_id，自定义操作（ca_xxx）统一归为 custom，避免标签基数失控
+_ACTION_TYPE_LABELS = {t.value: t.value for t in BuiltinActionType}
+_ACTION_SECONDS = metrics_registry.histogram(
+    "rpa_action_duration_seconds", "单个操作的执行耗时（含插件钩子与日志采集）", ("action_type", "status"),
+)
+_PLUGIN_HOOK_SECONDS = metrics_registry.histogram(
+    "rpa_plugin_hook_duration_seconds", "一次插件钩子（同一 hook 的全部插件）的执行耗时", ("hook",),
+)
 
 
 class ExecutionEngine:
@@ -112,7 +125,7 @@ class ExecutionEngine:
         self,
         req: ExecutionRequest,
         *,
-        steps: List[WorkflowStep],
+        steps: List[WorkflowStep] | Pipeline,
         session_id: str,
         browser_id: str,
         page: Page,
@@ -124,7 +137,7 @@ class ExecutionEngine:
         路由 /workflows/execute 调此方法。
 
         算法：
-            1. 编译步骤列表 → Pipeline IR
+            1. 编译步骤列表 → Pipeline IR（已编译的 Pipeline 直接使用，见 compile_action_pipeline）
             2. scope = Scope(req.variables)  （所有步骤共享同一引用）
             3. pipeline.execute(scope, executor)  （left-fold）
 
@@ -136,14 +149,23 @@ class ExecutionEngine:
         exec_id = getattr(req, 'execution_id', '') or new_execution_id()
         workflow_id = getattr(req, 'workflow_id', None)
 
-        pipeline = PipelineBuilder.build(steps)
+        pipeline = steps if isinstance(steps, Pipeline) else PipelineBuilder.build(steps)
 
         async def executor(
             action_id: str,
             params: dict,
             scope: Scope,
             output_vars: list[str],
+            page_index: int | None = None,
         ) -> ActionResult:
+            if page_index is None:
+                target_page = page
+            else:
+                # ParallelStep 分支绑定到同一浏览器上下文中的其它页面
+                pages = page.context.pages
+                if not 0 <= page_index < len(pages):
+                    return self._fail(f"页面索引 {page_index} 超出范围 (0-{len(pages) - 1})", action_id, time.time())
+                target_page = pages[page_index]
             return await self._run_action(
                 action_id=action_id,
                 params=params,
@@ -151,7 +173,7 @@ class ExecutionEngine:
                 output_vars=output_vars,
                 session_id=session_id,
                 browser_id=browser_id,
-                page=page,
+                page=target_page,
                 plugins=plugins or [],
                 mid=req.variables.get("mid", req.mid),
                 auth_headers=req_auth_headers,
@@ -159,10 +181,26 @@ class ExecutionEngine:
                 depth=depth,
                 workflow_id=workflow_id,
                 log_source=ActionLogSourceEnum.WORKFLOW,
+                params_resolved=True,
             )
 
         return await pipeline.execute(scope, executor)
 
+    @staticmethod
+    def compile_action_pipeline(action_model: CompositeActionModel) -> Pipeline:
+        """编译已保存的自定义操作步骤，按 (action_id, updated_at) 缓存。
+
+        命中时跳过步骤规范化与 PipelineBuilder.build，每次执行只剩变量绑定。
+        """
+        def build() -> Pipeline:
+            steps = [
+                workflow_step_adapter.validate_python(_ensure_action_type(s)) if isinstance(s, dict) else s
+                for s in action_model.steps
+            ]
+            return PipelineBuilder.build(steps)
+
+        return pipeline_cache.get_or_build(action_model.action_id, action_model.updated_at, build)
+
     # ═══════════════ 核心执行 ─────────────────────────────────
 
     async def _run_action(
@@ -183,12 +221,16 @@ class ExecutionEngine:
         depth: int = 0,
         workflow_id: str | None = None,
         log_source: ActionLogSourceEnum = ActionLogSourceEnum.ACTION,
+        params_resolved: bool = False,
     ) -> ActionResult:
         """执行单个 action 并按用户配置采集操作日志。
 
         这是所有浏览器操作执行的唯一入口（单操作 / 工作流步骤 / 插件钩子都会经过），
         因此在此处统一埋点，保证日志采集不遗漏。
+
+        params_resolved=True 表示 params 已由 Pipeline 的预编译模板替换过，不再重复替换。
         """
+        started = time.perf_counter()
         exec_id = execution_id or new_execution_id()
         log_ctx = ActionLogContext(
             mid=mid,
@@ -221,6 +263,7 @@ class ExecutionEngine:
             depth=depth,
             workflow_id=workflow_id,
             log_ctx=log_ctx,
+            params_resolved=params_resolved,
         )
 
         log_ctx.action_name = str(result.action_name or action_id)
@@ -232,6 +275,9 @@ class ExecutionEngine:
             else None
         )
         await save_action_log(log_ctx, result, status=status)
+        _ACTION_SECONDS.labels(
+            _ACTION_TYPE_LABELS.get(action_id, "custom"), "success" if result.success else "failure",
+        ).observe(time.perf_counter() - started)
         return result
 
     async def _run_action_core(
@@ -251,6 +297,7 @@ class ExecutionEngine:
         depth: int = 0,
         workflow_id: str | None = None,
         log_ctx: ActionLogContext | None = None,
+        params_resolved: bool = False,
     ) -> ActionResult:
         """执行单个 action 的核心方法。
 
@@ -274,22 +321,27 @@ class ExecutionEngine:
         if not action_class:
             return self._fail(f"未找到操作: {action_id}", action_id, start, replaced_params=dict(params))
 
-        # InputAction 的变量缺失或为 None 时替换为空字符串
-        resolve_default = "" if action_id == BuiltinActionType.INPUT else None
-        merged = scope.resolve_params(dict(params), default=resolve_default)
+        if params_resolved:
+            merged = dict(params)
+        else:
+            # InputAction 的变量缺失或为 None 时替换为空字符串
+            resolve_default = "" if action_id == BuiltinActionType.INPUT else None
+            merged = scope.resolve_params(dict(params), default=resolve_default)
         if issubclass(action_class, CompositeActionClass):
             # 校验用户是否有权执行此复合操作（自身或公开）
             ca_model = await action_crud_svr.get_by_action_id(action_id)
             if ca_model and ca_model.mid != str(mid) and not ca_model.is_public:
                 return self._fail(f"无权访问操作: {action_id}", action_id, start, replaced_params=merged)
 
-            db_steps = await action_registry.get_custom_action_steps(action_id)
-            if db_steps and not merged.get("steps"):
-                merged["steps"] = db_steps
+            # 已校验的步骤按 (action_id, updated_at) 缓存，复合操作执行时不再重复校验整棵步骤树
+            loaded = await action_registry.get_validated_action_steps(action_id)
+            db_steps, validated_steps = loaded or ([], [])
             # 校验 steps 中引用的所有 ca_ 操作是否可访问，防止越权执行
-            steps_to_validate = merged.get("steps", [])
+            steps_to_validate = merged.get("steps") or db_steps
             if steps_to_validate:
                 await action_crud_svr.validate_steps_referenced_actions(steps_to_validate, mid)
+            if validated_steps and not merged.get("steps"):
+                merged["steps"] = validated_steps
 
         action: BaseAction = action_class.new_action(
             mid=mid,
@@ -381,6 +433,7 @@ class ExecutionEngine:
         if not filtered:
             return plugin_results
 
+        hook_start = time.perf_counter()
         for pc in filtered:
             if not pc.plugin_id:
                 continue
@@ -423,6 +476,7 @@ class ExecutionEngine:
                     action_id=pc.plugin_id,
                     action_name=f"Plugin: {pc.plugin_id}",
                 ))
+        _PLUGIN_HOOK_SECONDS.labels(hook_type).observe(time.perf_counter() - hook_start)
         return plugin_results
 
     async def _run_hooks(
@@ -553,6 +607,19 @@ class ExecutionEngine:
             base["branches"] = {"true": tc, "false": fc}
             return base
 
+        if params.get("branches") is not None:
+            # 并行分支：各分支基于同一份变量预览，按声明顺序合并
+            branch_previews = []
+            branch_vars = {}
+            for branch in params.get("branches") or []:
+                bc = await ExecutionEngine._preview_steps_recursive(branch or [], mid, dict(variables))
+                branch_vars.update(ExecutionEngine._collect_preview_vars(bc))
+                branch_previews.append(bc)
+            base["preview_variables"] = dict(branch_vars)
+            variables.update(branch_vars)
+            base["parallel_branches"] = branch_previews
+            return base
+
         if params.get("loopBranch") is not None:
             loop_body = params.get("loopBranch", []) or []
             if not loop_body:
@@ -610,6 +677,9 @@ class ExecutionEngine:
         from app.models.execution.action_params import BuiltinActionType
         from app.services.execution.actions.all_actions import get_action_metadata
 
+        if action_id == BuiltinActionType.PARALLEL:
+            return await ExecutionEngine._validate_parallel(params or {})
+
         action_class = await action_registry.get_action_class_for_user(action_id)
         if not action_class:
             raise ValueError(f"未找到操作: {action_id}")
@@ -647,4 +717,55 @@ class ExecutionEngine:
         }
 
 
+    @staticmethod
+    async def _validate_parallel(params: dict) -> Dict[str, Any]:
+        """并行步骤没有对应的操作类，校验分支结构及分支内引用的操作是否存在"""
+        from pydantic import ValidationError
+        from app.models.execution.action_params import ParallelParams
+
+        metadata = BuiltinActionType.PARALLEL.metadata
+        errors: list[str] = []
+        invalid: list[str] = []
+        branches = params.get("branches")
+        if isinstance(branches, list):
+            params = {**params, "branches": [
+                [_ensure_action_type(dict(step)) if isinstance(step, dict) else step for step in branch]
+                if isinstance(branch, list) else branch
+                for branch in branches
+            ]}
+        try:
+            parsed = ParallelParams.model_validate(params)
+        except ValidationError as e:
+            invalid = sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+            errors.append(str(e))
+            parsed = None
+
+        if parsed is not None:
+            if not parsed.branches:
+                errors.append("并行步骤至少需要一个分支")
+            if parsed.page_indexes is not None and len(parsed.page_indexes) > len(parsed.branches):
+                errors.append("page_indexes 数量不能超过分支数量")
+            for index, branch in enumerate(parsed.branches):
+                if not branch:
+                    errors.append(f"分支 {index} 没有步骤")
+                for step in branch:
+                    action_id = step.get("action_id", "") if isinstance(step, dict) else getattr(step, "action_id", "")
+                    if action_id == BuiltinActionType.PARALLEL:
+                        step_params = step.get("params") if isinstance(step, dict) else getattr(step, "params", None)
+                        nested = await ExecutionEngine._validate_parallel(params_to_dict(step_params))
+                        errors.extend(f"分支 {index}: {err}" for err in nested["errors"])
+                    elif action_id not in BuiltinActionType \
+                            and not await action_registry.get_action_class_for_user(action_id):
+                        errors.append(f"分支 {index}: 未找到操作 {action_id}")
+
+        return {
+            "valid": not errors and not invalid,
+            "action_id": BuiltinActionType.PARALLEL.value,
+            "action_name": metadata.name,
+            "missing_params": [],
+            "invalid_params": invalid,
+            "errors": errors,
+        }
+
+
 execution_engine = ExecutionEngine()
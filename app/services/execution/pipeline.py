@@ -2,14 +2,14 @@
 Pipeline — 工作流管道
 
 数据结构:
-    StepNode = AtomicStep | LoopStep | IfElseStep       (sealed union)
+    StepNode = AtomicStep | LoopStep | IfElseStep | ParallelStep       (sealed union)
     Pipeline = list[StepNode]
 
 算法:
     Pipeline.execute(scope):  left-fold 遍历步骤序列
         for step in steps:
             if step.condition fails → skip
-            resolved_params = scope.resolve_params(step.params)
+            resolved_params = step.template.render(scope)
             result = executor(action_id, resolved_params, scope)
             scope.set_outputs(step.output_vars, result.data)
 
@@ -25,13 +25,20 @@ Pipeline — 工作流管道
         branch = true_body if condition(scope) else false_body
         branch.execute(scope)
         scope.pop()
+
+    ParallelStep.execute(scope): fork-join
+        children = [Scope(scope.snapshot()) for branch in branches]   每个分支独立子作用域
+        TaskGroup: branch_i.execute(children[i], executor@page_i)      并发执行
+        for i in 声明顺序: scope.update(children[i] 的写入)            确定性合并
 """
 
 from __future__ import annotations
 
+import asyncio
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
 from typing import Any, Callable, Coroutine, List, Protocol
 
 from loguru import logger
@@ -40,10 +47,11 @@ from app.models.execution.action_params import BuiltinActionType, OnErrorEnum
 from app.models.execution.condition_models import (
     ConditionRule,
     ConditionEvaluateError,
-    evaluate_rule,
 )
 from app.services.execution.actions.base import ActionResult
-from app.services.execution.scope import Scope
+from app.services.execution.condition_compiler import RulePredicate, compile_rule, safe_evaluate_condition
+from app.services.execution.scope import Scope, isolate_variables
+from app.services.execution.template import CompiledTemplate, compile_template
 
 
 # ─── Action Executor 协议 ──────────────────────────────
@@ -52,6 +60,8 @@ class ActionExecutor(Protocol):
     """执行单个 action 的可调用对象。
 
     (action_id, resolved_params, scope, output_vars) → ActionResult
+
+    page_index: 在浏览器上下文的第几个页面上执行（ParallelStep 的分支页面绑定），None 表示当前页面
     """
     async def __call__(
         self,
@@ -59,6 +69,7 @@ class ActionExecutor(Protocol):
         params: dict,
         scope: Scope,
         output_vars: list[str],
+        page_index: int | None = None,
     ) -> ActionResult: ...
 
 
@@ -72,13 +83,19 @@ class StepNode(ABC):
     retry: int = 0
     on_error: OnErrorEnum = OnErrorEnum.STOP
     on_error_branch: Pipeline | None = None  # 失败时执行的子管道（回退/清理/告警等）
+    condition_check: RulePredicate | None = field(init=False, repr=False, compare=False, default=None)
+
+    def __post_init__(self):
+        # 条件在构建时编译一次，执行时只做变量绑定
+        if self.condition is not None:
+            self.condition_check = compile_rule(self.condition)
 
     def should_execute(self, scope: Scope) -> bool:
         """条件门控：评估 step.condition。"""
-        if self.condition is None:
+        if self.condition_check is None:
             return True
         try:
-            return evaluate_rule(self.condition, scope.snapshot())
+            return self.condition_check(scope.snapshot())
         except ConditionEvaluateError as e:
             logger.warning(f"步骤条件评估失败: {e}")
             return False
@@ -101,18 +118,31 @@ class AtomicStep(StepNode):
         params:      操作参数（含 {{var}} 模板，执行时由 scope.resolve_params 替换）
         input_vars:  输入变量，执行前合并到 scope（供后续步骤的 {{var}} 引用）
         output_vars: 输出变量名列表，结果按 data.values() 顺序赋值
+        template:    params 的预编译模板（构建时编译一次，执行时只做变量绑定）
     """
     params: dict[str, Any] = field(default_factory=dict)
     input_vars: dict[str, Any] = field(default_factory=dict)
     output_vars: list[str] = field(default_factory=list)
+    template: CompiledTemplate = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.template = compile_template(self.params)
+
+    @property
+    def has_templates(self) -> bool:
+        return self.template.has_templates
 
     async def execute(self, scope: Scope, executor: ActionExecutor) -> ActionResult:
         # 将 input_vars 合并到当前作用域，使后续模板 {{key}} 可解析到值
         if self.input_vars:
             scope.update(self.input_vars)
-        # InputAction 的变量缺失或为 None 时替换为空字符串
-        default = "" if self.action_id == BuiltinActionType.INPUT else None
-        replaced = scope.resolve_params(self.params, default=default)
+        if not self.template.has_templates:
+            replaced = dict(self.params)
+        else:
+            # InputAction 的变量缺失或为 None 时替换为空字符串
+            default = "" if self.action_id == BuiltinActionType.INPUT else None
+            replaced = self.template.render(scope, default=default)
         return await executor(
             action_id=self.action_id,
             params=replaced,
@@ -162,7 +192,7 @@ class LoopStep(StepNode):
         parts = path.split(".")
         current = obj
         for part in parts:
-            if isinstance(current, dict):
+            if isinstance(current, Mapping):
                 current = current.get(part)
             elif hasattr(current, part):
                 current = getattr(current, part)
@@ -191,13 +221,16 @@ class LoopStep(StepNode):
         return resolved
 
     def _inject_mapped_params(self, pipeline: Pipeline, mapped: dict[str, Any]) -> Pipeline:
-        """将映射参数注入 Pipeline 中每个 AtomicStep 的 params"""
+        """将映射参数注入 Pipeline 中每个 AtomicStep 的 params。
+
+        返回新的 Pipeline，不修改原 IR（编译后的 Pipeline 会被缓存并在多次执行间共享）。
+        """
         if not mapped:
             return pipeline
-        for step in pipeline.steps:
-            if isinstance(step, AtomicStep):
-                step.params = {**step.params, **mapped}
-        return pipeline
+        return Pipeline(steps=[
+            replace(step, params={**step.params, **mapped}) if isinstance(step, AtomicStep) else step
+            for step in pipeline.steps
+        ])
 
     async def execute(self, scope: Scope, executor: ActionExecutor) -> ActionResult:
         results: list[ActionResult] = []
@@ -248,8 +281,6 @@ class LoopStep(StepNode):
         return results
 
     async def _loop_by_while(self, scope: Scope, executor: ActionExecutor) -> list[ActionResult]:
-        from app.services.execution.actions.control_flow import safe_evaluate_condition
-
         results = []
         i = 0
         while safe_evaluate_condition(self.loop_condition, scope.snapshot()):
@@ -263,8 +294,6 @@ class LoopStep(StepNode):
         return results
 
     async def _loop_by_until(self, scope: Scope, executor: ActionExecutor) -> list[ActionResult]:
-        from app.services.execution.actions.control_flow import safe_evaluate_condition
-
         results = []
         i = 0
         while True:
@@ -338,14 +367,16 @@ class IfElseStep(StepNode):
     condition_rule: ConditionRule | None = None
     true_body: Pipeline | None = None
     false_body: Pipeline | None = None
+    rule_check: RulePredicate | None = field(init=False, repr=False, compare=False, default=None)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.condition_rule is not None:
+            self.rule_check = compile_rule(self.condition_rule)
 
     async def execute(self, scope: Scope, executor: ActionExecutor) -> ActionResult:
         try:
-            take_true = (
-                evaluate_rule(self.condition_rule, scope.snapshot())
-                if self.condition_rule is not None
-                else False
-            )
+            take_true = self.rule_check(scope.snapshot()) if self.rule_check is not None else False
         except ConditionEvaluateError as e:
             logger.warning(f"if_else 条件评估失败: {e}")
             take_true = False
@@ -418,6 +449,140 @@ class IfElseStep(StepNode):
         )
 
 
+class _BranchFailed(Exception):
+    """fail_fast 模式下分支失败，抛出以让 TaskGroup 取消其余分支"""
+
+
+# 执行一个并行分支，返回该分支的步骤结果
+BranchRunner = Callable[[], Coroutine[Any, Any, List[ActionResult]]]
+
+
+async def run_parallel_branches(
+    branches: list[BranchRunner],
+    written: Callable[[int], Mapping[str, Any]],
+    merge: Callable[[dict[str, Any]], None],
+    *,
+    fail_fast: bool,
+    max_concurrency: int,
+    action_id: str,
+) -> ActionResult:
+    """fork-join 执行并行分支（ParallelStep 与旧执行器的 ParallelStrategy 共用）。
+
+    - fail_fast 时任一分支失败立即取消其余分支（TaskGroup 语义），否则等待全部结束后汇总
+    - 分支内抛出的异常视为该分支失败，不会以 ExceptionGroup 向上抛出
+    - 全部结束后按分支声明顺序把成功分支赋值过的变量 written(index) 交给 merge 合并回父作用域，
+      同名以靠后的分支为准
+    """
+    outcomes: list[list[ActionResult] | None] = [None] * len(branches)
+    limiter = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    async def run_branch(index: int) -> None:
+        try:
+            if limiter is None:
+                results = await branches[index]()
+            else:
+                async with limiter:
+                    results = await branches[index]()
+        except Exception as e:
+            logger.exception(f"parallel 分支 {index} 执行异常: {e}")
+            results = [ActionResult(
+                success=False, error=f"分支执行异常: {e}", action_id=action_id, action_name="parallel",
+            )]
+        outcomes[index] = results
+        if fail_fast and results and not results[-1].success:
+            raise _BranchFailed(index)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for index in range(len(branches)):
+                group.create_task(run_branch(index))
+    except* _BranchFailed:
+        pass
+
+    summary: list[dict[str, Any]] = []
+    failed: list[int] = []
+    cancelled: list[int] = []
+    for index, results in enumerate(outcomes):
+        if results is None:
+            cancelled.append(index)
+            summary.append({"index": index, "success": False, "cancelled": True, "results": []})
+            continue
+        success = not results or results[-1].success
+        summary.append({"index": index, "success": success, "results": results})
+        if success:
+            merge(dict(written(index)))
+        else:
+            failed.append(index)
+
+    data = {"branches": summary, "failed_branches": failed, "cancelled_branches": cancelled}
+    if failed:
+        errors = "; ".join(f"分支 {i}: {summary[i]['results'][-1].error}" for i in failed)
+        return ActionResult(
+            success=False,
+            error=f"parallel 分支执行失败: {errors}",
+            data=data,
+            action_id=action_id,
+            action_name="parallel",
+        )
+    return ActionResult(success=True, data=data, action_id=action_id, action_name="parallel")
+
+
+def _bind_page(executor: ActionExecutor, page_index: int | None) -> ActionExecutor:
+    """把分支内所有 action 绑定到指定页面（分支内嵌套的 ParallelStep 可再次覆盖）"""
+    if page_index is None:
+        return executor
+
+    async def bound(
+        action_id: str,
+        params: dict,
+        scope: Scope,
+        output_vars: list[str],
+        page_index: int | None = page_index,
+    ) -> ActionResult:
+        return await executor(action_id, params, scope, output_vars, page_index=page_index)
+
+    return bound
+
+
+@dataclass
+class ParallelStep(StepNode):
+    """并行步骤 — 并发执行多个子管道（fork-join）。
+
+    字段:
+        branches:         list[Pipeline] — 各分支
+        page_indexes:     各分支绑定的页面索引（按位置对应，None 表示当前页面）
+        fail_fast:        True=任一分支失败立即取消其余分支（TaskGroup 语义），False=等待全部结束后汇总
+        max_concurrency:  同时执行的分支数上限，0 表示不限制
+
+    作用域:
+        每个分支在父作用域的深拷贝上新建独立的 Scope，分支之间互不可见（包括列表 / 字典的原地修改）；
+        全部结束后按分支声明顺序把成功分支赋值过的变量合并回父作用域（同名以靠后的分支为准）。
+    """
+    branches: list[Pipeline] = field(default_factory=list)
+    page_indexes: list[int | None] = field(default_factory=list)
+    fail_fast: bool = True
+    max_concurrency: int = 0
+
+    async def execute(self, scope: Scope, executor: ActionExecutor) -> ActionResult:
+        base = scope.snapshot()
+        children = [Scope(isolate_variables(base)) for _ in self.branches]
+        for child in children:
+            child.push()  # 分支写入落在独立的顶层，合并时只取这一层
+
+        def branch(index: int) -> BranchRunner:
+            page_index = self.page_indexes[index] if index < len(self.page_indexes) else None
+            return lambda: self.branches[index].execute(children[index], _bind_page(executor, page_index))
+
+        return await run_parallel_branches(
+            [branch(index) for index in range(len(self.branches))],
+            written=lambda index: children[index].current,
+            merge=scope.update,
+            fail_fast=self.fail_fast,
+            max_concurrency=self.max_concurrency,
+            action_id=self.action_id,
+        )
+
+
 # ─── Pipeline — 步骤序列 ───────────────────────────────
 
 @dataclass
@@ -506,7 +671,10 @@ class PipelineBuilder:
     编译策略（按 action_type 分发）:
         - LOOP     → LoopStep(body = Pipeline(children))
         - IF_ELSE  → IfElseStep(true_body, false_body)
+        - PARALLEL → ParallelStep(branches = [Pipeline(branch) ...])
         - 其他      → AtomicStep
+
+    已保存的自定义操作由 ExecutionEngine.compile_action_pipeline 编译并缓存（见 pipeline_cache）。
     """
 
     @staticmethod
@@ -596,6 +764,27 @@ class PipelineBuilder:
                     false_body=PipelineBuilder.build(false_raw) if false_raw else None,
                 ))
 
+            # PARALLEL
+            elif action_type == BuiltinActionType.PARALLEL:
+                branches_raw = PipelineBuilder._get_param(s, "branches") or []
+                page_indexes = PipelineBuilder._get_param(s, "page_indexes") or []
+                on_branch_error = PipelineBuilder._get_param(s, "on_branch_error") or "fail_fast"
+                on_error = OnErrorEnum(PipelineBuilder._get_attr(s, "on_error", "stop") or "stop")
+                on_error_raw = PipelineBuilder._get_attr(s, "on_error_branch")
+                on_error_branch = PipelineBuilder.build(on_error_raw) if on_error_raw else None
+
+                nodes.append(ParallelStep(
+                    action_id=action_id,
+                    condition=condition,
+                    retry=PipelineBuilder._get_attr(s, "retry", 0) or 0,
+                    on_error=on_error,
+                    on_error_branch=on_error_branch,
+                    branches=[PipelineBuilder.build(branch or []) for branch in branches_raw],
+                    page_indexes=list(page_indexes),
+                    fail_fast=on_branch_error != "collect_all",
+                    max_concurrency=PipelineBuilder._get_param(s, "max_concurrency") or 0,
+                ))
+
             # Atomic / Composite (default)
             else:
                 params = PipelineBuilder._get_attr(s, "params", {}) or {}
@@ -635,7 +824,7 @@ class PipelineBuilder:
     @staticmethod
     def _get_param(step, key: str, default=None):
         """安全获取 params 中的字段（兼容 dict 和模型）。"""
-        params = getattr(step, "params", {}) or {}
+        params = PipelineBuilder._get_attr(step, "params", {}) or {}
         if isinstance(params, dict):
             return params.get(key, default)
         return getattr(params, key, default)
@@ -0,0 +1,106 @@
+"""
+PipelineCache — 已编译 Pipeline / 自定义操作步骤的 LRU 缓存
+
+定时工作流会以同一份步骤列表执行成千上万次，每次都重新做
+"读 DB → 规范化步骤 → PipelineBuilder.build" 是纯粹的重复劳动。
+
+数据结构:
+    key     = 自定义操作 action_id（工作流执行的也是其关联的自定义操作）
+    version = CompositeActionModel.updated_at
+    OrderedDict[key, (version, value)]   — LRU，命中时移到末尾，超出容量淘汰最久未用
+
+失效策略:
+    1. 版本不一致即视为未命中并重建（跨进程 / 跨节点修改同样生效）
+    2. ActionCrudService.update / delete 主动调用 invalidate_action()，立即释放旧条目
+
+缓存的 Pipeline / WorkflowStep 在多次、多个并发执行之间共享，执行期间不得修改
+（运行时状态全部保存在 Scope / ExecutionContext 中）。
+"""
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class VersionedLRUCache(Generic[T]):
+    """按 (key, version) 命中的 LRU 缓存"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self._entries: OrderedDict[Hashable, tuple[Hashable, T]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, version: Hashable) -> T | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, value: T) -> T:
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def get_or_build(self, key: Hashable, version: Hashable, builder: Callable[[], T]) -> T:
+        """命中直接返回，否则调用 builder 构建并写入缓存"""
+        value = self.get(key, version)
+        if value is None:
+            value = self.put(key, version, builder())
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# 已编译的 Pipeline（action_id → Pipeline）
+pipeline_cache: VersionedLRUCache = VersionedLRUCache(settings.pipeline_cache_size)
+# 已规范化的自定义操作步骤（action_id → list[step]），供复合操作执行使用
+action_steps_cache: VersionedLRUCache[list] = VersionedLRUCache(settings.pipeline_cache_size)
+# 已校验为 WorkflowStep 模型的自定义操作步骤（action_id → list[WorkflowStep]），供 StepExecutor 直接执行
+validated_steps_cache: VersionedLRUCache[list] = VersionedLRUCache(settings.pipeline_cache_size)
+
+
+def invalidate_action(action_id: str) -> None:
+    """自定义操作被修改 / 删除时调用，清除该操作的所有缓存"""
+    pipeline_cache.invalidate(action_id)
+    action_steps_cache.invalidate(action_id)
+    validated_steps_cache.invalidate(action_id)
+
+
+__all__ = [
+    "VersionedLRUCache",
+    "pipeline_cache",
+    "action_steps_cache",
+    "validated_steps_cache",
+    "invalidate_action",
+]
@@ -1,24 +1,213 @@
 """
 Scope — 变量作用域
 
-数据结构：Scope 栈 (list[dict])，支持推入/弹出嵌套作用域。
-算法：   Chain-of-responsibility 查找 — 从栈顶向栈底搜索键。
+数据结构：
+    Scope 栈 (list[_Layer])  — 支持推入/弹出嵌套作用域，栈顶 dict 直接交给 BaseAction 写入
+    展平索引 _flat (dict)    — 所有层合并后的可见变量（栈顶覆盖栈底），查找 O(1)
+    版本段 _segments + _delta — 快照用的分段不可变字典（LSM 式合并）
+
+算法：
+    写入:   任意层的写入 / 删除都通过 _Layer 回调同步到 _flat 与 _delta，O(1)
+    查找:   _flat[key]，与栈深度无关
+    快照:   冻结 _delta 追加为新段，返回引用所有段的只读视图，不拷贝变量
+            新段不小于前一段的一半时与之合并，段数保持 O(log N)，每个变量摊还 O(log N) 次拷贝
 
 设计原则：
 - 所有 Step 共享同一个 Scope 实例引用（单指针传递，无拷贝）
 - push()/pop() 用于循环体/分支体的局部变量隔离
 - resolve_params() 递归遍历参数树，替换 {{var}} 模板
+- snapshot() 返回不可变视图：之后对 Scope 的修改不会影响已取得的快照
 """
 
+import copy
 import re
+from collections.abc import Iterator, Mapping
 from typing import Any
 
+# 快照段中的删除标记（变量在该版本中不存在）
+_ABSENT = object()
+
+
+class _Layer(dict):
+    """作用域层。
+
+    就是一个 dict（BaseAction.variables 直接持有它并写入），
+    所有修改操作额外通知所属 Scope 同步展平索引。
+    """
+
+    __slots__ = ("_scope",)
+
+    def __init__(self, scope: "Scope | None", initial: dict[str, Any] | None = None):
+        super().__init__(initial or {})
+        self._scope = scope
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        dict.__setitem__(self, key, value)
+        if self._scope is not None:
+            self._scope._on_set(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        dict.__delitem__(self, key)
+        if self._scope is not None:
+            self._scope._on_delete(self, key)
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    _NO_DEFAULT = object()
+
+    def pop(self, key: str, default: Any = _NO_DEFAULT) -> Any:
+        if key in self:
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+        if default is _Layer._NO_DEFAULT:
+            raise KeyError(key)
+        return default
+
+    def popitem(self) -> tuple[str, Any]:
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self) -> None:
+        for key in list(self):
+            del self[key]
+
+    def __reduce_ex__(self, protocol):
+        # 拷贝 / 序列化时退化为普通 dict，不携带 Scope 引用
+        return dict, (dict(self),)
+
+
+class BranchVariables(dict):
+    """记录赋值过哪些键的变量 dict。
+
+    旧执行器（ExecutionContext）的并行分支使用：分支结束后只把 assigned() 合并回父上下文，
+    与 ParallelStep 只合并分支栈顶层的语义一致。copy() 连同赋值记录一起拷贝，
+    save_state() / restore_state() 回滚变量时赋值记录也随之回滚。
+    """
+
+    __slots__ = ("_written",)
+
+    def __init__(self, initial: Mapping[str, Any] | None = None):
+        super().__init__(initial or {})
+        self._written: set[str] = set()
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        dict.__setitem__(self, key, value)
+        self._written.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        dict.__delitem__(self, key)
+        self._written.discard(key)
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self._written.discard(key)
+        return dict.pop(self, key, *default)
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self._written.clear()
+
+    def copy(self) -> "BranchVariables":
+        clone = BranchVariables(self)
+        clone._written = set(self._written)
+        return clone
+
+    def assigned(self) -> dict[str, Any]:
+        """分支赋值过（且仍存在）的变量"""
+        return {key: dict.__getitem__(self, key) for key in self._written if key in self}
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+def isolate_variables(variables: Mapping[str, Any]) -> dict[str, Any]:
+    """深拷贝变量，供并行分支独立修改（列表 / 字典的原地修改不会泄漏到其它分支或父作用域）。
+
+    无法拷贝的值（页面、锁等运行时句柄）保持共享引用。
+    """
+    memo: dict[int, Any] = {}
+    isolated: dict[str, Any] = {}
+    for key, value in variables.items():
+        try:
+            isolated[key] = copy.deepcopy(value, memo)
+        except Exception:
+            isolated[key] = value
+    return isolated
+
+
+class ScopeSnapshot(Mapping[str, Any]):
+    """Scope 某一时刻的只读视图。
+
+    由若干不可变的版本段组成（旧 → 新），查找时从最新段向前找；
+    仅在需要遍历（如日志序列化）时才合并为 dict，且只合并一次。
+    """
+
+    __slots__ = ("_segments", "_merged")
+
+    def __init__(self, segments: tuple[dict[str, Any], ...]):
+        self._segments = segments
+        self._merged: dict[str, Any] | None = None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._merged is not None:
+            return self._merged[key]
+        for segment in reversed(self._segments):
+            if key in segment:
+                value = segment[key]
+                if value is _ABSENT:
+                    break
+                return value
+        raise KeyError(key)
+
+    def _materialize(self) -> dict[str, Any]:
+        if self._merged is None:
+            merged: dict[str, Any] = {}
+            for segment in self._segments:
+                merged.update(segment)
+            self._merged = {k: v for k, v in merged.items() if v is not _ABSENT}
+        return self._merged
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __repr__(self) -> str:
+        return f"ScopeSnapshot({self._materialize()!r})"
+
 
 class Scope:
     """变量作用域栈。
 
     栈底是全局变量，栈顶是当前作用域。写入总是发生在栈顶，
-    查找从栈顶向栈底遍历。
+    查找通过展平索引一次完成。
 
     用法:
         scope = Scope({"mid": 123})
@@ -31,10 +220,15 @@ class Scope:
         scope.pop()                            # 弹出（离开循环体）
     """
 
-    __slots__ = ("_stack",)
+    __slots__ = ("_stack", "_flat", "_delta", "_segments")
 
     def __init__(self, initial: dict[str, Any] | None = None):
-        self._stack: list[dict[str, Any]] = [dict(initial or {})]
+        root = _Layer(self, initial)
+        self._stack: list[_Layer] = [root]
+        self._flat: dict[str, Any] = dict(root)
+        # 自上次快照以来的变更（_ABSENT 表示删除），快照时冻结为新段
+        self._delta: dict[str, Any] = dict(root)
+        self._segments: list[dict[str, Any]] = []
 
     # ─── 基本操作 ───────────────────────────────────────
 
@@ -45,12 +239,16 @@ class Scope:
 
     def push(self) -> None:
         """推入新作用域层。"""
-        self._stack.append({})
+        self._stack.append(_Layer(self))
 
     def pop(self) -> None:
         """弹出当前作用域。至少保留一层（全局层不可弹出）。"""
-        if len(self._stack) > 1:
-            self._stack.pop()
+        if len(self._stack) <= 1:
+            return
+        layer = self._stack.pop()
+        layer._scope = None
+        for key in layer:
+            self._reindex(key, len(self._stack))
 
     def depth(self) -> int:
         return len(self._stack)
@@ -58,11 +256,8 @@ class Scope:
     # ─── 读写 ───────────────────────────────────────────
 
     def get(self, key: str, default: Any = None) -> Any:
-        """从栈顶向栈底查找键。O(depth) 时间复杂度。"""
-        for layer in reversed(self._stack):
-            if key in layer:
-                return layer[key]
-        return default
+        """查找键（栈顶优先）。O(1) 时间复杂度。"""
+        return self._flat.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
         """写入当前（栈顶）作用域。"""
@@ -73,10 +268,46 @@ class Scope:
         self._stack[-1].update(mapping)
 
     def __contains__(self, key: str) -> bool:
-        for layer in reversed(self._stack):
+        return key in self._flat
+
+    # ─── 索引维护 ───────────────────────────────────────
+
+    def _layer_index(self, layer: _Layer) -> int:
+        if layer is self._stack[-1]:
+            return len(self._stack) - 1
+        for i, candidate in enumerate(self._stack):
+            if candidate is layer:
+                return i
+        return -1
+
+    def _shadowed(self, index: int, key: str) -> bool:
+        """key 是否被 index 之上的层覆盖"""
+        return any(key in layer for layer in self._stack[index + 1:])
+
+    def _reindex(self, key: str, below: int) -> None:
+        """按前 below 层重新计算 key 的可见值"""
+        for layer in reversed(self._stack[:below]):
             if key in layer:
-                return True
-        return False
+                value = dict.__getitem__(layer, key)
+                self._flat[key] = value
+                self._delta[key] = value
+                return
+        if key in self._flat:
+            del self._flat[key]
+            self._delta[key] = _ABSENT
+
+    def _on_set(self, layer: _Layer, key: str, value: Any) -> None:
+        index = self._layer_index(layer)
+        if index < 0 or self._shadowed(index, key):
+            return
+        self._flat[key] = value
+        self._delta[key] = value
+
+    def _on_delete(self, layer: _Layer, key: str) -> None:
+        index = self._layer_index(layer)
+        if index < 0 or self._shadowed(index, key):
+            return
+        self._reindex(key, index)
 
     # ─── 模板替换 ───────────────────────────────────────
 
@@ -130,9 +361,25 @@ class Scope:
 
     # ─── 快照 ───────────────────────────────────────────
 
-    def snapshot(self) -> dict[str, Any]:
-        """展平所有作用域层为单一 dict（栈顶覆盖栈底）。"""
-        result: dict[str, Any] = {}
-        for layer in self._stack:
-            result.update(layer)
-        return result
+    def snapshot(self) -> Mapping[str, Any]:
+        """返回当前可见变量（栈顶覆盖栈底）的只读视图。
+
+        不拷贝变量：冻结自上次快照以来的变更为新段，视图引用全部段。
+        需要可修改的 dict 时使用 dict(scope.snapshot())。
+        """
+        if self._delta:
+            self._segments.append(self._delta)
+            self._delta = {}
+            self._compact()
+        return ScopeSnapshot(tuple(self._segments))
+
+    def _compact(self) -> None:
+        """合并相邻的段：新段不小于前一段一半时合并（合并产生新 dict，旧快照不受影响）。"""
+        segments = self._segments
+        while len(segments) >= 2 and len(segments[-1]) * 2 >= len(segments[-2]):
+            merged = dict(segments[-2])
+            merged.update(segments[-1])
+            if len(segments) == 2:
+                # 合并到最底段时不再需要删除标记
+                merged = {k: v for k, v in merged.items() if v is not _ABSENT}
+            segments[-2:] = [merged]
@@ -0,0 +1,132 @@
+"""
+Template — 参数模板预编译
+
+Scope.resolve_params 每次执行都要 DFS 整棵参数树、对每个字符串跑一次正则；
+对循环体里动辄上千元素的参数列表，真正含 {{var}} 的往往只有寥寥几处。
+
+编译（一次）:
+    compile_template(params) → CompiledTemplate
+        - 不含模板的子树整体视为常量，渲染时原样复用（不再遍历、不再拷贝）
+        - 含模板的字符串预先切分为 [字面量, 变量名, 字面量, ...] 片段
+        - dict / list 只保留含模板的下标，其余位置直接引用原值
+
+渲染（每次执行）:
+    template.render(scope, default) → 与 scope.resolve_params(params, default) 相同的结果
+
+注意：渲染结果与编译时的参数树共享常量子树，调用方应将其视为只读。
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from app.services.execution.scope import Scope
+
+# 渲染函数：(scope, default) → 渲染结果
+Renderer = Callable[[Scope, "str | None"], Any]
+
+_MISSING = object()
+
+
+def _compile_text(text: str) -> Renderer | None:
+    """把含 {{var}} 的字符串编译为渲染函数，不含模板返回 None。"""
+    if "{{" not in text:
+        return None
+
+    # split 带捕获组：偶数位是字面量，奇数位是变量名
+    parts = Scope._TEMPLATE_RE.split(text)
+    if len(parts) == 1:
+        return None
+    literals = parts[0::2]
+    names = parts[1::2]
+    placeholders = [f"{{{{{name}}}}}" for name in names]
+
+    def render(scope: Scope, default: str | None) -> str:
+        out = [literals[0]]
+        for name, placeholder, literal in zip(names, placeholders, literals[1:]):
+            value = scope.get(name, _MISSING)
+            if default is not None:
+                out.append(default if value is _MISSING or value is None else str(value))
+            else:
+                # 向后兼容：缺失变量保留字面量，None 值转为 "None" 字符串
+                out.append(placeholder if value is _MISSING else str(value))
+            out.append(literal)
+        return "".join(out)
+
+    return render
+
+
+def _compile_node(node: Any) -> Renderer | None:
+    """编译参数树节点，整棵子树都不含模板时返回 None（常量）。"""
+    if isinstance(node, str):
+        return _compile_text(node)
+
+    if isinstance(node, dict):
+        dynamic = [(k, r) for k, v in node.items() if (r := _compile_node(v)) is not None]
+        if not dynamic:
+            return None
+        static = dict(node)
+
+        def render_dict(scope: Scope, default: str | None) -> dict:
+            out = dict(static)
+            for key, renderer in dynamic:
+                out[key] = renderer(scope, default)
+            return out
+
+        return render_dict
+
+    if isinstance(node, list):
+        dynamic = [(i, r) for i, v in enumerate(node) if (r := _compile_node(v)) is not None]
+        if not dynamic:
+            return None
+        static = list(node)
+
+        def render_list(scope: Scope, default: str | None) -> list:
+            out = list(static)
+            for index, renderer in dynamic:
+                out[index] = renderer(scope, default)
+            return out
+
+        return render_list
+
+    # 嵌套的 Pydantic 模型：Scope.resolve_params 会将其展开为 dict，这里保持一致
+    if hasattr(node, "model_dump"):
+        dumped = node.model_dump()
+        return _compile_node(dumped) or (lambda scope, default: dumped)
+
+    return None
+
+
+class CompiledTemplate:
+    """预编译的参数模板。"""
+
+    __slots__ = ("source", "_render")
+
+    def __init__(self, params: Any):
+        # 与 Scope.resolve_params 一致：Pydantic 模型按 model_dump() 后的结构处理
+        if params is not None and not isinstance(params, (str, dict, list)) and hasattr(params, "model_dump"):
+            params = params.model_dump()
+        self.source = params
+        self._render = _compile_node(params)
+
+    @property
+    def has_templates(self) -> bool:
+        return self._render is not None
+
+    def render(self, scope: Scope, default: str | None = None) -> Any:
+        """按当前作用域渲染参数树。
+
+        Args:
+            default: 缺失或值为 None 时的替换值，语义同 Scope.resolve_params。
+        """
+        if self._render is None:
+            return self.source
+        return self._render(scope, default)
+
+
+def compile_template(params: Any) -> CompiledTemplate:
+    """编译参数树。"""
+    return CompiledTemplate(params)
+
+
+__all__ = ["CompiledTemplate", "compile_template"]
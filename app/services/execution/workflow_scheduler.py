@@ -0,0 +1,432 @@
+"""
+WorkflowTriggerScheduler — 进程内的工作流定时触发
+
+UserWorkflow 保存了 trigger_type / trigger_config，此前由外部 cron 调用 HTTP 接口触发执行：
+每次执行多一轮请求开销，且所有整点任务在同一秒涌入。本模块在进程内把触发配置转换为
+ExecutionEngine.execute_steps() 调用。
+
+触发配置:
+    trigger_type = "cron"       trigger_config = {"cron": "*/5 * * * *", "browser_id": 123}
+    trigger_type = "interval"   trigger_config = {"seconds": 300, "browser_id": 123}
+
+    可选字段:
+        timezone   cron 表达式的时区（默认本机时区）
+        overlap    上一次执行尚未结束时的策略: "coalesce"（默认，结束后补跑一次）/ "skip"（丢弃本次）
+        jitter     启动抖动上限（秒），默认 settings.workflow_trigger_max_jitter
+        variables  执行时注入的变量
+
+调度:
+    - 触发时间由 APScheduler 的 CronTrigger / IntervalTrigger 计算，时钟可注入（测试中使用模拟时钟）
+    - 所有任务按下一次执行时间放在一个最小堆中，run_pending() 每个 tick 只弹出到期的任务
+    - 每个工作流的启动时间加上固定的抖动偏移（按 workflow_id 哈希，不超过周期的一半），
+      同一时刻触发的大量工作流被均匀打散，而单个工作流的执行间隔保持稳定
+    - 错过的多次触发（进程暂停 / tick 延迟）合并为一次执行
+
+并发:
+    每次执行先占用户级名额（max_per_user）再占全局名额（max_concurrency），
+    某个用户积压的执行不会占住全局名额。排队中的执行视为"正在运行"，参与重叠判定。
+
+注册:
+    WorkflowCrudService 的创建 / 更新 / 启用 / 禁用 / 删除 / 复制 / Fork 在提交后调用 sync() / unregister()，
+    应用启动时 load_from_db() 加载全部已启用的定时工作流。
+    trigger_config.browser_id 必须属于工作流的 mid（经 browser_ownership_cache 校验），否则不注册，
+    避免用别人的浏览器执行（例如 Fork 来的配置）。
+
+多节点（cluster_enabled）:
+    每个节点都加载全部定时工作流，但只有 (mid, browser_id) 按会话目录 / 哈希环归属本节点时才执行，
+    其它节点到期时跳过（计入 remote），浏览器只在所属节点启动。归属在注册时和每次触发时重新判定，
+    节点失效后会话重新分配，由新的所属节点接手后续触发；预热提示也只在所属节点登记。
+"""
+import asyncio
+import heapq
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from loguru import logger
+from sqlmodel import select
+
+from app.config import settings
+from app.models.database.workflow.models import UserWorkflow
+from app.utils.depends.session_manager import DatabaseSessionManager
+
+TRIGGER_TYPES = ("cron", "interval")
+OVERLAP_POLICIES = ("coalesce", "skip")
+
+
+@dataclass(slots=True, frozen=True)
+class ScheduledWorkflow:
+    """一次定时执行所需的工作流快照"""
+    workflow_id: str
+    mid: int
+    browser_id: int
+    custom_action_id: str
+    variables: dict[str, Any] = field(default_factory=dict)
+
+
+# 执行一次定时工作流
+WorkflowRunner = Callable[[ScheduledWorkflow], Awaitable[Any]]
+# 判断 browser_id 是否属于 mid
+OwnershipCheck = Callable[[int, int], Awaitable[bool]]
+
+
+async def owns_browser(mid: int, browser_id: int) -> bool:
+    """默认归属校验：复用 verify_browser_ownership 的归属缓存"""
+    # 延迟导入：指纹服务包依赖较多，避免与 CRUD 服务循环导入
+    from app.services.RPA_browser.fingerprint.ownership_cache import browser_ownership_cache
+
+    return await browser_ownership_cache.is_owner(mid, browser_id)
+
+
+async def owned_by_local_node(mid: int, browser_id: int) -> bool:
+    """默认节点校验：未启用会话分片时总是 True，否则判断会话是否归属本节点"""
+    # 延迟导入：集群模块依赖 HTTP 客户端等较重的依赖
+    from app.services.RPA_browser.cluster import get_default_session_router
+
+    router = get_default_session_router()
+    if router is None:
+        return True
+    return router.is_local(await router.locate(mid, browser_id))
+
+
+async def run_stored_workflow(job: ScheduledWorkflow) -> list:
+    """
+    默认执行器：与 /workflows/execute 的 action_id 分支相同的执行路径
+
+    由调度器在节点校验通过后调用，会在本节点启动浏览器
+    """
+    # 延迟导入：CRUD 服务在提交后回调本模块
+    from app.models.execution.request_params import WorkflowExecutionRequest
+    from app.services.RPA_browser.session.live_service import live_service
+    from app.services.execution.crud_service import action_crud_svr, workflow_crud_svr
+    from app.services.execution.engine import ExecutionEngine
+
+    action_model = await action_crud_svr.get_by_action_id(job.custom_action_id)
+    if not action_model:
+        raise ValueError(f"未找到操作: {job.custom_action_id}")
+    plugins = await workflow_crud_svr.get_enabled_plugins(job.workflow_id)
+
+    await live_service.get_or_create_browser_session_entry(
+        job.mid, job.browser_id, headless=settings.workflow_trigger_headless
+    )
+
+    engine = ExecutionEngine()
+    req = WorkflowExecutionRequest(
+        mid=job.mid,
+        browser_id=job.browser_id,
+        action_id=job.custom_action_id,
+        workflow_id=job.workflow_id,
+        variables=dict(job.variables),
+    )
+    # 执行期间占用会话，资源治理器不会在运行中途休眠页面
+    async with live_service.use_browser_session(job.mid, job.browser_id) as entry:
+        page = await entry.browser_session.get_current_page()
+        return await engine.execute_steps(
+            req,
+            steps=engine.compile_action_pipeline(action_model),
+            session_id=str(job.browser_id),
+            browser_id=str(job.browser_id),
+            page=page,
+            plugins=plugins,
+        )
+
+
+@dataclass(slots=True)
+class _TriggerJob:
+    spec: ScheduledWorkflow
+    trigger: BaseTrigger
+    overlap: str
+    jitter: float
+    fire_at: datetime  # 下一次名义触发时间（未加抖动）
+    run_at: float  # 下一次实际启动时间（时钟时间戳）
+    generation: int  # 重新注册后旧的堆条目失效
+    local: bool = True  # 最近一次节点校验的结果，决定是否登记预热提示
+
+
+def _build_trigger(trigger_type: str, config: dict, start: datetime) -> BaseTrigger:
+    if trigger_type == "cron":
+        return CronTrigger.from_crontab(config["cron"], timezone=config.get("timezone"))
+    seconds = float(config["seconds"])
+    if seconds <= 0:
+        raise ValueError(f"Invalid interval: {seconds}")
+    return IntervalTrigger(seconds=seconds, start_date=start + timedelta(seconds=seconds))
+
+
+class WorkflowTriggerScheduler:
+    """cron / interval 触发的工作流调度器，由 run_pending() 按 tick 驱动"""
+
+    def __init__(
+        self,
+        runner: WorkflowRunner = run_stored_workflow,
+        *,
+        owner_check: OwnershipCheck = owns_browser,
+        node_check: OwnershipCheck = owned_by_local_node,
+        max_concurrency: int = 16,
+        max_per_user: int = 2,
+        max_jitter: float = 30.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            runner: 执行一次工作流的函数
+            owner_check: 校验 trigger_config.browser_id 是否属于工作流的 mid
+            node_check: 校验 (mid, browser_id) 的会话是否归属本节点，不归属时触发被跳过
+            max_concurrency: 全局同时执行的工作流数量上限
+            max_per_user: 单个用户同时执行的工作流数量上限
+            max_jitter: 启动抖动上限（秒），0 表示不抖动
+            enabled: 关闭时 sync() 不注册任何任务（由外部 cron 驱动的部署）
+            clock: 返回 Unix 时间戳的时钟（测试中可注入模拟时钟）
+        """
+        self._runner = runner
+        self._owner_check = owner_check
+        self._node_check = node_check
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_user = max(1, max_per_user)
+        self.max_jitter = max(0.0, max_jitter)
+        self.enabled = enabled
+        self._clock = clock
+        # 登记即将执行的计划（例如浏览器预热池），参数为 (mid, browser_id, run_at)
+        self.schedule_hint: Callable[[int, int, float], None] | None = None
+
+        self._jobs: dict[str, _TriggerJob] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._generation = 0
+        # 正在运行 / 排队中的执行，重新注册后仍按 workflow_id 判定重叠
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._pending: set[str] = set()
+        self._global_slots: asyncio.Semaphore | None = None
+        self._user_slots: dict[int, asyncio.Semaphore] = {}
+        self._user_inflight: dict[int, int] = {}
+        self._active = 0
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.remote = 0
+
+    # ── 注册 ──
+
+    async def sync(self, workflow: UserWorkflow) -> bool:
+        """按工作流当前状态注册或注销定时任务，返回是否已注册"""
+        workflow_id = workflow.workflow_id
+        trigger_type = workflow.trigger_type
+        config = workflow.trigger_config or {}
+        if not self.enabled or not workflow.is_enabled or trigger_type not in TRIGGER_TYPES:
+            self.unregister(workflow_id)
+            return False
+
+        try:
+            now = self._now()
+            trigger = _build_trigger(trigger_type, config, now)
+            browser_id = int(config["browser_id"])
+            overlap = config.get("overlap", "coalesce")
+            if overlap not in OVERLAP_POLICIES:
+                raise ValueError(f"Invalid overlap policy: {overlap}")
+            first = trigger.get_next_fire_time(None, now + timedelta(microseconds=1))
+            if first is None:
+                raise ValueError("Trigger never fires")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"工作流 {workflow_id} 的触发配置无效，不注册定时任务: {e}")
+            self.unregister(workflow_id)
+            return False
+
+        mid = int(workflow.mid)
+        if not await self._owner_check(mid, browser_id):
+            logger.warning(f"工作流 {workflow_id} 的浏览器 {browser_id} 不属于用户 {mid}，不注册定时任务")
+            self.unregister(workflow_id)
+            return False
+
+        second = trigger.get_next_fire_time(first, first)
+        period = (second - first).total_seconds() if second else 0.0
+        jitter_cap = min(float(config.get("jitter", self.max_jitter)), self.max_jitter, period / 2)
+        jitter = (zlib.crc32(workflow_id.encode()) / 0xFFFFFFFF) * max(0.0, jitter_cap)
+
+        spec = ScheduledWorkflow(
+            workflow_id=workflow_id,
+            mid=mid,
+            browser_id=browser_id,
+            custom_action_id=workflow.custom_action_id,
+            variables=dict(config.get("variables") or {}),
+        )
+        self._generation += 1
+        local = await self._is_local(spec)
+        job = _TriggerJob(spec, trigger, overlap, jitter, first, 0.0, self._generation, local)
+        self._jobs[workflow_id] = job
+        self._schedule(job, first)
+        return True
+
+    def unregister(self, workflow_id: str) -> None:
+        """注销定时任务（正在运行的执行不会被中断，但不再补跑）"""
+        if self._jobs.pop(workflow_id, None) is not None:
+            self._pending.discard(workflow_id)
+
+    async def load_from_db(self) -> int:
+        """加载全部已启用的定时工作流，返回注册数量"""
+        if not self.enabled:
+            return 0
+        async with DatabaseSessionManager.async_session() as session:
+            result = await session.exec(
+                select(UserWorkflow).where(
+                    UserWorkflow.is_enabled == True,  # noqa: E712
+                    UserWorkflow.trigger_type.in_(TRIGGER_TYPES),
+                )
+            )
+            workflows = result.all()
+        registered = 0
+        for workflow in workflows:
+            registered += await self.sync(workflow)
+        logger.info(f"✅ Loaded {registered} scheduled workflows")
+        return registered
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), timezone.utc)
+
+    def _schedule(self, job: _TriggerJob, fire_at: datetime) -> None:
+        job.fire_at = fire_at
+        job.run_at = fire_at.timestamp() + job.jitter
+        heapq.heappush(self._heap, (job.run_at, job.generation, job.spec.workflow_id))
+        if self.schedule_hint is not None and job.local:
+            self.schedule_hint(job.spec.mid, job.spec.browser_id, job.run_at)
+
+    # ── 触发 ──
+
+    async def run_pending(self) -> int:
+        """启动所有到期的工作流，返回本次触发的数量（不等待执行结束）"""
+        now = self._clock()
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, workflow_id = heapq.heappop(self._heap)
+            job = self._jobs.get(workflow_id)
+            if job is None or job.generation != generation:
+                continue
+
+            # 下一次触发严格晚于当前时间：错过的多次触发合并为本次执行
+            after = max(datetime.fromtimestamp(now, timezone.utc), job.fire_at) + timedelta(microseconds=1)
+            next_fire = job.trigger.get_next_fire_time(None, after)
+            if next_fire is None:
+                self._jobs.pop(workflow_id, None)
+            else:
+                self._schedule(job, next_fire)
+
+            fired += 1
+            self._fire(job)
+        return fired
+
+    def _fire(self, job: _TriggerJob) -> None:
+        workflow_id = job.spec.workflow_id
+        if workflow_id not in self._tasks:
+            self._start(job.spec)
+        elif job.overlap == "skip":
+            self.skipped += 1
+            logger.debug(f"工作流 {workflow_id} 上一次执行未结束，跳过本次触发")
+        else:
+            self.coalesced += 1
+            self._pending.add(workflow_id)
+
+    def _start(self, spec: ScheduledWorkflow) -> None:
+        self._user_inflight[spec.mid] = self._user_inflight.get(spec.mid, 0) + 1
+        self._tasks[spec.workflow_id] = asyncio.create_task(self._run(spec))
+
+    async def _run(self, spec: ScheduledWorkflow) -> None:
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        user_slots = self._user_slots.setdefault(spec.mid, asyncio.Semaphore(self.max_per_user))
+        try:
+            # 多节点部署中所有节点都注册了任务，只有会话所属节点执行
+            local = await self._is_local(spec)
+            if (job := self._jobs.get(spec.workflow_id)) is not None:
+                job.local = local
+            if not local:
+                self.remote += 1
+                logger.debug(f"工作流 {spec.workflow_id} 的浏览器 {spec.browser_id} 归属其它节点，本节点跳过")
+                return
+            async with user_slots, self._global_slots:
+                self._active += 1
+                self.runs += 1
+                try:
+                    await self._runner(spec)
+                except Exception as e:
+                    self.failures += 1
+                    logger.exception(f"定时工作流 {spec.workflow_id} 执行失败: {e}")
+                finally:
+                    self._active -= 1
+        finally:
+            self._tasks.pop(spec.workflow_id, None)
+            self._user_inflight[spec.mid] -= 1
+            if not self._user_inflight[spec.mid]:
+                del self._user_inflight[spec.mid]
+                self._user_slots.pop(spec.mid, None)
+            # coalesce：运行期间的触发合并为一次补跑，使用最新注册的快照
+            if spec.workflow_id in self._pending:
+                self._pending.discard(spec.workflow_id)
+                job = self._jobs.get(spec.workflow_id)
+                if job is not None:
+                    self._start(job.spec)
+
+    async def _is_local(self, spec: ScheduledWorkflow) -> bool:
+        try:
+            return await self._node_check(spec.mid, spec.browser_id)
+        except Exception as e:
+            # 目录不可用时无法确定归属，宁可跳过也不在多个节点重复执行
+            logger.warning(f"工作流 {spec.workflow_id} 的节点归属校验失败，本节点跳过: {e}")
+            return False
+
+    # ── 生命周期 ──
+
+    async def wait_idle(self) -> None:
+        """等待所有正在运行 / 排队中的执行（包括补跑）结束"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        """注销所有任务并取消正在运行的执行"""
+        self._jobs.clear()
+        self._heap.clear()
+        self._pending.clear()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        next_run = min((job.run_at for job in self._jobs.values()), default=None)
+        return {
+            "jobs": len(self._jobs),
+            "active": self._active,
+            "queued": len(self._tasks) - self._active,
+            "pending": len(self._pending),
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "remote": self.remote,
+            "next_run_in": next_run - self._clock() if next_run is not None else None,
+        }
+
+
+workflow_trigger_scheduler = WorkflowTriggerScheduler(
+    max_concurrency=settings.workflow_trigger_max_concurrency,
+    max_per_user=settings.workflow_trigger_max_per_user,
+    max_jitter=settings.workflow_trigger_max_jitter,
+    enabled=settings.workflow_trigger_enabled,
+)
+
+
+__all__ = [
+    "OwnershipCheck",
+    "ScheduledWorkflow",
+    "WorkflowRunner",
+    "WorkflowTriggerScheduler",
+    "owned_by_local_node",
+    "owns_browser",
+    "run_stored_workflow",
+    "workflow_trigger_scheduler",
+]
@@ -27,12 +27,20 @@ handler 直接返回 CommonResponseModel，客户端解析为 dict。
 
 import asyncio
 import json
+import time
 from typing import Any
 
 from faststream.rabbit import RabbitBroker
 from loguru import logger
 
 from app.config import settings
+from app.utils.metrics.registry import metrics_registry
+
+# routing_key 对应固定的业务方法，数量有限，可直接作为标签
+_RPC_CALL_SECONDS = metrics_registry.histogram(
+    "rpa_rpc_call_duration_seconds", "RPC 请求从发送到收到响应的耗时", ("routing_key", "outcome"),
+)
+_RPC_IN_FLIGHT = metrics_registry.gauge("rpa_rpc_calls_in_flight", "正在等待响应的 RPC 请求数")
 
 
 class RpcClient:
@@ -101,6 +109,9 @@ class RpcClient:
 
         # FastStream broker.request() 使用 Direct Reply-To，自动处理 correlation_id 和 reply_to
         # 通过 asyncio.wait_for 控制超时（FastStream request 的 timeout 参数是发布确认超时，非 RPC 等待超时）
+        start = time.perf_counter()
+        outcome = "error"
+        _RPC_IN_FLIGHT.inc()
         try:
             msg = await asyncio.wait_for(
                 self._broker.request(
@@ -109,10 +120,15 @@ class RpcClient:
                 ),
                 timeout=timeout,
             )
+            outcome = "ok"
         except TimeoutError:
+            outcome = "timeout"
             raise TimeoutError(
                 f"RPC 请求超时（{timeout}s）: routing_key={routing_key}"
             )
+        finally:
+            _RPC_IN_FLIGHT.dec()
+            _RPC_CALL_SECONDS.labels(routing_key, outcome).observe(time.perf_counter() - start)
 
         # 解析响应消息体（CommonResponseModel 序列化后的 JSON）
         body = msg.body.decode()
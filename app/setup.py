@@ -1,8 +1,13 @@
 """后台任务注册和配置"""
 
 from loguru import logger
+from app.config import settings
 from app.scheduler_manager import scheduler_manager_ist
 from app.services.RPA_browser.background_tasks import BackgroundTasks
+from app.services.RPA_browser.browser_session_pool.warm_pool import get_default_warm_pool
+from app.services.RPA_browser.cluster import get_default_session_router
+from app.services.execution.action_log_writer import action_log_writer
+from app.services.execution.workflow_scheduler import workflow_trigger_scheduler
 
 
 def register_background_tasks():
@@ -17,6 +22,65 @@ def register_background_tasks():
         misfire_grace_time=None,  # 错过执行时间不立即执行,等待下一次
     )
 
+    # 浏览器预热池 - 按配置间隔预测并提前启动浏览器
+    if settings.browser_warm_pool_enabled:
+        scheduler_manager_ist.add_interval_job(
+            func=BackgroundTasks.warm_browser_pool,
+            seconds=settings.browser_warm_pool_interval,
+            id="warm_browser_pool",
+            name="浏览器预热任务",
+            misfire_grace_time=None,
+        )
+
+    # 浏览器资源预算 - 比会话清理更频繁地检查内存，防止突发的会话把主机内存耗尽
+    if settings.browser_memory_budget_mb > 0:
+        scheduler_manager_ist.add_interval_job(
+            func=BackgroundTasks.enforce_resource_budget,
+            seconds=settings.browser_resource_check_interval,
+            id="enforce_resource_budget",
+            name="浏览器资源预算任务",
+            misfire_grace_time=None,
+        )
+
+    # 多节点会话分片 - 定期刷新本节点心跳
+    if settings.cluster_enabled:
+        scheduler_manager_ist.add_interval_job(
+            func=BackgroundTasks.cluster_heartbeat,
+            seconds=settings.cluster_heartbeat_interval,
+            id="cluster_heartbeat",
+            name="节点心跳任务",
+            misfire_grace_time=None,
+        )
+
+    # 产物保留策略 - 按保留天数 / 容量上限清理截图等产物
+    if settings.artifact_retention_days > 0 or settings.artifact_max_total_mb > 0:
+        scheduler_manager_ist.add_interval_job(
+            func=BackgroundTasks.cleanup_artifacts,
+            seconds=settings.artifact_cleanup_interval,
+            id="cleanup_artifacts",
+            name="产物清理任务",
+            misfire_grace_time=None,
+        )
+
+    # HTTP 客户端回收 - 无流量时也能关闭闲置的连接池客户端
+    scheduler_manager_ist.add_interval_job(
+        func=BackgroundTasks.sweep_http_clients,
+        seconds=settings.http_client_idle_ttl,
+        id="sweep_http_clients",
+        name="HTTP 客户端回收任务",
+        misfire_grace_time=None,
+    )
+
+    # 工作流定时触发 - 每个 tick 启动到期的 cron / interval 工作流
+    if settings.workflow_trigger_enabled:
+        scheduler_manager_ist.add_interval_job(
+            func=workflow_trigger_scheduler.run_pending,
+            seconds=settings.workflow_trigger_tick_interval,
+            id="workflow_triggers",
+            name="工作流定时触发任务",
+            misfire_grace_time=None,
+        )
+
     logger.info("✅ All background tasks registered")
     logger.info("📋 Registered tasks:")
     for job in scheduler_manager_ist.get_jobs():
@@ -30,6 +94,21 @@ async def start_background_tasks():
     # 注册所有后台任务
     register_background_tasks()
 
+    if settings.browser_warm_pool_enabled:
+        await get_default_warm_pool().start()
+
+    if (session_router := get_default_session_router()) is not None:
+        await session_router.start()
+
+    if settings.action_log_async_write:
+        await action_log_writer.start()
+
+    if settings.workflow_trigger_enabled:
+        if settings.browser_warm_pool_enabled:
+            # 即将执行的定时工作流提前预热浏览器
+            workflow_trigger_scheduler.schedule_hint = get_default_warm_pool().add_scheduled_hint
+        await workflow_trigger_scheduler.load_from_db()
+
     # 启动调度器
     scheduler_manager_ist.start()
 
@@ -43,4 +122,16 @@ async def stop_background_tasks():
     # 关闭调度器
     scheduler_manager_ist.shutdown(wait=True)
 
+    if settings.browser_warm_pool_enabled:
+        await get_default_warm_pool().stop()
+
+    if (session_router := get_default_session_router()) is not None:
+        await session_router.stop()
+
+    # 取消仍在执行的定时工作流
+    await workflow_trigger_scheduler.close()
+
+    # 排空待写入的操作日志
+    await action_log_writer.stop()
+
     logger.info("✅ Background tasks stopped successfully")
@@ -0,0 +1,43 @@
+"""
+多节点会话路由依赖注入函数
+用于把请求转发到浏览器会话所属的节点
+"""
+import httpx
+from fastapi import Depends, Request
+from loguru import logger
+
+from bili_common.models.depends import BrowserReqAuthInfo
+from app.models.common.exceptions.base_exception import SessionOwnerUnavailableException
+from app.services.RPA_browser.cluster import SessionForwardedException, get_default_session_router
+from app.utils.depends.security_depends import verify_browser_ownership
+
+
+async def route_to_session_owner(
+    request: Request,
+    browser_req: BrowserReqAuthInfo = Depends(verify_browser_ownership),
+) -> None:
+    """
+    确保请求在浏览器会话所属的节点上处理（未启用 cluster_enabled 时不做任何事）
+
+    Args:
+        request: 当前请求
+        browser_req: 验证通过的浏览器请求信息
+
+    Raises:
+        SessionForwardedException: 请求已转发给所属节点，携带所属节点的响应
+        SessionOwnerUnavailableException: 所属节点不可达
+    """
+    router = get_default_session_router()
+    if router is None or router.is_forwarded(request):
+        return
+
+    owner = await router.locate(browser_req.auth_info.mid, int(browser_req.browser_id))
+    if router.is_local(owner):
+        return
+
+    try:
+        response = await router.forward(request, owner)
+    except httpx.HTTPError as e:
+        logger.warning(f"转发请求到节点 {owner.node_id} 失败: {e}")
+        raise SessionOwnerUnavailableException(node_id=owner.node_id) from e
+    raise SessionForwardedException(response, owner.node_id)
@@ -12,6 +12,7 @@ from bili_common.models.depends import (
     BrowserReqAuthInfo,
 )
 from app.services.RPA_browser.fingerprint.browser_fingerprint_service import BrowserFingerprintService
+from app.services.RPA_browser.fingerprint.ownership_cache import browser_ownership_cache
 from app.services.RPA_browser.permission_config_service import PermissionConfigService
 from app.utils.depends.mid_depends import AuthInfo, get_auth_info_from_header
 from app.utils.depends.session_manager import DatabaseSessionManager
@@ -20,15 +21,15 @@ from app.utils.depends.session_manager import DatabaseSessionManager
 async def _verify_browser_ownership_core(
     browser_id: int | str,
     auth_info: AuthInfo,
-    session: AsyncSession,
 ) -> BrowserReqAuthInfo:
     """
     验证浏览器ID是否属于当前用户MID（核心逻辑）
 
+    归属结果来自 browser_ownership_cache，按用户整体缓存，未命中时才查询数据库
+
     Args:
         browser_id: 浏览器ID
         auth_info: 认证信息
-        session: 数据库会话
 
     Returns:
         BrowserReqAuthInfo: 验证通过的浏览器请求信息
@@ -36,15 +37,12 @@ async def _verify_browser_ownership_core(
     Raises:
         BrowserIdNotBeloneToUserException: 当浏览器不属于用户或不存在时抛出
     """
+    try:
+        owned = await browser_ownership_cache.is_owner(auth_info.mid, int(browser_id))
+    except ValueError:
+        owned = False
 
-    # 验证浏览器指纹是否存在且属于当前用户
-    fingerprint_info = await BrowserFingerprintService.read_fingerprint(
-        browser_id=browser_id,
-        mid=auth_info.mid,
-        session=session,
-    )
-
-    if not fingerprint_info:
+    if not owned:
         raise BrowserIdNotBeloneToUserException(browser_id=browser_id)
 
     return BrowserReqAuthInfo(auth_info=auth_info, browser_id=browser_id)
@@ -53,7 +51,6 @@ async def _verify_browser_ownership_core(
 async def verify_browser_ownership(
     browser_id: int | str,
     auth_info: AuthInfo = Depends(get_auth_info_from_header),
-    session: AsyncSession = DatabaseSessionManager.get_dependency(),
 ) -> BrowserReqAuthInfo:
     """
     验证浏览器ID是否属于当前用户MID（GET 请求使用）
@@ -61,7 +58,6 @@ async def verify_browser_ownership(
     Args:
         browser_id: 浏览器ID（从 query 参数获取）
         auth_info: 认证信息（从请求头获取）
-        session: 数据库会话
 
     Returns:
         BrowserReqAuthInfo: 验证通过的浏览器请求信息
@@ -69,7 +65,7 @@ async def verify_browser_ownership(
     Raises:
         HTTPException: 当浏览器不属于用户或不存在时抛出
     """
-    return await _verify_browser_ownership_core(browser_id, auth_info, session)
+    return await _verify_browser_ownership_core(browser_id, auth_info)
 
 async def verify_fingerprint_limit(
     auth_info: AuthInfo = Depends(get_auth_info_from_header),
@@ -3,10 +3,12 @@ from typing import Any, AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import DisconnectionError, OperationalError
-from sqlalchemy import text
+from sqlalchemy import event, text
 from app.config import settings
 import asyncio
+import time
 from loguru import logger
+from app.utils.metrics.registry import metrics_registry
 
 # 数据库连接重试配置
 MAX_RETRIES = 3
@@ -36,6 +38,55 @@ engine = create_async_engine(
     connect_args=_connect_args,
 )
 
+# SQL 执行耗时：按语句类型统计，不以语句文本为标签（避免标签基数失控）
+_SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK"})
+_DB_QUERY_SECONDS = metrics_registry.histogram(
+    "rpa_db_query_duration_seconds", "单条 SQL 的执行耗时", ("operation",),
+)
+_DB_QUERY_ERRORS = metrics_registry.counter(
+    "rpa_db_query_errors_total", "执行失败的 SQL 条数", ("operation",),
+)
+
+
+def _sql_operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    verb = head[0].upper() if head else ""
+    return verb if verb in _SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_query_start", None)
+    if start is not None:
+        _DB_QUERY_SECONDS.labels(_sql_operation(statement)).observe(time.perf_counter() - start)
+
+
+def _handle_error(exception_context):
+    _DB_QUERY_ERRORS.labels(_sql_operation(exception_context.statement or "")).inc()
+
+
+if settings.metrics_enabled:
+    # 异步引擎的事件挂在其同步引擎上，由事件循环线程在 greenlet 中同步触发
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+def _pool_connections():
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    return [(("checked_out",), pool.checkedout()), (("idle",), pool.checkedin())]
+
+
+metrics_registry.gauge(
+    "rpa_db_pool_connections", "数据库连接池中的连接数", ("state",), collect=_pool_connections,
+)
+
 
 class DatabaseSessionManager:
     @staticmethod
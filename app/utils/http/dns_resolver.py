@@ -0,0 +1,154 @@
+"""
+DNS 解析 —— 不阻塞事件循环、带缓存的异步解析器
+
+socket.getaddrinfo 是阻塞调用，直接在事件循环里执行时，一个慢 DNS 会卡住进程内
+所有浏览器会话、WebRTC 推流和 API 请求。
+
+结构:
+    ThreadPoolResolver — 在有界线程池中执行 getaddrinfo（线程数有上限，慢解析不会无限堆积线程）
+    CachingResolver    — 包装任意后端:
+        - 正向缓存: hostname → IP 列表，ttl 秒内直接命中
+        - 负向缓存: 解析失败 / 超时同样缓存 negative_ttl 秒，避免对坏域名反复等待
+        - 同名合并: 同一 hostname 的并发查询只发起一次后端解析，其余等待同一结果
+        - 超时: 单次解析最多等待 timeout 秒（线程继续执行，调用方不再等待）
+
+getaddrinfo 不返回记录的真实 TTL，缓存时间取配置值。
+"""
+import asyncio
+import socket
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.config import settings
+
+# 解析后端：hostname → IP 地址列表，解析失败抛出 socket.gaierror / OSError
+Resolver = Callable[[str], Awaitable[list[str]]]
+
+
+class ThreadPoolResolver:
+    """在有界线程池中执行 socket.getaddrinfo（同时返回 IPv4 / IPv6 地址）"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max(1, max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+
+    @staticmethod
+    def _getaddrinfo(hostname: str) -> list[str]:
+        infos = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def __call__(self, hostname: str) -> list[str]:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="dns-resolver")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._getaddrinfo, hostname)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class CachingResolver:
+    """带正向 / 负向缓存与同名合并的异步解析器"""
+
+    def __init__(
+        self,
+        backend: Resolver,
+        *,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        timeout: float = 5.0,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        # hostname → (过期时间, IP 列表, 失败时的异常)
+        self._entries: OrderedDict[str, tuple[float, list[str], BaseException | None]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[list[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+
+    async def resolve(self, hostname: str) -> list[str]:
+        """解析主机名，返回去重后的 IP 列表；解析失败抛出 socket.gaierror / TimeoutError"""
+        hostname = hostname.strip().lower()
+        entry = self._entries.get(hostname)
+        if entry is not None and entry[0] > self._clock():
+            self.hits += 1
+            self._entries.move_to_end(hostname)
+            if entry[2] is not None:
+                raise type(entry[2])(*entry[2].args)
+            return list(entry[1])
+
+        self.misses += 1
+        task = self._inflight.get(hostname)
+        if task is None:
+            task = asyncio.create_task(self._lookup(hostname))
+            # 所有等待者都被取消时也取走异常，避免 "exception was never retrieved" 告警
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[hostname] = task
+        # shield：某个等待者被取消不会中断其他等待者共享的解析
+        return list(await asyncio.shield(task))
+
+    async def _lookup(self, hostname: str) -> list[str]:
+        self.lookups += 1
+        try:
+            addresses = await asyncio.wait_for(self._backend(hostname), self.timeout)
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f"no address for {hostname}")
+        except (OSError, TimeoutError) as e:
+            self._store(hostname, self.negative_ttl, [], e)
+            raise
+        else:
+            self._store(hostname, self.ttl, addresses, None)
+            return addresses
+        finally:
+            self._inflight.pop(hostname, None)
+
+    def _store(self, hostname: str, ttl: float, addresses: list[str], error: BaseException | None) -> None:
+        if ttl <= 0:
+            return
+        self._entries[hostname] = (self._clock() + ttl, addresses, error)
+        self._entries.move_to_end(hostname)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, hostname: str) -> None:
+        self._entries.pop(hostname.strip().lower(), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "lookups": self.lookups,
+        }
+
+
+# 进程内默认解析器（URLSecurityChecker 等使用）
+dns_resolver = CachingResolver(
+    ThreadPoolResolver(settings.dns_resolver_max_workers),
+    ttl=settings.dns_cache_ttl,
+    negative_ttl=settings.dns_negative_cache_ttl,
+    timeout=settings.dns_resolve_timeout,
+    max_entries=settings.dns_cache_max_entries,
+)
+
+
+__all__ = ["Resolver", "ThreadPoolResolver", "CachingResolver", "dns_resolver"]
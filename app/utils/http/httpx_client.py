@@ -2,13 +2,22 @@
 HTTPX asynchronous client wrapper module
 Provides encapsulated asynchronous HTTP request functionality
 if headers is None, provide default headers with random fingerprint
+
+Long-lived clients are pooled by HttpClientManager, keyed by
+(proxy, verify, http2, timeout), so repeated requests reuse keep-alive
+connections instead of paying TCP/TLS/proxy CONNECT setup every time.
 """
 import httpx
 import asyncio
+import time
+from collections import OrderedDict
 from collections.abc import Callable
-from typing import Dict, Any, Union
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Any, NamedTuple, Union
 from loguru import logger
 
+from app.config import settings
+
 from app.utils.http.rand_headers_gen import rand_fingerprint_generator
 
 
@@ -37,6 +46,9 @@ class AsyncHttpClient:
         self.base_url = base_url
         self.kwargs = kwargs
         self.client: httpx.AsyncClient | None = None
+        # Requests currently running on this client, used by HttpClientManager
+        # to decide when a pooled client can be closed
+        self.inflight = 0
 
     async def __aenter__(self):
         """Async context manager entry"""
@@ -98,6 +110,7 @@ class AsyncHttpClient:
         if not self.client:
             await self.start()
 
+        self.inflight += 1
         try:
             response = await self.client.request(
                 method=method,
@@ -119,6 +132,8 @@ class AsyncHttpClient:
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error for {method.upper()} {url}: {str(e)}")
             raise
+        finally:
+            self.inflight -= 1
 
     async def get(self, 
                   url: str,
@@ -246,6 +261,212 @@ def get_global_http_client() -> AsyncHttpClient:
     return _default_http_client
 
 
+class ClientKey(NamedTuple):
+    """Connection-relevant settings that a pooled client is keyed by"""
+    proxy: str | None
+    verify: bool
+    http2: bool
+    timeout: float
+
+
+def _stateless_cookies() -> CookieJar:
+    """A cookie jar that never stores cookies.
+
+    Pooled clients are shared by unrelated callers, so cookies set by one
+    response must not be sent with another caller's requests.
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+class HttpClientManager:
+    """
+    Pool of long-lived AsyncHttpClient instances keyed by ClientKey
+
+    Each client keeps a bounded connection pool (httpx.Limits) so repeated
+    requests to the same host reuse keep-alive connections. Clients unused
+    for idle_ttl seconds, and least recently used clients beyond max_clients,
+    are closed once they have no requests in flight.
+    """
+
+    def __init__(self,
+                 *,
+                 max_clients: int = 32,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 idle_ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_clients: Maximum number of pooled clients (distinct keys)
+            max_connections: Connection limit of each client
+            max_keepalive_connections: Idle keep-alive connections kept by each client
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open
+            idle_ttl: Seconds after which an unused client is closed
+            clock: Monotonic time source
+        """
+        self.max_clients = max(1, max_clients)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        # key -> (client, time it was last handed out)
+        self._clients: OrderedDict[ClientKey, tuple[AsyncHttpClient, float]] = OrderedDict()
+        # Evicted clients that still had requests in flight, closed on a later sweep
+        self._retired: list[AsyncHttpClient] = []
+        self.created = 0
+        self.closed = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def get_client(self,
+                         *,
+                         proxy: str | None = None,
+                         verify: bool = True,
+                         http2: bool = False,
+                         timeout: float = 30.0) -> AsyncHttpClient:
+        """
+        Get (or create) the pooled client for the given settings
+
+        Args:
+            proxy: Proxy URL, None for a direct connection
+            verify: Whether to verify TLS certificates
+            http2: Whether to enable HTTP/2 (requires the h2 package)
+            timeout: Default timeout of the client in seconds
+
+        Returns:
+            A started AsyncHttpClient; do not close it, the manager owns it
+        """
+        await self.sweep()
+        key = ClientKey(proxy or None, verify, http2, float(timeout))
+        entry = self._clients.get(key)
+        if entry is not None:
+            client = entry[0]
+        else:
+            client = AsyncHttpClient(
+                timeout=timeout,
+                proxy=key.proxy,
+                verify=verify,
+                http2=http2,
+                limits=self.limits,
+                cookies=_stateless_cookies(),
+            )
+            await client.start()
+            self.created += 1
+        self._clients[key] = (client, self._clock())
+        self._clients.move_to_end(key)
+        if len(self._clients) > self.max_clients:
+            while len(self._clients) > self.max_clients:
+                _, (evicted, _) = self._clients.popitem(last=False)
+                self._retired.append(evicted)
+            await self.sweep()
+        return client
+
+    async def sweep(self) -> None:
+        """Close idle clients and retired clients without requests in flight
+
+        Runs on every get_client call and periodically from the background
+        task, so idle clients are closed even when there is no traffic.
+        """
+        now = self._clock()
+        for key, (client, last_used) in list(self._clients.items()):
+            if client.inflight == 0 and now - last_used > self.idle_ttl:
+                del self._clients[key]
+                self._retired.append(client)
+
+        still_busy: list[AsyncHttpClient] = []
+        for client in self._retired:
+            if client.inflight:
+                still_busy.append(client)
+                continue
+            await client.close()
+            self.closed += 1
+        self._retired = still_busy
+
+    async def close_all(self) -> None:
+        """Close every pooled client (called on application shutdown)"""
+        clients = [client for client, _ in self._clients.values()] + self._retired
+        self._clients.clear()
+        self._retired = []
+        for client in clients:
+            await client.close()
+            self.closed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "retired": len(self._retired),
+            "inflight": sum(client.inflight for client, _ in self._clients.values()),
+            "created": self.created,
+            "closed": self.closed,
+        }
+
+
+_client_manager: HttpClientManager | None = None
+
+
+def get_http_client_manager() -> HttpClientManager:
+    """
+    Get the global HttpClientManager instance
+
+    Returns:
+        HttpClientManager instance
+    """
+    global _client_manager
+    if _client_manager is None:
+        _client_manager = HttpClientManager(
+            max_clients=settings.http_client_max_clients,
+            max_connections=settings.http_client_max_connections,
+            max_keepalive_connections=settings.http_client_max_keepalive_connections,
+            keepalive_expiry=settings.http_client_keepalive_expiry,
+            idle_ttl=settings.http_client_idle_ttl,
+        )
+    return _client_manager
+
+
+async def get_http_client(*,
+                          proxy: str | None = None,
+                          verify: bool = True,
+                          http2: bool = False,
+                          timeout: float = 30.0) -> AsyncHttpClient:
+    """
+    Get a pooled client from the global HttpClientManager
+
+    Args:
+        proxy: Proxy URL, None for a direct connection
+        verify: Whether to verify TLS certificates
+        http2: Whether to enable HTTP/2
+        timeout: Default timeout of the client in seconds
+
+    Returns:
+        AsyncHttpClient instance owned by the manager
+    """
+    return await get_http_client_manager().get_client(
+        proxy=proxy, verify=verify, http2=http2, timeout=timeout
+    )
+
+
+async def sweep_idle_http_clients() -> None:
+    """Close idle pooled clients of the global HttpClientManager, if it exists"""
+    if _client_manager is not None:
+        await _client_manager.sweep()
+
+
+async def close_http_clients() -> None:
+    """Close the global client and every pooled client"""
+    global _default_http_client
+    if _client_manager is not None:
+        await _client_manager.close_all()
+    if _default_http_client is not None:
+        await _default_http_client.close()
+        # A later restart in the same process gets a fresh client
+        _default_http_client = None
+
+
 async def request(method: str,
                   url: str,
                   *,
@@ -276,33 +497,20 @@ async def request(method: str,
     if headers is None:
         fp_rand = rand_fingerprint_generator.generate()
         headers = fp_rand.headers
-    client = get_global_http_client()
     if timeout:
-        # Create a temporary client with custom timeout
-        temp_client = AsyncHttpClient(timeout=timeout)
-        try:
-            await temp_client.start()
-            return await temp_client.request(
-                method, url,
-                content=content,
-                data=data,
-                json=json,
-                params=params,
-                headers=headers,
-                **kwargs
-            )
-        finally:
-            await temp_client.close()
+        # Pooled client with the custom timeout, reused across calls
+        client = await get_http_client(timeout=timeout)
     else:
-        return await client.request(
-            method, url,
-            content=content,
-            data=data,
-            json=json,
-            params=params,
-            headers=headers,
-            **kwargs
-        )
+        client = get_global_http_client()
+    return await client.request(
+        method, url,
+        content=content,
+        data=data,
+        json=json,
+        params=params,
+        headers=headers,
+        **kwargs
+    )
 
 
 async def get(url: str,
@@ -425,7 +633,13 @@ async def delete(url: str,
 
 __all__ = [
     "AsyncHttpClient",
+    "ClientKey",
+    "HttpClientManager",
     "get_global_http_client",
+    "get_http_client_manager",
+    "get_http_client",
+    "sweep_idle_http_clients",
+    "close_http_clients",
     "request",
     "get",
     "post",
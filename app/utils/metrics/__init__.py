@@ -0,0 +1,3 @@
+"""
+进程内运行指标与采样剖析
+"""
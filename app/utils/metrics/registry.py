@@ -0,0 +1,327 @@
+"""
+MetricsRegistry — 进程内运行指标（Prometheus 文本格式导出）
+
+热路径（执行每个 action、每条 SQL、每个 WebRTC 帧）只做几次加法，导出时才汇总格式化：
+
+指标类型:
+    Counter    — 单调递增计数，labels(...).inc()
+    Gauge      — 当前值，labels(...).set() 或注册时传入 collect 回调，在导出时从已有的 stats() 拉取
+    Histogram  — 固定分桶的耗时分布，labels(...).observe(seconds)
+                 observe 只做一次二分查找 + 两次加法，分桶累计（le）在导出时计算
+
+数据结构:
+    metric._children: dict[标签值元组, Child]   — 同一组标签值只创建一次 Child，热路径可提前取出复用
+    registry._metrics: dict[name, Metric]       — 按注册顺序导出；同名重复注册返回已有实例（模块重载 / 测试安全）
+
+计数不加锁：埋点都在事件循环线程中执行（SQLAlchemy 事件同样由事件循环线程触发）。
+settings.metrics_enabled=False 时 Counter / Histogram 的 labels() 返回空操作 Child，埋点不再记录。
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from loguru import logger
+
+from app.config import settings
+
+# Prometheus 文本格式 0.0.4
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认分桶（秒）：覆盖单个操作 / SQL 的毫秒级到分钟级
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# 拉取式 Gauge 的回调：无标签时返回数值；有标签时返回 (标签值元组, 数值) 序列
+GaugeCollector = Callable[[], float | Iterable[tuple[Sequence[Any], float]]]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _NoopChild:
+    """指标关闭时 labels() 返回的空操作 Child"""
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+_NOOP = _NoopChild()
+
+
+class _Metric:
+    """指标基类：按标签值元组管理 Child"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), *, enabled: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._children: dict[tuple, Any] = {}
+        if not self.labelnames and enabled:
+            # 无标签指标从一开始就导出（值为 0），便于区分"没有发生"与"没有采集"
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """取指定标签值的 Child（首次访问时创建），热路径可提前取出复用"""
+        if not self.enabled:
+            return _NOOP
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际传入 {values}")
+            # labels(1) 与 labels("1") 是同一个 Child
+            normalized = tuple(str(v) for v in values)
+            child = self._children.get(normalized)
+            if child is None:
+                child = self._children[normalized] = self._new_child()
+            # 非字符串标签值同时以原值为键，下次直接命中
+            self._children[values] = child
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _unique_children(self) -> Iterable[tuple[tuple, Any]]:
+        seen: set[int] = set()
+        for values, child in list(self._children.items()):
+            if id(child) not in seen:
+                seen.add(id(child))
+                yield tuple(str(v) for v in values), child
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """单调递增计数（名称以 _total 结尾）"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._unique_children():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """当前值：直接 set，或在导出时调用 collect 回调拉取（队列深度、缓存大小等已有统计）"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        collect: GaugeCollector | None = None,
+        enabled: bool = True,
+    ):
+        # Gauge 不产生热路径开销，不受 metrics_enabled 影响
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def _samples(self) -> Iterable[str]:
+        if self.collect is None:
+            for values, child in self._unique_children():
+                yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            return
+        collected = self.collect()
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(float(collected))}"
+            return
+        for values, value in collected:
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(float(value))}"
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # 最后一格对应 +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """固定分桶的分布（耗时单位为秒）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        enabled: bool = True,
+    ):
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames, enabled=enabled)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._unique_children():
+            cumulative = 0
+            for bound, count in zip((*self.upper_bounds, math.inf), child.counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*values, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """进程内指标注册表"""
+
+    def __init__(self, *, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, cls: type[_Metric], name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        metric = self._metrics.get(name)
+        if metric is not None:
+            if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+        metric = self._metrics[name] = cls(name, documentation, labelnames, enabled=self.enabled, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        collect: GaugeCollector | None = None,
+    ) -> Gauge:
+        gauge = self._register(Gauge, name, documentation, labelnames)
+        if collect is not None:
+            gauge.collect = collect
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """导出全部指标；单个拉取式指标回调失败时跳过该指标，不影响其余输出"""
+        blocks: list[str] = []
+        for metric in list(self._metrics.values()):
+            try:
+                blocks.append(metric.render())
+            except Exception as e:
+                logger.warning(f"[Metrics] 导出指标 {metric.name} 失败: {e}")
+        return "\n".join(blocks) + "\n"
+
+
+metrics_registry = MetricsRegistry(enabled=settings.metrics_enabled)
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "DEFAULT_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics_registry",
+]
@@ -1,7 +1,8 @@
 from .botright import Botright
 from .modules.faker import Faker
+from .modules.playwright_driver import PlaywrightDriverManager
 from .modules.proxy_manager import ProxyManager
 
 VERSION = "0.5.1"
 
-__all__ = ["Botright", "Faker", "ProxyManager", "VERSION"]
+__all__ = ["Botright", "Faker", "PlaywrightDriverManager", "ProxyManager", "VERSION"]
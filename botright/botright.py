@@ -12,11 +12,12 @@ import loguru
 from async_class import AsyncObject
 from browserforge.fingerprints import Fingerprint
 from patchright.async_api import async_playwright as undetected_async_playwright
-from playwright.async_api import APIResponse, Playwright, async_playwright
+from playwright.async_api import Playwright, async_playwright
 
 from app.utils.http.rand_headers_gen import desktop_fingerprint_generator
 from botright.playwright_mock import browser
 from .modules import Faker, ProxyManager
+from .modules.playwright_driver import DriverLease, PlaywrightDriverManager
 from .playwright_mock import BrowserContext
 
 class Botright(AsyncObject):
@@ -25,13 +26,16 @@ class Botright(AsyncObject):
             headless: Optional[bool] = False,
             block_images: Optional[bool] = False,
             cache_responses: Optional[bool] = False,
+            response_cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+            response_cache_disk_bytes: Optional[int] = 256 * 1024 * 1024,
             user_action_layer: Optional[bool] = False,
             scroll_into_view: Optional[bool] = True,
             spoof_canvas: Optional[bool] = True,
             mask_fingerprint: Optional[bool] = True,
             use_undetected_playwright: Optional[bool] = False,
             fingerprint: Optional[Fingerprint] = None,
-            execute_path: Optional[str] = None
+            execute_path: Optional[str] = None,
+            driver_manager: Optional[PlaywrightDriverManager] = None
     ) -> None:
         """
         Initialize a Botright instance with specified configurations.
@@ -40,11 +44,14 @@ class Botright(AsyncObject):
             headless (bool, optional): Whether to run the browser in headless mode. Defaults to False.
             block_images (bool, optional): Whether to block images in the browser. Defaults to False.
             cache_responses (bool, optional): Whether to cache HTTP responses. Defaults to False.
+            response_cache_max_bytes (int, optional): Memory budget of the response cache per browser context. Defaults to 64 MiB.
+            response_cache_disk_bytes (int, optional): Size of the on-disk response cache under the profile directory, 0 disables it. Defaults to 256 MiB.
             user_action_layer (bool, optional): Whether to enable user action simulation layer. Defaults to False.
             scroll_into_view (bool, optional): Whether to scroll elements into view automatically. Defaults to True.
             spoof_canvas (bool, optional): Whether to disable canvas fingerprinting protection. Defaults to True.
             mask_fingerprint (bool, optional): Whether to mask the browser fingerprint. Defaults to True.
             use_undetected_playwright (bool, optional): Whether to use undetected_playwright (TEMP). Defaults to False.
+            driver_manager (PlaywrightDriverManager, optional): Borrow a shared Playwright driver instead of starting one. Defaults to None.
         """
         # This Init Function is only for intellisense.
         super().__init__()
@@ -54,13 +61,16 @@ class Botright(AsyncObject):
             headless: Optional[bool] = False,
             block_images: Optional[bool] = False,
             cache_responses: Optional[bool] = False,
+            response_cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+            response_cache_disk_bytes: Optional[int] = 256 * 1024 * 1024,
             user_action_layer: Optional[bool] = False,
             scroll_into_view: Optional[bool] = True,
             spoof_canvas: Optional[bool] = True,
             mask_fingerprint: Optional[bool] = True,
             use_undetected_playwright: Optional[bool] = False,
             fingerprint: Optional[Fingerprint] = None,
-            execute_path: Optional[str] = None
+            execute_path: Optional[str] = None,
+            driver_manager: Optional[PlaywrightDriverManager] = None
     ) -> None:
         """
         Initialize a Botright instance with specified configurations.
@@ -69,16 +79,24 @@ class Botright(AsyncObject):
             headless (bool, optional): Whether to run the browser in headless mode. Defaults to False.
             block_images (bool, optional): Whether to block images in the browser. Defaults to False.
             cache_responses (bool, optional): Whether to cache HTTP responses. Defaults to False.
+            response_cache_max_bytes (int, optional): Memory budget of the response cache per browser context. Defaults to 64 MiB.
+            response_cache_disk_bytes (int, optional): Size of the on-disk response cache under the profile directory, 0 disables it. Defaults to 256 MiB.
             user_action_layer (bool, optional): Whether to enable user action simulation layer. Defaults to False.
             scroll_into_view (bool, optional): Whether to scroll elements into view automatically. Defaults to True.
             spoof_canvas (bool, optional): Whether to disable canvas fingerprinting protection. Defaults to True.
             mask_fingerprint (bool, optional): Whether to mask the browser fingerprint. Defaults to True.
             use_undetected_playwright (bool, optional): Whether to use undetected_playwright . EXPERIMENTAL (TEMP). Defaults to False.
+            driver_manager (PlaywrightDriverManager, optional): Borrow a shared Playwright driver instead of starting one. Defaults to None.
         """
-        # Starting Playwright
-        if use_undetected_playwright:
+        # Starting Playwright (or borrowing a shared driver, which skips spawning a Node process per instance)
+        self.driver_lease: Optional[DriverLease] = None
+        self.driver_manager = driver_manager
+        if driver_manager:
+            self.driver_lease = await driver_manager.acquire(undetected=bool(use_undetected_playwright))
+            self.playwright: Playwright = self.driver_lease.playwright
+        elif use_undetected_playwright:
             # (TODO: TEMP)
-            self.playwright: Playwright = await undetected_async_playwright().start()
+            self.playwright = await undetected_async_playwright().start()
         else:
             self.playwright = await async_playwright().start()
 
@@ -90,11 +108,12 @@ class Botright(AsyncObject):
         self.headless = headless
         self.block_images = block_images
         self.cache_responses = cache_responses
+        self.response_cache_max_bytes = response_cache_max_bytes
+        self.response_cache_disk_bytes = response_cache_disk_bytes
         self.scroll_into_view = scroll_into_view
         self.user_action_layer = user_action_layer
         self.mask_fingerprint = mask_fingerprint
         self.use_undetected_playwright = use_undetected_playwright
-        self.cache: Dict[str, APIResponse] = {}
 
         # '--disable-gpu', '--incognito', '--disable-blink-features=AutomationControlled'
         # fmt: off
@@ -179,14 +198,19 @@ class Botright(AsyncObject):
     async def __adel__(self) -> None:
         """
         Cleanup method called when the Botright instance is closed.
-        Closes all associated browser instances and stops the Playwright engine.
+        Closes all associated browser instances and stops (or releases) the Playwright engine.
         """
         for obj in self.stoppable:
             with suppress(Exception):
                 await obj.close()
 
-        with suppress(Exception):
-            await self.playwright.stop()
+        if self.driver_lease:
+            # Shared driver: hand it back instead of stopping it for everyone
+            with suppress(Exception):
+                await self.driver_manager.release(self.driver_lease)
+        else:
+            with suppress(Exception):
+                await self.playwright.stop()
 
         for temp_dir in self.temp_dirs:
             if os.path.exists(temp_dir.name):
@@ -1,4 +1,6 @@
 from .faker import Faker
+from .playwright_driver import PlaywrightDriverManager
 from .proxy_manager import ProxyManager
+from .response_cache import ResponseCache, ResponseCacheBudget, default_response_cache_budget
 
-__all__ = ["Faker", "ProxyManager"]
+__all__ = ["Faker", "PlaywrightDriverManager", "ProxyManager", "ResponseCache", "ResponseCacheBudget", "default_response_cache_budget"]
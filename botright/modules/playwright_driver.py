@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import loguru
+from patchright.async_api import async_playwright as undetected_async_playwright
+from playwright.async_api import Playwright, async_playwright
+
+
+class DriverManagerClosedError(Exception):
+    pass
+
+
+@dataclass
+class DriverShard:
+    """
+    A single Playwright driver (one Node process) shared by many Botright instances.
+    """
+
+    index: int
+    undetected: bool
+    playwright: Optional[Playwright] = None
+    refcount: int = 0
+    starts: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class DriverLease:
+    """
+    A borrowed reference to a shard's driver. Must be handed back via `PlaywrightDriverManager.release`.
+    """
+
+    shard: DriverShard
+    playwright: Playwright
+    released: bool = False
+
+
+class PlaywrightDriverManager:
+    """
+    Process-wide pool of Playwright drivers.
+
+    Instead of every Botright instance spawning its own Node driver through `async_playwright().start()`,
+    instances borrow a driver from one of N shards per flavour (playwright / patchright). Shards are
+    refcounted, lazily started on first use and transparently restarted when the driver connection died.
+    """
+
+    def __init__(self, shards: int = 1, keep_alive: bool = True) -> None:
+        """
+        Args:
+            shards (int, optional): Number of drivers per flavour. Borrowers go to the least loaded shard. Defaults to 1.
+            keep_alive (bool, optional): Keep an idle driver running when its refcount drops to zero,
+                so the next launch skips the driver spawn. Defaults to True.
+        """
+        self.keep_alive = keep_alive
+        self._shards: dict[bool, List[DriverShard]] = {
+            undetected: [DriverShard(index=i, undetected=undetected) for i in range(max(1, shards))]
+            for undetected in (False, True)
+        }
+        self._closed = False
+
+    @property
+    def shards(self) -> List[DriverShard]:
+        return self._shards[False] + self._shards[True]
+
+    @property
+    def running_drivers(self) -> int:
+        return sum(1 for shard in self.shards if shard.playwright is not None)
+
+    async def acquire(self, undetected: bool = False) -> DriverLease:
+        """
+        Borrow a running driver, starting or restarting the chosen shard if necessary.
+
+        Args:
+            undetected (bool, optional): Borrow a patchright driver instead of a playwright one. Defaults to False.
+
+        Returns:
+            DriverLease: The borrowed driver.
+        """
+        if self._closed:
+            raise DriverManagerClosedError("PlaywrightDriverManager has been shut down")
+
+        shard = min(self._shards[undetected], key=lambda s: s.refcount)
+        # Reserve the slot before awaiting so concurrent borrowers spread over the shards
+        shard.refcount += 1
+        try:
+            async with shard.lock:
+                if shard.playwright is not None and not self._is_alive(shard.playwright):
+                    loguru.logger.warning(f"Playwright driver shard {shard.index} (undetected={undetected}) died, restarting")
+                    await self._stop_driver(shard.playwright)
+                    shard.playwright = None
+                if shard.playwright is None:
+                    shard.playwright = await self._start_driver(undetected)
+                    shard.starts += 1
+                return DriverLease(shard=shard, playwright=shard.playwright)
+        except BaseException:
+            shard.refcount -= 1
+            raise
+
+    async def release(self, lease: DriverLease) -> None:
+        """
+        Hand a lease back. The driver is stopped once unused unless `keep_alive` is set.
+
+        Args:
+            lease (DriverLease): The lease returned by `acquire`.
+        """
+        if lease.released:
+            return
+        lease.released = True
+        shard = lease.shard
+        shard.refcount = max(0, shard.refcount - 1)
+        if shard.refcount or self.keep_alive:
+            return
+        async with shard.lock:
+            # A borrower may have arrived while we waited for the lock
+            if shard.refcount == 0 and shard.playwright is lease.playwright:
+                await self._stop_driver(shard.playwright)
+                shard.playwright = None
+
+    async def shutdown(self) -> None:
+        """
+        Stop every driver. Further `acquire` calls raise `DriverManagerClosedError`.
+        """
+        self._closed = True
+        for shard in self.shards:
+            async with shard.lock:
+                if shard.playwright is not None:
+                    await self._stop_driver(shard.playwright)
+                    shard.playwright = None
+                shard.refcount = 0
+
+    async def _start_driver(self, undetected: bool) -> Playwright:
+        if undetected:
+            return await undetected_async_playwright().start()
+        return await async_playwright().start()
+
+    @staticmethod
+    async def _stop_driver(playwright: Playwright) -> None:
+        with suppress(Exception):
+            await playwright.stop()
+
+    @staticmethod
+    def _is_alive(playwright: Playwright) -> bool:
+        """
+        A driver is considered dead once its connection recorded a closed error (driver process exited or pipe broke).
+        """
+        try:
+            return playwright._impl_obj._connection._closed_error is None
+        except AttributeError:
+            return True
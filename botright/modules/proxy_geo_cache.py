@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from tempfile import gettempdir
+from typing import Awaitable, Callable, Dict, Optional
+
+import loguru
+
+
+@dataclass
+class ProxyGeoInfo:
+    """
+    Egress IP and geolocation of a proxy (or of the direct connection).
+    """
+
+    ip: str = ""
+    country: str = ""
+    country_code: str = ""
+    latitude: str = ""
+    longitude: str = ""
+    timezone: str = ""
+    fetched_at: float = 0.0
+
+
+GeoFetcher = Callable[[], Awaitable[ProxyGeoInfo]]
+
+
+class GeoLookupError(Exception):
+    """
+    The proxy was reachable and reported its egress IP, only the geolocation APIs failed.
+    """
+
+    def __init__(self, message: str, ip: str) -> None:
+        super().__init__(message)
+        self.ip = ip
+
+
+class ProxyGeoCache:
+    """
+    Persistent cache of proxy egress IP / geolocation, keyed by proxy URL.
+
+    Entries live in memory and in a SQLite file, so they survive restarts and are shared between processes.
+    Lookups follow a stale-while-revalidate policy:
+
+    - younger than `refresh_after`: returned as is
+    - younger than `ttl`: returned immediately, a background refresh is started
+    - missing or older than `ttl`: the caller waits for a lookup
+
+    An expired entry is only served when the lookup fails with `GeoLookupError` for the same egress IP, i.e. the proxy
+    is alive and unchanged and only the geolocation APIs are down. Any other failure (dead or rotated proxy) propagates,
+    and a failed background refresh drops the entry, so a launch never gets a stale timezone / locale fingerprint.
+    Concurrent lookups for the same proxy are single-flighted. Keys are stored hashed because proxy URLs carry credentials.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 24 * 3600,
+        refresh_after: float = 3600,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            path (str, optional): SQLite file path. None keeps the cache in memory only. Defaults to None.
+            ttl (float, optional): Seconds after which an entry is no longer used. Defaults to 24 hours.
+            refresh_after (float, optional): Seconds after which an entry is refreshed in the background. Defaults to 1 hour.
+            clock (Callable[[], float], optional): Wall-clock time source. Defaults to time.time.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.refresh_after = min(refresh_after, ttl)
+        self._clock = clock
+        self._memory: Dict[str, ProxyGeoInfo] = {}
+        self._inflight: Dict[str, asyncio.Task[ProxyGeoInfo]] = {}
+        self._initialized = False
+        self.lookups = 0
+
+    @staticmethod
+    def key_for(proxy: str) -> str:
+        return hashlib.sha256(proxy.encode()).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        assert self.path
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._initialized:
+            conn.execute("CREATE TABLE IF NOT EXISTS proxy_geo (key TEXT PRIMARY KEY, info TEXT NOT NULL, fetched_at REAL NOT NULL)")
+            self._initialized = True
+        return conn
+
+    def _load(self, key: str) -> Optional[ProxyGeoInfo]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT info FROM proxy_geo WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return ProxyGeoInfo(**json.loads(row[0])) if row else None
+
+    def _save(self, key: str, info: ProxyGeoInfo) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO proxy_geo (key, info, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET info = excluded.info, fetched_at = excluded.fetched_at",
+                (key, json.dumps(asdict(info)), info.fetched_at),
+            )
+        finally:
+            conn.close()
+
+    async def _cached(self, key: str) -> Optional[ProxyGeoInfo]:
+        info = self._memory.get(key)
+        if info is None and self.path:
+            try:
+                info = await asyncio.to_thread(self._load, key)
+            except sqlite3.Error as e:
+                loguru.logger.warning(f"Reading proxy geo cache failed: {e}")
+            if info is not None:
+                self._memory[key] = info
+        return info
+
+    async def get(self, proxy: str, fetcher: GeoFetcher) -> ProxyGeoInfo:
+        """
+        Get the geo information of a proxy, looking it up with `fetcher` when necessary.
+
+        Args:
+            proxy (str): Proxy URL ("" for the direct connection).
+            fetcher (GeoFetcher): Coroutine factory performing the actual lookup. Must not depend on the caller's state,
+                as it may run in the background after the caller returned.
+
+        Returns:
+            ProxyGeoInfo: The cached or freshly looked up information.
+        """
+        key = self.key_for(proxy)
+        info = await self._cached(key)
+        if info is not None:
+            age = self._clock() - info.fetched_at
+            if age < self.refresh_after:
+                return info
+            if age < self.ttl:
+                self._refresh(key, fetcher)
+                return info
+        try:
+            return await asyncio.shield(self._refresh(key, fetcher))
+        except GeoLookupError as e:
+            if info is None or e.ip != info.ip:
+                raise
+            # Geo APIs down or rate limiting, but the proxy still has the same egress IP
+            loguru.logger.warning("Proxy geo lookup failed, using expired cache entry")
+            return info
+
+    def _refresh(self, key: str, fetcher: GeoFetcher) -> asyncio.Task[ProxyGeoInfo]:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup(key, fetcher))
+            # Background refreshes have no awaiter; retrieve their exception to keep the loop quiet
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _lookup(self, key: str, fetcher: GeoFetcher) -> ProxyGeoInfo:
+        self.lookups += 1
+        try:
+            info = await fetcher()
+            info.fetched_at = self._clock()
+            self._memory[key] = info
+            if self.path:
+                try:
+                    await asyncio.to_thread(self._save, key, info)
+                except sqlite3.Error as e:
+                    loguru.logger.warning(f"Writing proxy geo cache failed: {e}")
+            return info
+        except GeoLookupError as e:
+            cached = self._memory.get(key)
+            if cached is not None and cached.ip != e.ip:
+                await self._forget(key)
+            raise
+        except Exception:
+            # The proxy itself failed: its cached location can no longer be trusted
+            await self._forget(key)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _delete(self, key: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM proxy_geo WHERE key = ?", (key,))
+        finally:
+            conn.close()
+
+    async def _forget(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._delete, key)
+            except sqlite3.Error as e:
+                loguru.logger.warning(f"Deleting from proxy geo cache failed: {e}")
+
+    async def invalidate(self, proxy: str) -> None:
+        await self._forget(self.key_for(proxy))
+
+
+default_proxy_geo_cache = ProxyGeoCache(
+    path=os.environ.get("BOTRIGHT_PROXY_GEO_CACHE", os.path.join(gettempdir(), "botright_proxy_geo.sqlite3")),
+)
@@ -6,6 +6,8 @@ from typing import Dict, List, Optional
 import httpx
 from async_class import AsyncObject, link
 
+from .proxy_geo_cache import GeoLookupError, ProxyGeoCache, ProxyGeoInfo, default_proxy_geo_cache
+
 
 class SplitError(Exception):
     pass
@@ -15,13 +17,15 @@ class ProxyCheckError(Exception):
     pass
 
 
+class ProxyGeoLookupError(ProxyCheckError, GeoLookupError):
+    pass
+
+
 class ProxyManager(AsyncObject):
     proxy: str = ""
     http_proxy: Dict[str, str] = {}
     browser_proxy: Optional[Dict[str, str]] = None
     plain_proxy: str = ""
-    _httpx: httpx.AsyncClient
-    _phttpx: httpx.AsyncClient
     ip: str = ""
     port: str = ""
     username: str = ""
@@ -34,10 +38,23 @@ class ProxyManager(AsyncObject):
     latitude: str = ""
     longitude: str = ""
     timezone: str = ""
+    egress_ip: str = ""
+
+    # Egress IP / geolocation cache shared by all launches (replaceable, e.g. in tests)
+    geo_cache: ProxyGeoCache = default_proxy_geo_cache
+    get_ip_apis: List[str] = ["https://api.ipify.org/?format=json", "https://api.myip.com/", "https://get.geojs.io/v1/ip.json", "https://api.ip.sb/jsonip", "https://l2.io/ip.json"]
+    get_geo_apis: Dict[str, List[str]] = {
+        "http://ip-api.com/json/<IP>": ["country", "countryCode", "lat", "lon", "timezone"],
+        "https://ipapi.co/<IP>/json": ["country_name", "country", "latitude", "longitude", "timezone"],
+        "https://api.techniknews.net/ipgeo/<IP>": ["country", "countryCode", "lat", "lon", "timezone"],
+        "https://get.geojs.io/v1/ip/geo/<IP>.json": ["country", "country_code", "latitude", "longitude", "timezone"],
+    }
 
     async def __ainit__(self, botright, proxy: str) -> None:
         """
-        Initialize a ProxyManager instance with a proxy string and perform proxy checks.
+        Initialize a ProxyManager instance with a proxy string and resolve the proxy's egress IP and geolocation.
+
+        The geolocation comes from `geo_cache`, so launches through a known proxy don't wait for the lookup APIs.
 
         Args:
             botright: An instance of Botright for linking purposes.
@@ -48,13 +65,11 @@ class ProxyManager(AsyncObject):
         self.proxy = proxy.strip() if proxy else ""
 
         self.timeout = httpx.Timeout(20.0, read=None)
-        self._httpx = httpx.AsyncClient(verify=False)
 
         if self.proxy:
             self.split_proxy()
             self.proxy = f"{self.username}:{self.password}@{self.ip}:{self.port}" if self.username else f"{self.ip}:{self.port}"
             self.plain_proxy = f"http://{self.proxy}"
-            self._phttpx = httpx.AsyncClient(proxies={"all://": self.plain_proxy}, verify=False)
             self.http_proxy = {"http": self.plain_proxy, "https": self.plain_proxy}
 
             if self.username:
@@ -62,15 +77,7 @@ class ProxyManager(AsyncObject):
             else:
                 self.browser_proxy = {"server": self.plain_proxy}
 
-            await self.check_proxy(self._phttpx)
-
-        else:
-            self._phttpx = self._httpx
-            await self.check_proxy(self._phttpx)
-
-    async def __adel__(self) -> None:
-        await self._httpx.aclose()
-        await self._phttpx.aclose()
+        await self.check_proxy()
 
     def split_helper(self, split_proxy: List[str]) -> None:
         """
@@ -104,44 +111,90 @@ class ProxyManager(AsyncObject):
         else:
             raise SplitError(f"Proxy Format ({self.proxy}) isnt supported")
 
-    async def check_proxy(self, httpx_client: httpx.AsyncClient) -> None:
+    async def check_proxy(self) -> None:
         """
-        Check the validity of the proxy by making HTTP requests to determine its properties.
+        Resolve the egress IP and geolocation of the proxy (through `geo_cache`) and apply them to this instance.
 
-        Args:
-            httpx_client (httpx.AsyncClient): The HTTPX client to use for proxy checks.
+        Raises:
+            ProxyCheckError: The proxy is unreachable, or its geolocation is unknown and not cached for its egress IP.
         """
-        get_ip_apis = ["https://api.ipify.org/?format=json", "https://api.myip.com/", "https://get.geojs.io/v1/ip.json", "https://api.ip.sb/jsonip", "https://l2.io/ip.json"]
+        try:
+            info = await self.geo_cache.get(self.plain_proxy, self._geo_fetcher())
+        except ProxyCheckError:
+            raise
+        except Exception as e:
+            raise ProxyCheckError(f"Checking proxy failed: {e}") from e
+
+        self.egress_ip = info.ip
+        self.country = info.country
+        self.country_code = info.country_code
+        self.latitude = info.latitude
+        self.longitude = info.longitude
+        self.timezone = info.timezone
+
+    def _geo_fetcher(self):
+        """
+        Build a lookup coroutine factory that only captures immutable settings,
+        so a background refresh doesn't keep this instance alive.
+        """
+        plain_proxy, timeout = self.plain_proxy, self.timeout
+        ip_apis, geo_apis = list(self.get_ip_apis), dict(self.get_geo_apis)
+
+        async def fetch() -> ProxyGeoInfo:
+            async with httpx.AsyncClient(verify=False) as direct_client:
+                if not plain_proxy:
+                    return await ProxyManager.lookup_geo_info(direct_client, direct_client, timeout, ip_apis, geo_apis)
+                async with httpx.AsyncClient(proxy=plain_proxy, verify=False) as proxy_client:
+                    return await ProxyManager.lookup_geo_info(proxy_client, direct_client, timeout, ip_apis, geo_apis)
+
+        return fetch
+
+    @staticmethod
+    async def lookup_geo_info(
+        ip_client: httpx.AsyncClient,
+        geo_client: httpx.AsyncClient,
+        timeout: httpx.Timeout,
+        ip_apis: List[str],
+        geo_apis: Dict[str, List[str]],
+    ) -> ProxyGeoInfo:
+        """
+        Query the egress IP through the proxy and its geolocation directly.
 
-        for get_ip_api in get_ip_apis:
+        Args:
+            ip_client (httpx.AsyncClient): Client routed through the proxy, used to determine the egress IP.
+            geo_client (httpx.AsyncClient): Client used for the geolocation APIs.
+            timeout (httpx.Timeout): Timeout of each API request.
+            ip_apis (List[str]): Egress IP APIs, tried in order.
+            geo_apis (Dict[str, List[str]]): Geolocation APIs and their field names, tried in order.
+
+        Returns:
+            ProxyGeoInfo: The egress IP and geolocation.
+        """
+        for get_ip_api in ip_apis:
             with suppress(Exception):
-                ip_request = await httpx_client.get(get_ip_api, timeout=self.timeout)
+                ip_request = await ip_client.get(get_ip_api, timeout=timeout)
                 ip = ip_request.json().get("ip")
                 break
         else:
             raise ProxyCheckError("Could not get IP-Address of Proxy (Proxy is Invalid/Timed Out)")
 
-        get_geo_apis = {
-            "http://ip-api.com/json/<IP>": ["country", "countryCode", "lat", "lon", "timezone"],
-            "https://ipapi.co/<IP>/json": ["country_name", "country", "latitude", "longitude", "timezone"],
-            "https://api.techniknews.net/ipgeo/<IP>": ["country", "countryCode", "lat", "lon", "timezone"],
-            "https://get.geojs.io/v1/ip/geo/<IP>.json": ["country", "country_code", "latitude", "longitude", "timezone"],
-        }
-
-        for get_geo_api, api_names in get_geo_apis.items():
+        for get_geo_api, api_names in geo_apis.items():
             with suppress(Exception):
                 api_url = get_geo_api.replace("<IP>", ip)
                 country, country_code, latitude, longitude, timezone = api_names
-                r = await self._httpx.get(api_url, timeout=self.timeout)
+                r = await geo_client.get(api_url, timeout=timeout)
                 data = r.json()
 
-                self.country = data.get(country)
-                self.country_code = data.get(country_code)
-                self.latitude = data.get(latitude)
-                self.longitude = data.get(longitude)
-                self.timezone = data.get(timezone)
+                info = ProxyGeoInfo(
+                    ip=ip,
+                    country=data.get(country),
+                    country_code=data.get(country_code),
+                    latitude=data.get(latitude),
+                    longitude=data.get(longitude),
+                    timezone=data.get(timezone),
+                )
 
-                assert self.country
-                break
-        else:
-            raise ProxyCheckError("Could not get GeoInformation from proxy (Proxy is Probably not Indexed)")
+                assert info.country
+                return info
+
+        raise ProxyGeoLookupError("Could not get GeoInformation from proxy (Proxy is Probably not Indexed)", ip)
@@ -0,0 +1,495 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+import loguru
+
+# Resource types served from the cache, everything else goes to the network untouched
+CACHEABLE_RESOURCE_TYPES = ("document", "stylesheet", "image", "media", "font", "manifest")
+# Status codes that are cacheable by default, i.e. may get heuristic freshness (RFC 9111 section 4.2.2)
+CACHEABLE_STATUS_CODES = (200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501)
+# Status codes that get `default_ttl` when a response has no caching headers and no Last-Modified
+DEFAULT_TTL_STATUS_CODES = (200, 203, 204)
+# Headers that are not replayed from the cache. Bodies are stored decoded, so the encoding headers no longer apply
+UNSTORED_HEADERS = ("set-cookie", "content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive")
+# Approximate per-entry bookkeeping overhead, counted so that many tiny responses still respect the budget
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CachedResponse:
+    """
+    A response stored in the cache. The body is kept decoded.
+    """
+
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+    expires_at: float
+    # Request header values of the headers listed in `Vary`, which a later request must match
+    vary: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.url) + sum(len(k) + len(v) for k, v in self.headers.items()) + ENTRY_OVERHEAD_BYTES
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def matches(self, request_headers: Dict[str, str]) -> bool:
+        return all(request_headers.get(name, "") == value for name, value in self.vary.items())
+
+
+class ResponseCacheBudget:
+    """
+    Global memory ceiling shared by the response caches of all browser contexts.
+
+    When an insert would exceed the ceiling, entries are evicted from the cache currently holding the most bytes.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Args:
+            max_bytes (int): Total bytes all registered caches may keep in memory.
+        """
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._caches: weakref.WeakSet[ResponseCache] = weakref.WeakSet()
+
+    def register(self, cache: ResponseCache) -> None:
+        self._caches.add(cache)
+
+    def unregister(self, cache: ResponseCache) -> None:
+        self._caches.discard(cache)
+
+    def make_room(self, nbytes: int) -> List[ResponseCache]:
+        """
+        Evict entries until `nbytes` more fit under the ceiling.
+
+        Returns:
+            List[ResponseCache]: The caches entries were evicted from.
+        """
+        touched: List[ResponseCache] = []
+        while self.used_bytes + nbytes > self.max_bytes:
+            victim = max((c for c in self._caches if c.memory_entries), key=lambda c: c.memory_bytes, default=None)
+            if victim is None:
+                break
+            victim._evict_lru()
+            if victim not in touched:
+                touched.append(victim)
+        return touched
+
+
+class _DiskTier:
+    """
+    LRU of spilled responses as files in a directory: `<key>.body` holds the body, `<key>.json` the metadata.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # Rebuild the LRU order of a previous run from the file modification times
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                key = name[:-5]
+                meta, body = self._paths(key)
+                try:
+                    found.append((os.path.getmtime(meta), key, os.path.getsize(meta) + os.path.getsize(body)))
+                except OSError:
+                    continue
+        for _, key, size in sorted(found):
+            self._index[key] = size
+            self.used_bytes += size
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _paths(self, key: str):
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.body")
+
+    def read(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            if key not in self._index:
+                return None
+            meta_path, body_path = self._paths(key)
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(body_path, "rb") as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+            self._index.move_to_end(key)
+            return CachedResponse(body=body, **meta)
+
+    def write_many(self, entries: List[CachedResponse]) -> None:
+        with self._lock:
+            for entry in entries:
+                if entry.size > self.max_bytes:
+                    continue
+                key = cache_key(entry.url)
+                self._remove(key)
+                meta_path, body_path = self._paths(key)
+                meta = asdict(entry)
+                del meta["body"]
+                try:
+                    # Body first, metadata last: a `.json` file always points to a complete body
+                    with open(body_path + ".tmp", "wb") as f:
+                        f.write(entry.body)
+                    os.replace(body_path + ".tmp", body_path)
+                    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                        json.dump(meta, f)
+                    os.replace(meta_path + ".tmp", meta_path)
+                    size = os.path.getsize(meta_path) + len(entry.body)
+                except OSError as e:
+                    loguru.logger.warning(f"Spilling response to disk failed: {e}")
+                    continue
+                self._index[key] = size
+                self.used_bytes += size
+                while self.used_bytes > self.max_bytes and self._index:
+                    self._remove(next(iter(self._index)))
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is None:
+            return
+        self.used_bytes -= size
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ResponseCache:
+    """
+    Byte-budgeted LRU cache of HTTP responses for one browser context.
+
+    - Memory is bounded per context (`max_bytes`) and globally (`budget`)
+    - Freshness follows Cache-Control / Expires; `no-store` responses are never stored, `no-cache` ones always revalidate
+    - Stale entries with an ETag or Last-Modified are revalidated with a conditional request, a 304 refreshes them
+    - Entries evicted from memory optionally spill to a disk tier (e.g. under the profile directory) and are
+      promoted back on the next hit
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: Optional[int] = None,
+        budget: Optional[ResponseCacheBudget] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        heuristic_max_ttl: float = 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            max_bytes (int, optional): Bytes this cache may keep in memory. Defaults to 64 MiB.
+            max_entry_bytes (int, optional): Larger responses are not cached. Defaults to an eighth of `max_bytes`.
+            budget (ResponseCacheBudget, optional): Global ceiling shared with other contexts. Defaults to `default_response_cache_budget`.
+            disk_dir (str, optional): Directory of the disk tier. None disables spilling. Defaults to None.
+            disk_max_bytes (int, optional): Bytes the disk tier may use. Defaults to 256 MiB.
+            default_ttl (float, optional): Freshness of successful non-HTML responses without any caching headers. Defaults to 5 minutes.
+            heuristic_max_ttl (float, optional): Upper bound of the Last-Modified heuristic freshness. Defaults to 1 day.
+            clock (Callable[[], float], optional): Wall-clock time source. Defaults to time.time.
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.budget = budget if budget is not None else default_response_cache_budget
+        self.default_ttl = default_ttl
+        self.heuristic_max_ttl = heuristic_max_ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._spilled: List[CachedResponse] = []
+        self._disk = _DiskTier(disk_dir, disk_max_bytes) if disk_dir else None
+        self.memory_bytes = 0
+        self.budget.register(self)
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.spills = 0
+
+    @property
+    def memory_entries(self) -> int:
+        return len(self._entries)
+
+    # ── Freshness ──
+
+    def freshness_lifetime(self, headers: Dict[str, str], now: float, status: int = 200) -> Optional[float]:
+        """
+        Seconds a response stays fresh, or None if it must not be stored.
+
+        Without explicit freshness, only heuristically cacheable status codes get a heuristic lifetime, and HTML
+        documents never do: they are stored only if they carry a validator, and are revalidated on every load.
+        """
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives:
+            return None
+        age = float(headers["age"]) if headers.get("age", "").isdigit() else 0.0
+        if "no-cache" in directives:
+            return 0.0
+        if "max-age" in directives:
+            try:
+                return max(int(directives["max-age"] or 0) - age, 0.0)
+            except ValueError:
+                return 0.0
+
+        date = _parse_http_date(headers.get("date")) or now
+        expires = headers.get("expires")
+        if expires is not None:
+            expires_at = _parse_http_date(expires)
+            return max(expires_at - date - age, 0.0) if expires_at is not None else 0.0
+
+        if status not in CACHEABLE_STATUS_CODES or headers.get("content-type", "").lower().startswith("text/html"):
+            return 0.0
+        last_modified = _parse_http_date(headers.get("last-modified"))
+        if last_modified is not None:
+            return min(max(date - last_modified, 0.0) * 0.1, self.heuristic_max_ttl)
+        if status not in DEFAULT_TTL_STATUS_CODES:
+            return 0.0
+        return self.default_ttl
+
+    # ── Lookup / store ──
+
+    async def get(self, url: str, request_headers: Optional[Dict[str, str]] = None) -> Optional[CachedResponse]:
+        """
+        Look up a response (fresh or stale) from memory, then from the disk tier.
+        """
+        key = cache_key(url)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self._disk is not None:
+            entry = await asyncio.to_thread(self._disk.read, key)
+            if entry is not None:
+                self.disk_hits += 1
+                await self._insert(key, entry)
+        if entry is not None and not entry.matches(request_headers or {}):
+            return None
+        return entry
+
+    async def put(
+        self, url: str, status: int, headers: Dict[str, str], body: bytes,
+        request_headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[CachedResponse]:
+        """
+        Store a response if its status and headers allow it.
+
+        Returns:
+            Optional[CachedResponse]: The stored entry, or None if the response was not cacheable.
+        """
+        key = cache_key(url)
+        headers = {k.lower(): v for k, v in headers.items()}
+        now = self._clock()
+        lifetime = self.freshness_lifetime(headers, now, status)
+        vary_names = [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+        if lifetime is None or status not in CACHEABLE_STATUS_CODES or "*" in vary_names:
+            self._discard(key)
+            return None
+        if lifetime == 0 and "etag" not in headers and "last-modified" not in headers:
+            # Immediately stale and impossible to revalidate
+            self._discard(key)
+            return None
+
+        request_headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+        entry = CachedResponse(
+            url=url,
+            status=status,
+            headers={k: v for k, v in headers.items() if k not in UNSTORED_HEADERS},
+            body=body,
+            stored_at=now,
+            expires_at=now + lifetime,
+            vary={name: request_headers.get(name, "") for name in vary_names},
+        )
+        if entry.size > self.max_entry_bytes:
+            self._discard(key)
+            return None
+        await self._insert(key, entry)
+        self.stores += 1
+        return entry
+
+    async def revalidate(self, entry: CachedResponse, headers: Dict[str, str]) -> CachedResponse:
+        """
+        Refresh a stale entry from the headers of a 304 Not Modified response.
+
+        The refreshed entry replaces the old one through `_insert`, since its size changes with the headers and
+        the memory accounting must subtract exactly what was added.
+        """
+        updated = dict(entry.headers)
+        updated.update({k.lower(): v for k, v in headers.items() if k.lower() not in UNSTORED_HEADERS})
+        now = self._clock()
+        refreshed = replace(
+            entry,
+            headers=updated,
+            stored_at=now,
+            expires_at=now + (self.freshness_lifetime(updated, now, entry.status) or 0.0),
+        )
+        await self._insert(cache_key(entry.url), refreshed)
+        return refreshed
+
+    async def _insert(self, key: str, entry: CachedResponse) -> None:
+        self._discard(key)
+        touched = self.budget.make_room(entry.size)
+        while self._entries and self.memory_bytes + entry.size > self.max_bytes:
+            self._evict_lru()
+        self._entries[key] = entry
+        self._account(entry.size)
+        for cache in {self, *touched}:
+            await cache._flush_spilled()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._account(-entry.size)
+
+    def _evict_lru(self) -> None:
+        _, entry = self._entries.popitem(last=False)
+        self._account(-entry.size)
+        self.evictions += 1
+        if self._disk is not None and (entry.etag or entry.last_modified or entry.is_fresh(self._clock())):
+            self._spilled.append(entry)
+
+    def _account(self, delta: int) -> None:
+        self.memory_bytes += delta
+        self.budget.used_bytes += delta
+
+    async def _flush_spilled(self) -> None:
+        if not self._spilled or self._disk is None:
+            return
+        spilled, self._spilled = self._spilled, []
+        await asyncio.to_thread(self._disk.write_many, spilled)
+        self.spills += len(spilled)
+
+    # ── Route handler ──
+
+    async def handle(self, route: Any) -> None:
+        """
+        Playwright route handler serving cacheable GET requests from the cache.
+
+        Args:
+            route (Route): The intercepted route.
+        """
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            await route.continue_()
+            return
+
+        request_headers = request.headers
+        entry = await self.get(request.url, request_headers)
+        if entry is not None and entry.is_fresh(self._clock()):
+            self.hits += 1
+            await self._fulfill(route, entry)
+            return
+
+        conditional: Dict[str, str] = {}
+        if entry is not None:
+            if entry.etag:
+                conditional["if-none-match"] = entry.etag
+            if entry.last_modified:
+                conditional["if-modified-since"] = entry.last_modified
+        response = await route.fetch(headers={**request_headers, **conditional} if conditional else None)
+
+        if entry is not None and conditional and response.status == 304:
+            self.revalidated += 1
+            await self._fulfill(route, await self.revalidate(entry, response.headers))
+            return
+
+        self.misses += 1
+        await self.put(request.url, response.status, response.headers, await response.body(), request_headers)
+        await route.fulfill(response=response)
+
+    @staticmethod
+    async def _fulfill(route: Any, entry: CachedResponse) -> None:
+        await route.fulfill(status=entry.status, headers=entry.headers, body=entry.body)
+
+    # ── Metrics / lifecycle ──
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+            "disk_bytes": self._disk.used_bytes if self._disk is not None else 0,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "hit_ratio": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """
+        Release the memory tier and its share of the global budget. The disk tier is kept for the next launch.
+        """
+        self._entries.clear()
+        self._spilled.clear()
+        self._account(-self.memory_bytes)
+        self.budget.unregister(self)
+
+
+default_response_cache_budget = ResponseCacheBudget(
+    max_bytes=int(os.environ.get("BOTRIGHT_RESPONSE_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import inspect
+import os
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Pattern, TypedDict, Union
 from playwright._impl._async_base import AsyncEventContextManager
 from playwright._impl._errors import TargetClosedError
-from playwright.async_api import APIResponse
 from playwright.async_api import BrowserContext as PlaywrightBrowserContext
 from playwright.async_api import ConsoleMessage as PlaywrightConsoleMessage
 from playwright.async_api import ElementHandle as PlaywrightElementHandle
@@ -14,6 +14,7 @@ from playwright.async_api import Request as PlaywrightRequest
 from playwright.async_api import Route as PlaywrightRoute
 
 from ..modules import Faker, ProxyManager
+from ..modules.response_cache import ResponseCache
 from . import ElementHandle, Frame, JSHandle, Page, Request, Route, new_page
 
 if TYPE_CHECKING:
@@ -74,12 +75,22 @@ async def new_browser(botright: Botright, proxy: ProxyManager, faker: Faker, fla
         **parsed_launch_arguments
     )
 
+    # Response cache per context: bounded in memory, spilling to the profile directory when one is given
+    cache = None
+    if botright.cache_responses:
+        user_data_dir = launch_arguments.get("user_data_dir")
+        cache = ResponseCache(
+            max_bytes=botright.response_cache_max_bytes,
+            disk_dir=os.path.join(user_data_dir, "botright_response_cache") if user_data_dir and botright.response_cache_disk_bytes else None,
+            disk_max_bytes=botright.response_cache_disk_bytes or 0,
+        )
+
     browser = BrowserContext(
         _browser,
         proxy,
         faker,
         use_undetected_playwright=botright.use_undetected_playwright,
-        cache=botright.cache,
+        cache=cache,
         user_action_layer=botright.user_action_layer,
         mask_fingerprint=botright.mask_fingerprint,
         scroll_into_view=botright.scroll_into_view,
@@ -102,7 +113,7 @@ class BrowserContext(PlaywrightBrowserContext):
             proxy: ProxyManager,
             faker: Faker,
             use_undetected_playwright: Optional[bool],
-            cache: Dict[str, APIResponse],
+            cache: Optional[ResponseCache],
             user_action_layer: Optional[bool],
             scroll_into_view: Optional[bool],
             mask_fingerprint: Optional[bool],
@@ -111,6 +122,8 @@ class BrowserContext(PlaywrightBrowserContext):
         self._impl_obj = browser._impl_obj
         self._browser = browser
         self._closed = False
+        # Page wrappers by underlying Playwright page, so every access returns the same wrapper
+        self._page_wrappers: Dict[Any, Page] = {}
         self._route_proxies: Dict[
             Union[Callable[[PlaywrightRoute], Any], Callable[[PlaywrightRoute, PlaywrightRequest], Any]], Union[
                 Callable[[PlaywrightRoute], Any], Callable[[PlaywrightRoute, PlaywrightRequest], Any]]
@@ -149,25 +162,42 @@ class BrowserContext(PlaywrightBrowserContext):
 
         pages: List[Page] = []
         for _page in self._browser.pages:
-            page = Page(_page, self, self.faker)
+            page = self._wrap_page(_page)
             pages.append(page)
         return pages
 
-    async def cache_responses(self):
-        async def route_interceptor(route: PlaywrightRoute):
-            request = route.request
+    def _wrap_page(self, page: PlaywrightPage) -> Page:
+        """
+        Get the Page wrapper of a Playwright page, creating it on first access.
 
-            if request.resource_type in ("document", "stylesheet", "image", "media", "font", "manifest"):
-                if request.url not in self.cache:
-                    response = await route.fetch()
-                    self.cache[request.url] = response
-                else:
-                    response = self.cache[request.url]
-                await route.fulfill(response=response)
-            else:
-                await route.continue_()
+        Wrappers are registered by the underlying page and dropped once it emits `close`.
 
-        await self.route("**", route_interceptor)
+        Args:
+            page (PlaywrightPage): The Playwright page (or an existing wrapper).
+
+        Returns:
+            Page: The wrapper belonging to this context.
+        """
+        if isinstance(page, Page) and page.browser is self:
+            return page
+
+        key = page._impl_obj
+        wrapper = self._page_wrappers.get(key)
+        if wrapper is None:
+            wrapper = Page(page, self, self.faker)
+            # A page that is already closed never emits `close` again, so don't register it
+            if not page.is_closed():
+                self._page_wrappers[key] = wrapper
+                page.once("close", lambda _: self._page_wrappers.pop(key, None))
+        return wrapper
+
+    def _forget_page(self, page: PlaywrightPage) -> None:
+        self._page_wrappers.pop(page._impl_obj, None)
+
+    async def cache_responses(self):
+        if self.cache is None:
+            self.cache = ResponseCache()
+        await self.route("**", self.cache.handle)
 
     async def block_images(self):
         async def all_blocker(route: PlaywrightRoute):
@@ -200,6 +230,9 @@ class BrowserContext(PlaywrightBrowserContext):
 
     async def close(self, reason: Optional[str] = None):
         self._closed = True
+        self._page_wrappers.clear()
+        if self.cache is not None:
+            self.cache.close()
         try:
             return await self._origin_close(reason=reason)
         except TargetClosedError:
@@ -215,8 +248,9 @@ class BrowserContext(PlaywrightBrowserContext):
             def handler_proxy(route: PlaywrightRoute, request: PlaywrightRequest):
                 page = request.frame.page
 
-                route = Route(route, Page(page, self, self.faker))
-                request = Request(request, Page(page, self, self.faker))
+                page = self._wrap_page(page)
+                route = Route(route, page)
+                request = Request(request, page)
                 return handler(route, request)  # type: ignore
 
             self._route_proxies[handler] = handler_proxy
@@ -226,7 +260,7 @@ class BrowserContext(PlaywrightBrowserContext):
             def handler_proxy_no_request(route: PlaywrightRoute):
                 page = route.request.frame.page
 
-                route = Route(route, Page(page, self, self.faker))
+                route = Route(route, self._wrap_page(page))
                 return handler(route)  # type: ignore
 
             self._route_proxies[handler] = handler_proxy_no_request
@@ -290,7 +324,7 @@ class BrowserContext(PlaywrightBrowserContext):
                     scroll_into_view=self.scroll_into_view,
                     mask_fingerprint=self.mask_fingerprint,
                 )
-                page = Page(_page, self, self.faker)
+                page = self._wrap_page(_page)
                 frame = Frame(_frame, page)
 
                 source["context"], source["page"], source["frame"] = context, page, frame
@@ -321,7 +355,7 @@ class BrowserContext(PlaywrightBrowserContext):
                     scroll_into_view=self.scroll_into_view,
                     mask_fingerprint=self.mask_fingerprint,
                 )
-                page = Page(_page, self, self.faker)
+                page = self._wrap_page(_page)
                 frame = Frame(_frame, page)
 
                 source["context"], source["page"], source["frame"] = context, page, frame
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import math
 import random
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, List, Literal, NoReturn, Optional, Tuple, Union
 
 # fmt: off
@@ -16,6 +18,7 @@ if TYPE_CHECKING:
 
 
 # From https://github.com/riflosnake/HumanCursor/blob/main/humancursor/utilities/human_curve_generator.py
+# Vectorized with NumPy: the Bézier curve is one matrix product with a cached Bernstein basis table
 class HumanizeMouseTrajectory:
     def __init__(self, from_point: Tuple[int, int], to_point: Tuple[int, int]) -> None:
         self.from_point = from_point
@@ -27,7 +30,7 @@ class HumanizeMouseTrajectory:
             raise ValueError("Argument must be between 0.0 and 1.0.")
         return -n * (n - 2)
 
-    def generate_curve(self) -> List[Tuple[int, int]]:
+    def generate_curve(self) -> List[Tuple[float, float]]:
         """Generates the curve based on arguments below, default values below are automatically modified to cause randomness"""
         left_boundary = min(self.from_point[0], self.to_point[0]) - 80
         right_boundary = max(self.from_point[0], self.to_point[0]) + 80
@@ -38,7 +41,7 @@ class HumanizeMouseTrajectory:
         points = self.generate_points(internalKnots)
         points = self.distort_points(points, 1, 1, 0.5)
         points = self.tween_points(points, 100)
-        return points
+        return [(x, y) for x, y in points.tolist()]
 
     def generate_internal_knots(
         self, l_boundary: Union[int, float], r_boundary: Union[int, float], d_boundary: Union[int, float], u_boundary: Union[int, float], knots_count: int
@@ -53,13 +56,13 @@ class HumanizeMouseTrajectory:
         if d_boundary > u_boundary:
             raise ValueError("down_boundary must be less than or equal to upper_boundary")
 
-        knotsX = np.random.choice(range(int(l_boundary), int(r_boundary)), size=knots_count)
-        knotsY = np.random.choice(range(int(d_boundary), int(u_boundary)), size=knots_count)
+        knotsX = np.random.randint(int(l_boundary), int(r_boundary), size=knots_count)
+        knotsY = np.random.randint(int(d_boundary), int(u_boundary), size=knots_count)
 
         knots = list(zip(knotsX, knotsY))
         return knots
 
-    def generate_points(self, knots: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    def generate_points(self, knots: List[Tuple[int, int]]) -> np.ndarray:
         """Generates the points from BezierCalculator"""
         if not self.check_if_list_of_points(knots):
             raise ValueError("knots must be valid list of points")
@@ -72,7 +75,7 @@ class HumanizeMouseTrajectory:
         knots = [self.from_point] + knots + [self.to_point]
         return BezierCalculator.calculate_points_in_curve(int(midPtsCnt), knots)
 
-    def distort_points(self, points: List[Tuple[int, int]], distortion_mean: int, distortion_st_dev: int, distortion_frequency: float) -> Union[List[Tuple[int, int]], NoReturn]:
+    def distort_points(self, points: np.ndarray, distortion_mean: int, distortion_st_dev: int, distortion_frequency: float) -> Union[np.ndarray, NoReturn]:
         """Distorts points by parameters of mean, standard deviation and frequency"""
         if not (self.check_if_numeric(distortion_mean) and self.check_if_numeric(distortion_st_dev) and self.check_if_numeric(distortion_frequency)):
             raise ValueError("Distortions must be numeric")
@@ -81,34 +84,36 @@ class HumanizeMouseTrajectory:
         if not (0 <= distortion_frequency <= 1):
             raise ValueError("distortion_frequency must be in range [0,1]")
 
-        distorted: List[Tuple[int, int]] = []
-        for i in range(1, len(points) - 1):
-            x, y = points[i]
-            delta = int(np.random.normal(distortion_mean, distortion_st_dev) if random.random() < distortion_frequency else 0)
-            distorted.append((x, y + delta))
-        distorted = [points[0]] + distorted + [points[-1]]
+        distorted = np.array(points, dtype=float)
+        inner = len(distorted) - 2
+        if inner > 0:
+            # First and last point stay in place, every inner point is shifted vertically with probability distortion_frequency
+            shifted = np.random.random(inner) < distortion_frequency
+            delta = np.trunc(np.random.normal(distortion_mean, distortion_st_dev, inner))
+            distorted[1:-1, 1] += np.where(shifted, delta, 0.0)
         return distorted
 
-    def tween_points(self, points: List[Tuple[int, int]], target_points: int) -> Union[List[Tuple[int, int]], NoReturn]:
+    def tween_points(self, points: np.ndarray, target_points: int) -> Union[np.ndarray, NoReturn]:
         """Modifies points by tween"""
         if not self.check_if_list_of_points(points):
             raise ValueError("List of points not valid")
         if not isinstance(target_points, int) or target_points < 2:
             raise ValueError("target_points must be an integer greater or equal to 2")
 
-        res: List[Tuple[int, int]] = []
-        for i in range(target_points):
-            index = int(self.easeOutQuad(float(i) / (target_points - 1)) * (len(points) - 1))
-            res += (points[index],)
-        return res
+        points = np.asarray(points, dtype=float)
+        n = np.arange(target_points) / (target_points - 1)
+        index = (-n * (n - 2) * (len(points) - 1)).astype(int)
+        return points[index]
 
     @staticmethod
     def check_if_numeric(val: Any) -> bool:
         """Checks if value is proper numeric value"""
         return isinstance(val, (float, int, np.integer, np.float32, np.float64))
 
-    def check_if_list_of_points(self, list_of_points: List[Tuple[int, int]]) -> bool:
+    def check_if_list_of_points(self, list_of_points: Union[List[Tuple[int, int]], np.ndarray]) -> bool:
         """Checks if list of points is valid"""
+        if isinstance(list_of_points, np.ndarray):
+            return list_of_points.ndim == 2 and list_of_points.shape[1] == 2 and np.issubdtype(list_of_points.dtype, np.number)
         try:
 
             def point(p):
@@ -123,10 +128,10 @@ class BezierCalculator:
     @staticmethod
     def binomial(n: int, k: int):
         """Returns the binomial coefficient "n choose k" """
-        return math.factorial(n) / float(math.factorial(k) * math.factorial(n - k))
+        return math.comb(n, k)
 
     @staticmethod
-    def bernstein_polynomial_point(x: int, i: int, n: int):
+    def bernstein_polynomial_point(x: float, i: int, n: int):
         """Calculate the i-th component of a bernstein polynomial of degree n"""
         return BezierCalculator.binomial(n, i) * (x**i) * ((1 - x) ** (n - i))
 
@@ -149,23 +154,43 @@ class BezierCalculator:
         return bernstein
 
     @staticmethod
-    def calculate_points_in_curve(n: int, points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    @lru_cache(maxsize=128)
+    def bernstein_basis(n: int, degree: int) -> np.ndarray:
+        """
+        Returns the (n, degree + 1) table of all bernstein polynomials of the given degree, sampled at n evenly spaced points in [0,1].
+        Tables are cached and read-only.
+        """
+        t = np.linspace(0.0, 1.0, n)[:, None]
+        i = np.arange(degree + 1)
+        coefficients = np.array([math.comb(degree, k) for k in range(degree + 1)], dtype=float)
+        basis = coefficients * t**i * (1 - t) ** (degree - i)
+        basis.setflags(write=False)
+        return basis
+
+    @staticmethod
+    def calculate_points_in_curve(n: int, points: List[Tuple[int, int]]) -> np.ndarray:
         """
         Given list of control points, returns n points in the Bézier curve,
         described by these points
         """
-        curvePoints: List[Tuple[int, int]] = []
-        bernstein_polynomial = BezierCalculator.bernstein_polynomial(points)
-        for i in range(n):
-            t = i / (n - 1)
-            curvePoints += (bernstein_polynomial(t),)
-        return curvePoints
+        return BezierCalculator.bernstein_basis(n, len(points) - 1) @ np.asarray(points, dtype=float)
+
+
+# CDP `buttons` bit of each mouse button
+BUTTON_MASKS = {"left": 1, "right": 2, "middle": 4}
 
 
 class Mouse(PlaywrightMouse):
     last_x: int = 0
     last_y: int = 0
 
+    # Send humanized movements as pipelined CDP Input.dispatchMouseEvent calls (needs the page's CDP session)
+    batched_dispatch: bool = True
+    # Pacing of trajectory points (seconds), close to what one awaited driver round trip per point used to take
+    point_interval: float = 0.001
+    # Points are sent in bursts, one per interval (a 125Hz mouse report rate)
+    batch_interval: float = 0.008
+
     def __init__(self, mouse: PlaywrightMouse, page: Page):
         super().__init__(mouse)
         self._impl_obj = mouse._impl_obj
@@ -173,10 +198,25 @@ class Mouse(PlaywrightMouse):
         self._mouse = mouse
 
         self._origin_move = mouse.move
+        self._origin_down = mouse.down
+        self._origin_up = mouse.up
         self._origin_dblclick = mouse.dblclick
 
         self.last_x = 0
         self.last_y = 0
+        self._pressed: List[str] = []
+
+    async def down(self, *, button: Optional[Literal["left", "middle", "right"]] = None, click_count: Optional[int] = None) -> None:
+        await self._origin_down(button=button, click_count=click_count)
+        button = button or "left"
+        if button not in self._pressed:
+            self._pressed.append(button)
+
+    async def up(self, *, button: Optional[Literal["left", "middle", "right"]] = None, click_count: Optional[int] = None) -> None:
+        await self._origin_up(button=button, click_count=click_count)
+        button = button or "left"
+        if button in self._pressed:
+            self._pressed.remove(button)
 
     async def click(
         self,
@@ -238,11 +278,49 @@ class Mouse(PlaywrightMouse):
             return
 
         humanized_points = HumanizeMouseTrajectory((int(self.last_x), int(self.last_y)), (int(x), int(y)))
+        *path, (last_x, last_y) = humanized_points.points
 
         # Move Mouse to new random locations
-        for x, y in humanized_points.points:
-            await self._origin_move(x=x, y=y)
-            # await page.wait_for_timeout(random.randint(1, 5))
+        cdp = getattr(self._page, "cdp", None)
+        if self.batched_dispatch and cdp is not None:
+            await self._dispatch_batched(cdp, path)
+        else:
+            for x, y in path:
+                await self._origin_move(x=x, y=y)
+
+        # The last point goes through Playwright, which tracks the cursor position used by down() and up()
+        await self._origin_move(x=last_x, y=last_y)
 
         # Set LastX and LastY cause Playwright does not have mouse.current_location
-        self.last_x, self.last_y = humanized_points.points[-1]
+        self.last_x, self.last_y = last_x, last_y
+
+    async def _dispatch_batched(self, cdp: Any, points: List[Tuple[float, float]]) -> None:
+        """
+        Send mouseMoved events for the given points without awaiting each one.
+
+        CDP processes the commands of a session in order, so the events still arrive in order. They are paced in bursts
+        of `batch_interval` (`point_interval` per point) and all responses are awaited at the end.
+
+        Args:
+            cdp (CDPSession): The CDP session of the page.
+            points (List[Tuple[float, float]]): The trajectory points to move through.
+        """
+        loop = asyncio.get_running_loop()
+        buttons = sum(BUTTON_MASKS[button] for button in self._pressed)
+        button = self._pressed[0] if self._pressed else "none"
+        per_batch = max(1, round(self.batch_interval / self.point_interval))
+
+        pending = []
+        started = loop.time()
+        for index in range(0, len(points), per_batch):
+            for x, y in points[index : index + per_batch]:
+                event = {"type": "mouseMoved", "x": x, "y": y, "button": button, "buttons": buttons}
+                pending.append(asyncio.ensure_future(cdp.send("Input.dispatchMouseEvent", event)))
+            delay = started + (index + per_batch) * self.point_interval - loop.time()
+            if delay > 0 and index + per_batch < len(points):
+                await asyncio.sleep(delay)
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
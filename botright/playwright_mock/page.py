@@ -73,7 +73,7 @@ async def new_page(browser: BrowserContext, faker: Faker) -> Page:
     """
     # Create new Page
     _page = await browser._origin_new_page()
-    page = Page(_page, browser, faker)
+    page = browser._wrap_page(_page)
     await page._mock_page()
 
     return page
@@ -92,17 +92,11 @@ class Page(PlaywrightPage):
         self.scroll_into_view: Optional[bool] = browser.scroll_into_view
         self._main_frame = page.main_frame
 
-        # Objects
-        if isinstance(page.mouse, Mouse):
-            self._mouse = page.mouse
-        else:
-            self._mouse = Mouse(page.mouse, self)
-        if isinstance(page.keyboard, Keyboard):
-            self._keyboard = page.keyboard
-        else:
-            self._keyboard = Keyboard(page.keyboard, self)
+        # Objects (input helpers and captcha solvers are created on first use)
+        self._mouse: Optional[Mouse] = None
+        self._keyboard: Optional[Keyboard] = None
+        self._hcaptcha_solver: Optional[hcaptcha.hCaptcha] = None
         self.cdp: Optional[PlaywrightCDPSession] = None
-        self.hcaptcha_solver = hcaptcha.hCaptcha(browser, self)
 
         # Aliases
         self._origin_close = page.close
@@ -150,12 +144,24 @@ class Page(PlaywrightPage):
 
     @property
     def mouse(self):
+        if self._mouse is None:
+            mouse = self._page.mouse
+            self._mouse = mouse if isinstance(mouse, Mouse) else Mouse(mouse, self)
         return self._mouse
 
     @property
     def keyboard(self):
+        if self._keyboard is None:
+            keyboard = self._page.keyboard
+            self._keyboard = keyboard if isinstance(keyboard, Keyboard) else Keyboard(keyboard, self)
         return self._keyboard
 
+    @property
+    def hcaptcha_solver(self) -> hcaptcha.hCaptcha:
+        if self._hcaptcha_solver is None:
+            self._hcaptcha_solver = hcaptcha.hCaptcha(self.browser, self)
+        return self._hcaptcha_solver
+
     @property
     def main_frame(self):
         return Frame(self._main_frame, self)
@@ -276,15 +282,14 @@ class Page(PlaywrightPage):
     ):
         await self._origin_close(run_before_unload=run_before_unload, reason=reason)
 
-        if self in self.browser.pages:
-            self.browser.pages.remove(self)
+        self.browser._forget_page(self)
 
     async def opener(self):
         _page = await self._origin_opener()
         if not _page:
             return None
 
-        page = Page(_page, self.browser, self.faker)
+        page = self.browser._wrap_page(_page)
         return page
 
     def frame(
@@ -559,7 +564,7 @@ class Page(PlaywrightPage):
                     scroll_into_view=self.scroll_into_view,
                     mask_fingerprint=self.browser.mask_fingerprint,
                 )
-                source["page"] = Page(_page, self.browser, self.faker)
+                source["page"] = self.browser._wrap_page(_page)
                 source["frame"] = Frame(_frame, self)
 
                 if isinstance(element, PlaywrightElementHandle):
@@ -590,7 +595,7 @@ class Page(PlaywrightPage):
                     scroll_into_view=self.scroll_into_view,
                     mask_fingerprint=self.browser.mask_fingerprint,
                 )
-                source["page"] = Page(_page, self.browser, self.faker)
+                source["page"] = self.browser._wrap_page(_page)
                 source["frame"] = Frame(_frame, self)
 
                 return callback(source, *args, **kwargs)
@@ -612,15 +617,15 @@ class Page(PlaywrightPage):
         ):  # Checking how many parameters the callable expects
 
             def handler_proxy(route: PlaywrightRoute, request: PlaywrightRequest):
-                route = Route(route, Page(self, self.browser, self.faker))
-                request = Request(request, Page(self, self.browser, self.faker))
+                route = Route(route, self)
+                request = Request(request, self)
                 return handler(route, request)  # type: ignore
 
             await self._origin_route(url=url, handler=handler_proxy, times=times)
         else:
 
             def handler_proxy_no_request(route: PlaywrightRoute):
-                route = Route(route, Page(self, self.browser, self.faker))
+                route = Route(route, self)
                 return handler(route)  # type: ignore
 
             await self._origin_route(
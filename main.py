@@ -11,6 +11,8 @@ from app.utils.alembic_migration import run_alembic_upgrade_head, check_schemas
 import asyncio
 from loguru import logger
 from app.services.mq.rpc_client import rpc_client
+from app.services.RPA_browser.base.base_engines import playwright_driver_manager
+from app.utils.http.httpx_client import close_http_clients
 
 
 def _setup_windows_event_loop() -> None:
@@ -56,6 +58,10 @@ async def lifespan(app: FastAPI):
     yield
     await stop_background_tasks()
     await rpc_client.close()
+    # 关闭出站 HTTP 连接池
+    await close_http_clients()
+    # 关闭所有共享的 Playwright 驱动进程
+    await playwright_driver_manager.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,179 @@
+"""
+测试产物存储 —— 内容寻址去重、流式写入、保留策略，以及 截图 → 产物引用 → Range 下载 的端到端链路
+"""
+import hashlib
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from playwright.async_api import Page
+
+from app.controller.v1.browser_control.execution import artifact_router
+from app.models.common.exceptions.base_exception import ArtifactNotFoundException
+from app.models.execution.action_params import ScreenshotParams
+from app.models.router.router_prefix import BrowserControlRouterPath
+from app.services.execution.actions import screenshot
+from app.services.execution.artifact_store import ArtifactStore, image_size
+from app.utils.depends.mid_depends import get_auth_info_from_header
+
+MID = 24680
+
+
+@pytest.fixture
+def clock(fake_clock):
+    # 从当前时间开始：孤立内容的宽限期按文件 mtime 判断
+    return fake_clock(time.time())
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return ArtifactStore(str(tmp_path / "artifacts"), retention_days=1, chunk_size=7, clock=clock)
+
+
+def blob_files(store: ArtifactStore) -> list[Path]:
+    return [p for p in Path(store.root, "blobs").rglob("*") if p.is_file()]
+
+
+class TestArtifactStore:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_identical_content_is_stored_once(self, store):
+        first = await store.put(MID, b"same bytes", content_type="image/png")
+        second = await store.put(MID, b"same bytes", content_type="image/png")
+
+        assert first.artifact_id != second.artifact_id
+        assert first.sha256 == second.sha256 == hashlib.sha256(b"same bytes").hexdigest()
+        assert len(blob_files(store)) == 1
+        assert store.stats()["deduplicated"] == 1 and store.stats()["bytes_written"] == 10
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stream_write_and_ranged_read(self, store):
+        async def chunks():
+            for part in (b"0123", b"45678", b"9abcdef"):
+                yield part
+
+        artifact = await store.put(MID, chunks())
+        assert artifact.size == 16 and artifact.sha256 == hashlib.sha256(b"0123456789abcdef").hexdigest()
+
+        loaded = await store.get(artifact.artifact_id, str(MID))
+        assert await store.read_bytes(loaded) == b"0123456789abcdef"
+        parts = [c async for c in store.iter_bytes(loaded, 3, 12)]
+        # 按 chunk_size=7 分块读取
+        assert parts == [b"3456789", b"abc"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_other_users_and_bad_ids_are_not_found(self, store):
+        artifact = await store.put(MID, b"private")
+        for artifact_id, mid in [(artifact.artifact_id, MID + 1), ("../../etc/passwd", MID), ("0" * 32, MID)]:
+            with pytest.raises(ArtifactNotFoundException):
+                await store.get(artifact_id, mid)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_retention_and_size_budget(self, store, clock):
+        old = await store.put(MID, b"a" * 10)
+        clock.now += 3600
+        shared = [await store.put(MID, b"b" * 10) for _ in range(2)]
+        clock.now += 3600
+        newest = await store.put(MID, b"c" * 10)
+
+        # 容量上限 20 字节：最新的两份内容保留（同内容的两个引用只计一次），更旧的被淘汰
+        store.max_total_bytes = 20
+        result = await store.cleanup()
+        assert (result["evicted"], result["blobs_removed"], result["total_bytes"]) == (1, 1, 20)
+        for artifact in (*shared, newest):
+            await store.get(artifact.artifact_id, MID)
+        with pytest.raises(ArtifactNotFoundException):
+            await store.get(old.artifact_id, MID)
+
+        # 超过保留天数的引用与内容全部删除
+        clock.now += 86400 + 1
+        result = await store.cleanup()
+        assert result["expired"] == 3 and result["blobs_removed"] == 2
+        assert blob_files(store) == []
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_orphan_blobs_survive_the_grace_period(self, store, clock):
+        store.max_total_bytes = 5
+        await store.put(MID, b"too large for the budget")
+
+        # 刚写入的内容即使已无引用也不删除，避免与并发写入竞争
+        assert (await store.cleanup())["evicted"] == 1
+        assert len(blob_files(store)) == 1
+        clock.now += 600
+        assert (await store.cleanup())["blobs_removed"] == 1
+
+    def test_image_size(self):
+        png = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + (640).to_bytes(4, "big") + (480).to_bytes(4, "big")
+        jpeg = (
+            b"\xff\xd8"
+            + b"\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+            + b"\xff\xc0\x00\x11\x08" + (300).to_bytes(2, "big") + (200).to_bytes(2, "big") + b"\x03" + b"\x00" * 9
+        )
+        assert image_size(png) == (640, 480)
+        assert image_size(jpeg) == (200, 300)
+        assert image_size(b"GIF89a") == (None, None)
+
+
+class TestScreenshotArtifactEndToEnd:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, page: Page, store, monkeypatch):
+        self.page = page
+        self.store = store
+        monkeypatch.setattr(screenshot, "artifact_store", store)
+        monkeypatch.setattr(artifact_router, "artifact_store", store)
+
+    @pytest.fixture
+    async def client(self):
+        from bili_common.models.depends import AuthInfo
+
+        app = FastAPI()
+        app.include_router(artifact_router.router)
+        app.dependency_overrides[get_auth_info_from_header] = lambda: AuthInfo(mid=MID, level=5)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_screenshot_returns_reference_and_downloads_with_range(self, client):
+        await self.page.set_content(
+            "<html><body style='margin:0;background:#0a0'><div style='height:2000px'>static</div></body></html>"
+        )
+        action = screenshot.ScreenshotAction.new_action(
+            mid=MID, page=self.page, variables={}, params=ScreenshotParams(full_page=True),
+        )
+        result = await action.execute()
+
+        assert result.success
+        data = result.data
+        assert data["base64"] == "" and data["artifact_id"]
+        assert (data["width"], data["height"]) == (1280, 2000)
+
+        url = f"{artifact_router.router.prefix}{BrowserControlRouterPath.artifacts_download}"
+        resp = await client.get(url, params={"artifact_id": data["artifact_id"]})
+        assert resp.status_code == 200 and resp.headers["content-type"] == "image/png"
+        assert resp.headers["etag"] == f'"{data["sha256"]}"'
+        body = resp.content
+        assert len(body) == data["size"] and hashlib.sha256(body).hexdigest() == data["sha256"]
+
+        ranged = await client.get(url, params={"artifact_id": data["artifact_id"]}, headers={"Range": "bytes=16-23"})
+        assert ranged.status_code == 206
+        assert ranged.headers["content-range"] == f"bytes 16-23/{data['size']}"
+        assert ranged.content == body[16:24]
+
+        suffix = await client.get(url, params={"artifact_id": data["artifact_id"]}, headers={"Range": "bytes=-4"})
+        assert suffix.status_code == 206 and suffix.content == body[-4:]
+
+        unsatisfiable = await client.get(
+            url, params={"artifact_id": data["artifact_id"]}, headers={"Range": f"bytes={data['size']}-"})
+        assert unsatisfiable.status_code == 416
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_return_base64_keeps_inline_payload(self):
+        await self.page.set_content("<html><body>inline</body></html>")
+        action = screenshot.ScreenshotAction.new_action(
+            mid=MID, page=self.page, variables={}, params=ScreenshotParams(return_base64=True),
+        )
+        result = await action.execute()
+        assert result.success and result.data["base64"] and result.data["artifact_id"]
@@ -0,0 +1,198 @@
+"""
+测试条件预编译 —— 与解释执行的 evaluate_rule / 参考解释器 interpret 做差分对比
+
+test_condition_models.py 中的全部用例在此重跑一遍，期间 evaluate_rule / evaluate_condition
+被替换为"解释执行与编译执行结果（返回值或异常类型 + 信息）必须完全一致"的差分版本。
+"""
+import ast
+import operator
+
+import pytest
+
+import test_condition_models as cases
+from app.models.execution.condition_models import ConditionRule, evaluate_condition, evaluate_rule
+from app.services.execution.condition_compiler import (
+    compile_expression,
+    compile_rule,
+    expression_cache,
+    safe_evaluate_condition,
+)
+
+
+def outcome(fn, *args, **kwargs):
+    try:
+        return "ok", fn(*args, **kwargs)
+    except Exception as e:
+        return "error", type(e), str(e)
+
+
+def differential_evaluate_rule(rule, variables, *, strict=False):
+    expected = outcome(evaluate_rule, rule, variables, strict=strict)
+    assert outcome(compile_rule(rule, strict=strict), variables) == expected
+    # 前端传入的 dict 形式编译后语义相同
+    assert outcome(compile_rule(rule.model_dump(mode="json"), strict=strict), variables) == expected
+    return evaluate_rule(rule, variables, strict=strict)
+
+
+def differential_evaluate_condition(condition, variables):
+    expected = outcome(evaluate_condition, condition, variables)
+    assert outcome(compile_rule(ConditionRule(condition=condition), strict=True), variables) == expected
+    return evaluate_condition(condition, variables)
+
+
+@pytest.fixture(autouse=True)
+def differential(monkeypatch):
+    monkeypatch.setattr(cases, "evaluate_rule", differential_evaluate_rule)
+    monkeypatch.setattr(cases, "evaluate_condition", differential_evaluate_condition)
+
+
+class TestParamsConditionDifferential(cases.TestParamsCondition):
+    pass
+
+
+class TestConditionRuleSimpleDifferential(cases.TestConditionRuleSimple):
+    pass
+
+
+class TestConditionRuleCompoundDifferential(cases.TestConditionRuleCompound):
+    pass
+
+
+COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_, ast.IsNot: operator.is_not,
+}
+
+BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+
+
+def eval_node(node, variables):
+    """参考解释器：改动前 safe_evaluate_condition 逐节点 match 的求值方式"""
+    match node:
+        case ast.Constant(value):
+            return value
+        case ast.Name(id):
+            if id in variables:
+                return variables[id]
+            raise NameError(f"变量 '{id}' 未定义")
+        case ast.Subscript():
+            obj = eval_node(node.value, variables)
+            key = eval_node(node.slice, variables)
+            if isinstance(obj, dict):
+                return obj.get(key)
+            raise TypeError("仅支持 dict 下标访问")
+        case ast.Tuple(elts):
+            return tuple(eval_node(e, variables) for e in elts)
+        case ast.List(elts):
+            return [eval_node(e, variables) for e in elts]
+        case ast.Compare(left, ops, comparators):
+            val = eval_node(left, variables)
+            for op, comp in zip(ops, comparators):
+                other = eval_node(comp, variables)
+                if type(op) not in COMPARE_OPS:
+                    raise ValueError(f"不支持的比较运算符: {type(op).__name__}")
+                val = COMPARE_OPS[type(op)](val, other)
+            return val
+        case ast.BoolOp(op, values):
+            vals = [eval_node(v, variables) for v in values]
+            return all(vals) if isinstance(op, ast.And) else any(vals)
+        case ast.UnaryOp(op, operand):
+            val = eval_node(operand, variables)
+            if isinstance(op, ast.Not):
+                return not val
+            if isinstance(op, ast.USub):
+                return -val
+            if isinstance(op, ast.UAdd):
+                return +val
+            raise ValueError(f"不支持的一元运算符: {type(op).__name__}")
+        case ast.BinOp(left, op, right):
+            lv = eval_node(left, variables)
+            rv = eval_node(right, variables)
+            if type(op) not in BIN_OPS:
+                raise ValueError(f"不支持的二元运算符: {type(op).__name__}")
+            return BIN_OPS[type(op)](lv, rv)
+        case _:
+            raise ValueError(f"不支持的操作: {type(node).__name__}")
+
+
+def interpret(source, variables):
+    """改动前 safe_evaluate_condition 的解释执行路径"""
+    tree = ast.parse(source.strip(), mode='eval')
+    return eval_node(tree.body, variables)
+
+
+EXPRESSIONS = [
+    "element_found == True",
+    "loop_index >= 5",
+    "  loop_index < 3 and not done  ",
+    "status in ('ok', 'done') or retries > 2",
+    "data['count'] + 1 == 4",
+    "data['missing'] is None",
+    "items[0] == 1",
+    "-loop_index + +2 * 3 ** 2 % 7 / 2",
+    "1 < loop_index < 0",
+    "[loop_index, status] != [0, 'ok']",
+    "status not in ['ok'] and data is not None",
+    "undefined_var == 1",
+    "missing or element_found",
+    "len(items) > 0",
+    "data.count == 3",
+    "loop_index // 2",
+    "~loop_index",
+    "status == 'ok' and len(items)",
+    "data['count'] if done else 0",
+    "loop_index ==",
+    "",
+    "status",
+]
+
+VARIABLE_SETS = [
+    {"element_found": True, "loop_index": 0, "done": False, "status": "ok", "retries": 0,
+     "data": {"count": 3}, "items": [1, 2]},
+    {"element_found": False, "loop_index": 7, "done": True, "status": "fail", "retries": 5,
+     "data": None, "items": []},
+    {"loop_index": "x", "status": None},
+]
+
+
+class TestExpressionDifferential:
+
+    @pytest.mark.parametrize("source", EXPRESSIONS)
+    def test_matches_interpreter(self, source):
+        for variables in VARIABLE_SETS:
+            assert outcome(compile_expression(source), variables) == outcome(interpret, source, variables)
+            expected = outcome(interpret, source, variables) if source else ("ok", False)
+            safe = safe_evaluate_condition(source, variables)
+            assert safe == (expected[1] if expected[0] == "ok" else False)
+
+    def test_compiled_once_per_source(self):
+        source = "loop_index >= 42"
+        evaluator = compile_expression(source)
+        hits = expression_cache.hits
+        for i in range(100):
+            assert compile_expression(source) is evaluator
+            assert safe_evaluate_condition(source, {"loop_index": i}) is (i >= 42)
+        assert expression_cache.hits - hits == 200
+
+    def test_syntax_error_is_cached(self):
+        evaluator = compile_expression("a ==")
+        assert compile_expression("a ==") is evaluator
+        for _ in range(3):
+            with pytest.raises(SyntaxError):
+                evaluator({"a": 1})
+        assert safe_evaluate_condition("a ==", {"a": 1}) is False
+
+    def test_invalid_dict_rule_is_not_cached(self):
+        with pytest.raises(ValueError):
+            compile_rule({"logic": "AND"})
+        rule = {"condition": {"field": "a", "condition_value_type": "BOOLEAN", "condition_value": True}}
+        predicate = compile_rule(rule)
+        assert compile_rule(dict(rule)) is predicate
+        assert predicate({"a": True}) is True and predicate({}) is False
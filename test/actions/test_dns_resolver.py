@@ -0,0 +1,104 @@
+"""
+DNS 解析测试 —— 缓存 / 负向缓存 / 同名合并 / 超时，以及 URLSecurityChecker 使用异步解析器
+"""
+import asyncio
+import socket
+import time
+
+import pytest
+
+from app.services.execution.actions.navigation import URLSecurityChecker
+from app.utils.http.dns_resolver import CachingResolver
+
+
+class FakeResolver:
+    """按表返回地址，统计查询次数并模拟解析延迟"""
+
+    def __init__(self, table: dict[str, list[str]], latency: float = 0.0):
+        self.table = table
+        self.latency = latency
+        self.calls: list[str] = []
+
+    async def __call__(self, hostname: str) -> list[str]:
+        self.calls.append(hostname)
+        await asyncio.sleep(self.latency)
+        if hostname not in self.table:
+            raise socket.gaierror(socket.EAI_NONAME, "not found")
+        return self.table[hostname]
+
+
+class TestCachingResolver:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_positive_and_negative_results_are_cached_until_ttl(self, fake_clock):
+        fake = FakeResolver({"example.com": ["93.184.216.34"]})
+        clock = fake_clock()
+        resolver = CachingResolver(fake, ttl=60, negative_ttl=5, clock=clock)
+
+        assert await resolver.resolve("Example.com") == ["93.184.216.34"]
+        assert await resolver.resolve("example.com") == ["93.184.216.34"]
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                await resolver.resolve("missing.test")
+        assert fake.calls == ["example.com", "missing.test"]
+
+        clock.now += 10  # 负向缓存过期，正向缓存仍有效
+        await resolver.resolve("example.com")
+        with pytest.raises(socket.gaierror):
+            await resolver.resolve("missing.test")
+        assert fake.calls == ["example.com", "missing.test", "missing.test"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_concurrent_lookups_for_same_host_are_coalesced(self):
+        fake = FakeResolver({"a.test": ["1.1.1.1"], "b.test": ["8.8.8.8"]}, latency=0.05)
+        resolver = CachingResolver(fake)
+
+        results = await asyncio.gather(*(resolver.resolve(h) for h in ["a.test"] * 20 + ["b.test"] * 20))
+
+        assert results == [["1.1.1.1"]] * 20 + [["8.8.8.8"]] * 20
+        assert sorted(fake.calls) == ["a.test", "b.test"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_slow_resolver_times_out_without_blocking_loop(self):
+        fake = FakeResolver({"slow.test": ["1.1.1.1"]}, latency=1.0)
+        resolver = CachingResolver(fake, timeout=0.05)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            await resolver.resolve("slow.test")
+        task.cancel()
+
+        assert time.perf_counter() - start < 0.5
+        assert ticks > 3
+        # 超时结果进入负向缓存，不会再次等待
+        with pytest.raises(TimeoutError):
+            await resolver.resolve("slow.test")
+        assert fake.calls == ["slow.test"]
+
+
+class TestURLSecurityCheckerDNS:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_checker_uses_resolver(self, monkeypatch):
+        fake = FakeResolver({
+            "public.test": ["93.184.216.34", "2606:2800:220:1:248:1893:25c8:1946"],
+            "internal.test": ["93.184.216.34", "10.0.0.5"],
+        })
+        monkeypatch.setattr(URLSecurityChecker, "resolver", CachingResolver(fake))
+
+        assert (await URLSecurityChecker.check_url_security("https://public.test/a")).allowed
+        blocked = await URLSecurityChecker.check_url_security("https://internal.test/")
+        assert not blocked.allowed and "internal.test" in blocked.reason
+        # 解析失败沿用原策略：放行，交给浏览器验证
+        assert (await URLSecurityChecker.check_url_security("https://nx.test/")).allowed
+
+        await URLSecurityChecker.check_url_security("https://public.test/b")
+        assert fake.calls == ["public.test", "internal.test", "nx.test"]
@@ -9,7 +9,7 @@ RPC 协议已简化：
 - 请求端直接发送强类型参数模型的 JSON（含 mid 字段）作为消息体
 - 服务端返回 CommonResponseModel 序列化后的 dict: {"code": 0, "msg": "success", "data": ...}
 
-使用 unittest.mock 模拟 rpc_client.call 与 httpx.AsyncClient。
+使用 unittest.mock 模拟 rpc_client.call 与连接池 HTTP 客户端（get_http_client）。
 """
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
@@ -18,6 +18,8 @@ from typing import Any
 import httpx
 
 from app.services.execution.actions.fetch_external_data import FetchExternalDataAction
+from app.utils.http import httpx_client
+from app.utils.http.httpx_client import HttpClientManager
 from app.models.execution.action_params import FetchExternalDataParams
 from app.models.execution.enums import HttpMethodEnum, HttpBodyTypeEnum
 from app.models.execution.system_services import RpcMethodName
@@ -327,16 +329,15 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls, patch(
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client, patch(
             "app.services.execution.actions.fetch_external_data.rpc_client.call",
             new=AsyncMock(),
         ) as mock_rpc_call:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -367,13 +368,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -410,13 +410,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -446,13 +445,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -482,13 +480,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -516,13 +513,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -544,15 +540,14 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(
                 side_effect=httpx.ConnectError("connection refused")
             )
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -580,13 +575,12 @@ class TestFetchExternalDataHttpMode:
         )
 
         with patch(
-            "app.services.execution.actions.fetch_external_data.httpx.AsyncClient",
-        ) as mock_client_cls:
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
             mock_client = MagicMock()
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.__aexit__ = AsyncMock(return_value=None)
             mock_client.request = AsyncMock(return_value=mock_response)
-            mock_client_cls.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await action.execute()
 
@@ -596,6 +590,37 @@ class TestFetchExternalDataHttpMode:
         assert result.variables["last_output"] == {"token": "xyz"}
 
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_http_uses_pooled_client_per_proxy_and_timeout(self):
+        """测试 HTTP 模式按代理 / 超时取连接池客户端，而不是每次新建客户端"""
+        action = FetchExternalDataAction.new_action(
+            mid=1,
+            page=None,
+            variables={},
+            params=FetchExternalDataParams(
+                method=HttpMethodEnum.GET,
+                url="https://api.example.com/data",
+                proxy="http://127.0.0.1:3128",
+                timeout=5000,
+            ),
+        )
+
+        with patch(
+            "app.services.execution.actions.fetch_external_data.get_http_client",
+            new_callable=AsyncMock,
+        ) as mock_get_client:
+            mock_client = MagicMock()
+            mock_client.request = AsyncMock(return_value=httpx.Response(
+                200, json={"ok": True}, request=httpx.Request("GET", "https://api.example.com/data"),
+            ))
+            mock_get_client.return_value = mock_client
+
+            result = await action.execute()
+
+        assert result.success
+        mock_get_client.assert_awaited_once_with(proxy="http://127.0.0.1:3128", timeout=5.0)
+        assert "proxy" not in mock_client.request.call_args.kwargs
+
 # ========== 参数校验测试 ==========
 
 class TestFetchExternalDataParamsValidation:
@@ -658,3 +683,60 @@ class TestFetchExternalDataParamsValidation:
         )
         assert params.method_name == RpcMethodName.NONE
         assert params.url == "https://example.com/api"
+
+
+# ========== 连接池客户端管理测试 ==========
+
+class TestHttpClientManager:
+    """HttpClientManager：按键复用、闲置回收、容量淘汰与关闭"""
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_clients_are_reused_per_key(self):
+        manager = HttpClientManager()
+        direct = await manager.get_client(timeout=10)
+        assert await manager.get_client(timeout=10) is direct
+        assert await manager.get_client(timeout=10, proxy="http://127.0.0.1:3128") is not direct
+        assert await manager.get_client(timeout=20) is not direct
+        assert len(manager) == 3
+
+        await manager.close_all()
+        assert direct.client is None and len(manager) == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_idle_and_overflow_clients_are_closed_when_not_busy(self, fake_clock):
+        clock = fake_clock()
+        manager = HttpClientManager(max_clients=2, idle_ttl=60, clock=clock)
+        a = await manager.get_client(timeout=1)
+        b = await manager.get_client(timeout=2)
+        a.inflight = 1  # 模拟 a 上仍有请求在执行
+
+        await manager.get_client(timeout=3)  # 超出容量，淘汰最久未用的 a
+        assert a.client is not None  # 请求未结束前不会关闭
+        a.inflight = 0
+        clock.now += 61  # b 闲置超时
+        c = await manager.get_client(timeout=3)
+
+        assert a.client is None and b.client is None and c.client is not None
+        assert manager.stats()["clients"] == 1
+        await manager.close_all()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_sweep_closes_idle_clients_without_traffic(self, fake_clock):
+        clock = fake_clock()
+        manager = HttpClientManager(idle_ttl=60, clock=clock)
+        client = await manager.get_client(timeout=1)
+        clock.now += 61
+
+        await manager.sweep()  # 后台任务调用，无需新的 get_client
+
+        assert client.client is None and len(manager) == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_close_http_clients_resets_global_client(self):
+        first = httpx_client.get_global_http_client()
+        await first.start()
+
+        await httpx_client.close_http_clients()
+
+        second = httpx_client.get_global_http_client()
+        assert second is not first and first.client is None
@@ -0,0 +1,93 @@
+"""
+基准测试：条件无缓存求值（表达式每次 ast.parse + 编译 / 规则每次递归遍历 ConditionRule）vs 缓存的预编译闭包
+
+模拟循环条件的热路径：同一组 while 表达式与 break 规则在 N 次迭代中反复求值，
+loop_index 每轮递增，并校验两种方式每一次的结果完全一致。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_condition_eval.py --iterations 100000
+"""
+import argparse
+import time
+
+from app.models.execution.condition_models import ConditionRule, evaluate_rule
+from app.services.execution.condition_compiler import compile_expression, compile_rule, expression_cache
+
+EXPRESSIONS = {
+    "compare": "loop_index < 100000",
+    "boolean": "loop_index >= 5 and not done and status in ('ok', 'retry')",
+    "subscript": "data['count'] + loop_index % 7 * 2 != 3",
+}
+
+RULE = {
+    "logic": "OR",
+    "rules": [
+        {"logic": "AND", "rules": [
+            {"condition": {"field": "done", "condition_value_type": "BOOLEAN", "condition_value": True}},
+            {"condition": {"field": "status", "condition_value_type": "STRING", "condition_value": "ok"}},
+        ]},
+        {"logic": "NOT", "rules": [
+            {"condition": {"field": "error", "condition_value_type": "NULL", "condition_value": None}},
+        ]},
+    ],
+}
+
+
+def uncached(source: str, variables: dict):
+    """不命中缓存的求值路径：每次重新 ast.parse 并编译"""
+    expression_cache.invalidate(source)
+    return compile_expression(source)(variables)
+
+
+def make_variables(i: int) -> dict:
+    return {"loop_index": i, "done": i % 2 == 0, "status": "ok", "error": None, "data": {"count": 1}}
+
+
+def bench(name: str, baseline, compiled, iterations: int) -> None:
+    start = time.perf_counter()
+    expected = [baseline(make_variables(i)) for i in range(iterations)]
+    baseline_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [compiled(make_variables(i)) for i in range(iterations)]
+    compiled_s = time.perf_counter() - start
+
+    assert actual == expected, f"{name} 结果不一致"
+    print(
+        f"{name:<10} baseline={baseline_s / iterations * 1e6:7.3f}µs  "
+        f"compiled={compiled_s / iterations * 1e6:7.3f}µs  speedup={baseline_s / compiled_s:5.1f}x"
+    )
+
+
+def main(iterations: int) -> None:
+    print(f"{iterations} 次求值（含构造 variables 的固定开销），结果逐次一致")
+    for name, source in EXPRESSIONS.items():
+        bench(
+            name,
+            lambda variables, source=source: uncached(source, variables),
+            lambda variables, source=source: compile_expression(source)(variables),
+            iterations,
+        )
+
+    # 规则：解释执行按前端 dict 校验一次后反复遍历；编译执行持有谓词 / 每次经缓存查找 / 每次传入 dict
+    rule = ConditionRule.model_validate(RULE)
+    bench("rule", lambda variables: evaluate_rule(rule, variables), compile_rule(rule), iterations)
+    bench(
+        "rule+cache",
+        lambda variables: evaluate_rule(rule, variables),
+        lambda variables: compile_rule(rule)(variables),
+        iterations,
+    )
+    bench(
+        "rule+dict",
+        lambda variables: evaluate_rule(ConditionRule.model_validate(RULE), variables),
+        lambda variables: compile_rule(RULE)(variables),
+        iterations,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.iterations)
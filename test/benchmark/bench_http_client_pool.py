@@ -0,0 +1,88 @@
+"""
+基准测试：FetchExternalData 的 HTTP 请求 —— 每次新建 httpx.AsyncClient vs 连接池客户端（HttpClientManager）
+
+在本机启动一个 uvicorn 桩服务（返回固定 JSON），顺序发起 N 次 GET 请求。
+本地回环上只体现 TCP 建连开销；真实外网 / HTTPS / 代理 CONNECT 下差距更大。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_http_client_pool.py --requests 1000
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.utils.http.httpx_client import HttpClientManager
+
+
+async def stub_app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"ok": true, "items": [1, 2, 3]}'})
+
+
+def start_stub_server() -> tuple[uvicorn.Server, str]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(stub_app, log_level="error", lifespan="off"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}/api"
+
+
+async def run_fresh_clients(url: str, requests: int) -> list[float]:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.request("GET", url, timeout=30.0)
+        response.json()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def run_pooled_client(url: str, requests: int) -> list[float]:
+    manager = HttpClientManager()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = await manager.get_client(timeout=30.0)
+        response = await client.request("GET", url)
+        response.json()
+        timings.append((time.perf_counter() - start) * 1000)
+    await manager.close_all()
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(f"{name:<14} total={sum(timings):9.1f}ms  p50={statistics.median(timings):7.3f}ms  "
+          f"p99={statistics.quantiles(timings, n=100)[98]:7.3f}ms")
+
+
+async def main(requests: int) -> None:
+    server, url = start_stub_server()
+    try:
+        fresh = await run_fresh_clients(url, requests)
+        pooled = await run_pooled_client(url, requests)
+    finally:
+        server.should_exit = True
+
+    print(f"{requests} 次顺序 GET {url}")
+    report("fresh client", fresh)
+    report("pooled client", pooled)
+    print(f"speedup        {sum(fresh) / sum(pooled):.1f}x (total)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,87 @@
+"""
+基准测试：执行引擎单步耗时 —— 关闭指标 vs 开启指标
+
+用不依赖浏览器的 print 步骤构造工作流，经 ExecutionEngine.execute_steps 完整执行
+（模板替换、参数校验、日志采集判定、_run_action 埋点全部经过）。
+两种模式交替运行多轮以抵消机器抖动，取各自单步耗时的中位数比较；
+同时单独测量一次埋点本身（两次 perf_counter + labels + observe）的开销。
+
+关闭日志输出，使单步耗时尽量小，得到的开销占比偏保守。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_metrics_overhead.py --steps 200 --rounds 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from loguru import logger
+
+from app.models.execution.action_params import create_workflow_step
+from app.models.execution.request_params import WorkflowExecutionRequest
+from app.services.execution import engine as engine_module
+from app.services.execution.engine import ExecutionEngine
+from app.services.execution.pipeline import PipelineBuilder
+from app.utils.metrics.registry import MetricsRegistry
+
+DISABLED = MetricsRegistry(enabled=False)
+
+
+async def run_once(engine: ExecutionEngine, pipeline, steps: int) -> float:
+    req = WorkflowExecutionRequest(mid=1, browser_id=1, action_id="bench", variables={"name": "bench"})
+    start = time.perf_counter()
+    results = await engine.execute_steps(req, steps=pipeline, session_id="s", browser_id="1", page=None)
+    elapsed = time.perf_counter() - start
+    assert len(results) == steps and all(r.success for r in results)
+    return elapsed / steps * 1e6
+
+
+def instrumentation_cost_ns(iterations: int) -> float:
+    """单次埋点的开销（纳秒）"""
+    histogram = MetricsRegistry().histogram("bench_seconds", "bench", ("action_type", "status"))
+    labels = {"print": "print"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        histogram.labels(labels.get("print", "custom"), "success").observe(time.perf_counter() - started)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def main(steps: int, rounds: int) -> None:
+    logger.remove()
+    engine = ExecutionEngine()
+    pipeline = PipelineBuilder.build(
+        [create_workflow_step("print", {"message": "step {{name}}"}) for _ in range(steps)]
+    )
+    enabled = (engine_module._ACTION_SECONDS, engine_module._PLUGIN_HOOK_SECONDS)
+    disabled = (
+        DISABLED.histogram("off_action_seconds", "", ("action_type", "status")),
+        DISABLED.histogram("off_plugin_seconds", "", ("hook",)),
+    )
+
+    # 预热：模板编译、action 类查找等一次性开销
+    await run_once(engine, pipeline, steps)
+
+    timings: dict[str, list[float]] = {"disabled": [], "enabled": []}
+    for _ in range(rounds):
+        for mode, metrics in (("disabled", disabled), ("enabled", enabled)):
+            engine_module._ACTION_SECONDS, engine_module._PLUGIN_HOOK_SECONDS = metrics
+            timings[mode].append(await run_once(engine, pipeline, steps))
+    engine_module._ACTION_SECONDS, engine_module._PLUGIN_HOOK_SECONDS = enabled
+
+    off = statistics.median(timings["disabled"])
+    on = statistics.median(timings["enabled"])
+    cost = instrumentation_cost_ns(200_000)
+    print(f"{rounds} 轮 × {steps} 步（两种模式交替执行），单步耗时中位数")
+    print(f"disabled  {off:8.2f}µs")
+    print(f"enabled   {on:8.2f}µs  delta={(on - off) / off * 100:+.2f}%")
+    print(f"单次埋点开销 {cost:6.0f}ns = 单步耗时的 {cost / 1000 / off * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.steps, args.rounds))
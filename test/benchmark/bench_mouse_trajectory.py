@@ -0,0 +1,105 @@
+"""
+基准测试：人类化鼠标轨迹 —— 纯 Python 逐点 Bernstein 计算 vs NumPy 向量化；逐点 await 派发 vs 批量 CDP 派发
+
+1. 轨迹生成吞吐（points/sec），不需要浏览器
+2. ClickAction 端到端耗时：在本地静态页面上反复点击按钮，对比 Mouse.batched_dispatch 开 / 关
+   依赖本机已安装 Playwright 的 chromium（playwright install chromium），可用 --skip-click 跳过
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_mouse_trajectory.py --curves 2000 --clicks 30
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from botright.playwright_mock.mouse import HumanizeMouseTrajectory, Mouse
+
+STATIC_PAGE = """
+<html><body style="margin:0">
+  <button id="target" style="position:absolute;left:{left}px;top:{top}px;width:80px;height:30px"
+          onclick="window.clicks=(window.clicks||0)+1">click</button>
+</body></html>
+"""
+
+
+def legacy_trajectory(from_point, to_point):
+    """旧实现：阶乘二项式逐点求 Bernstein 多项式，逐点扰动与补间"""
+    def bernstein(t, knots):
+        n = len(knots) - 1
+        x = y = 0
+        for i, (kx, ky) in enumerate(knots):
+            bern = math.factorial(n) / float(math.factorial(i) * math.factorial(n - i)) * (t**i) * ((1 - t) ** (n - i))
+            x += kx * bern
+            y += ky * bern
+        return x, y
+
+    left, right = min(from_point[0], to_point[0]) - 80, max(from_point[0], to_point[0]) + 80
+    down, up = min(from_point[1], to_point[1]) - 80, max(from_point[1], to_point[1]) + 80
+    knots = list(zip(np.random.choice(range(left, right), size=2), np.random.choice(range(down, up), size=2)))
+    knots = [from_point] + knots + [to_point]
+    count = max(abs(from_point[0] - to_point[0]), abs(from_point[1] - to_point[1]), 2)
+    points = [bernstein(i / (count - 1), knots) for i in range(count)]
+    points = [points[0]] + [
+        (x, y + int(np.random.normal(1, 1) if random.random() < 0.5 else 0)) for x, y in points[1:-1]
+    ] + [points[-1]]
+    return [points[int(-(i / 99) * (i / 99 - 2) * (len(points) - 1))] for i in range(100)]
+
+
+def bench_trajectory(curves: int) -> None:
+    moves = [((random.randint(0, 1280), random.randint(0, 720)), (random.randint(0, 1280), random.randint(0, 720)))
+             for _ in range(curves)]
+    for name, generate in [("legacy", legacy_trajectory), ("vectorized", lambda a, b: HumanizeMouseTrajectory(a, b).points)]:
+        start = time.perf_counter()
+        points = sum(len(generate(a, b)) for a, b in moves)
+        elapsed = time.perf_counter() - start
+        print(f"trajectory {name:<10} {curves} 条轨迹 {elapsed * 1000:8.1f}ms  {points / elapsed:12,.0f} points/sec")
+
+
+async def bench_click(clicks: int) -> None:
+    from playwright.async_api import async_playwright
+
+    from app.services.execution.actions.interaction import ClickAction
+    from botright.playwright_mock import BrowserContext, new_page
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        context = BrowserContext(await browser.new_context(), MagicMock(), MagicMock(), use_undetected_playwright=False,
+                                 cache={}, user_action_layer=False, scroll_into_view=True, mask_fingerprint=False)
+        page = await new_page(context, context.faker)
+
+        for batched in (False, True):
+            Mouse.batched_dispatch = batched
+            timings = []
+            for _ in range(clicks):
+                await page.set_content(STATIC_PAGE.format(left=random.randint(0, 1100), top=random.randint(0, 600)))
+                action = ClickAction.new_action(mid=0, page=page, variables={}, params={"selector": "#target"})
+                start = time.perf_counter()
+                result = await action.execute()
+                timings.append((time.perf_counter() - start) * 1000)
+                assert result.success, result.error
+            name = "batched" if batched else "per-point"
+            print(f"ClickAction {name:<10} p50={statistics.median(timings):8.1f}ms  "
+                  f"p90={statistics.quantiles(timings, n=10)[8]:8.1f}ms")
+
+        await browser.close()
+
+
+def main(curves: int, clicks: int, skip_click: bool) -> None:
+    bench_trajectory(curves)
+    if not skip_click:
+        asyncio.run(bench_click(clicks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--curves", type=int, default=2000)
+    parser.add_argument("--clicks", type=int, default=30)
+    parser.add_argument("--skip-click", action="store_true")
+    args = parser.parse_args()
+    main(args.curves, args.clicks, args.skip_click)
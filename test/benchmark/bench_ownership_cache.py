@@ -0,0 +1,136 @@
+"""
+负载测试：浏览器归属校验 —— 每个请求查询数据库 vs 归属缓存
+
+在临时 SQLite 数据库中写入若干用户及其浏览器，用 httpx ASGITransport 以固定并发
+请求一个挂载归属校验依赖的接口（模拟操作轮询 / 页面列表 / WebRTC 信令），
+统计每秒请求数与实际执行的 SQL 条数。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_ownership_cache.py --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# 在导入 app 之前指向临时 SQLite 数据库
+_db_dir = tempfile.mkdtemp(prefix="bench_ownership_")
+os.environ["MYSQL_BROWSER_INFO_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+
+from fastapi import Depends, FastAPI, Header  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.models.common.exceptions.base_exception import BrowserIdNotBeloneToUserException  # noqa: E402
+from app.models.database.browser.info import UserBrowserInfo  # noqa: E402
+from app.services.RPA_browser.fingerprint.browser_fingerprint_service import BrowserFingerprintService  # noqa: E402
+from app.services.RPA_browser.fingerprint.ownership_cache import browser_ownership_cache  # noqa: E402
+from app.utils.depends.mid_depends import get_auth_info_from_header  # noqa: E402
+from app.utils.depends.security_depends import verify_browser_ownership  # noqa: E402
+from app.utils.depends.session_manager import DatabaseSessionManager, engine  # noqa: E402
+from bili_common.models.depends import AuthInfo, BrowserReqAuthInfo  # noqa: E402
+
+
+async def verify_uncached(
+    browser_id: int | str,
+    auth_info: AuthInfo = Depends(get_auth_info_from_header),
+    session: AsyncSession = DatabaseSessionManager.get_dependency(),
+) -> BrowserReqAuthInfo:
+    """旧路径：每个请求读取整行指纹"""
+    if not await BrowserFingerprintService.read_fingerprint(int(browser_id), auth_info.mid, session):
+        raise BrowserIdNotBeloneToUserException(browser_id=browser_id)
+    return BrowserReqAuthInfo(auth_info=auth_info, browser_id=browser_id)
+
+
+async def auth_from_header(x_mid: int = Header()) -> AuthInfo:
+    return AuthInfo(mid=x_mid, level=5)
+
+
+def make_app(dependency) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/probe")
+    async def probe(browser_req: BrowserReqAuthInfo = Depends(dependency)):
+        return {"browser_id": str(browser_req.browser_id)}
+
+    app.dependency_overrides[get_auth_info_from_header] = auth_from_header
+    return app
+
+
+async def seed(users: int, per_user: int) -> list[tuple[int, int]]:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    now = datetime.now(timezone.utc)
+    fingerprints = itertools.count(1)
+    pairs, rows = [], []
+    for mid in range(1, users + 1):
+        for _ in range(per_user):
+            row = UserBrowserInfo(mid=mid, created_at=now, updated_at=now)
+            row.fingerprint = next(fingerprints)
+            pairs.append((mid, row.browser_id))
+            rows.append(row)
+    async with DatabaseSessionManager.async_session() as session:
+        session.add_all(rows)
+        await session.commit()
+    return pairs
+
+
+async def run(app: FastAPI, pairs: list[tuple[int, int]], requests: int, concurrency: int) -> tuple[float, int]:
+    """返回 (每秒请求数, SQL 条数)"""
+    queries = 0
+
+    def on_execute(*_):
+        nonlocal queries
+        queries += 1
+
+    rng = random.Random(0)
+    workload = [rng.choice(pairs) for _ in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(mid: int, browser_id: int) -> None:
+            async with semaphore:
+                response = await client.get("/probe", params={"browser_id": browser_id}, headers={"x-mid": str(mid)})
+                response.raise_for_status()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(one(mid, browser_id) for mid, browser_id in workload))
+        finally:
+            elapsed = time.perf_counter() - start
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return requests / elapsed, queries
+
+
+async def main(requests: int, concurrency: int, users: int, per_user: int) -> None:
+    from loguru import logger
+    logger.remove()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    pairs = await seed(users, per_user)
+    print(f"{users} 用户 × {per_user} 浏览器, {requests} 请求, 并发 {concurrency}")
+
+    for name, dependency in (("uncached", verify_uncached), ("cached", verify_browser_ownership)):
+        browser_ownership_cache.clear()
+        rps, queries = await run(make_app(dependency), pairs, requests, concurrency)
+        print(f"{name:<10} {rps:10.0f} req/s  queries={queries:6d}  ({queries / requests:.3f}/req)")
+    print(f"cache      {browser_ownership_cache.stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.users, args.per_user))
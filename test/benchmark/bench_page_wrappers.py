@@ -0,0 +1,65 @@
+"""
+基准测试：BrowserContext.pages —— 每次访问新建 Page 包装器（立即构造 hCaptcha / Mouse / Keyboard）vs 包装器注册表 + 惰性辅助对象
+
+模拟控制器轮询页面列表：每轮访问一次 context.pages，统计单次访问耗时（p50/p99）与 tracemalloc 分配量。
+底层 Playwright 页面用 MagicMock 代替，不需要启动浏览器。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_page_wrappers.py --pages 5 --polls 200
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+
+from botright.playwright_mock import BrowserContext, Page
+
+
+def make_context(pages: int) -> BrowserContext:
+    raw_pages = []
+    for _ in range(pages):
+        page = MagicMock()
+        page.is_closed.return_value = False
+        raw_pages.append(page)
+    playwright_context = MagicMock()
+    playwright_context.pages = raw_pages
+    return BrowserContext(playwright_context, MagicMock(), MagicMock(), use_undetected_playwright=False, cache={},
+                          user_action_layer=False, scroll_into_view=True, mask_fingerprint=False)
+
+
+def legacy_pages(context: BrowserContext) -> list[Page]:
+    """旧实现：每次访问都新建包装器，并在构造时创建 Mouse / Keyboard / hCaptcha"""
+    pages = []
+    for _page in context._browser.pages:
+        page = Page(_page, context, context.faker)
+        page.mouse, page.keyboard, page.hcaptcha_solver
+        pages.append(page)
+    return pages
+
+
+def run(name: str, poll, context: BrowserContext, polls: int) -> None:
+    timings = []
+    tracemalloc.start()
+    for _ in range(polls):
+        start = time.perf_counter()
+        poll(context)
+        timings.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} total={sum(timings):9.1f}ms  p50={statistics.median(timings):8.3f}ms  "
+          f"p99={statistics.quantiles(timings, n=100)[98]:8.3f}ms  peak_alloc={peak / 1024:8.1f}KiB")
+
+
+def main(pages: int, polls: int) -> None:
+    print(f"{pages} 个页面，轮询 {polls} 次 context.pages")
+    run("legacy", legacy_pages, make_context(pages), polls)
+    run("registry", lambda context: context.pages, make_context(pages), polls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+    main(args.pages, args.polls)
@@ -0,0 +1,107 @@
+"""
+基准测试：每次执行重新规范化 + 编译 Pipeline vs 命中已编译 Pipeline 缓存
+
+构造一个 200 步、含嵌套 Loop / IfElse 的工作流（原始 JSON 形式，与数据库中保存的一致），
+使用不做任何事的 executor 执行，对比两种模式下单次 "编译 + 执行" 的耗时。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_pipeline_cache.py --runs 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models.execution.action_params import _ensure_action_type, workflow_step_adapter
+from app.services.execution.actions.base import ActionResult
+from app.services.execution.engine import ExecutionEngine
+from app.services.execution.pipeline import PipelineBuilder
+from app.services.execution.pipeline_cache import pipeline_cache
+from app.services.execution.scope import Scope
+
+
+def make_steps(total: int) -> list[dict]:
+    """每 10 步为一组：6 个原子步骤 + 一个含 2 步的循环 + 一个各含 1 步的分支"""
+    steps: list[dict] = []
+    for group in range(total // 10):
+        for i in range(6):
+            steps.append({
+                "action_id": "print",
+                "params": {"message": f"step {group}-{i}: {{{{name}}}}" if i % 2 else f"step {group}-{i}"},
+            })
+        steps.append({
+            "action_id": "loop",
+            "params": {
+                "count": 2,
+                "loopBranch": [
+                    {"action_id": "print", "params": {"message": "loop {{loop_index}}"}},
+                    {"action_id": "wait", "params": {"timeout": 0}},
+                ],
+            },
+        })
+        steps.append({
+            "action_id": "if_else",
+            "params": {
+                "condition": {"condition": {
+                    "field": "name", "condition_value_type": "STRING", "condition_value": "bench",
+                }},
+                "TrueBranch": [{"action_id": "print", "params": {"message": "true"}}],
+                "FalseBranch": [{"action_id": "print", "params": {"message": "false"}}],
+            },
+        })
+    return steps
+
+
+async def noop_executor(action_id: str, params: dict, scope: Scope, output_vars: list[str]) -> ActionResult:
+    return ActionResult(success=True, action_id=action_id)
+
+
+def build_uncached(model) -> object:
+    """旧路径：每次执行都规范化步骤并重新编译"""
+    steps = [workflow_step_adapter.validate_python(_ensure_action_type(dict(s))) for s in model.steps]
+    return PipelineBuilder.build(steps)
+
+
+async def bench(runs: int, compile_fn, model) -> list[float]:
+    timings: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pipeline = compile_fn(model)
+        await pipeline.execute(Scope({"name": "bench"}), noop_executor)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(0.99 * (len(ordered) - 1)))]
+    print(f"{name:<10} p50={statistics.median(timings):8.2f}ms  p99={p99:8.2f}ms  mean={statistics.mean(timings):8.2f}ms")
+
+
+async def main(runs: int, steps: int) -> None:
+    # 执行期间的逐步日志会淹没计时，基准测试中关闭
+    from loguru import logger
+    logger.remove()
+
+    model = SimpleNamespace(action_id="ca_bench", updated_at=datetime.now(), steps=make_steps(steps))
+    build_uncached(model)  # 预热 pydantic 校验器
+
+    uncached = await bench(runs, build_uncached, model)
+    pipeline_cache.clear()
+    cached = await bench(runs, ExecutionEngine.compile_action_pipeline, model)
+
+    print(f"{steps} 顶层步骤, {runs} 次执行")
+    report("uncached", uncached)
+    report("cached", cached)
+    print(f"speedup    {statistics.median(uncached) / statistics.median(cached):.2f}x (p50)")
+    print(f"cache      {pipeline_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.steps))
@@ -0,0 +1,114 @@
+"""
+基准测试：每个会话独立启动 Playwright 驱动 vs 共享驱动管理器
+
+对比两种模式下启动 N 个浏览器会话的单会话启动耗时（p50/p99）与进程树总 RSS。
+依赖本机已安装 Playwright 的 chromium（playwright install chromium），仅支持 Linux（读取 /proc）。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_playwright_driver.py --sessions 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from botright.modules.playwright_driver import PlaywrightDriverManager
+
+
+def _children(pid: int) -> list[int]:
+    """递归收集 pid 的所有子进程"""
+    result: list[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        children_file = task / "children"
+        if not children_file.exists():
+            continue
+        for child in children_file.read_text().split():
+            result.append(int(child))
+            result.extend(_children(int(child)))
+    return result
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def process_tree_rss_mb() -> float:
+    """当前进程的所有子进程（驱动 + 浏览器）RSS 总和，单位 MB"""
+    return sum(_rss_kb(pid) for pid in _children(os.getpid())) / 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def bench_dedicated(sessions: int) -> tuple[list[float], float]:
+    """旧模式：每个会话 async_playwright().start() 一个新驱动"""
+    latencies: list[float] = []
+    drivers, browsers = [], []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=True)
+        await browser.new_page()
+        latencies.append(time.perf_counter() - start)
+        drivers.append(playwright)
+        browsers.append(browser)
+    rss = process_tree_rss_mb()
+    for browser, playwright in zip(browsers, drivers):
+        await browser.close()
+        await playwright.stop()
+    return latencies, rss
+
+
+async def bench_shared(sessions: int, shards: int) -> tuple[list[float], float]:
+    """新模式：会话从 PlaywrightDriverManager 借用驱动"""
+    manager = PlaywrightDriverManager(shards=shards)
+    latencies: list[float] = []
+    leases, browsers = [], []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        lease = await manager.acquire()
+        browser = await lease.playwright.chromium.launch(headless=True)
+        await browser.new_page()
+        latencies.append(time.perf_counter() - start)
+        leases.append(lease)
+        browsers.append(browser)
+    rss = process_tree_rss_mb()
+    for browser, lease in zip(browsers, leases):
+        await browser.close()
+        await manager.release(lease)
+    await manager.shutdown()
+    return latencies, rss
+
+
+def _report(name: str, latencies: list[float], rss: float) -> None:
+    print(
+        f"{name:<10} p50={statistics.median(latencies) * 1000:8.1f}ms "
+        f"p99={_percentile(latencies, 0.99) * 1000:8.1f}ms "
+        f"first={latencies[0] * 1000:8.1f}ms rss={rss:8.1f}MB"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args()
+
+    _report("dedicated", *(await bench_dedicated(args.sessions)))
+    _report("shared", *(await bench_shared(args.sessions, args.shards)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
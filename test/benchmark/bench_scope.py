@@ -0,0 +1,73 @@
+"""
+基准测试：Scope 快照 —— 旧实现（每次合并整个作用域栈为新 dict）vs 分段只读视图
+
+模拟循环体：全局层有大量变量，每次迭代推入一层、写入循环变量、
+求值条件 / 记录日志各取一次快照、再弹出。并校验两种快照内容一致。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_scope.py --variables 5000 --iterations 1000
+"""
+import argparse
+import gc
+import time
+
+from app.services.execution.scope import Scope
+
+
+def legacy_snapshot(layers: list[dict]) -> dict:
+    merged: dict = {}
+    for layer in layers:
+        merged.update(layer)
+    return merged
+
+
+def run_legacy(variables: int, iterations: int) -> tuple[float, list[dict]]:
+    layers: list[dict] = [{f"var_{i}": i for i in range(variables)}]
+    kept: list[dict] = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        layers.append({})
+        layers[-1]["loop_index"] = i
+        layers[-1]["loop_item"] = {"id": i}
+        legacy_snapshot(layers)  # 条件求值
+        kept.append(legacy_snapshot(layers))  # 日志
+        layers.pop()
+        layers[0]["counter"] = i
+    return (time.perf_counter() - start) * 1000, kept
+
+
+def run_scope(variables: int, iterations: int) -> tuple[float, list]:
+    scope = Scope({f"var_{i}": i for i in range(variables)})
+    kept: list = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        scope.push()
+        scope.set("loop_index", i)
+        scope.set("loop_item", {"id": i})
+        scope.snapshot()  # 条件求值
+        kept.append(scope.snapshot())  # 日志
+        scope.pop()
+        scope.set("counter", i)
+    return (time.perf_counter() - start) * 1000, kept
+
+
+def main(variables: int, iterations: int) -> None:
+    scope_ms, scope_kept = run_scope(variables, iterations)
+    gc.collect()
+    legacy_ms, legacy_kept = run_legacy(variables, iterations)
+
+    for i in (0, iterations // 2, iterations - 1):
+        assert dict(scope_kept[i]) == legacy_kept[i], "快照内容不一致"
+
+    print(f"{variables} 个变量, {iterations} 次迭代（每次 2 个快照）, 快照内容一致")
+    print(f"legacy merge   {legacy_ms:9.2f}ms")
+    print(f"segmented view {scope_ms:9.2f}ms")
+    print(f"speedup        {legacy_ms / scope_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variables", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.variables, args.iterations)
@@ -0,0 +1,105 @@
+"""
+基准测试：screencast 帧摄取 —— PIL 解码 + RGB→YUV 转换 vs MJPEG 直接解码为 YUV 平面 + max_fps 限流
+
+N 路流，每路按 --source-fps 向 VideoFrameProducer 推送 JPEG（模拟 CDP screencast 回调），
+消费者不限速地调用 get_next_frame（解码在线程池中执行）。统计每路实际解码帧率与每路 CPU 占用。
+
+帧来源：--jpeg-dir 指定录制的 screencast JPEG 目录（按文件名排序循环播放）；
+未指定时生成带移动色块的合成帧。
+
+用法:
+    PYTHONPATH=. python test/benchmark/bench_screencast_ingest.py --streams 30 --seconds 5
+    PYTHONPATH=. python test/benchmark/bench_screencast_ingest.py --jpeg-dir /path/to/frames
+"""
+import argparse
+import asyncio
+import io
+import time
+from pathlib import Path
+
+import av
+import numpy as np
+from PIL import Image
+
+from app.models.runtime.webrtc_models import WebRTCSessionConfig
+from app.services.RPA_browser.webrtc.video_frame_producer import VideoFrameProducer
+
+
+class LegacyFrameProducer(VideoFrameProducer):
+    """旧解码流程：JPEG → PIL RGB → av.VideoFrame → yuv420p"""
+
+    def _decode_jpeg(self, jpeg_data: bytes) -> av.VideoFrame:
+        self._decoder.decoded += 1
+        return av.VideoFrame.from_image(Image.open(io.BytesIO(jpeg_data))).reformat(format="yuv420p")
+
+
+def load_frames(jpeg_dir: str | None, width: int, height: int, count: int = 30) -> list[bytes]:
+    if jpeg_dir:
+        return [p.read_bytes() for p in sorted(Path(jpeg_dir).glob("*.jp*g"))]
+    frames = []
+    background = np.zeros((height, width, 3), np.uint8)
+    background[:, :, 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    background[:, :, 2] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+    for i in range(count):
+        pixels = background.copy()
+        x = (i * 37) % (width - 200)
+        pixels[100:300, x:x + 200] = 255
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, "JPEG", quality=80)
+        frames.append(buffer.getvalue())
+    return frames
+
+
+async def run_stream(producer: VideoFrameProducer, frames: list[bytes], source_fps: int, deadline: float) -> None:
+    async def feed():
+        index = 0
+        while time.monotonic() < deadline:
+            await producer._on_frame_callback({"data": frames[index % len(frames)]})
+            index += 1
+            await asyncio.sleep(1 / source_fps)
+        await producer.stop()
+        if producer.frame_queue.empty():
+            producer.frame_queue.put_nowait(frames[0])  # 唤醒等待中的消费者
+
+    async def consume():
+        while producer.is_running:
+            await producer.get_next_frame()
+
+    await asyncio.gather(feed(), consume())
+
+
+async def run(name: str, producer_cls, frames: list[bytes], streams: int, seconds: float, source_fps: int, max_fps: int) -> None:
+    config = WebRTCSessionConfig(max_fps=max_fps, frame_queue_size=10)
+    producers = []
+    for _ in range(streams):
+        producer = producer_cls(page=None, config=config)
+        producer._is_running = True
+        producers.append(producer)
+
+    wall, cpu = time.monotonic(), time.process_time()
+    await asyncio.gather(*(run_stream(p, frames, source_fps, wall + seconds) for p in producers))
+    wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+
+    decoded = sum(p.stats()["decoded"] for p in producers)
+    print(f"{name:<8} max_fps={max_fps:<5} decoded={decoded / wall / streams:6.1f} fps/stream  "
+          f"cpu={cpu / wall / streams * 100:6.2f}% core/stream  total={decoded / wall:7.1f} fps")
+
+
+async def main(args) -> None:
+    frames = load_frames(args.jpeg_dir, args.width, args.height)
+    print(f"{args.streams} 路流，源帧率 {args.source_fps}fps，{len(frames)} 张 JPEG，平均 {sum(map(len, frames)) // len(frames)} 字节")
+    await run("legacy", LegacyFrameProducer, frames, args.streams, args.seconds, args.source_fps, 10**6)
+    await run("direct", VideoFrameProducer, frames, args.streams, args.seconds, args.source_fps, 10**6)
+    await run("direct", VideoFrameProducer, frames, args.streams, args.seconds, args.source_fps, args.max_fps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--source-fps", type=int, default=60)
+    parser.add_argument("--max-fps", type=int, default=15)
+    parser.add_argument("--jpeg-dir", default=None)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    asyncio.run(main(parser.parse_args()))
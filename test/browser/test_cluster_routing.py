@@ -0,0 +1,251 @@
+"""
+测试多节点会话分片 —— 一致性哈希、会话目录 compare-and-set、粘滞路由与请求转发
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.exceptions.handlers import custom_exception_handler, session_forwarded_handler
+from app.models.common.exceptions.base_exception import BaseException as CustomBaseException
+from app.services.RPA_browser.cluster import (
+    FORWARDED_BY_HEADER,
+    FORWARD_SIGNATURE_HEADER,
+    ClusterNode,
+    ConsistentHashRing,
+    InMemorySessionDirectory,
+    SessionForwardedException,
+    SessionRouter,
+    SQLiteSessionDirectory,
+)
+from app.utils.depends import cluster_depends
+from app.utils.depends.cluster_depends import route_to_session_owner
+from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.http.httpx_client import AsyncHttpClient
+
+SECRET = "cluster-test-secret"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def directory_factory(request, tmp_path):
+    def make(clock):
+        if request.param == "memory":
+            return InMemorySessionDirectory(clock)
+        return SQLiteSessionDirectory(str(tmp_path / "cluster.db"), clock)
+
+    return make
+
+
+class TestConsistentHashRing:
+
+    def test_placement_is_deterministic(self):
+        keys = [f"1_{i}" for i in range(200)]
+        a = ConsistentHashRing(["n1", "n2", "n3"])
+        b = ConsistentHashRing(["n3", "n1", "n2"])
+        assert [a.get(k) for k in keys] == [b.get(k) for k in keys]
+        assert ConsistentHashRing().get("1_1") is None
+
+    def test_adding_a_node_moves_only_its_share(self):
+        keys = [f"1_{i}" for i in range(2000)]
+        ring = ConsistentHashRing(["n1", "n2", "n3"])
+        before = {k: ring.get(k) for k in keys}
+        ring.add("n4")
+        moved = [k for k in keys if ring.get(k) != before[k]]
+
+        # 只有迁往新节点的 key 会变化，大约占 1/4
+        assert all(ring.get(k) == "n4" for k in moved)
+        assert 0.1 < len(moved) / len(keys) < 0.4
+
+        ring.remove("n4")
+        assert {k: ring.get(k) for k in keys} == before
+
+
+class TestSessionDirectory:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_claim_is_compare_and_set(self, directory_factory, fake_clock):
+        directory = directory_factory(fake_clock(1000.0))
+
+        assert await directory.get_owner(1, 1) is None
+        assert await directory.claim(1, 1, "n1") == "n1"
+        # 已有归属时不会被覆盖
+        assert await directory.claim(1, 1, "n2") == "n1"
+        assert await directory.claim(1, 1, "n2", replace="n3") == "n1"
+        # 只有确认旧节点失效（replace 与当前归属一致）时才能接管
+        assert await directory.claim(1, 1, "n2", replace="n1") == "n2"
+        assert await directory.get_owner(1, 1) == "n2"
+        await directory.close()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_alive_nodes_respects_ttl(self, directory_factory, fake_clock):
+        clock = fake_clock(1000.0)
+        directory = directory_factory(clock)
+        await directory.register_node(ClusterNode("n1", "http://n1"))
+        await directory.register_node(ClusterNode("n2", "http://n2"))
+
+        clock.now += 20
+        await directory.heartbeat("n2")
+        clock.now += 15
+
+        assert [n.node_id for n in await directory.alive_nodes(ttl=30)] == ["n2"]
+        await directory.remove_node("n2")
+        assert await directory.alive_nodes(ttl=30) == []
+        await directory.close()
+
+
+class TestSessionRouter:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_sessions_stick_to_owner_until_it_expires(self, fake_clock):
+        clock = fake_clock(1000.0)
+        directory = InMemorySessionDirectory(clock)
+        routers = {
+            node_id: SessionRouter(directory, ClusterNode(node_id, f"http://{node_id}"), node_ttl=30, secret=SECRET)
+            for node_id in ("n1", "n2", "n3")
+        }
+        for router in routers.values():
+            await router.start()
+
+        owners = {bid: (await routers["n1"].locate(1, bid)).node_id for bid in range(60)}
+        assert set(owners.values()) == {"n1", "n2", "n3"}
+        # 任意节点查询都得到同一个归属
+        for router in routers.values():
+            assert {bid: (await router.locate(1, bid)).node_id for bid in range(60)} == owners
+
+        # 新节点加入不会迁移已有会话（浏览器配置目录在原节点磁盘上）
+        await routers["n1"].directory.register_node(ClusterNode("n4", "http://n4"))
+        assert {bid: (await routers["n1"].locate(1, bid)).node_id for bid in range(60)} == owners
+
+        # n3 心跳超时后，其名下的会话被重新分配到存活节点，其余会话保持不动
+        clock.now += 31
+        for node_id in ("n1", "n2"):
+            await routers[node_id].heartbeat()
+        moved = {bid: (await routers["n1"].locate(1, bid)).node_id for bid in range(60)}
+        for bid, owner in owners.items():
+            if owner == "n3":
+                assert moved[bid] in {"n1", "n2"}
+            else:
+                assert moved[bid] == owner
+
+
+def _node_app(node_id: str, calls: list[str]) -> FastAPI:
+    """模拟一个节点：接口挂载 route_to_session_owner，跳过数据库鉴权"""
+    app = FastAPI()
+    app.add_exception_handler(CustomBaseException, custom_exception_handler)
+    app.add_exception_handler(SessionForwardedException, session_forwarded_handler)
+
+    async def fake_ownership(browser_id: int):
+        return SimpleNamespace(auth_info=SimpleNamespace(mid=1), browser_id=browser_id)
+
+    app.dependency_overrides[verify_browser_ownership] = fake_ownership
+
+    @app.post("/session/open", dependencies=[Depends(route_to_session_owner)])
+    async def open_session(browser_id: int, payload: dict):
+        calls.append(node_id)
+        return {"node": node_id, "browser_id": browser_id, "payload": payload}
+
+    return app
+
+
+class TestRouteToSessionOwner:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_request_is_forwarded_to_owner(self, monkeypatch):
+        directory = InMemorySessionDirectory()
+        calls: list[str] = []
+        app_a, app_b = _node_app("a", calls), _node_app("b", calls)
+        router_a = SessionRouter(
+            directory,
+            ClusterNode("a", "http://node-a"),
+            http_client=AsyncHttpClient(transport=ASGITransport(app=app_b)),
+            secret=SECRET,
+        )
+        router_b = SessionRouter(directory, ClusterNode("b", "http://node-b"), secret=SECRET)
+        await router_a.start()
+        await router_b.start()
+        await directory.claim(1, 7, "b")
+
+        # 两个节点共用同一个进程，转发过去的请求带签名的转发头，在 b 上直接本地处理
+        monkeypatch.setattr(cluster_depends, "get_default_session_router", lambda: router_a)
+
+        async with AsyncClient(transport=ASGITransport(app=app_a), base_url="http://node-a") as client:
+            response = await client.post("/session/open", params={"browser_id": 7}, json={"x": 1})
+
+        assert response.status_code == 200
+        assert response.json() == {"node": "b", "browser_id": 7, "payload": {"x": 1}}
+        # 只有所属节点执行了接口，转发过去的请求不会再次转发
+        assert calls == ["b"]
+
+        # 本节点拥有的会话直接在本地处理
+        await directory.claim(1, 8, "a")
+        async with AsyncClient(transport=ASGITransport(app=app_a), base_url="http://node-a") as client:
+            response = await client.post("/session/open", params={"browser_id": 8}, json={})
+        assert response.json()["node"] == "a"
+        await router_a.stop()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_unreachable_owner_returns_service_unavailable(self, monkeypatch):
+        directory = InMemorySessionDirectory()
+        calls: list[str] = []
+        app_a = _node_app("a", calls)
+        router_a = SessionRouter(
+            directory,
+            ClusterNode("a", "http://node-a"),
+            http_client=AsyncHttpClient(timeout=1),
+            secret=SECRET,
+        )
+        await router_a.start()
+        await directory.register_node(ClusterNode("b", "http://127.0.0.1:9"))
+        await directory.claim(1, 7, "b")
+        monkeypatch.setattr(cluster_depends, "get_default_session_router", lambda: router_a)
+
+        peer = SessionRouter(directory, ClusterNode("b", "http://127.0.0.1:9"), secret=SECRET)
+        async with AsyncClient(transport=ASGITransport(app=app_a), base_url="http://node-a") as client:
+            response = await client.post("/session/open", params={"browser_id": 7}, json={})
+            forwarded = await client.post(
+                "/session/open", params={"browser_id": 7}, json={},
+                headers=peer.sign_forward("POST", "/session/open"),
+            )
+
+        assert "b" in response.json()["msg"]
+        # 签名有效的转发请求在本节点处理，不再转发
+        assert calls == ["a"]
+        assert forwarded.json()["node"] == "a"
+        await router_a.stop()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_unsigned_or_forged_forward_header_is_still_routed(self, monkeypatch):
+        directory = InMemorySessionDirectory()
+        calls: list[str] = []
+        app_a, app_b = _node_app("a", calls), _node_app("b", calls)
+        router_a = SessionRouter(
+            directory,
+            ClusterNode("a", "http://node-a"),
+            http_client=AsyncHttpClient(transport=ASGITransport(app=app_b)),
+            secret=SECRET,
+        )
+        await router_a.start()
+        await directory.claim(1, 7, "b")
+        monkeypatch.setattr(cluster_depends, "get_default_session_router", lambda: router_a)
+
+        outsider = SessionRouter(directory, ClusterNode("b", "http://node-b"), secret="wrong-secret")
+        signed_for_other_path = router_a.sign_forward("POST", "/session/close")
+        expired = SessionRouter(
+            directory, ClusterNode("b", "http://node-b"), secret=SECRET, clock=lambda: 0,
+        ).sign_forward("POST", "/session/open")
+        forged_headers = [
+            {FORWARDED_BY_HEADER: "b"},
+            {FORWARDED_BY_HEADER: "b", FORWARD_SIGNATURE_HEADER: "123:deadbeef"},
+            outsider.sign_forward("POST", "/session/open"),
+            signed_for_other_path,
+            expired,
+        ]
+        async with AsyncClient(transport=ASGITransport(app=app_a), base_url="http://node-a") as client:
+            for headers in forged_headers:
+                response = await client.post("/session/open", params={"browser_id": 7}, json={}, headers=headers)
+                assert response.json()["node"] == "b"
+
+        # 伪造的转发头不能让非所属节点 a 启动同一会话
+        assert calls == ["b"] * len(forged_headers)
+        await router_a.stop()
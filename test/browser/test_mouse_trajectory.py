@@ -0,0 +1,119 @@
+"""
+测试人类化鼠标轨迹（向量化实现）与批量 CDP 派发
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from botright.playwright_mock.mouse import BezierCalculator, HumanizeMouseTrajectory, Mouse
+
+
+class FakeCDPSession:
+    """记录 Input.dispatchMouseEvent 调用，并统计同时在途的请求数"""
+
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+        self.events: list[dict] = []
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def send(self, method: str, params: dict):
+        assert method == "Input.dispatchMouseEvent"
+        self.events.append(params)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        await asyncio.sleep(self.latency)
+        self.inflight -= 1
+
+
+def make_mouse(cdp: FakeCDPSession | None) -> Mouse:
+    playwright_mouse = MagicMock()
+    playwright_mouse.move = AsyncMock()
+    playwright_mouse.down = AsyncMock()
+    playwright_mouse.up = AsyncMock()
+    page = SimpleNamespace(cdp=cdp, wait_for_timeout=AsyncMock())
+    return Mouse(playwright_mouse, page)
+
+
+class TestTrajectory:
+
+    def test_curve_matches_scalar_bernstein_formula(self):
+        knots = [(0, 0), (120, -40), (300, 260), (500, 400)]
+        curve = BezierCalculator.calculate_points_in_curve(50, knots)
+
+        reference = BezierCalculator.bernstein_polynomial(knots)
+        expected = [reference(i / 49) for i in range(50)]
+        np.testing.assert_allclose(curve, expected, atol=1e-9)
+        # 基函数表按 (点数, 阶数) 缓存复用
+        assert BezierCalculator.bernstein_basis(50, 3) is BezierCalculator.bernstein_basis(50, 3)
+
+    def test_trajectory_shape_and_endpoints(self):
+        for start, end in [((0, 0), (640, 360)), ((500, 500), (10, 20)), ((5, 5), (6, 5))]:
+            trajectory = HumanizeMouseTrajectory(start, end)
+            points = trajectory.points
+
+            assert len(points) == 100
+            assert points[0] == pytest.approx(start) and points[-1] == pytest.approx(end)
+            assert all(type(x) is float and type(y) is float for x, y in points)
+
+    def test_distortion_shifts_inner_points_vertically_by_whole_pixels(self):
+        trajectory = HumanizeMouseTrajectory((0, 0), (10, 10))
+        points = np.column_stack([np.arange(1000.0), np.zeros(1000)])
+
+        distorted = trajectory.distort_points(points, 1, 1, 0.5)
+
+        np.testing.assert_array_equal(distorted[:, 0], points[:, 0])
+        assert distorted[0, 1] == 0 and distorted[-1, 1] == 0
+        assert np.all(distorted[:, 1] == np.trunc(distorted[:, 1]))
+        assert 0.2 < np.count_nonzero(distorted[1:-1, 1]) / 998 < 0.6
+
+    def test_tween_follows_ease_out_quad(self):
+        trajectory = HumanizeMouseTrajectory((0, 0), (10, 10))
+        points = np.column_stack([np.arange(500.0), np.arange(500.0)])
+
+        tweened = trajectory.tween_points(points, 100)
+
+        expected = [int(trajectory.easeOutQuad(i / 99) * 499) for i in range(100)]
+        assert tweened[:, 0].astype(int).tolist() == expected
+
+
+class TestBatchedDispatch:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_move_pipelines_cdp_events_and_syncs_last_point(self):
+        cdp = FakeCDPSession()
+        mouse = make_mouse(cdp)
+
+        await mouse.move(400, 300)
+
+        assert len(cdp.events) == 99
+        assert cdp.max_inflight > 1
+        assert {e["type"] for e in cdp.events} == {"mouseMoved"}
+        assert {(e["button"], e["buttons"]) for e in cdp.events} == {("none", 0)}
+        # 最后一个点经 Playwright 发送，保持其内部光标位置同步
+        mouse._origin_move.assert_awaited_once_with(x=pytest.approx(400), y=pytest.approx(300))
+        assert (mouse.last_x, mouse.last_y) == (pytest.approx(400), pytest.approx(300))
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_pressed_buttons_are_reported_while_dragging(self):
+        cdp = FakeCDPSession(latency=0)
+        mouse = make_mouse(cdp)
+
+        await mouse.down(button="left")
+        await mouse.move(200, 100)
+        await mouse.up(button="left")
+        await mouse.move(0, 0)
+
+        assert {(e["button"], e["buttons"]) for e in cdp.events[:99]} == {("left", 1)}
+        assert {(e["button"], e["buttons"]) for e in cdp.events[99:]} == {("none", 0)}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_falls_back_to_playwright_moves_without_cdp_session(self):
+        mouse = make_mouse(None)
+
+        await mouse.move(50, 60)
+
+        assert mouse._origin_move.await_count == 100
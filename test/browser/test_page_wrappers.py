@@ -0,0 +1,79 @@
+"""
+测试 botright Page 包装器 —— 同一底层页面复用同一包装器、关闭后失效、辅助对象惰性创建
+"""
+from unittest.mock import MagicMock, patch
+
+from botright.playwright_mock import BrowserContext, Mouse, Page
+
+
+def make_playwright_page() -> MagicMock:
+    """模拟 playwright Page：记录 once 注册的事件回调，便于手动触发 close"""
+    page = MagicMock(name="playwright_page")
+    page.is_closed.return_value = False
+    page.listeners = {}
+    page.once.side_effect = lambda event, handler: page.listeners.setdefault(event, []).append(handler)
+    return page
+
+
+def make_context(pages: list[MagicMock]) -> BrowserContext:
+    playwright_context = MagicMock(name="playwright_context")
+    playwright_context.pages = pages
+    return BrowserContext(
+        playwright_context,
+        proxy=MagicMock(),
+        faker=MagicMock(),
+        use_undetected_playwright=False,
+        cache={},
+        user_action_layer=False,
+        scroll_into_view=True,
+        mask_fingerprint=False,
+    )
+
+
+class TestPageWrapperRegistry:
+
+    def test_repeated_pages_access_returns_same_wrappers(self):
+        raw_pages = [make_playwright_page(), make_playwright_page()]
+        context = make_context(raw_pages)
+
+        first = context.pages
+        for _ in range(10):
+            again = context.pages
+            assert all(a is b for a, b in zip(first, again))
+        assert len(context._page_wrappers) == 2
+        assert context.persistent_page is first[0]
+        # 每个底层页面只注册一次 close 监听
+        assert all(len(page.listeners["close"]) == 1 for page in raw_pages)
+
+    def test_wrapper_is_dropped_when_page_closes(self):
+        raw_page = make_playwright_page()
+        context = make_context([raw_page])
+        old = context.pages[0]
+
+        raw_page.listeners["close"][0](raw_page)
+        assert context._page_wrappers == {}
+
+        assert context.pages[0] is not old
+        assert context.pages[0] is context.pages[0]
+
+    def test_closed_pages_are_not_registered(self):
+        raw_page = make_playwright_page()
+        context = make_context([make_playwright_page()])
+        raw_page.is_closed.return_value = True
+
+        assert context._wrap_page(raw_page) is not context._wrap_page(raw_page)
+        assert len(context._page_wrappers) == 1
+
+    def test_helpers_are_created_on_first_use(self):
+        context = make_context([make_playwright_page()])
+
+        with patch("botright.modules.hcaptcha.hCaptcha") as solver_cls:
+            page: Page = context.pages[0]
+            assert page._mouse is None and page._hcaptcha_solver is None
+            solver_cls.assert_not_called()
+
+            assert page.hcaptcha_solver is page.hcaptcha_solver
+            solver_cls.assert_called_once_with(context, page)
+
+        assert isinstance(page.mouse, Mouse) and page.mouse is page.mouse
+        assert page.keyboard is page.keyboard
@@ -0,0 +1,133 @@
+"""
+测试共享 Playwright 驱动管理器 —— 引用计数、分片、崩溃重启
+"""
+import asyncio
+
+import pytest
+
+from botright.modules.playwright_driver import (
+    DriverManagerClosedError,
+    PlaywrightDriverManager,
+)
+
+
+class FakePlaywright:
+    """模拟 Playwright 驱动：记录 stop 调用，可手动标记为崩溃"""
+
+    def __init__(self, undetected: bool):
+        self.undetected = undetected
+        self.alive = True
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+        self.alive = False
+
+
+class FakeDriverManager(PlaywrightDriverManager):
+    """不启动真实 Node 驱动的管理器，统计驱动启动次数"""
+
+    def __init__(self, *args, start_delay: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started: list[FakePlaywright] = []
+        self.start_delay = start_delay
+
+    async def _start_driver(self, undetected: bool):
+        await asyncio.sleep(self.start_delay)
+        driver = FakePlaywright(undetected)
+        self.started.append(driver)
+        return driver
+
+    @staticmethod
+    def _is_alive(playwright) -> bool:
+        return playwright.alive
+
+
+class TestPlaywrightDriverManager:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_concurrent_acquire_starts_one_driver(self):
+        """60 个会话并发借用同一个分片，只启动一个驱动"""
+        manager = FakeDriverManager(shards=1, start_delay=0.01)
+        leases = await asyncio.gather(*(manager.acquire() for _ in range(60)))
+
+        assert len(manager.started) == 1
+        assert all(lease.playwright is manager.started[0] for lease in leases)
+        assert manager.shards[0].refcount == 60
+
+        for lease in leases:
+            await manager.release(lease)
+        assert manager.shards[0].refcount == 0
+        # keep_alive 默认开启：空闲时保留驱动
+        assert not manager.started[0].stopped
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_release_is_idempotent_and_stops_without_keep_alive(self):
+        manager = FakeDriverManager(shards=1, keep_alive=False)
+        first = await manager.acquire()
+        second = await manager.acquire()
+
+        await manager.release(first)
+        await manager.release(first)
+        assert manager.shards[0].refcount == 1
+        assert not manager.started[0].stopped
+
+        await manager.release(second)
+        assert manager.started[0].stopped
+        assert manager.running_drivers == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_shards_balance_by_refcount(self):
+        manager = FakeDriverManager(shards=3)
+        leases = await asyncio.gather(*(manager.acquire() for _ in range(9)))
+
+        assert len(manager.started) == 3
+        assert sorted(s.refcount for s in manager.shards if not s.undetected) == [3, 3, 3]
+        assert {id(lease.playwright) for lease in leases} == {id(d) for d in manager.started}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_flavours_use_separate_drivers(self):
+        manager = FakeDriverManager(shards=1)
+        normal = await manager.acquire()
+        undetected = await manager.acquire(undetected=True)
+
+        assert normal.playwright is not undetected.playwright
+        assert undetected.playwright.undetected is True
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_crashed_driver_is_restarted(self):
+        manager = FakeDriverManager(shards=1)
+        lease = await manager.acquire()
+        crashed = lease.playwright
+        crashed.alive = False
+
+        new_lease = await manager.acquire()
+        assert new_lease.playwright is not crashed
+        assert len(manager.started) == 2
+        assert manager.shards[0].starts == 2
+        # 旧借用者归还不会误停新驱动
+        await manager.release(lease)
+        assert not new_lease.playwright.stopped
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_failed_start_does_not_leak_refcount(self):
+        manager = FakeDriverManager(shards=1)
+
+        async def boom(undetected: bool):
+            raise RuntimeError("driver spawn failed")
+
+        manager._start_driver = boom
+        with pytest.raises(RuntimeError):
+            await manager.acquire()
+        assert manager.shards[0].refcount == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_shutdown_stops_drivers_and_rejects_acquire(self):
+        manager = FakeDriverManager(shards=2)
+        await manager.acquire()
+        await manager.acquire(undetected=True)
+
+        await manager.shutdown()
+        assert all(d.stopped for d in manager.started)
+        with pytest.raises(DriverManagerClosedError):
+            await manager.acquire()
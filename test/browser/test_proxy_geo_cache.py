@@ -0,0 +1,202 @@
+"""
+测试代理出口 IP / 地理位置缓存 —— 单飞、持久化、后台刷新、过期兜底
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+from async_class import AsyncObject
+
+from botright.modules.proxy_geo_cache import GeoLookupError, ProxyGeoCache, ProxyGeoInfo
+from botright.modules.proxy_manager import ProxyCheckError, ProxyManager
+
+PROXY_EGRESS_IP = "203.0.113.7"
+DIRECT_EGRESS_IP = "198.51.100.1"
+
+
+class GeoStub:
+    """本地桩服务：一个端口充当 IP / 地理位置 API，另一个端口充当 HTTP 代理（自行应答），统计各接口命中次数"""
+
+    def __init__(self):
+        self.hits: dict[str, int] = {}
+        self.servers: list[uvicorn.Server] = []
+        self.api_port = 0
+        self.proxy_port = 0
+
+    def app(self, via_proxy: bool):
+        async def handler(scope, receive, send):
+            if scope["type"] != "http":
+                return
+            path = scope["path"]
+            await asyncio.sleep(0.01)
+            if path == "/ip":
+                name, body = "ip", {"ip": PROXY_EGRESS_IP if via_proxy else DIRECT_EGRESS_IP}
+            elif path.startswith("/geo/"):
+                name = "geo"
+                body = {"country": "Germany", "countryCode": "DE", "lat": 52.52, "lon": 13.40, "timezone": "Europe/Berlin", "query": path[5:]}
+            else:
+                name, body = "other", {}
+            self.hits[name] = self.hits.get(name, 0) + 1
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+        return handler
+
+    def serve(self, via_proxy: bool) -> int:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(self.app(via_proxy), log_level="error", lifespan="off"))
+        threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        self.servers.append(server)
+        return sock.getsockname()[1]
+
+    def start(self) -> None:
+        self.api_port = self.serve(via_proxy=False)
+        self.proxy_port = self.serve(via_proxy=True)
+
+    def stop(self) -> None:
+        for server in self.servers:
+            server.should_exit = True
+
+
+class DummyBotright(AsyncObject):
+    async def __ainit__(self) -> None:
+        pass
+
+
+@pytest.fixture
+def geo_stub(monkeypatch):
+    stub = GeoStub()
+    stub.start()
+    base = f"http://127.0.0.1:{stub.api_port}"
+    monkeypatch.setattr(ProxyManager, "get_ip_apis", [f"{base}/ip"])
+    monkeypatch.setattr(ProxyManager, "get_geo_apis", {f"{base}/geo/<IP>": ["country", "countryCode", "lat", "lon", "timezone"]})
+    yield stub
+    stub.stop()
+
+
+class TestProxyManagerGeoCache:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_hundred_launches_through_one_proxy_do_one_lookup(self, geo_stub, tmp_path, monkeypatch):
+        cache = ProxyGeoCache(path=str(tmp_path / "geo.sqlite3"))
+        monkeypatch.setattr(ProxyManager, "geo_cache", cache)
+        botright = await DummyBotright()
+        proxy = f"127.0.0.1:{geo_stub.proxy_port}"
+
+        managers = await asyncio.gather(*(ProxyManager(botright, proxy) for _ in range(50)))
+        for _ in range(50):
+            managers.append(await ProxyManager(botright, proxy))
+
+        assert cache.lookups == 1
+        assert geo_stub.hits == {"ip": 1, "geo": 1}
+        for manager in managers:
+            assert manager.egress_ip == PROXY_EGRESS_IP
+            assert (manager.country_code, manager.timezone) == ("DE", "Europe/Berlin")
+            assert (manager.latitude, manager.longitude) == (52.52, 13.40)
+            assert manager.browser_proxy == {"server": f"http://{proxy}"}
+
+        # 新进程（新缓存实例）直接读取 SQLite，不再查询
+        restarted = ProxyGeoCache(path=str(tmp_path / "geo.sqlite3"))
+        monkeypatch.setattr(ProxyManager, "geo_cache", restarted)
+        manager = await ProxyManager(botright, proxy)
+        assert manager.timezone == "Europe/Berlin"
+        assert restarted.lookups == 0 and geo_stub.hits == {"ip": 1, "geo": 1}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_direct_connection_is_cached_separately(self, geo_stub, monkeypatch):
+        cache = ProxyGeoCache()
+        monkeypatch.setattr(ProxyManager, "geo_cache", cache)
+        botright = await DummyBotright()
+
+        direct = await ProxyManager(botright, "")
+        proxied = await ProxyManager(botright, f"127.0.0.1:{geo_stub.proxy_port}")
+
+        assert direct.egress_ip == DIRECT_EGRESS_IP and direct.browser_proxy is None
+        assert proxied.egress_ip == PROXY_EGRESS_IP
+        assert cache.lookups == 2
+
+
+class TestProxyGeoCache:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stale_entry_is_served_while_refreshing_in_background(self, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        cache = ProxyGeoCache(ttl=100, refresh_after=10, clock=clock)
+        release = asyncio.Event()
+        timezones = iter(["Europe/Berlin", "Europe/Paris"])
+
+        async def fetcher():
+            info = ProxyGeoInfo(ip="1.2.3.4", country="X", timezone=next(timezones))
+            if info.timezone == "Europe/Paris":
+                await release.wait()
+            return info
+
+        assert (await cache.get("p", fetcher)).timezone == "Europe/Berlin"
+        clock.now += 50
+        # 过了 refresh_after：立即返回旧值，后台刷新
+        results = await asyncio.wait_for(asyncio.gather(*(cache.get("p", fetcher) for _ in range(10))), 1)
+        assert {info.timezone for info in results} == {"Europe/Berlin"}
+        release.set()
+        await asyncio.sleep(0.01)
+
+        assert (await cache.get("p", fetcher)).timezone == "Europe/Paris"
+        assert cache.lookups == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_expired_entry_is_used_only_when_geo_api_fails_for_same_ip(self, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        cache = ProxyGeoCache(ttl=100, refresh_after=10, clock=clock)
+        failure: Exception | None = None
+
+        async def fetcher():
+            if failure is not None:
+                raise failure
+            return ProxyGeoInfo(ip="1.2.3.4", country="X", timezone="Asia/Tokyo")
+
+        await cache.get("p", fetcher)
+        clock.now += 500
+        # 代理可达且出口 IP 未变，只是地理位置 API 不可用
+        failure = GeoLookupError("geo api down", ip="1.2.3.4")
+        assert (await cache.get("p", fetcher)).timezone == "Asia/Tokyo"
+
+        # 代理已轮换出口 IP：旧的时区 / 位置不再可信
+        failure = GeoLookupError("geo api down", ip="5.6.7.8")
+        with pytest.raises(GeoLookupError):
+            await cache.get("p", fetcher)
+        # 条目已被清除，之后的启动重新查询而不是继续使用旧位置
+        with pytest.raises(GeoLookupError):
+            await cache.get("p", fetcher)
+        assert cache.lookups == 4
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_dead_proxy_is_not_served_from_expired_entry(self, tmp_path, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        cache = ProxyGeoCache(path=str(tmp_path / "geo.sqlite3"), ttl=100, refresh_after=10, clock=clock)
+        fail = False
+
+        async def fetcher():
+            if fail:
+                raise ProxyCheckError("Could not get IP-Address of Proxy (Proxy is Invalid/Timed Out)")
+            return ProxyGeoInfo(ip="1.2.3.4", country="X", timezone="Asia/Tokyo")
+
+        await cache.get("p", fetcher)
+        clock.now += 500
+        fail = True
+        with pytest.raises(ProxyCheckError):
+            await cache.get("p", fetcher)
+        # 失败的查询同时清除了持久化的条目
+        assert await ProxyGeoCache(path=str(tmp_path / "geo.sqlite3"))._cached(cache.key_for("p")) is None
+
+        fail = False
+        await cache.get("p", fetcher)
+        await cache.invalidate("p")
+        fail = True
+        with pytest.raises(ProxyCheckError):
+            await cache.get("p", fetcher)
@@ -0,0 +1,233 @@
+"""
+测试浏览器资源治理 —— 进程采样、预算判断、代价排序、页面休眠与会话关闭
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models.runtime.control import SessionLifecycleState
+from app.models.runtime.live_service import BrowserSessionEntry
+from app.services.RPA_browser.browser_session_pool.session_registry import ShardedSessionRegistry
+from app.services.RPA_browser.session.live_service import LiveService
+from app.services.RPA_browser.session.resource_governor import ProcessStats, ResourceGovernor
+
+
+class FakeStatsProvider:
+    """按 user_data_dir 返回预设的资源占用"""
+
+    def __init__(self, stats: dict[str, float]):
+        self.stats = stats
+
+    def sample_all(self, user_data_dirs):
+        return {d: ProcessStats(rss_mb=self.stats[d], cpu_percent=5.0) for d in user_data_dirs if d in self.stats}
+
+
+class FakeBrowserSession:
+    is_closed = False
+
+    def __init__(self, user_data_dir: str, pages: int = 2):
+        self.playwright_instance = SimpleNamespace(user_data_dir=user_data_dir)
+        self.pages = pages
+        self.hibernated = 0
+        self.closed = False
+
+    def hibernatable_page_count(self) -> int:
+        return self.pages - self.hibernated
+
+    async def hibernate_idle_pages(self) -> int:
+        count = self.hibernatable_page_count()
+        self.hibernated = self.pages
+        return count
+
+    async def restore_hibernated_pages(self) -> int:
+        count, self.hibernated = self.hibernated, 0
+        return count
+
+    async def close(self):
+        self.closed = True
+
+
+def _entry(browser_id: int, idle: int, **kwargs) -> BrowserSessionEntry:
+    return BrowserSessionEntry(
+        mid=1,
+        browser_id=browser_id,
+        browser_session=FakeBrowserSession(f"/data/1/{browser_id}", pages=kwargs.pop("pages", 2)),
+        last_activity=int(time.time()) - idle,
+        **kwargs,
+    )
+
+
+def _returning(entry: BrowserSessionEntry):
+    async def factory():
+        return entry
+    return factory
+
+
+def _sampled(governor: ResourceGovernor, entries: dict[str, BrowserSessionEntry]) -> dict[str, BrowserSessionEntry]:
+    governor.sample(entries)
+    return entries
+
+
+@pytest.fixture
+def budget_settings(monkeypatch):
+    monkeypatch.setattr(settings, "browser_memory_budget_mb", 1000)
+    monkeypatch.setattr(settings, "browser_memory_critical_ratio", 1.5)
+    monkeypatch.setattr(settings, "browser_hibernate_reclaim_ratio", 0.5)
+    monkeypatch.setattr(settings, "browser_page_hibernate_min_idle", 60)
+
+
+class TestResourceGovernor:
+
+    def test_sample_writes_stats_to_entries(self, budget_settings):
+        governor = ResourceGovernor(FakeStatsProvider({"/data/1/1": 300.0}))
+        entries = {"1_1": _entry(1, idle=0), "1_2": _entry(2, idle=0)}
+
+        assert governor.sample(entries) == 300.0
+        assert entries["1_1"].rss_mb == 300.0 and entries["1_1"].cpu_percent == 5.0
+        # 找不到进程的会话记为 0
+        assert entries["1_2"].rss_mb == 0.0
+
+    def test_no_decision_within_budget_or_disabled(self, budget_settings, monkeypatch):
+        governor = ResourceGovernor(FakeStatsProvider({"/data/1/1": 600.0, "/data/1/2": 300.0}))
+        entries = _sampled(governor, {"1_1": _entry(1, idle=600), "1_2": _entry(2, idle=600)})
+        assert governor.plan(entries) == {}
+
+        monkeypatch.setattr(settings, "browser_memory_budget_mb", 0)
+        entries["1_1"].rss_mb = 10_000
+        assert governor.plan(entries) == {}
+
+    def test_hibernates_highest_cost_first(self, budget_settings):
+        # 总量 1200MB > 1000MB，未到临界值；代价 = 闲置时长 × 内存
+        governor = ResourceGovernor(
+            FakeStatsProvider({"/data/1/1": 400.0, "/data/1/2": 400.0, "/data/1/3": 400.0})
+        )
+        entries = _sampled(governor, {
+            "1_1": _entry(1, idle=100),
+            "1_2": _entry(2, idle=900),
+            "1_3": _entry(3, idle=300),
+        })
+
+        decisions = governor.plan(entries)
+
+        # 休眠 1_2 预计回收 200MB，刚好回到预算内
+        assert list(decisions) == ["1_2"]
+        assert decisions["1_2"].hibernate_pages and not decisions["1_2"].should_cleanup
+        assert decisions["1_2"].next_state == SessionLifecycleState.SUSPENDING
+
+    def test_protected_sessions_are_never_evicted(self, budget_settings):
+        governor = ResourceGovernor(
+            FakeStatsProvider({"/data/1/1": 500.0, "/data/1/2": 500.0, "/data/1/3": 500.0, "/data/1/4": 100.0})
+        )
+        watched = _entry(1, idle=900)
+        watched.active_connections.add("conn-1")
+        entries = _sampled(governor, {
+            "1_1": watched,
+            "1_2": _entry(2, idle=900, is_manual_mode=True),
+            "1_3": _entry(3, idle=10),  # 刚使用过
+            "1_4": _entry(4, idle=900),
+        })
+
+        decisions = governor.plan(entries)
+
+        assert set(decisions) == {"1_4"}
+        # 总量 1600MB 已超过临界值，唯一候选直接关闭
+        assert decisions["1_4"].should_cleanup
+
+    def test_terminates_suspended_and_critical_sessions(self, budget_settings):
+        governor = ResourceGovernor(FakeStatsProvider({"/data/1/1": 900.0, "/data/1/2": 300.0}))
+        suspended = _entry(1, idle=900, lifecycle_state=SessionLifecycleState.SUSPENDING)
+        entries = _sampled(governor, {"1_1": suspended, "1_2": _entry(2, idle=60)})
+
+        # 已休眠过的会话不能再休眠：1_2 休眠预计回收 150MB 不够，代价最高的 1_1 直接关闭
+        decisions = governor.plan(entries)
+        assert decisions["1_2"].hibernate_pages
+        assert decisions["1_1"].should_cleanup
+        assert decisions["1_1"].next_state == SessionLifecycleState.TERMINATING
+
+        # 超过临界值（1000 × 1.5）时不尝试休眠
+        governor = ResourceGovernor(FakeStatsProvider({"/data/1/1": 1000.0, "/data/1/2": 800.0}))
+        entries = _sampled(governor, {"1_1": _entry(1, idle=600), "1_2": _entry(2, idle=60)})
+        decisions = governor.plan(entries)
+        assert list(decisions) == ["1_1"]
+        assert decisions["1_1"].should_cleanup and not decisions["1_1"].hibernate_pages
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_live_service_hibernates_and_resumes(self, budget_settings, monkeypatch):
+        entries = {"1_1": _entry(1, idle=900), "1_2": _entry(2, idle=60)}
+        registry = ShardedSessionRegistry()
+        for key, entry in entries.items():
+            await registry.get_or_create(key, _returning(entry))
+        monkeypatch.setattr(LiveService, "_browser_sessions", registry)
+        monkeypatch.setattr(
+            LiveService, "_resource_governor",
+            ResourceGovernor(FakeStatsProvider({"/data/1/1": 800.0, "/data/1/2": 400.0})),
+        )
+        service = LiveService()
+
+        await service.enforce_resource_budget()
+
+        hibernated = entries["1_1"]
+        assert hibernated.lifecycle_state == SessionLifecycleState.SUSPENDING
+        assert hibernated.browser_session.hibernated == 2
+        assert entries["1_2"].browser_session.hibernated == 0
+
+        # 执行类接口通过 acquire / use_browser_session 获取条目时恢复页面并刷新活动时间
+        assert await service.acquire_browser_session_entry(1, 1) is hibernated
+        assert hibernated.lifecycle_state == SessionLifecycleState.ACTIVE
+        assert hibernated.browser_session.hibernated == 0
+        assert hibernated.idle_duration <= 1
+
+    def test_busy_sessions_are_never_evicted(self, budget_settings):
+        governor = ResourceGovernor(FakeStatsProvider({"/data/1/1": 900.0, "/data/1/2": 600.0}))
+        running = _entry(1, idle=900, busy_count=1)
+        entries = _sampled(governor, {"1_1": running, "1_2": _entry(2, idle=300)})
+
+        # 正在执行的会话即使闲置很久、占用最高也不回收
+        assert set(governor.plan(entries)) == {"1_2"}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_session_in_use_is_not_hibernated(self, budget_settings, monkeypatch):
+        entry = _entry(1, idle=900)
+        registry = ShardedSessionRegistry()
+        await registry.get_or_create("1_1", _returning(entry))
+        monkeypatch.setattr(LiveService, "_browser_sessions", registry)
+        monkeypatch.setattr(
+            LiveService, "_resource_governor", ResourceGovernor(FakeStatsProvider({"/data/1/1": 1200.0})),
+        )
+        service = LiveService()
+
+        async with service.use_browser_session(1, 1) as used:
+            assert used is entry and entry.is_busy
+            # 刷新活动时间后仍人为拉长闲置，验证忙碌标记本身即可阻止休眠
+            entry.last_activity -= 900
+            await service.enforce_resource_budget()
+            assert entry.browser_session.hibernated == 0
+
+        assert not entry.is_busy and entry.idle_duration <= 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_resume_and_hibernate_do_not_interleave(self, budget_settings, monkeypatch):
+        entry = _entry(1, idle=900, lifecycle_state=SessionLifecycleState.SUSPENDING)
+        entry.browser_session.hibernated = 2
+        registry = ShardedSessionRegistry()
+        await registry.get_or_create("1_1", _returning(entry))
+        monkeypatch.setattr(LiveService, "_browser_sessions", registry)
+        service = LiveService()
+
+        # 并发恢复只执行一次，且与同一会话的其它独占操作排队
+        order: list[str] = []
+
+        async def exclusive():
+            order.append(f"exclusive:{entry.lifecycle_state.value}")
+
+        await asyncio.gather(
+            service.acquire_browser_session_entry(1, 1),
+            service.acquire_browser_session_entry(1, 1),
+            registry.run_exclusive("1_1", exclusive),
+        )
+        assert entry.lifecycle_state == SessionLifecycleState.ACTIVE
+        assert entry.browser_session.hibernated == 0
+        assert order == [f"exclusive:{SessionLifecycleState.ACTIVE.value}"]
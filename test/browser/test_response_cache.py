@@ -0,0 +1,274 @@
+"""
+测试 botright 响应缓存 —— 按字节预算的 LRU、全局上限、Cache-Control / ETag、磁盘层（本地资源服务 + 假 Route）
+"""
+import random
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from botright.modules.response_cache import ResponseCache, ResponseCacheBudget
+
+KIB = 1024
+
+
+class AssetServer:
+    """本地资源服务：/<policy>/<name>?size=N 返回 N 字节，按 policy 设置缓存头，统计每个路径的请求次数"""
+
+    def __init__(self):
+        self.hits: dict[str, int] = {}
+        self.not_modified = 0
+        self.server: uvicorn.Server | None = None
+        self.port = 0
+
+    async def app(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path = scope["path"]
+        params = dict(part.split("=") for part in scope["query_string"].decode().split("&") if part)
+        request_headers = {k.decode(): v.decode() for k, v in scope["headers"]}
+        self.hits[path] = self.hits.get(path, 0) + 1
+
+        policy = path.split("/")[1]
+        etag = f'"{path}"'
+        headers = [(b"content-type", b"application/octet-stream"), (b"etag", etag.encode())]
+        if policy == "static":
+            headers.append((b"cache-control", b"public, max-age=3600"))
+        elif policy == "revalidate":
+            headers.append((b"cache-control", b"no-cache"))
+            if request_headers.get("if-none-match") == etag:
+                self.not_modified += 1
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        elif policy == "private":
+            headers.append((b"cache-control", b"no-store"))
+        elif policy == "vary":
+            headers.append((b"vary", b"*"))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"x" * int(params.get("size", 1024))})
+
+    def start(self) -> None:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.server = uvicorn.Server(uvicorn.Config(self.app, log_level="error", lifespan="off", interface="asgi3"))
+        threading.Thread(target=self.server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+        while not self.server.started:
+            time.sleep(0.01)
+        self.port = sock.getsockname()[1]
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+
+    def url(self, path: str, size: int) -> str:
+        return f"http://127.0.0.1:{self.port}{path}?size={size}"
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str = "image", method: str = "GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+        self.headers = {"accept": "*/*"}
+
+
+class FakeResponse:
+    def __init__(self, response: httpx.Response):
+        self.status = response.status_code
+        self.headers = {k.lower(): v for k, v in response.headers.items()}
+        self._body = response.content
+
+    async def body(self) -> bytes:
+        return self._body
+
+
+class FakeRoute:
+    """模拟 Playwright Route：fetch 走真实 HTTP，记录 fulfill / continue_"""
+
+    def __init__(self, client: httpx.AsyncClient, request: FakeRequest):
+        self.client = client
+        self.request = request
+        self.fulfilled: dict | None = None
+        self.continued = False
+
+    async def fetch(self, headers: dict | None = None) -> FakeResponse:
+        return FakeResponse(await self.client.get(self.request.url, headers=headers or self.request.headers))
+
+    async def fulfill(self, response: FakeResponse | None = None, status: int | None = None, headers: dict | None = None, body: bytes | None = None):
+        if response is not None:
+            status, body = response.status, await response.body()
+        self.fulfilled = {"status": status, "body": body}
+
+    async def continue_(self):
+        self.continued = True
+
+
+@pytest.fixture(scope="module")
+def asset_server():
+    server = AssetServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+async def load(cache: ResponseCache, client: httpx.AsyncClient, url: str, resource_type: str = "image") -> FakeRoute:
+    route = FakeRoute(client, FakeRequest(url, resource_type))
+    await cache.handle(route)
+    return route
+
+
+class TestMemoryBudget:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_memory_stays_under_budget_across_10000_requests(self, asset_server):
+        budget = 2 * 1024 * KIB
+        cache = ResponseCache(max_bytes=budget, budget=ResponseCacheBudget(16 * 1024 * KIB))
+        rng = random.Random(7)
+        # 300 个资源，4-64 KiB，总量远超预算；访问分布偏向少数热点资源
+        assets = [(f"/static/{i}", rng.choice((4, 8, 16, 32, 64)) * KIB) for i in range(300)]
+        weights = [1 / (i + 1) for i in range(len(assets))]
+
+        peak = 0
+        async with httpx.AsyncClient() as client:
+            for path, size in rng.choices(assets, weights, k=10_000):
+                route = await load(cache, client, asset_server.url(path, size))
+                assert route.fulfilled["status"] == 200 and len(route.fulfilled["body"]) == size
+                peak = max(peak, cache.memory_bytes)
+                assert cache.memory_bytes <= budget and cache.budget.used_bytes <= budget
+
+        stats = cache.stats()
+        assert peak > budget * 0.8
+        assert stats["hits"] + stats["misses"] == 10_000
+        assert stats["misses"] == sum(asset_server.hits.get(path, 0) for path, _ in assets)
+        assert stats["evictions"] > 0 and stats["hit_ratio"] > 0.5
+
+        cache.close()
+        assert cache.budget.used_bytes == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_global_ceiling_is_shared_between_contexts(self, asset_server):
+        shared = ResponseCacheBudget(256 * KIB)
+        first = ResponseCache(max_bytes=200 * KIB, budget=shared)
+        second = ResponseCache(max_bytes=200 * KIB, budget=shared)
+
+        async with httpx.AsyncClient() as client:
+            for i in range(10):
+                await load(first, client, asset_server.url(f"/static/shared-a-{i}", 16 * KIB))
+            for i in range(10):
+                await load(second, client, asset_server.url(f"/static/shared-b-{i}", 16 * KIB))
+                assert shared.used_bytes <= shared.max_bytes
+
+        # 第二个上下文的插入从占用更多的第一个上下文中逐出
+        assert first.evictions > 0
+        assert first.memory_bytes + second.memory_bytes == shared.used_bytes
+
+
+class TestHttpSemantics:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stale_entry_is_revalidated_with_etag(self, asset_server):
+        cache = ResponseCache()
+        url = asset_server.url("/revalidate/app.css", 8 * KIB)
+
+        async with httpx.AsyncClient() as client:
+            first = await load(cache, client, url, "stylesheet")
+            second = await load(cache, client, url, "stylesheet")
+
+        assert asset_server.not_modified == 1
+        assert second.fulfilled == {"status": 200, "body": b"x" * 8 * KIB} == first.fulfilled
+        assert cache.stats()["revalidated"] == 1 and cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_expired_entry_is_refetched(self, asset_server, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        cache = ResponseCache(clock=clock)
+        url = asset_server.url("/static/expiring.js", 1 * KIB)
+
+        async with httpx.AsyncClient() as client:
+            await load(cache, client, url)
+            await load(cache, client, url)
+            clock.now += 3601
+            await load(cache, client, url)
+
+        # 过期后带 If-None-Match 回源，static 策略总是返回 200
+        assert asset_server.hits["/static/expiring.js"] == 2
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_uncacheable_responses_are_not_stored(self, asset_server):
+        cache = ResponseCache()
+
+        async with httpx.AsyncClient() as client:
+            for path in ("/private/token.json", "/vary/page.html"):
+                for _ in range(2):
+                    route = await load(cache, client, asset_server.url(path, 512), "document")
+                    assert route.fulfilled["status"] == 200
+            skipped = await load(cache, client, asset_server.url("/static/api", 512), "xhr")
+
+        assert asset_server.hits["/private/token.json"] == 2 and asset_server.hits["/vary/page.html"] == 2
+        assert skipped.continued and cache.memory_bytes == 0
+
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_revalidation_keeps_memory_accounting_exact(self):
+        budget = ResponseCacheBudget(1024 * KIB)
+        cache = ResponseCache(budget=budget)
+        url = "http://assets.test/app.js"
+        entry = await cache.put(url, 200, {"etag": '"v1"', "cache-control": "no-cache"}, b"x" * KIB)
+
+        # 304 带回更多的头部，条目大小随之变化
+        for i in range(3):
+            entry = await cache.revalidate(entry, {"x-served-by": "edge-" * (i + 1), "date": "Thu, 01 Jan 2026 00:00:00 GMT"})
+            assert cache.memory_bytes == entry.size == budget.used_bytes
+            assert await cache.get(url) is entry
+
+        cache.close()
+        assert cache.memory_bytes == 0 and budget.used_bytes == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_heuristic_freshness_is_limited(self, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        cache = ResponseCache(clock=clock)
+
+        # 无缓存头、无校验器：错误页与 HTML 文档都不缓存
+        assert await cache.put("http://assets.test/missing.png", 404, {"content-type": "image/png"}, b"") is None
+        assert await cache.put("http://assets.test/", 200, {"content-type": "text/html; charset=utf-8"}, b"<html>") is None
+
+        image = await cache.put("http://assets.test/logo.png", 200, {"content-type": "image/png"}, b"png")
+        assert image.expires_at == clock.now + cache.default_ttl
+
+        # 带校验器的 HTML 可以缓存，但每次都要回源校验
+        page = await cache.put("http://assets.test/index", 200, {"content-type": "text/html", "etag": '"p"'}, b"<html>")
+        assert page is not None and not page.is_fresh(clock.now)
+        cache.close()
+
+
+class TestDiskTier:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_evicted_entries_spill_to_disk_and_survive_restart(self, asset_server, tmp_path):
+        cache = ResponseCache(max_bytes=64 * KIB, max_entry_bytes=32 * KIB, disk_dir=str(tmp_path))
+        urls = [asset_server.url(f"/static/disk-{i}", 16 * KIB) for i in range(8)]
+
+        async with httpx.AsyncClient() as client:
+            for url in urls:
+                await load(cache, client, url)
+            assert cache.stats()["spills"] > 0 and cache.memory_bytes <= 64 * KIB
+
+            # 已逐出到磁盘的资源不再回源
+            route = await load(cache, client, urls[0])
+            assert route.fulfilled["body"] == b"x" * 16 * KIB
+            assert cache.stats()["disk_hits"] == 1
+            cache.close()
+
+            # 新的上下文（同一 profile 目录）直接命中磁盘层
+            reopened = ResponseCache(max_bytes=64 * KIB, max_entry_bytes=32 * KIB, disk_dir=str(tmp_path))
+            await load(reopened, client, urls[1])
+            assert reopened.stats()["disk_hits"] == 1
+
+        assert all(asset_server.hits[f"/static/disk-{i}"] == 1 for i in range(8))
+        reopened.close()
@@ -0,0 +1,209 @@
+"""
+测试截屏自适应调节 —— CDP 截屏参数下发与 ScreencastGovernor 闭环调节（模拟时钟 + 假 CDP 会话）
+"""
+import base64
+
+import pytest
+
+from app.models.runtime.webrtc_models import ScreencastSettings, WebRTCSessionConfig
+from app.services.RPA_browser.webrtc.governor import SCREENCAST_LEVELS, ScreencastGovernor, StreamSignals
+from app.services.RPA_browser.webrtc.video_frame_producer import VideoFrameProducer
+
+LAST = len(SCREENCAST_LEVELS) - 1
+
+
+class FakeCDPSession:
+    """记录 CDP 命令，并可主动派发事件"""
+
+    def __init__(self):
+        self.sent: list[tuple[str, dict | None]] = []
+        self.listeners: dict[str, list] = {}
+
+    async def send(self, method: str, params: dict | None = None):
+        self.sent.append((method, params))
+
+    def on(self, event: str, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event: str, handler):
+        self.listeners[event].remove(handler)
+
+    async def emit(self, event: str, params: dict):
+        for handler in list(self.listeners.get(event, [])):
+            await handler(params)
+
+    def commands(self, method: str) -> list[dict | None]:
+        return [params for name, params in self.sent if name == method]
+
+
+class FakePage:
+    def __init__(self):
+        self.cdp = FakeCDPSession()
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeStream:
+    """实现 GovernedStream 接口：信号由测试设定，参数下发到真实的 VideoFrameProducer"""
+
+    def __init__(self, key: str, producer: VideoFrameProducer, viewers: int = 1):
+        self.stream_key = key
+        self.producer = producer
+        self.viewers = viewers
+        self.busy_seconds = 0.0
+        self.dropped = 0
+        self.queue_depth = 0
+        self.fraction_lost = 0.0
+
+    @property
+    def screencast_adjustable(self) -> bool:
+        return self.producer.adjustable
+
+    async def collect_signals(self) -> StreamSignals:
+        return StreamSignals(
+            viewers=self.viewers,
+            queue_depth=self.queue_depth,
+            queue_capacity=10,
+            frames_dropped=self.dropped,
+            busy_seconds=self.busy_seconds,
+            fraction_lost=self.fraction_lost,
+        )
+
+    async def apply_screencast_settings(self, settings: ScreencastSettings) -> bool:
+        return await self.producer.apply_settings(settings)
+
+
+async def make_stream(key: str, viewers: int = 1) -> FakeStream:
+    producer = VideoFrameProducer(FakePage(), WebRTCSessionConfig())
+    await producer.start()
+    return FakeStream(key, producer, viewers)
+
+
+def make_governor(clock: SimulatedClock, cpu_budget: float = 1.0, load: float = 0.0) -> ScreencastGovernor:
+    return ScreencastGovernor(
+        cpu_budget=cpu_budget, interval=1.0, load_high=0.85, loss_threshold=0.1,
+        upgrade_after=2, clock=clock, load_average=lambda: load, autostart=False,
+    )
+
+
+async def step(governor: ScreencastGovernor, clock: SimulatedClock, streams: dict[FakeStream, float]):
+    """推进模拟时钟 1 秒，每路流按给定 CPU 占用累计耗时，然后执行一个调节周期"""
+    clock.now += 1.0
+    for stream, cost in streams.items():
+        stream.busy_seconds += cost
+    return await governor.tick()
+
+
+class TestCDPScreencast:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_frames_are_acked_and_settings_applied_live(self):
+        page = FakePage()
+        producer = VideoFrameProducer(page, WebRTCSessionConfig(quality=75))
+        await producer.start()
+
+        assert producer.adjustable
+        assert page.cdp.commands("Page.startScreencast") == [{"format": "jpeg", "quality": 75, "everyNthFrame": 1}]
+
+        await page.cdp.emit("Page.screencastFrame", {"data": base64.b64encode(b"jpeg").decode(), "sessionId": 7})
+        assert producer.frame_queue.get_nowait() == b"jpeg"
+        assert page.cdp.commands("Page.screencastFrameAck") == [{"sessionId": 7}]
+
+        assert await producer.apply_settings(SCREENCAST_LEVELS[3])
+        assert page.cdp.commands("Page.startScreencast")[-1] == {
+            "format": "jpeg", "quality": 50, "everyNthFrame": 2, "maxWidth": 1280, "maxHeight": 720,
+        }
+
+        await producer.stop()
+        assert page.cdp.commands("Page.stopScreencast") == [None]
+        assert page.cdp.listeners["Page.screencastFrame"] == []
+        assert not await producer.apply_settings(SCREENCAST_LEVELS[0])
+
+
+class TestScreencastGovernor:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_congested_stream_degrades_then_recovers(self):
+        clock = SimulatedClock()
+        governor = make_governor(clock)
+        congested, healthy = await make_stream("a"), await make_stream("b")
+        governor.register(congested)
+        governor.register(healthy)
+        load = {congested: 0.1, healthy: 0.1}
+
+        assert await governor.tick() == []  # 首次采样只记录基线
+
+        congested.dropped += 3
+        decisions = await step(governor, clock, load)
+        assert [(d.stream_key, d.level, d.reason) for d in decisions] == [("a", 1, "congested")]
+        assert congested.producer.settings == SCREENCAST_LEVELS[1]
+        assert healthy.producer.settings == SCREENCAST_LEVELS[0]
+
+        # 连续 upgrade_after 个周期无过载后升回
+        assert await step(governor, clock, load) == []
+        decisions = await step(governor, clock, load)
+        assert [(d.stream_key, d.level, d.reason) for d in decisions] == [("a", 0, "headroom")]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_budget_favours_streams_with_viewers(self):
+        clock = SimulatedClock()
+        governor = make_governor(clock, cpu_budget=1.0)
+        idle, watched, popular = await make_stream("idle", 0), await make_stream("one", 1), await make_stream("many", 3)
+        for stream in (idle, watched, popular):
+            governor.register(stream)
+        await governor.tick()
+
+        await step(governor, clock, {idle: 0.2, watched: 0.5, popular: 0.5})
+
+        assert governor.level_of("idle") == LAST
+        assert governor.level_of("many") == 0
+        assert governor.level_of("one") > 0
+        assert governor.last_cost <= governor.last_budget
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_host_load_tightens_budget(self):
+        clock = SimulatedClock()
+        governor = make_governor(clock, cpu_budget=1.0, load=1.7)
+        stream = await make_stream("a")
+        governor.register(stream)
+        await governor.tick()
+
+        await step(governor, clock, {stream: 0.8})
+
+        assert governor.last_budget == pytest.approx(0.5)
+        assert governor.level_of("a") > 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_parked_stream_restores_when_viewers_return(self):
+        clock = SimulatedClock()
+        governor = make_governor(clock)
+        stream = await make_stream("a", viewers=0)
+        governor.register(stream)
+        await governor.tick()
+
+        await step(governor, clock, {stream: 0.01})
+        assert stream.producer.settings == SCREENCAST_LEVELS[LAST]
+
+        stream.viewers = 1
+        decisions = await step(governor, clock, {stream: 0.01})
+        assert [(d.level, d.reason) for d in decisions] == [(0, "viewers returned")]
+        assert stream.producer.page.cdp.commands("Page.startScreencast")[-1]["quality"] == 80
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_viewer_packet_loss_counts_as_congestion(self):
+        clock = SimulatedClock()
+        governor = make_governor(clock)
+        stream = await make_stream("a")
+        governor.register(stream)
+        await governor.tick()
+
+        stream.fraction_lost = 0.25
+        decisions = await step(governor, clock, {stream: 0.1})
+
+        assert [d.reason for d in decisions] == ["congested"]
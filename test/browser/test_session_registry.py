@@ -0,0 +1,343 @@
+"""
+测试分片会话注册表 —— single-flight 创建、独占操作、不同 key 互不阻塞，LiveService 并发压力，
+以及 LiveService 与会话池两个注册表的一致性
+"""
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+import pytest
+
+from app.models.runtime.session import SessionCreateParams
+from app.services.RPA_browser.browser_session_pool.playwright_pool import PlaywrightSessionPool
+from app.services.RPA_browser.browser_session_pool.session_registry import ShardedSessionRegistry
+from app.services.RPA_browser.session.live_service import LiveService
+
+# session 包导出的 live_service 是服务实例，这里取模块本身用于替换 get_default_session_pool
+live_service_module = sys.modules[LiveService.__module__]
+
+
+class FakeSession:
+    is_closed = False
+
+    async def close(self):
+        self.is_closed = True
+
+    async def force_close(self):
+        self.is_closed = True
+
+
+class CountingSessionPool(PlaywrightSessionPool):
+    """记录每个浏览器的启动次数，可以让指定浏览器的启动一直挂起"""
+
+    def __init__(self, launch_delay: float = 0.01):
+        super().__init__()
+        self.launch_delay = launch_delay
+        self.launches: Counter[tuple[int, int]] = Counter()
+        self.blocked: dict[tuple[int, int], asyncio.Event] = {}
+        # 按顺序消耗的启动结果：异常则抛出，"closed" 表示启动后浏览器立即被关闭
+        self.outcomes: dict[tuple[int, int], list[Exception | str]] = {}
+
+    async def _create_session(self, params: SessionCreateParams):
+        key = (params.mid, params.browser_id)
+        self.launches[key] += 1
+        if event := self.blocked.get(key):
+            await event.wait()
+        await asyncio.sleep(self.launch_delay)
+        session = FakeSession()
+        if outcomes := self.outcomes.get(key):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            session.is_closed = True
+        return session
+
+
+def assert_registries_consistent(pool: PlaywrightSessionPool) -> None:
+    """LiveService 中运行中的条目与池中同 key 的会话是同一个对象，池中多出的只能是未认领的预热会话"""
+    live_keys = set()
+    for entry in LiveService._browser_sessions.values():
+        key = (entry.mid, entry.browser_id)
+        live_keys.add(key)
+        if entry.browser_running:
+            assert pool._sessions.get(key) is entry.browser_session
+    assert set(pool._sessions) - live_keys <= set(pool.warm_sessions)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = CountingSessionPool()
+    monkeypatch.setattr(live_service_module, "get_default_session_pool", lambda: pool)
+    monkeypatch.setattr(LiveService, "_browser_sessions", ShardedSessionRegistry())
+    return pool
+
+
+class TestShardedSessionRegistry:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_concurrent_creates_share_one_result(self):
+        registry = ShardedSessionRegistry()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return object()
+
+        results = await asyncio.gather(*(registry.get_or_create("k", factory) for _ in range(20)))
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+        assert registry["k"] is results[0]
+        assert registry.in_flight == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_failed_create_is_shared_and_not_registered(self):
+        registry = ShardedSessionRegistry()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("launch failed")
+
+        results = await asyncio.gather(
+            *(registry.get_or_create("k", factory) for _ in range(5)), return_exceptions=True
+        )
+        assert calls == 1
+        assert all(isinstance(r, ValueError) for r in results)
+        assert "k" not in registry
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cancelled_caller_does_not_abort_creation(self):
+        registry = ShardedSessionRegistry()
+
+        async def factory():
+            await asyncio.sleep(0.02)
+            return "session"
+
+        first = asyncio.create_task(registry.get_or_create("k", factory))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(registry.get_or_create("k", factory))
+        await asyncio.sleep(0.005)
+        first.cancel()
+
+        assert await second == "session"
+        assert registry["k"] == "session"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_exclusive_operation_serializes_with_create(self):
+        registry = ShardedSessionRegistry()
+        order: list[str] = []
+
+        async def create():
+            order.append("create")
+            return "session"
+
+        async def close():
+            registry.discard("k")
+            await asyncio.sleep(0.01)
+            order.append("close")
+
+        await registry.get_or_create("k", create)
+        closing = asyncio.create_task(registry.run_exclusive("k", close))
+        await asyncio.sleep(0.001)
+        # 关闭进行中，get_or_create 排队等待关闭完成后重新创建
+        assert await registry.get_or_create("k", create) == "session"
+        await closing
+        assert order == ["create", "close", "create"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_remove_runs_finalizer(self):
+        registry = ShardedSessionRegistry()
+        session = FakeSession()
+
+        async def create():
+            return session
+
+        await registry.get_or_create("k", create)
+        assert await registry.remove("k", lambda s: s.close()) is session
+        assert session.is_closed
+        assert await registry.remove("k") is None
+
+
+class TestLiveServiceConcurrency:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_1000_calls_across_200_keys_launch_each_browser_once(self, fake_pool):
+        service = LiveService()
+
+        entries = await asyncio.gather(*(
+            service.get_or_create_browser_session_entry(mid=1, browser_id=i % 200)
+            for i in range(1000)
+        ))
+
+        assert len(fake_pool.launches) == 200
+        assert set(fake_pool.launches.values()) == {1}
+        assert len(LiveService._browser_sessions) == 200
+        # 同一 key 的所有调用拿到同一个会话条目
+        by_key: dict[int, set[int]] = {}
+        for entry in entries:
+            by_key.setdefault(entry.browser_id, set()).add(id(entry))
+        assert all(len(ids) == 1 for ids in by_key.values())
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_slow_launch_does_not_block_other_keys(self, fake_pool):
+        service = LiveService()
+        gate = asyncio.Event()
+        fake_pool.blocked[(1, 0)] = gate
+
+        stuck = asyncio.create_task(service.get_or_create_browser_session_entry(mid=1, browser_id=0))
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        others = await asyncio.wait_for(
+            asyncio.gather(*(service.get_or_create_browser_session_entry(mid=1, browser_id=i) for i in range(1, 50))),
+            timeout=2,
+        )
+        assert len(others) == 49
+        assert time.perf_counter() - start < 1
+        assert not stuck.done()
+
+        gate.set()
+        assert (await stuck).browser_id == 0
+        assert fake_pool.launches[(1, 0)] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_release_then_recreate(self, fake_pool):
+        service = LiveService()
+        entry = await service.get_or_create_browser_session_entry(mid=1, browser_id=7)
+
+        assert await service.release_browser_session(1, 7)
+        assert entry.browser_session.is_closed
+        assert "1_7" not in LiveService._browser_sessions
+        assert not fake_pool.has_session(1, 7)
+
+        await service.get_or_create_browser_session_entry(mid=1, browser_id=7)
+        assert fake_pool.launches[(1, 7)] == 2
+
+
+class TestSessionCreationCoalescing:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_50_concurrent_requests_share_one_launch(self, fake_pool):
+        fake_pool.launch_delay = 0.2
+        service = LiveService()
+
+        start = time.perf_counter()
+        entries = await asyncio.gather(*(
+            service.get_or_create_browser_session_entry(mid=2, browser_id=1) for _ in range(50)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert fake_pool.launches[(2, 1)] == 1
+        assert all(entry is entries[0] for entry in entries)
+        # 总耗时约等于一次启动
+        assert elapsed < 0.2 * 1.5
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_acquire_metric_counts_one_creation_per_launch(self, fake_pool):
+        fake_pool.launch_delay = 0.05
+        service = LiveService()
+        acquires = live_service_module._SESSION_ACQUIRE_TOTAL
+        before = {result: acquires.labels(result).value for result in ("created", "coalesced", "reused")}
+
+        await asyncio.gather(*(service.get_or_create_browser_session_entry(mid=2, browser_id=9) for _ in range(10)))
+        await service.get_or_create_browser_session_entry(mid=2, browser_id=9)
+
+        delta = {result: acquires.labels(result).value - value for result, value in before.items()}
+        assert delta == {"created": 1, "coalesced": 9, "reused": 1}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_waiters_receive_the_same_exception(self, fake_pool):
+        fake_pool.outcomes[(2, 2)] = [ValueError("浏览器指纹信息不存在")]
+        service = LiveService()
+
+        results = await asyncio.gather(
+            *(service.get_or_create_browser_session_entry(mid=2, browser_id=2) for _ in range(50)),
+            return_exceptions=True,
+        )
+
+        assert fake_pool.launches[(2, 2)] == 1
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len({id(r) for r in results}) == 1
+        assert "2_2" not in LiveService._browser_sessions
+        # 失败不会被缓存，下一次请求重新启动
+        await service.get_or_create_browser_session_entry(mid=2, browser_id=2)
+        assert fake_pool.launches[(2, 2)] == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_closed_browser_is_retried_inside_the_flight_without_sleep(self, fake_pool):
+        fake_pool.outcomes[(2, 3)] = ["closed"]
+        service = LiveService()
+
+        start = time.perf_counter()
+        entries = await asyncio.gather(*(
+            service.get_or_create_browser_session_entry(mid=2, browser_id=3) for _ in range(20)
+        ))
+
+        # 第一次启动的浏览器已关闭，同一个创建任务内立即重启一次
+        assert fake_pool.launches[(2, 3)] == 2
+        assert all(entry is entries[0] for entry in entries)
+        assert not entries[0].browser_session.is_closed
+        assert time.perf_counter() - start < 0.5
+
+
+class TestRegistryConsistency:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_interleaved_create_and_release_keep_registries_in_sync(self, fake_pool):
+        service = LiveService()
+        rng = random.Random(3)
+
+        async def churn(browser_id: int):
+            if rng.random() < 0.4:
+                await service.release_browser_session(3, browser_id)
+            else:
+                await service.get_or_create_browser_session_entry(mid=3, browser_id=browser_id)
+
+        await asyncio.gather(*(churn(rng.randrange(10)) for _ in range(300)))
+        assert_registries_consistent(fake_pool)
+
+        # 浏览器意外退出：条目失效，重新获取时先从池中移除旧会话再重建
+        entry = await service.get_or_create_browser_session_entry(mid=3, browser_id=0)
+        entry.browser_session.is_closed = True
+        rebuilt = await service.get_or_create_browser_session_entry(mid=3, browser_id=0)
+        assert rebuilt.browser_session is not entry.browser_session
+        assert_registries_consistent(fake_pool)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_warm_session_is_adopted_by_live_service(self, fake_pool):
+        service = LiveService()
+        assert await fake_pool.prewarm_session(SessionCreateParams(mid=4, browser_id=1))
+        # 未认领的预热会话只存在于池中
+        assert "4_1" not in LiveService._browser_sessions
+        assert_registries_consistent(fake_pool)
+
+        entry = await service.get_or_create_browser_session_entry(mid=4, browser_id=1)
+        assert entry.browser_session is fake_pool._sessions[(4, 1)]
+        assert fake_pool.launches[(4, 1)] == 1 and fake_pool.warm_sessions == {}
+        assert_registries_consistent(fake_pool)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_warm_eviction_does_not_close_a_claimed_session(self, fake_pool):
+        service = LiveService()
+        await fake_pool.prewarm_session(SessionCreateParams(mid=4, browser_id=2))
+        await fake_pool.prewarm_session(SessionCreateParams(mid=4, browser_id=3))
+
+        # 预热池已决定淘汰，但在释放执行前会话被 LiveService 认领
+        entry, released = await asyncio.gather(
+            service.get_or_create_browser_session_entry(mid=4, browser_id=2),
+            fake_pool.release_warm_session(4, 2),
+        )
+        assert not released and not entry.browser_session.is_closed
+        assert_registries_consistent(fake_pool)
+
+        # 无人认领的预热会话正常释放
+        unclaimed = fake_pool._sessions[(4, 3)]
+        assert await fake_pool.release_warm_session(4, 3)
+        assert unclaimed.is_closed and not fake_pool.has_session(4, 3)
+        assert_registries_consistent(fake_pool)
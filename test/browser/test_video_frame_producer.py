@@ -0,0 +1,104 @@
+"""
+测试 WebRTC 视频帧生产者 —— JPEG 直接解码为 YUV 平面、max_fps 限流与尾帧补发
+"""
+import asyncio
+import io
+
+import av
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.models.runtime.webrtc_models import WebRTCSessionConfig
+from app.services.RPA_browser.webrtc.jpeg_decoder import JpegFrameDecoder
+from app.services.RPA_browser.webrtc.video_frame_producer import VideoFrameProducer
+
+
+def make_jpeg(width: int = 320, height: int = 240, subsampling: int = 2) -> bytes:
+    pixels = np.zeros((height, width, 3), np.uint8)
+    pixels[:, :, 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    pixels[:, :, 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+    pixels[height // 4: height // 2, width // 4: width // 2] = 255
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=90, subsampling=subsampling)
+    return buffer.getvalue()
+
+
+def legacy_decode(jpeg_data: bytes) -> av.VideoFrame:
+    """旧流程：PIL 解码为 RGB，再由 PyAV 转换为 yuv420p"""
+    return av.VideoFrame.from_image(Image.open(io.BytesIO(jpeg_data))).reformat(format="yuv420p")
+
+
+def luma(frame: av.VideoFrame) -> np.ndarray:
+    return frame.to_ndarray()[: frame.height].astype(int)
+
+
+def make_producer(max_fps: int = 30, queue_size: int = 10) -> VideoFrameProducer:
+    producer = VideoFrameProducer(page=None, config=WebRTCSessionConfig(max_fps=max_fps, frame_queue_size=queue_size))
+    producer._is_running = True
+    return producer
+
+
+class TestJpegFrameDecoder:
+
+    @pytest.mark.parametrize("subsampling", [2, 0])  # 4:2:0 / 4:4:4
+    def test_output_matches_legacy_pipeline(self, subsampling):
+        jpeg_data = make_jpeg(subsampling=subsampling)
+
+        frame = JpegFrameDecoder().decode(jpeg_data)
+
+        assert frame.format.name == "yuv420p" and (frame.width, frame.height) == (320, 240)
+        # limited range 输出，与 PIL → yuv420p 的结果只有舍入误差
+        assert np.abs(luma(frame) - luma(legacy_decode(jpeg_data))).mean() < 1.0
+
+    def test_corrupted_jpeg_raises(self):
+        with pytest.raises((av.error.FFmpegError, ValueError)):
+            JpegFrameDecoder().decode(b"\xff\xd8 not a jpeg")
+
+
+class TestVideoFrameProducer:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_frames_above_max_fps_are_skipped_and_latest_is_flushed(self):
+        producer = make_producer(max_fps=10)
+
+        for i in range(10):
+            await producer._on_frame_callback({"data": f"frame-{i}".encode()})
+
+        assert producer.queue_size == 1
+        await asyncio.sleep(0.15)
+        # 时间槽到达后补发最后一帧，中间帧被跳过
+        assert [producer.frame_queue.get_nowait() for _ in range(producer.queue_size)] == [b"frame-0", b"frame-9"]
+        assert producer.stats()["throttled"] == 8 and producer.stats()["received"] == 10
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_full_queue_drops_oldest(self):
+        producer = make_producer(max_fps=1000, queue_size=2)
+
+        for i in range(4):
+            producer._next_frame_at = 0.0
+            await producer._on_frame_callback(f"frame-{i}".encode())
+
+        assert [producer.frame_queue.get_nowait() for _ in range(2)] == [b"frame-2", b"frame-3"]
+        assert producer.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_next_frame_decodes_jpeg(self):
+        producer = make_producer()
+        await producer._on_frame_callback({"data": make_jpeg(640, 360)})
+
+        frame = await producer.get_next_frame()
+
+        assert (frame.width, frame.height, frame.format.name) == (640, 360, "yuv420p")
+        assert producer.stats()["decoded"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stop_discards_pending_frame(self):
+        producer = make_producer(max_fps=10)
+        await producer._on_frame_callback(b"first")
+        await producer._on_frame_callback(b"pending")
+
+        await producer.stop()
+        await asyncio.sleep(0.15)
+
+        assert producer.queue_size == 1
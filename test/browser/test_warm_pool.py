@@ -0,0 +1,133 @@
+"""
+测试浏览器预热池 —— 预测、预算、认领命中、超时释放、首页耗时统计
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.models.runtime.session import SessionCreateParams
+from app.services.RPA_browser.browser_session_pool.playwright_pool import PlaywrightSessionPool
+from app.services.RPA_browser.browser_session_pool.warm_pool import WarmPoolService
+
+
+class FakeSession:
+    is_closed = False
+
+    def __init__(self, browser_id: int):
+        self.browser_id = browser_id
+        self.closed = False
+
+    async def force_close(self):
+        self.closed = True
+        return None
+
+
+class FakeSessionPool(PlaywrightSessionPool):
+    """不启动真实浏览器的会话池，启动耗时用 launch_delay 模拟"""
+
+    def __init__(self, launch_delay: float = 0.0):
+        super().__init__()
+        self.launch_delay = launch_delay
+        self.launched: list[tuple[int, int]] = []
+
+    async def _create_session(self, params: SessionCreateParams):
+        await asyncio.sleep(self.launch_delay)
+        self.launched.append((params.mid, params.browser_id))
+        return FakeSession(params.browser_id)
+
+
+@pytest.fixture
+def warm_settings(monkeypatch):
+    monkeypatch.setattr(settings, "browser_warm_pool_max_sessions", 2)
+    monkeypatch.setattr(settings, "browser_warm_pool_session_estimate_mb", 300)
+    monkeypatch.setattr(settings, "browser_warm_pool_memory_reserve_mb", 1000)
+    monkeypatch.setattr(settings, "browser_warm_pool_max_load_per_cpu", 0.7)
+    monkeypatch.setattr(settings, "browser_warm_pool_recent_window", 3600)
+    monkeypatch.setattr(settings, "browser_warm_pool_schedule_lead_time", 120)
+    monkeypatch.setattr(settings, "browser_warm_pool_ttl", 600)
+
+
+def _service(pool, clock, memory_mb=8000.0, load=0.1) -> WarmPoolService:
+    return WarmPoolService(pool, clock=clock, memory_provider=lambda: memory_mb, load_provider=lambda: load)
+
+
+class TestWarmPool:
+
+    def test_predict_orders_scheduled_before_recent(self, warm_settings, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        service = _service(FakeSessionPool(), clock)
+        service.record_activity(1, 10)
+        clock.now += 5
+        service.record_activity(1, 11)
+        service.add_scheduled_hint(2, 20, clock.now + 60)
+        service.add_scheduled_hint(3, 30, clock.now + 3600)  # 超出提前量，不预热
+
+        keys = [(c.mid, c.browser_id, c.reason) for c in service.predict()]
+        assert keys == [(2, 20, "scheduled"), (1, 11, "recent"), (1, 10, "recent")]
+
+    def test_predict_drops_stale_activity(self, warm_settings, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        service = _service(FakeSessionPool(), clock)
+        service.record_activity(1, 10)
+        clock.now += 3601
+        assert service.predict() == []
+
+    def test_capacity_respects_budgets(self, warm_settings, fake_clock):
+        pool = FakeSessionPool()
+        assert _service(pool, fake_clock(1_000_000.0)).capacity() == 2
+        # 可用内存只够再启动 1 个（(1400 - 1000) // 300）
+        assert _service(pool, fake_clock(1_000_000.0), memory_mb=1400).capacity() == 1
+        # 负载过高不预热
+        assert _service(pool, fake_clock(1_000_000.0), load=0.9).capacity() == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_warm_session_is_claimed_as_hit(self, warm_settings, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        pool = FakeSessionPool(launch_delay=0.05)
+        service = _service(pool, clock)
+        for browser_id in (10, 11, 12):
+            service.record_activity(1, browser_id)
+
+        # 预算上限 2 个
+        assert await service.warm_up() == 2
+        assert set(pool.warm_sessions) == {(1, 12), (1, 11)}
+
+        await pool.get_session(SessionCreateParams(mid=1, browser_id=12))
+        await pool.get_session(SessionCreateParams(mid=1, browser_id=99))
+        assert pool.stats.hits == 1
+        assert pool.stats.warm_hits == 1
+        assert pool.stats.misses == 1
+        assert (1, 12) not in pool.warm_sessions
+        # 命中几乎为 0 耗时，未命中要等待启动
+        assert pool.stats.percentile(0.0) < 0.01
+        assert pool.stats.percentile(0.99) >= 0.05
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_unclaimed_warm_sessions_are_released(self, warm_settings, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        pool = FakeSessionPool()
+        service = _service(pool, clock)
+        service.record_activity(1, 10)
+        await service.warm_up()
+        session = pool._sessions[(1, 10)]
+
+        clock.now += 601
+        assert await service.evict_unclaimed() == 1
+        assert session.closed
+        assert not pool.has_session(1, 10)
+        assert pool.warm_sessions == {}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_failed_warm_up_forgets_candidate(self, warm_settings, fake_clock):
+        clock = fake_clock(1_000_000.0)
+        pool = FakeSessionPool()
+
+        async def boom(params):
+            raise ValueError("浏览器指纹信息不存在")
+
+        pool._create_session = boom
+        service = _service(pool, clock)
+        service.record_activity(1, 10)
+        assert await service.warm_up() == 0
+        assert service.predict() == []
@@ -0,0 +1,186 @@
+"""
+测试 WebRTC 多观众共享编码 —— 一个页面只编码一次，多个本地 aiortc 观众订阅同一路编码帧
+"""
+import asyncio
+import io
+import time
+
+import av
+import numpy as np
+import pytest
+from aiortc import RTCPeerConnection, RTCSessionDescription
+from aiortc.codecs.vpx import Vp8Encoder
+from PIL import Image
+
+from app.models.runtime.webrtc_models import WebRTCSessionConfig
+from app.services.RPA_browser.webrtc.broadcast import EncodedFrame, VideoBroadcast
+from app.services.RPA_browser.webrtc.stream_session import WebRTCStreamSession
+
+
+def make_jpeg(index: int, width: int = 320, height: int = 240) -> bytes:
+    pixels = np.zeros((height, width, 3), np.uint8)
+    pixels[:, :, 2] = np.linspace(0, 255, width, dtype=np.uint8)
+    x = (index * 16) % (width - 64)
+    pixels[80:144, x:x + 64] = 255
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=80)
+    return buffer.getvalue()
+
+
+class FakeScreencast:
+    """模拟 page.screencast：记录 on_frame 回调，由测试主动推帧"""
+
+    def __init__(self):
+        self.on_frame = None
+        self.starts = 0
+
+    async def start(self, on_frame, quality):
+        self.on_frame = on_frame
+        self.starts += 1
+        return self
+
+    async def stop(self):
+        self.on_frame = None
+
+
+class FakePage:
+    def __init__(self):
+        self.screencast = FakeScreencast()
+
+
+class FakeProducer:
+    """直接提供 yuv420p 帧的生产者"""
+
+    def __init__(self):
+        self.frames: asyncio.Queue = asyncio.Queue()
+        self.is_running = True
+
+    async def get_next_frame(self):
+        frame = await self.frames.get()
+        if frame is None:
+            self.is_running = False
+        return frame
+
+
+def make_frame(index: int) -> av.VideoFrame:
+    pixels = np.full((240, 320, 3), index % 255, np.uint8)
+    return av.VideoFrame.from_ndarray(pixels, format="rgb24").reformat(format="yuv420p")
+
+
+async def connect_viewer(session: WebRTCStreamSession) -> tuple[RTCPeerConnection, list]:
+    """本地客户端：接收 offer，回 answer，并持续读取解码后的视频帧"""
+    client = RTCPeerConnection()
+    received = []
+
+    @client.on("track")
+    def on_track(track):
+        async def consume():
+            while True:
+                try:
+                    received.append(await track.recv())
+                except Exception:
+                    return
+        asyncio.ensure_future(consume())
+
+    offer = await session.create_offer()
+    await client.setRemoteDescription(RTCSessionDescription(sdp=offer["sdp"], type=offer["type"]))
+    answer = await client.createAnswer()
+    await client.setLocalDescription(answer)
+    await session.handle_answer(client.localDescription.sdp, client.localDescription.type, viewer_key=offer["stream_key"])
+    return client, received
+
+
+class TestSharedEncoding:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_multiple_viewers_share_a_single_encode(self, monkeypatch):
+        # 观众的 RTCRtpSender 只允许做 RTP 分包，不允许自行编码
+        def sender_encode(*args, **kwargs):
+            raise AssertionError("RTCRtpSender 不应重新编码")
+        monkeypatch.setattr(Vp8Encoder, "encode", sender_encode)
+
+        page = FakePage()
+        session = WebRTCStreamSession("1:1:page_0", page, WebRTCSessionConfig(max_fps=30), page_index=0)
+        await session.start()
+        clients = []
+        try:
+            for _ in range(3):
+                clients.append(await connect_viewer(session))
+            assert [key.rsplit("#", 1)[1] for key in session.viewers] == ["1", "2", "3"]
+
+            deadline = time.monotonic() + 15
+            index = 0
+            while time.monotonic() < deadline and min(len(r) for _, r in clients) < 10:
+                await page.screencast.on_frame({"data": make_jpeg(index)})
+                index += 1
+                await asyncio.sleep(0.04)
+
+            assert all(len(received) >= 10 for _, received in clients)
+            broadcast = session.broadcast.stats()
+            # 每帧只解码、编码一次，与观众数无关
+            assert page.screencast.starts == 1
+            assert broadcast["encoded"] + broadcast["skipped"] <= session.producer.stats()["decoded"]
+            assert broadcast["encoded"] < sum(len(received) for _, received in clients)
+            assert broadcast["viewers"] == 3
+        finally:
+            for client, _ in clients:
+                await client.close()
+            await session.close()
+
+        assert session.viewer_count == 0 and session.broadcast.viewer_count == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_closing_one_viewer_keeps_the_others(self):
+        session = WebRTCStreamSession("1:1:page_1", FakePage(), WebRTCSessionConfig(), page_index=1)
+        await session.start()
+        try:
+            first = await session.create_offer()
+            second = await session.create_offer()
+
+            await session.close_viewer(first["stream_key"])
+
+            assert list(session.viewers) == [second["stream_key"]]
+            assert session.broadcast.viewer_count == 1 and session.is_active
+        finally:
+            await session.close()
+
+
+class TestSlowViewer:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_slow_viewer_drops_only_its_own_frames(self):
+        producer = FakeProducer()
+        broadcast = VideoBroadcast(producer, bitrate=500_000, viewer_queue_size=4)
+        fast, slow = broadcast.subscribe(), broadcast.subscribe()
+        broadcast.start()
+
+        received = []
+        for index in range(20):
+            await producer.frames.put(make_frame(index))
+            received.append(await fast.recv())
+
+        assert len(received) == 20 and fast.frames_dropped == 0
+        assert broadcast.frames_encoded == 20
+        # 慢观众积压满后丢弃自己的队列，并请求关键帧以便重新同步
+        assert slow.frames_dropped > 0 and slow.queued < 4
+        assert broadcast.keyframes_encoded >= 2
+
+        producer.frames.put_nowait(None)
+        await broadcast.stop()
+
+    def test_waiting_viewer_resumes_on_keyframe(self):
+        broadcast = VideoBroadcast(FakeProducer(), bitrate=500_000, viewer_queue_size=2)
+        track = broadcast.subscribe()
+        delta = EncodedFrame(av.Packet(b"delta"), keyframe=False)
+        key = EncodedFrame(av.Packet(b"key"), keyframe=True)
+
+        track.push(delta)  # 新观众：关键帧之前的差分帧被跳过
+        track.push(key)
+        track.push(delta)
+        broadcast._keyframe_requested = False
+        track.push(delta)  # 队列满
+
+        assert track.queued == 0 and broadcast._keyframe_requested
+        track.push(delta)
+        track.push(key)
+        assert track.queued == 1 and track.frames_dropped == 5
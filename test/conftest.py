@@ -43,6 +43,22 @@ def _init_test_db():
     yield
 
 
+class FakeClock:
+    """可拨动的模拟时钟：调用时返回 now，测试中直接修改 now 模拟时间流逝"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """模拟时钟工厂：fake_clock(start) 返回从 start 开始的 FakeClock（默认 0.0）"""
+    return FakeClock
+
+
 @pytest.fixture(scope="session")
 async def shared_browser():
     """会话级别的共享浏览器 - 整个测试会话只启动一次"""
@@ -0,0 +1,189 @@
+"""
+浏览器归属校验缓存测试
+
+真实 SQLite 数据库 + verify_browser_ownership 依赖，统计每批请求实际执行的 SQL 条数，
+验证高频轮询只在缓存未命中时查询数据库，以及创建 / 删除指纹后立即生效。
+"""
+import asyncio
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlmodel import delete
+
+from app.exceptions.handlers import custom_exception_handler
+from app.models.common.exceptions.base_exception import BaseException as CustomBaseException
+from app.models.database.browser.info import UserBrowserInfo
+from app.models.runtime.api import BrowserFingerprintDeleteParams, BrowserFingerprintListParams
+from app.services.RPA_browser.fingerprint.browser_fingerprint_service import BrowserFingerprintService
+from app.services.RPA_browser.fingerprint.ownership_cache import BrowserOwnershipCache, browser_ownership_cache
+from app.utils.depends.mid_depends import get_auth_info_from_header
+from app.utils.depends.security_depends import verify_browser_ownership
+from app.utils.depends.session_manager import DatabaseSessionManager, engine
+from bili_common.models.depends import AuthInfo, BrowserReqAuthInfo
+from bili_common.models.response_code import ResponseCode
+
+OWNER_MID = 5550001
+OTHER_MID = 5550002
+_fingerprints = itertools.count(5550000)
+
+
+@contextmanager
+def count_queries():
+    """统计代码块内引擎执行的 SQL 条数"""
+    counter = {"queries": 0}
+
+    def on_execute(*_):
+        counter["queries"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+def new_browser(mid: int) -> UserBrowserInfo:
+    now = datetime.now(timezone.utc)
+    browser = UserBrowserInfo(mid=mid, created_at=now, updated_at=now)
+    browser.fingerprint = next(_fingerprints)
+    return browser
+
+
+@pytest.fixture
+async def browsers():
+    """OWNER_MID 名下 3 个浏览器，OTHER_MID 名下 1 个"""
+    rows = [new_browser(OWNER_MID) for _ in range(3)] + [new_browser(OTHER_MID)]
+    ids = [row.browser_id for row in rows]
+    async with DatabaseSessionManager.async_session() as session:
+        session.add_all(rows)
+        await session.commit()
+    browser_ownership_cache.clear()
+    yield ids
+    async with DatabaseSessionManager.async_session() as session:
+        await session.exec(delete(UserBrowserInfo).where(UserBrowserInfo.mid.in_([OWNER_MID, OTHER_MID])))
+        await session.commit()
+    browser_ownership_cache.clear()
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.add_exception_handler(CustomBaseException, custom_exception_handler)
+
+    @app.get("/probe")
+    async def probe(browser_req: BrowserReqAuthInfo = Depends(verify_browser_ownership)):
+        return {"browser_id": str(browser_req.browser_id)}
+
+    app.dependency_overrides[get_auth_info_from_header] = lambda: AuthInfo(mid=OWNER_MID, level=5)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+async def probe(client: AsyncClient, browser_id: int | str) -> bool:
+    response = await client.get("/probe", params={"browser_id": browser_id})
+    assert response.status_code == 200
+    body = response.json()
+    if "code" in body:
+        assert body["code"] == ResponseCode.FORBIDDEN
+        return False
+    return True
+
+
+class TestOwnershipDependency:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_polling_queries_database_once(self, client, browsers):
+        owned, foreign = browsers[:3], browsers[3]
+
+        with count_queries() as counter:
+            results = await asyncio.gather(*(probe(client, owned[i % 3]) for i in range(200)))
+            assert all(results)
+            # 他人的浏览器 / 不存在 / 非数字 ID 同样由已加载的列表判定
+            assert not await probe(client, foreign)
+            assert not await probe(client, 1)
+            assert not await probe(client, "abc")
+
+        # 并发的首批请求合并为一次加载
+        assert counter["queries"] == 1
+        assert browser_ownership_cache.stats()["loads"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_and_delete_take_effect_immediately(self, client, browsers):
+        assert await probe(client, browsers[0])
+
+        created = new_browser(OWNER_MID)
+        created_id = created.browser_id
+        async with DatabaseSessionManager.async_session() as session:
+            session.add(created)
+            await session.commit()
+            browser_ownership_cache.mark_owned(OWNER_MID, created_id)
+
+            with count_queries() as counter:
+                assert await probe(client, created_id)
+            assert counter["queries"] == 0
+
+            await BrowserFingerprintService.delete_fingerprint(
+                BrowserFingerprintDeleteParams(browser_id=browsers[0]), OWNER_MID, session
+            )
+        with count_queries() as counter:
+            assert not await probe(client, browsers[0])
+        assert counter["queries"] == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_listing_browsers_preloads_the_cache(self, client, browsers):
+        async with DatabaseSessionManager.async_session() as session:
+            await BrowserFingerprintService.list_fingerprint(BrowserFingerprintListParams(page=1, per_page=20), OWNER_MID, session)
+
+        with count_queries() as counter:
+            for browser_id in browsers[:3]:
+                assert await probe(client, browser_id)
+        assert counter["queries"] == 0
+
+
+class TestOwnershipCache:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_negative_results_expire_before_positive_ones(self):
+        now = [0.0]
+        owned = {1: {10}}
+
+        async def loader(mid):
+            return owned[mid]
+
+        cache = BrowserOwnershipCache(loader, ttl=30, negative_ttl=5, clock=lambda: now[0])
+        assert await cache.is_owner(1, 10) and not await cache.is_owner(1, 11)
+
+        owned[1] = {10, 11}  # 其它节点新建了浏览器
+        now[0] = 4
+        assert not await cache.is_owner(1, 11)
+        now[0] = 6
+        assert await cache.is_owner(1, 11)
+        assert cache.stats()["loads"] == 2
+
+        owned[1] = set()  # 其它节点删除了全部浏览器，正向结果在 ttl 内仍然有效
+        now[0] = 30
+        assert await cache.is_owner(1, 10)
+        now[0] = 37
+        assert not await cache.is_owner(1, 10)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_load_racing_with_revoke_is_not_cached(self):
+        release = asyncio.Event()
+
+        async def loader(mid):
+            await release.wait()
+            return [10]
+
+        cache = BrowserOwnershipCache(loader)
+        pending = asyncio.create_task(cache.is_owner(1, 10))
+        await asyncio.sleep(0)
+        cache.revoke(1, 10)  # 加载期间被删除
+        release.set()
+        await pending
+
+        assert cache.stats()["users"] == 0
@@ -0,0 +1,195 @@
+"""
+测试运行指标与采样剖析 —— 指标导出格式、热路径埋点（执行引擎 / SQL），以及管理员 /metrics、/profile 接口
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.controller.v1.admin import router as admin_router
+from app.exceptions.handlers import custom_exception_handler
+from app.models.common.exceptions.base_exception import BaseException as CustomBaseException
+from app.models.execution.action_params import create_workflow_step
+from app.models.execution.request_params import WorkflowExecutionRequest
+from app.services.execution.engine import ExecutionEngine
+from app.utils.depends.session_manager import DatabaseSessionManager
+from app.utils.metrics.profiler import SamplingProfiler
+from app.utils.metrics.registry import MetricsRegistry, metrics_registry
+from bili_common.models.response_code import ResponseCode
+
+
+def sample_value(name: str, labels: dict[str, str] | None = None) -> float:
+    """从全局注册表的导出文本中取一个样本值，不存在时为 0"""
+    label_text = ",".join(f'{k}="{v}"' for k, v in (labels or {}).items())
+    prefix = f"{name}{{{label_text}}} " if label_text else f"{name} "
+    for line in metrics_registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def busy_loop_for_profiler(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestMetricsRegistry:
+
+    def test_render_counter_gauge_histogram(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_requests_total", "请求数", ("path",))
+        counter.labels('/a"b').inc()
+        counter.labels('/a"b').inc(2)
+        registry.gauge("demo_queue_depth", "队列深度", collect=lambda: 7)
+        histogram = registry.histogram("demo_latency_seconds", "耗时", ("op",), buckets=(0.1, 1.0))
+        child = histogram.labels("read")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            child.observe(value)
+
+        lines = registry.render().splitlines()
+        assert "# TYPE demo_requests_total counter" in lines
+        assert 'demo_requests_total{path="/a\\"b"} 3' in lines
+        assert "demo_queue_depth 7" in lines
+        # 分桶为累计计数，边界值计入 le=边界 的桶
+        assert 'demo_latency_seconds_bucket{op="read",le="0.1"} 2' in lines
+        assert 'demo_latency_seconds_bucket{op="read",le="1"} 3' in lines
+        assert 'demo_latency_seconds_bucket{op="read",le="+Inf"} 4' in lines
+        assert 'demo_latency_seconds_count{op="read"} 4' in lines
+        assert 'demo_latency_seconds_sum{op="read"} 3.65' in lines
+
+    def test_reregister_returns_same_metric_and_rejects_conflicts(self):
+        registry = MetricsRegistry()
+        first = registry.histogram("demo_seconds", "耗时", ("op",))
+        assert registry.histogram("demo_seconds", "耗时", ("op",)) is first
+        with pytest.raises(ValueError):
+            registry.counter("demo_seconds", "耗时", ("op",))
+        with pytest.raises(ValueError):
+            first.labels("a", "b")
+
+    def test_label_values_are_normalised_to_one_child(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_status_total", "状态", ("code",))
+        counter.labels("1").inc()
+        counter.labels("1").inc()
+        counter.labels(1).inc()
+        assert counter.labels(1) is counter.labels("1")
+        assert 'demo_status_total{code="1"} 3' in registry.render().splitlines()
+
+    def test_disabled_registry_records_nothing(self):
+        registry = MetricsRegistry(enabled=False)
+        registry.histogram("demo_seconds", "耗时", ("op",)).labels("x").observe(1.0)
+        registry.counter("demo_total", "次数").inc()
+        registry.gauge("demo_depth", "深度", collect=lambda: 3)
+        lines = registry.render().splitlines()
+        assert not any(line.startswith(("demo_seconds_", "demo_total")) for line in lines)
+        assert "demo_depth 3" in lines
+
+    def test_failing_collector_does_not_break_export(self):
+        registry = MetricsRegistry()
+        registry.gauge("demo_broken", "回调失败", collect=lambda: 1 / 0)
+        registry.counter("demo_total", "次数").inc()
+        assert "demo_total 1" in registry.render().splitlines()
+
+
+class TestHotPathInstrumentation:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_engine_records_action_duration_per_type(self):
+        labels = {"action_type": "print", "status": "success", "le": "+Inf"}
+        before = sample_value("rpa_action_duration_seconds_bucket", labels)
+
+        req = WorkflowExecutionRequest(mid=1, browser_id=1, action_id="metrics_test", variables={"name": "x"})
+        steps = [create_workflow_step("print", {"message": "hello {{name}}"}) for _ in range(3)]
+        results = await ExecutionEngine().execute_steps(
+            req, steps=steps, session_id="s", browser_id="1", page=None,
+        )
+
+        assert all(r.success for r in results)
+        assert sample_value("rpa_action_duration_seconds_bucket", labels) == before + 3
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_db_queries_are_timed_by_operation(self):
+        before = sample_value("rpa_db_query_duration_seconds_count", {"operation": "SELECT"})
+        errors = sample_value("rpa_db_query_errors_total", {"operation": "SELECT"})
+
+        async with DatabaseSessionManager.async_session() as session:
+            await session.exec(text("SELECT 1"))
+            with pytest.raises(Exception):
+                await session.exec(text("SELECT * FROM no_such_table"))
+
+        assert sample_value("rpa_db_query_duration_seconds_count", {"operation": "SELECT"}) == before + 1
+        assert sample_value("rpa_db_query_errors_total", {"operation": "SELECT"}) == errors + 1
+
+
+class TestAdminMetricsRouter:
+
+    @pytest.fixture
+    async def admin_client(self):
+        app = FastAPI()
+        app.include_router(admin_router)
+        app.add_exception_handler(CustomBaseException, custom_exception_handler)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_metrics_endpoint_exports_prometheus_text(self, admin_client):
+        resp = await admin_client.get(f"{admin_router.prefix}/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+        for name in (
+            "rpa_action_duration_seconds",
+            "rpa_session_launch_duration_seconds",
+            "rpa_db_query_duration_seconds",
+            "rpa_rpc_call_duration_seconds",
+            "rpa_webrtc_frames_dropped_total",
+            "rpa_action_log_queue_depth",
+        ):
+            assert f"# TYPE {name} " in body
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_profile_reports_busy_thread(self, admin_client):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop_for_profiler, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            resp = await admin_client.get(
+                f"{admin_router.prefix}/profile", params={"seconds": 0.3, "interval_ms": 2},
+            )
+        finally:
+            stop.set()
+            worker.join()
+
+        data = resp.json()["data"]
+        assert data["samples"] > 10
+        busy = [s for s in data["stacks"] if s["stack"].startswith("busy-worker;")]
+        assert busy and any("busy_loop_for_profiler" in s["stack"] for s in busy)
+
+        collapsed = await admin_client.get(
+            f"{admin_router.prefix}/profile", params={"seconds": 0.05, "format": "collapsed"},
+        )
+        assert collapsed.status_code == 200
+        line = collapsed.text.splitlines()[0]
+        assert line.rsplit(" ", 1)[1].isdigit()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_only_one_profile_at_a_time(self, admin_client, monkeypatch):
+        profiler = SamplingProfiler(max_seconds=0.3)
+        monkeypatch.setattr("app.controller.v1.admin.metrics_router.sampling_profiler", profiler)
+
+        url = f"{admin_router.prefix}/profile"
+        first = asyncio.create_task(admin_client.get(url, params={"seconds": 10}))
+        while not profiler.running:
+            await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        second = await admin_client.get(url, params={"seconds": 1})
+        assert second.json()["code"] == ResponseCode.BUSINESS_ERROR
+
+        # 采样时长被截断到上限，且采样期间事件循环未被阻塞
+        first_resp = await first
+        assert first_resp.json()["data"]["duration"] < 1
+        assert time.perf_counter() - started < 1
@@ -0,0 +1,170 @@
+"""
+操作日志批量写入测试 —— 攒批落库、保持执行顺序、队列满时的丢弃策略、关闭时排空
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+import app.services.execution.action_log_writer as action_log_writer_module
+from app.models.database.log.models import ActionLogRecord
+from app.services.execution.action_log_writer import ActionLogWriter
+from app.services.execution.crud_service import action_log_crud_svr
+from app.utils.depends.session_manager import engine
+
+
+def make_record(execution_id: str, index: int, success: bool = True) -> ActionLogRecord:
+    return ActionLogRecord(
+        log_id=uuid.uuid4().hex,
+        mid="writer-test",
+        execution_id=execution_id,
+        action_id=f"step_{index}",
+        success=success,
+        params={"index": index},
+        started_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+async def log_table():
+    async with engine.begin() as conn:
+        await conn.run_sync(ActionLogRecord.__table__.create, checkfirst=True)
+
+
+class TestActionLogWriter:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_batches_are_written_in_order_and_drained_on_stop(self, log_table):
+        batches: list[int] = []
+
+        async def sink(records):
+            batches.append(len(records))
+            await action_log_crud_svr.create_many(records)
+
+        writer = ActionLogWriter(sink, batch_size=50, flush_interval=0.05)
+        await writer.start()
+        execution_id = uuid.uuid4().hex
+        for i in range(120):
+            assert await writer.submit(make_record(execution_id, i))
+        await writer.stop()
+
+        rows = await action_log_crud_svr.list_by_execution("writer-test", execution_id)
+        assert [r.action_id for r in rows] == [f"step_{i}" for i in range(120)]
+        assert rows[0].params == {"index": 0}
+        # 攒批写入：远少于逐条写入的往返次数
+        assert sum(batches) == 120 and len(batches) <= 4
+        assert writer.stats()["written"] == 120 and writer.queue_depth == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_full_queue_drops_successes_and_waits_for_failures(self):
+        release = asyncio.Event()
+        written: list[str] = []
+
+        async def slow_sink(records):
+            await release.wait()
+            written.extend(r.action_id for r in records)
+
+        writer = ActionLogWriter(slow_sink, max_queue=2, batch_size=1, flush_interval=0.01, put_timeout=0.05)
+        await writer.start()
+        await writer.submit(make_record("e", 0))
+        await asyncio.sleep(0.02)  # 第一条已被写入协程取走，阻塞在 sink 中
+        assert await writer.submit(make_record("e", 1))
+        assert await writer.submit(make_record("e", 2))
+
+        dropped = {reason: action_log_writer_module._DROPPED_TOTAL.labels(reason).value for reason in ("success", "timeout")}
+        assert not await writer.submit(make_record("e", 3))
+        assert not await writer.submit(make_record("e", 4, success=False))
+        assert writer.stats()["dropped"] == 2
+        # 丢弃数同时导出为指标，按原因区分
+        assert {
+            reason: action_log_writer_module._DROPPED_TOTAL.labels(reason).value - value
+            for reason, value in dropped.items()
+        } == {"success": 1, "timeout": 1}
+
+        # 失败记录在超时前等到了空位
+        pending = asyncio.create_task(writer.submit(make_record("e", 5, success=False)))
+        release.set()
+        assert await pending
+        await writer.stop()
+        assert written == ["step_0", "step_1", "step_2", "step_5"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_failed_batch_is_retried_row_by_row(self):
+        written: list[str] = []
+
+        async def picky_sink(records):
+            if any(r.action_id == "step_1" for r in records):
+                raise RuntimeError("bad row")
+            written.extend(r.action_id for r in records)
+
+        writer = ActionLogWriter(picky_sink, batch_size=10, flush_interval=0.01)
+        await writer.start()
+        for i in range(3):
+            await writer.submit(make_record("e", i))
+        await writer.stop()
+
+        assert written == ["step_0", "step_2"]
+        assert writer.stats()["failed"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_writes_inline_when_not_started(self):
+        written: list[str] = []
+
+        async def sink(records):
+            written.extend(r.action_id for r in records)
+
+        writer = ActionLogWriter(sink)
+        assert await writer.submit(make_record("e", 0))
+        assert written == ["step_0"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_crashed_writer_is_restarted(self):
+        written: list[str] = []
+
+        async def sink(records):
+            written.extend(r.action_id for r in records)
+
+        writer = ActionLogWriter(sink, batch_size=10, flush_interval=0.01)
+        collect = writer._collect
+        calls = 0
+
+        async def flaky_collect(queue):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("boom")
+            return await collect(queue)
+
+        writer._collect = flaky_collect
+        await writer.start()
+        for i in range(3):
+            await writer.submit(make_record("e", i))
+        await writer.stop()
+
+        assert written == ["step_0", "step_1", "step_2"]
+        assert writer.stats()["crashes"] == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_repeatedly_crashing_writer_falls_back_to_direct_writes(self):
+        written: list[str] = []
+
+        async def sink(records):
+            written.extend(r.action_id for r in records)
+
+        async def broken_collect(queue):
+            raise RuntimeError("boom")
+
+        writer = ActionLogWriter(sink, max_restarts=1)
+        writer._collect = broken_collect
+        await writer.start()
+        await writer.submit(make_record("e", 0))
+        await writer.submit(make_record("e", 1))
+        await asyncio.sleep(0.05)
+
+        # 已入队的记录被排空落库，之后的提交直接写库
+        assert not writer.running and writer.stats()["crashes"] == 2
+        assert written == ["step_0", "step_1"]
+        assert await writer.submit(make_record("e", 2))
+        assert written[-1] == "step_2"
+        await writer.stop()
@@ -597,3 +597,52 @@ class TestExecutionEngineDatabaseWorkflow:
 
         assert result.success
         assert result.data.success_count == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_composite_action_with_parallel_step(self):
+        """测试：自定义操作内部的并行步骤
+
+        流程：
+        1. 创建包含 parallel 步骤的自定义操作，两个分支分别读取不同元素
+        2. 外层再嵌套一层自定义操作，验证 ca_ 子步骤中的 parallel 同样可执行
+        3. 验证两个分支的输出变量都合并回复合操作
+        """
+        await self.page.set_content(
+            "<html><body>"
+            "<div id='left'>Left</div>"
+            "<div id='right'>Right</div>"
+            "</body></html>"
+        )
+
+        inner_action = await self._create_custom_action(
+            name="并行读取",
+            steps=[
+                {"action_id": "parallel", "params": {"branches": [
+                    [{"action_id": "get_text", "params": {"selector": "#left"}, "output_vars": ["left_text"]}],
+                    [{"action_id": "get_text", "params": {"selector": "#right"}, "output_vars": ["right_text"]}],
+                ]}},
+                {"action_id": "print", "params": {"message": "{{left_text}}-{{right_text}}"}},
+            ],
+        )
+        outer_action = await self._create_custom_action(
+            name="外层操作",
+            steps=[{"action_id": inner_action.action_id, "params": {}}],
+        )
+
+        result = await execution_engine.execute_action(
+            req=ActionExecutionRequest(
+                mid=self.mid,
+                browser_id=1,
+                action_id=outer_action.action_id,
+                params={},
+                input_data={},
+                output=[],
+            ),
+            session_id="test_session",
+            browser_id="test_browser",
+            page=self.page,
+        )
+
+        assert result.success, result.error
+        assert result.variables["left_text"] == "Left"
+        assert result.variables["right_text"] == "Right"
@@ -0,0 +1,238 @@
+"""
+并行步骤测试 —— 计时空操作验证并发（分支执行区间重叠）、子作用域隔离与确定性合并、
+fail_fast / collect_all 策略、分支异常、分支页面绑定与校验
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.models.execution.action_params import _ensure_action_type, workflow_step_adapter
+from app.services.execution.actions.base import ActionResult
+from app.services.execution.actions.control_flow import ExecutionContext
+from app.services.execution.engine import ExecutionEngine
+from app.services.execution.pipeline import ParallelStep, PipelineBuilder
+from app.services.execution.scope import Scope
+
+
+class TimedExecutor:
+    """空操作执行器：sleep(params.delay) 后把 params.value 写入 output_vars，params.fail 为真时返回失败，
+    params.error 非空时抛出异常，params.append_to 非空时把 value 原地追加到该列表变量；
+    记录的 seen 为调用时变量 params.watch（默认 shared）的值
+
+    每次调用记录开始 / 结束时间，用执行区间是否重叠判断并发，不依赖紧凑的总耗时窗口。
+    """
+
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    async def __call__(self, action_id, params, scope, output_vars, page_index=None) -> ActionResult:
+        call = {"action_id": action_id, "page_index": page_index, "seen": scope.get(params.get("watch", "shared")), "start": time.perf_counter()}
+        self.calls.append(call)
+        try:
+            await asyncio.sleep(params.get("delay", 0))
+        finally:
+            call["end"] = time.perf_counter()
+        if params.get("fail"):
+            return ActionResult(success=False, error=f"{action_id} failed", action_id=action_id)
+        if params.get("error"):
+            raise RuntimeError(params["error"])
+        if params.get("append_to"):
+            scope.get(params["append_to"]).append(params.get("value"))
+        for name in output_vars:
+            scope.set(name, params.get("value"))
+        return ActionResult(success=True, data={"value": params.get("value")}, action_id=action_id)
+
+
+def step(name: str, delay: float = 0, value=None, output: str | None = None, **params) -> dict:
+    return {
+        "action_id": name,
+        "params": {"delay": delay, "value": value, **params},
+        "output_vars": [output] if output else [],
+    }
+
+
+def span(executor: TimedExecutor, action_id: str) -> tuple[float, float]:
+    call = next(c for c in executor.calls if c["action_id"] == action_id)
+    return call["start"], call["end"]
+
+
+def overlaps(a: tuple[float, float], b: tuple[float, float]) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def parallel(*branches: list[dict], **params) -> dict:
+    return {"action_id": "parallel", "params": {"branches": list(branches), **params}}
+
+
+async def run(steps: list[dict], variables: dict | None = None):
+    executor = TimedExecutor()
+    scope = Scope(variables or {})
+    # 并行步骤按存储格式校验为 WorkflowStep 模型，其余空操作保持 dict
+    pipeline = PipelineBuilder.build([
+        workflow_step_adapter.validate_python(_ensure_action_type(s)) if s["action_id"] == "parallel" else s
+        for s in steps
+    ])
+    start = time.perf_counter()
+    results = await pipeline.execute(scope, executor)
+    return results, scope, executor, time.perf_counter() - start
+
+
+class TestParallelStep:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_wall_time_is_the_slowest_branch(self):
+        results, scope, executor, elapsed = await run([parallel(
+            [step("a1", 0.1, 1, "a"), step("a2", 0.2, 2, "a")],
+            [step("b1", 0.3, 3, "b")],
+            [step("c1", 0.1, 4, "c"), step("c2", 0.1, 5, "c"), step("c3", 0.1, 6, "c")],
+        )])
+
+        assert isinstance(PipelineBuilder.build([parallel([step("x")])]).steps[0], ParallelStep)
+        assert results[0].success and len(executor.calls) == 6
+        # 三个分支同时开始执行；总耗时不短于最慢分支，且明显短于串行的 0.9s
+        assert overlaps(span(executor, "a1"), span(executor, "b1"))
+        assert overlaps(span(executor, "b1"), span(executor, "c1"))
+        assert 0.3 <= elapsed < 0.8
+        assert (scope.get("a"), scope.get("b"), scope.get("c")) == (2, 3, 6)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_branches_are_isolated_and_merge_in_declaration_order(self):
+        results, scope, executor, _ = await run([
+            parallel(
+                # 分支 0 最后完成，但同名变量以声明更靠后的分支为准
+                [step("slow", 0.2, "first", "shared")],
+                [step("fast", 0.0, "second", "shared"), step("peek", 0.1)],
+            ),
+            step("after", value="{{shared}}", output="final"),
+        ], {"shared": "parent"})
+
+        assert all(r.success for r in results)
+        # 分支内看不到其它分支的写入
+        peek = next(c for c in executor.calls if c["action_id"] == "peek")
+        assert peek["seen"] == "second"
+        slow = next(c for c in executor.calls if c["action_id"] == "slow")
+        assert slow["seen"] == "parent"
+        assert scope.get("shared") == "second" and scope.get("final") == "second"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_assigning_the_parent_value_still_merges(self):
+        results, scope, _, _ = await run([parallel(
+            [step("change", 0.0, 5, "n")],
+            # 靠后的分支把变量赋回父作用域原来的值，仍然是一次写入
+            [step("reset", 0.1, 1, "n")],
+        )], {"n": 1})
+
+        assert results[0].success and scope.get("n") == 1
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_in_place_mutation_does_not_leak(self):
+        items = ["parent"]
+        results, scope, executor, _ = await run([parallel(
+            [step("append", 0.0, "a", append_to="items")],
+            [step("peek", 0.1, watch="items")],
+        )], {"items": items})
+
+        assert results[0].success
+        # 分支 0 修改的是自己的副本：父作用域与分支 1 都看不到
+        assert items == ["parent"] and scope.get("items") == ["parent"]
+        assert next(c for c in executor.calls if c["action_id"] == "peek")["seen"] == ["parent"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_branch_exception_fails_the_step(self):
+        results, scope, _, _ = await run([parallel(
+            [step("raise", 0.0, error="boom")],
+            [step("ok", 0.0, "kept", "ok")],
+            on_branch_error="collect_all",
+        )])
+
+        assert len(results) == 1 and not results[0].success
+        assert "boom" in results[0].error and results[0].data["failed_branches"] == [0]
+        assert scope.get("ok") == "kept"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_fail_fast_cancels_remaining_branches(self):
+        results, scope, executor, elapsed = await run([
+            parallel(
+                [step("boom", 0.05, fail=True)],
+                [step("long", 2.0, "never", "long")],
+                [step("quick", 0.0, "kept", "quick")],
+            ),
+            step("unreached"),
+        ])
+
+        # long 在失败后被取消，不会等满 2s
+        assert elapsed < 1.5 and span(executor, "long")[1] < span(executor, "long")[0] + 1.5
+        assert len(results) == 1 and not results[0].success
+        data = results[0].data
+        assert data["failed_branches"] == [0] and data["cancelled_branches"] == [1]
+        # 已成功结束的分支仍然合并，被取消 / 失败的分支不合并
+        assert scope.get("quick") == "kept" and "long" not in scope
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_collect_all_waits_for_every_branch(self):
+        results, scope, executor, elapsed = await run([parallel(
+            [step("boom", 0.05, fail=True)],
+            [step("long", 0.2, "done", "long")],
+            on_branch_error="collect_all",
+        )])
+
+        # 分支 0 失败后 long 继续执行到结束
+        assert elapsed >= 0.2 and overlaps(span(executor, "boom"), span(executor, "long"))
+        assert not results[0].success and "分支 0" in results[0].error
+        assert results[0].data["failed_branches"] == [0] and results[0].data["cancelled_branches"] == []
+        assert scope.get("long") == "done"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_branch_page_binding_and_concurrency_limit(self):
+        results, _, executor, elapsed = await run([parallel(
+            [step("p0", 0.1)],
+            [step("p1", 0.1), parallel([step("nested", 0.0)], page_indexes=[3])],
+            [step("p2", 0.1)],
+            page_indexes=[None, 1, 2],
+            max_concurrency=2,
+        )])
+
+        assert results[0].success
+        pages = {c["action_id"]: c["page_index"] for c in executor.calls}
+        assert pages == {"p0": None, "p1": 1, "nested": 3, "p2": 2}
+        # 最多 2 个分支同时执行：前两个分支并发，第三个分支要等其中一个结束后才开始
+        assert elapsed >= 0.2
+        assert overlaps(span(executor, "p0"), span(executor, "p1"))
+        assert span(executor, "p2")[0] >= min(span(executor, "p0")[1], span(executor, "p1")[1])
+
+
+class TestExecutionContextFork:
+
+    def test_fork_isolates_variables_and_tracks_assignments(self):
+        parent = ExecutionContext({"items": [1], "n": 1})
+        child = parent.fork()
+        child.variables["items"].append(2)
+        child.variables["n"] = 1
+
+        saved = child.save_state()
+        child.variables["loop_item"] = "x"
+        child.restore_state(saved)
+
+        assert parent.variables == {"items": [1], "n": 1}
+        # 赋值记录随 restore_state 回滚，循环体内的临时变量不会合并回父上下文
+        assert child.variables.assigned() == {"n": 1}
+
+
+class TestParallelValidation:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_validate_parallel(self):
+        ok = await ExecutionEngine.validate_action(1, "parallel", {"branches": [[step("print")], [step("wait")]]})
+        assert ok["valid"] and ok["action_id"] == "parallel"
+
+        bad = await ExecutionEngine.validate_action(1, "parallel", {
+            "branches": [[], [step("ca_missing_action")], [parallel()]],
+        })
+        assert not bad["valid"]
+        assert any("分支 0" in e for e in bad["errors"])
+        assert any("ca_missing_action" in e for e in bad["errors"])
+        assert any("至少需要一个分支" in e for e in bad["errors"])
+
+        invalid = await ExecutionEngine.validate_action(1, "parallel", {"branches": [], "on_branch_error": "retry"})
+        assert not invalid["valid"] and invalid["invalid_params"] == ["on_branch_error"]
@@ -0,0 +1,150 @@
+"""
+已编译 Pipeline 缓存测试 —— LRU / 版本失效、缓存 IR 不被执行修改、按操作失效
+"""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.database.workflow.models import BuiltinActionType
+from app.models.execution.action_params import _ensure_action_type, workflow_step_adapter
+from app.services.execution.actions.base import ActionResult
+from app.services.execution.action_registry import action_registry
+from app.services.execution.actions.control_flow import LoopAction
+from app.services.execution.crud_service import action_crud_svr
+from app.services.execution.engine import ExecutionEngine
+from app.services.execution.pipeline import AtomicStep, LoopStep, PipelineBuilder
+from app.services.execution.pipeline_cache import (
+    VersionedLRUCache,
+    action_steps_cache,
+    invalidate_action,
+    pipeline_cache,
+    validated_steps_cache,
+)
+from app.services.execution.scope import Scope
+
+
+async def noop_executor(action_id: str, params: dict, scope: Scope, output_vars: list[str]) -> ActionResult:
+    return ActionResult(success=True, data=params, action_id=action_id)
+
+
+class TestVersionedLRUCache:
+
+    def test_hit_miss_and_version_change(self):
+        cache: VersionedLRUCache[str] = VersionedLRUCache(maxsize=4)
+        builds = []
+
+        def build():
+            builds.append(1)
+            return f"v{len(builds)}"
+
+        assert cache.get_or_build("a", 1, build) == "v1"
+        assert cache.get_or_build("a", 1, build) == "v1"
+        # 版本变化（操作被修改）视为未命中
+        assert cache.get_or_build("a", 2, build) == "v2"
+        assert len(builds) == 2
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache: VersionedLRUCache[int] = VersionedLRUCache(maxsize=2)
+        cache.put("a", 0, 1)
+        cache.put("b", 0, 2)
+        cache.get("a", 0)
+        cache.put("c", 0, 3)
+        assert "a" in cache and "c" in cache and "b" not in cache
+
+
+class TestCompiledPipeline:
+
+    def test_compile_action_pipeline_is_cached_by_version(self):
+        pipeline_cache.clear()
+        now = datetime.now()
+        model = SimpleNamespace(
+            action_id=f"ca_{uuid.uuid4().hex[:12]}",
+            updated_at=now,
+            steps=[{"action_id": "print", "params": {"message": "{{name}}"}}],
+        )
+
+        first = ExecutionEngine.compile_action_pipeline(model)
+        assert ExecutionEngine.compile_action_pipeline(model) is first
+
+        model.updated_at = now + timedelta(seconds=1)
+        assert ExecutionEngine.compile_action_pipeline(model) is not first
+
+    def test_template_free_steps_skip_resolution(self):
+        pipeline = PipelineBuilder.build([
+            {"action_id": "print", "params": {"message": "hello"}},
+            {"action_id": "print", "params": {"message": "hi {{name}}"}},
+        ])
+        assert [step.has_templates for step in pipeline.steps] == [False, True]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cached_pipeline_is_not_mutated_by_execution(self):
+        pipeline = PipelineBuilder.build([workflow_step_adapter.validate_python(_ensure_action_type({
+            "action_id": BuiltinActionType.LOOP,
+            "params": {
+                "loop_source": "variable",
+                "loop_items_var": "users",
+                "param_mapping": {"selector": "loop_item.name"},
+                "loopBranch": [{"action_id": "print", "params": {"message": "{{loop_index}}"}}],
+            },
+        }))])
+        loop = pipeline.steps[0]
+        assert isinstance(loop, LoopStep)
+        body_step = loop.body.steps[0]
+        assert isinstance(body_step, AtomicStep)
+
+        for users in (["a", "b"], ["c"]):
+            scope = Scope({"users": [{"name": u} for u in users]})
+            await pipeline.execute(scope, noop_executor)
+
+        # 映射参数只作用于单次迭代，不会写回共享的 IR
+        assert body_step.params == {"message": "{{loop_index}}"}
+        assert loop.body.steps[0] is body_step
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_validated_steps_are_cached_by_version(self):
+        action = await action_crud_svr.create(
+            mid=1,
+            action_id=f"ca_{uuid.uuid4().hex[:12]}",
+            name="缓存校验步骤",
+            steps=[{"action_id": "print", "params": {"message": "{{name}}"}}],
+            is_composite=True,
+        )
+        try:
+            dict_steps, first = await action_registry.get_validated_action_steps(action.action_id)
+            _, second = await action_registry.get_validated_action_steps(action.action_id)
+            # 版本未变：复合操作每次执行拿到同一批已校验的步骤，不再重复校验
+            assert isinstance(dict_steps[0], dict)
+            assert first[0] is second[0]
+
+            await action_crud_svr.update(action.id, steps=[{"action_id": "print", "params": {"message": "v2"}}])
+            _, updated = await action_registry.get_validated_action_steps(action.action_id)
+            assert updated[0] is not first[0] and updated[0].params.message == "v2"
+        finally:
+            await action_crud_svr.delete(action.id)
+
+    def test_loop_param_mapping_does_not_mutate_shared_steps(self):
+        step = workflow_step_adapter.validate_python(_ensure_action_type(
+            {"action_id": "print", "params": {"message": "hello"}}
+        ))
+        injected = LoopAction._inject_params_to_children([step], {"message": "mapped"})
+
+        assert injected[0].params == {"message": "mapped"}
+        assert step.params.message == "hello"
+
+
+class TestInvalidateAction:
+
+    def test_invalidate_action_drops_all_caches(self):
+        action_id = f"ca_{uuid.uuid4().hex[:12]}"
+        pipeline_cache.put(action_id, 1, PipelineBuilder.build([]))
+        action_steps_cache.put(action_id, 1, [])
+        validated_steps_cache.put(action_id, 1, [])
+
+        invalidate_action(action_id)
+
+        assert action_id not in pipeline_cache
+        assert action_id not in action_steps_cache
+        assert action_id not in validated_steps_cache
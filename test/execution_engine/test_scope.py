@@ -0,0 +1,125 @@
+"""
+Scope 测试 —— 展平索引与栈语义一致、经 current 写入、快照不可变、弹出作用域后的遮蔽恢复
+"""
+import copy
+import random
+
+from app.services.execution.scope import Scope
+
+
+def reference_view(layers: list[dict]) -> dict:
+    """旧实现的语义：自底向上合并所有层"""
+    merged: dict = {}
+    for layer in layers:
+        merged.update(layer)
+    return merged
+
+
+class TestScopeLookup:
+
+    def test_push_pop_restores_shadowed_values(self):
+        scope = Scope({"a": 1, "b": 2})
+        scope.push()
+        scope.set("a", 10)
+        scope.set("c", 3)
+        assert scope.get("a") == 10 and scope.get("c") == 3 and scope.get("b") == 2
+
+        scope.pop()
+        assert scope.get("a") == 1
+        assert "c" not in scope
+        # 全局层不可弹出
+        scope.pop()
+        assert scope.depth() == 1 and scope.get("b") == 2
+
+    def test_writes_through_current_dict_are_indexed(self):
+        scope = Scope({"x": 1})
+        scope.push()
+        variables = scope.current  # BaseAction.variables 持有的就是这个引用
+        variables["x"] = 2
+        variables.update({"y": 3})
+        variables.setdefault("z", 4)
+        assert (scope.get("x"), scope.get("y"), scope.get("z")) == (2, 3, 4)
+
+        del variables["x"]
+        assert scope.get("x") == 1
+        variables.pop("y")
+        assert "y" not in scope
+        # 拷贝出来的 dict 与 Scope 无关
+        detached = copy.deepcopy(variables)
+        detached["z"] = 99
+        assert type(detached) is dict and scope.get("z") == 4
+
+    def test_writes_to_shadowed_lower_layer_stay_hidden(self):
+        scope = Scope({"k": "global"})
+        root = scope.current
+        scope.push()
+        scope.set("k", "local")
+        root["k"] = "global-2"
+        assert scope.get("k") == "local"
+        scope.pop()
+        assert scope.get("k") == "global-2"
+
+    def test_matches_reference_semantics_under_random_operations(self):
+        rng = random.Random(7)
+        scope = Scope()
+        layers: list[dict] = [{}]
+        keys = [f"k{i}" for i in range(8)]
+        for step in range(2000):
+            op = rng.random()
+            if op < 0.1:
+                scope.push()
+                layers.append({})
+            elif op < 0.2:
+                scope.pop()
+                if len(layers) > 1:
+                    layers.pop()
+            elif op < 0.3:
+                key = rng.choice(keys)
+                scope.current.pop(key, None)
+                layers[-1].pop(key, None)
+            else:
+                key = rng.choice(keys)
+                scope.set(key, step)
+                layers[-1][key] = step
+
+            expected = reference_view(layers)
+            assert {k: scope.get(k) for k in expected} == expected
+            assert all((k in scope) == (k in expected) for k in keys)
+            if step % 7 == 0:
+                assert dict(scope.snapshot()) == expected
+
+
+class TestScopeSnapshot:
+
+    def test_snapshot_is_unaffected_by_later_writes(self):
+        scope = Scope({"a": 1, "b": 2})
+        scope.push()
+        scope.set("c", 3)
+        first = scope.snapshot()
+
+        scope.set("a", 100)
+        scope.pop()
+        second = scope.snapshot()
+
+        assert dict(first) == {"a": 1, "b": 2, "c": 3}
+        assert first["a"] == 1 and first.get("c") == 3
+        assert dict(second) == {"a": 1, "b": 2}
+        assert "c" not in second
+
+    def test_snapshots_are_read_only_and_cheap(self):
+        scope = Scope({f"v{i}": i for i in range(1000)})
+        snapshots = []
+        for i in range(200):
+            scope.set("loop_index", i)
+            snapshots.append(scope.snapshot())
+
+        assert [s["loop_index"] for s in snapshots] == list(range(200))
+        assert all(len(s) == 1001 for s in snapshots[::50])
+        # 段数与快照次数呈对数关系，不会随迭代线性增长
+        assert len(snapshots[-1]._segments) <= 10
+        try:
+            snapshots[0]["loop_index"] = 1  # type: ignore[index]
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("snapshot should be read-only")
@@ -0,0 +1,66 @@
+"""
+参数模板预编译测试 —— 渲染结果与 Scope.resolve_params 完全一致，常量子树不被遍历 / 拷贝
+"""
+import pytest
+from pydantic import BaseModel
+
+from app.services.execution.pipeline import PipelineBuilder
+from app.services.execution.scope import Scope
+from app.services.execution.template import compile_template
+
+
+class Selector(BaseModel):
+    selector: str
+    index: int = 0
+
+
+PARAMS_CASES = [
+    "plain text",
+    "hello {{name}}",
+    "{{name}}{{name}} and {{missing}} / {{none_value}}",
+    "{{user.nick}} @ {{a.b.c}}",
+    "{{ name }} is not a template",
+    {"url": "https://example.com/{{name}}?page={{page}}", "timeout": 3000, "flag": True, "empty": None},
+    {"nested": {"list": ["a", "{{page}}", 1, None, ["{{missing}}"]], "static": {"k": "v"}}},
+    [{"message": "{{name}}"}, {"message": "static"}],
+    {"target": Selector(selector="#{{name}}"), "other": Selector(selector="#static")},
+    None,
+    42,
+]
+
+
+@pytest.fixture
+def scope() -> Scope:
+    scope = Scope({"name": "Alice", "page": 3, "none_value": None, "user.nick": "nick"})
+    scope.push()
+    scope.set("page", 4)
+    return scope
+
+
+class TestCompiledTemplate:
+
+    @pytest.mark.parametrize("params", PARAMS_CASES)
+    @pytest.mark.parametrize("default", [None, ""])
+    def test_render_matches_resolve_params(self, scope, params, default):
+        assert compile_template(params).render(scope, default) == scope.resolve_params(params, default)
+
+    def test_static_subtrees_are_shared_not_copied(self, scope):
+        items = [{"name": f"item-{i}"} for i in range(100)]
+        template = compile_template({"items": items, "message": "{{name}}"})
+
+        rendered = template.render(scope)
+
+        assert rendered == {"items": items, "message": "Alice"}
+        assert rendered["items"] is items
+        assert not compile_template({"items": items}).has_templates
+
+    def test_render_reflects_current_scope(self, scope):
+        template = compile_template({"message": "page {{page}}"})
+        assert template.render(scope) == {"message": "page 4"}
+        scope.pop()
+        assert template.render(scope) == {"message": "page 3"}
+
+    def test_atomic_step_compiles_once(self):
+        step = PipelineBuilder.build([{"action_id": "print", "params": {"message": "{{name}}"}}]).steps[0]
+        assert step.has_templates
+        assert step.template.render(Scope({"name": "Bob"})) == {"message": "Bob"}
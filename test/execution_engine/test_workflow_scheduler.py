@@ -0,0 +1,332 @@
+"""
+测试工作流定时触发 —— 模拟时钟 + 假执行器，验证抖动、错过触发合并、重叠策略、并发上限与 CRUD 注册
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.database.workflow.models import UserWorkflow
+from app.services.RPA_browser.cluster import ClusterNode, InMemorySessionDirectory, SessionRouter
+from app.services.execution.crud_service import workflow_crud
+from app.services.execution.crud_service import workflow_crud_svr
+from app.services.execution.workflow_scheduler import ScheduledWorkflow, WorkflowTriggerScheduler
+from app.utils.depends.session_manager import DatabaseSessionManager
+
+MID = 7770001
+START = datetime(2026, 1, 5, 8, 0, 0).timestamp()
+
+
+class FakeRunner:
+    """记录执行，可选地阻塞到 release 被设置"""
+
+    def __init__(self, block: bool = False):
+        self.calls: list[ScheduledWorkflow] = []
+        self.release = asyncio.Event()
+        if not block:
+            self.release.set()
+        self.active = 0
+        self.peak = 0
+        self.active_by_user: dict[int, int] = {}
+        self.peak_by_user: dict[int, int] = {}
+
+    async def __call__(self, job: ScheduledWorkflow) -> None:
+        self.calls.append(job)
+        self.active += 1
+        self.active_by_user[job.mid] = self.active_by_user.get(job.mid, 0) + 1
+        self.peak = max(self.peak, self.active)
+        self.peak_by_user[job.mid] = max(self.peak_by_user.get(job.mid, 0), self.active_by_user[job.mid])
+        try:
+            await self.release.wait()
+        finally:
+            self.active -= 1
+            self.active_by_user[job.mid] -= 1
+
+
+def workflow(trigger_type: str = "interval", mid: int = MID, **config) -> UserWorkflow:
+    config.setdefault("browser_id", 42)
+    if trigger_type == "interval":
+        config.setdefault("seconds", 60)
+    workflow_id = str(uuid.uuid4())
+    return UserWorkflow(
+        workflow_id=workflow_id,
+        name=f"定时任务-{workflow_id}",
+        custom_action_id="action",
+        mid=mid,
+        original_mid=mid,
+        trigger_type=trigger_type,
+        trigger_config=config,
+    )
+
+
+async def owns_all(mid: int, browser_id: int) -> bool:
+    return True
+
+
+async def tick(scheduler: WorkflowTriggerScheduler, clock, seconds: float = 0) -> int:
+    clock.now += seconds
+    fired = await scheduler.run_pending()
+    await asyncio.sleep(0)
+    return fired
+
+
+class TestTriggers:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_cron_starts_are_spread_by_jitter(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner()
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, max_concurrency=500, max_per_user=500, max_jitter=30, clock=clock)
+        for _ in range(200):
+            assert await scheduler.sync(workflow("cron", cron="* * * * *", timezone="UTC"))
+
+        # 整分钟之后的 30 秒内陆续启动
+        assert await tick(scheduler, clock, 59) == 0
+        started_at = []
+        for _ in range(31):
+            before = len(runner.calls)
+            await tick(scheduler, clock, 1)
+            started_at += [clock.now] * (len(runner.calls) - before)
+        await scheduler.wait_idle()
+
+        assert len(runner.calls) == 200
+        per_second = {t: started_at.count(t) for t in set(started_at)}
+        assert max(per_second.values()) < 30
+
+        # 每个工作流的偏移固定，下一分钟的启动间隔保持 60 秒
+        await tick(scheduler, clock, 60)
+        await scheduler.wait_idle()
+        assert len(runner.calls) == 400
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_missed_fires_are_coalesced_into_one_run(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner()
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, max_jitter=0, clock=clock)
+        await scheduler.sync(workflow(seconds=10))
+
+        assert await tick(scheduler, clock, 9) == 0
+        assert await tick(scheduler, clock, 1) == 1
+        # 进程暂停 10 个周期，恢复后只执行一次
+        assert await tick(scheduler, clock, 100) == 1
+        assert await tick(scheduler, clock, 0) == 0
+        assert await tick(scheduler, clock, 10) == 1
+        await scheduler.wait_idle()
+        assert len(runner.calls) == 3
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_invalid_config_is_not_registered(self, fake_clock):
+        scheduler = WorkflowTriggerScheduler(FakeRunner(), owner_check=owns_all, clock=fake_clock(START))
+        assert not await scheduler.sync(workflow("cron", cron="not a cron"))
+        assert not await scheduler.sync(workflow(browser_id="abc"))
+        assert not await scheduler.sync(workflow(overlap="queue"))
+        assert not await scheduler.sync(workflow("manual"))
+        assert scheduler.stats()["jobs"] == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_browser_not_owned_by_workflow_user_is_not_registered(self, fake_clock):
+        async def owns_only_42(mid: int, browser_id: int) -> bool:
+            return mid == MID and browser_id == 42
+
+        hints = []
+        scheduler = WorkflowTriggerScheduler(FakeRunner(), owner_check=owns_only_42, clock=fake_clock(START))
+        scheduler.schedule_hint = lambda *args: hints.append(args)
+        owned = workflow()
+        assert await scheduler.sync(owned)
+        assert not await scheduler.sync(workflow(browser_id=43))
+        assert not await scheduler.sync(workflow(mid=MID + 1))
+
+        # 已注册的工作流改用别人的浏览器后被注销
+        owned.trigger_config = {**owned.trigger_config, "browser_id": 43}
+        assert not await scheduler.sync(owned)
+        assert scheduler.stats()["jobs"] == 0
+        # 只为合法的 (mid, browser_id) 预热
+        assert {(mid, browser_id) for mid, browser_id, _ in hints} == {(MID, 42)}
+
+
+class TestOverlapAndConcurrency:
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_skip_drops_overlapping_fires(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner(block=True)
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, max_jitter=0, clock=clock)
+        await scheduler.sync(workflow(seconds=10, overlap="skip"))
+
+        for _ in range(4):
+            await tick(scheduler, clock, 10)
+        runner.release.set()
+        await scheduler.wait_idle()
+
+        assert len(runner.calls) == 1
+        assert scheduler.stats()["skipped"] == 3
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_coalesce_runs_once_after_overlap(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner(block=True)
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, max_jitter=0, clock=clock)
+        await scheduler.sync(workflow(seconds=10))
+
+        for _ in range(4):
+            await tick(scheduler, clock, 10)
+        runner.release.set()
+        await scheduler.wait_idle()
+
+        # 运行期间的 3 次触发合并为结束后的 1 次补跑
+        assert len(runner.calls) == 2
+        assert scheduler.stats()["coalesced"] == 3
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_per_user_and_global_limits(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner(block=True)
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, max_concurrency=3, max_per_user=2, max_jitter=0, clock=clock)
+        for mid in (1, 2, 3):
+            for _ in range(5):
+                await scheduler.sync(workflow(mid=mid, seconds=60))
+
+        assert await tick(scheduler, clock, 60) == 15
+        for _ in range(5):
+            await asyncio.sleep(0)
+        stats = scheduler.stats()
+        assert stats["active"] == 3 and stats["queued"] == 12
+
+        runner.release.set()
+        await scheduler.wait_idle()
+        assert len(runner.calls) == 15
+        assert runner.peak == 3 and max(runner.peak_by_user.values()) == 2
+        assert scheduler.stats()["active"] == scheduler.stats()["queued"] == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_runner_failure_does_not_stop_schedule(self, fake_clock):
+        clock = fake_clock(START)
+        calls = []
+
+        async def failing(job):
+            calls.append(job)
+            raise RuntimeError("boom")
+
+        scheduler = WorkflowTriggerScheduler(failing, owner_check=owns_all, max_jitter=0, clock=clock)
+        await scheduler.sync(workflow(seconds=10))
+        for _ in range(3):
+            await tick(scheduler, clock, 10)
+            await scheduler.wait_idle()
+        assert len(calls) == 3 and scheduler.stats()["failures"] == 3
+
+
+class TestClusterOwnership:
+
+    @staticmethod
+    def node_check(router: SessionRouter):
+        async def check(mid: int, browser_id: int) -> bool:
+            return router.is_local(await router.locate(mid, browser_id))
+
+        return check
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_each_trigger_fires_on_exactly_one_node(self, fake_clock):
+        clock = fake_clock(START)
+        directory = InMemorySessionDirectory(clock)
+        routers = [
+            SessionRouter(directory, ClusterNode(f"node-{i}", f"http://node-{i}"), node_ttl=30, secret="s", clock=clock)
+            for i in range(2)
+        ]
+        for router in routers:
+            await router.start()
+        runners = [FakeRunner(), FakeRunner()]
+        schedulers = [
+            WorkflowTriggerScheduler(runner, owner_check=owns_all, node_check=self.node_check(router), max_jitter=0, clock=clock)
+            for runner, router in zip(runners, routers)
+        ]
+        workflows = [workflow(seconds=10, browser_id=browser_id) for browser_id in range(40)]
+        for scheduler in schedulers:
+            for wf in workflows:
+                assert await scheduler.sync(wf)
+
+        await tick(schedulers[0], clock, 10)
+        await tick(schedulers[1], clock)
+        for scheduler in schedulers:
+            await scheduler.wait_idle()
+        runs = [sorted(job.browser_id for job in runner.calls) for runner in runners]
+        assert sorted(runs[0] + runs[1]) == list(range(40))
+        assert runs[0] and runs[1]
+        assert [s.stats()["remote"] for s in schedulers] == [len(runs[1]), len(runs[0])]
+
+        # node-1 宕机（不再心跳 / tick）后其会话重新分配，后续触发全部由 node-0 执行
+        clock.now += 30
+        await routers[0].heartbeat()
+        runners[0].calls.clear()
+        await tick(schedulers[0], clock)
+        await schedulers[0].wait_idle()
+        assert sorted(job.browser_id for job in runners[0].calls) == list(range(40))
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_failed_node_check_skips_the_run(self, fake_clock):
+        clock, runner = fake_clock(START), FakeRunner()
+
+        async def unreachable(mid: int, browser_id: int) -> bool:
+            raise OSError("directory unavailable")
+
+        scheduler = WorkflowTriggerScheduler(runner, owner_check=owns_all, node_check=unreachable, max_jitter=0, clock=clock)
+        hints = []
+        scheduler.schedule_hint = lambda mid, browser_id, run_at: hints.append(browser_id)
+        assert await scheduler.sync(workflow(seconds=10))
+        await tick(scheduler, clock, 10)
+        await scheduler.wait_idle()
+        assert not runner.calls and not hints and scheduler.stats()["remote"] == 1
+
+
+class TestCrudRegistration:
+
+    @pytest.fixture
+    def scheduler(self, monkeypatch, fake_clock):
+        scheduler = WorkflowTriggerScheduler(FakeRunner(), owner_check=owns_all, max_jitter=0, clock=fake_clock(START))
+        monkeypatch.setattr(workflow_crud, "workflow_trigger_scheduler", scheduler)
+        return scheduler
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_load_from_db_and_delete(self, scheduler):
+        now = datetime.now(timezone.utc)
+        rows = [
+            workflow("cron", cron="*/5 * * * *"),
+            workflow(seconds=30),
+            workflow("manual"),
+            workflow(seconds=30),
+        ]
+        rows[3].is_enabled = False
+        for row in rows:
+            row.created_at = row.updated_at = now
+        ids = [row.workflow_id for row in rows]
+        async with DatabaseSessionManager.async_session() as session:
+            session.add_all(rows)
+            await session.flush()
+            pks = [row.id for row in rows]
+            await session.commit()
+
+        # 启动时只加载已启用的 cron / interval 工作流
+        assert await scheduler.load_from_db() == 2
+        assert set(scheduler._jobs) == set(ids[:2])
+
+        for pk in pks:
+            await workflow_crud_svr.delete(pk)
+        assert scheduler.stats()["jobs"] == 0
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_fork_drops_browser_and_stays_disabled(self, scheduler):
+        original = workflow(seconds=30)
+        original.is_public = True
+        original.created_at = original.updated_at = datetime.now(timezone.utc)
+        async with DatabaseSessionManager.async_session() as session:
+            session.add(original)
+            await session.commit()
+            await session.refresh(original)
+        assert await scheduler.sync(original)
+
+        forked = await workflow_crud_svr.fork(original.id, target_mid=MID + 1)
+        duplicated = await workflow_crud_svr.duplicate(original.id)
+
+        # Fork 不带原作者的浏览器，副本都默认不启用，不会被注册
+        assert forked.trigger_config == {"seconds": 30}
+        assert duplicated.trigger_config == original.trigger_config
+        assert not forked.is_enabled and not duplicated.is_enabled
+        assert set(scheduler._jobs) == {original.workflow_id}
+
+        for pk in (original.id, forked.id, duplicated.id):
+            await workflow_crud_svr.delete(pk)